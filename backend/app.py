@@ -1,13 +1,18 @@
-from fastapi import FastAPI, HTTPException, Request, Depends, status, Response
+from fastapi import FastAPI, HTTPException, Request, Depends, Query, status, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, validator
 from typing import Optional, Dict, Any, List
 import os
+import orjson
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 from services.scoring import ScoringService
 from services.blockchain import BlockchainService
 from services.gdpr import GDPRService
+from services.api_access import flush_last_used
+from services.leaderboard import TOP_SCORES_MAX_LIMIT
+from database.loaders import ScoreLoader, get_score_loader
 from database.models import APIAccess
 from middleware.security_headers import SecurityHeadersMiddleware
 from middleware.auth import get_current_user
@@ -19,12 +24,10 @@ from utils.audit_logger import log_score_generation, log_on_chain_update, log_lo
 from utils.jwt_handler import create_access_token
 from models.auth import Token, AuthRequest
 from utils.monitoring import init_sentry, capture_exception, set_user_context
-from utils.logger import setup_logging, get_logger
-from middleware.logging import LoggingMiddleware
-from middleware.metrics import MetricsMiddleware
-from middleware.performance import PerformanceMiddleware
+from utils.logger import setup_logging, get_logger, flush_deferred
+from middleware.observability import ObservabilityMiddleware
 from middleware.cache import CacheMiddleware
-from utils.metrics import get_metrics, get_metrics_content_type, set_app_info
+from utils.metrics import flush_metrics, get_metrics, get_metrics_content_type, set_app_info
 
 load_dotenv()
 
@@ -42,6 +45,18 @@ init_sentry(
     enable_tracing=os.getenv("SENTRY_ENABLE_TRACING", "true").lower() == "true"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Flush buffered writes on shutdown"""
+    yield
+    # API key last_used_at writes queued since the last timed flush
+    await flush_last_used()
+    # Metric updates still queued for the flush task
+    flush_metrics()
+    # Log records deferred with emit_later, so shutdown doesn't drop them
+    flush_deferred()
+
+
 app = FastAPI(
     title="NeuroCred API",
     version="1.0.0",
@@ -66,6 +81,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set application info for metrics
@@ -73,18 +89,7 @@ app_version = os.getenv("APP_VERSION", "1.0.0")
 app_environment = os.getenv("ENVIRONMENT", "development")
 set_app_info(app_version, app_environment)
 
-# Add logging middleware (after CORS, before other middleware)
-app.add_middleware(LoggingMiddleware)
-
-# Add metrics middleware
-if os.getenv("METRICS_ENABLED", "true").lower() == "true":
-    app.add_middleware(MetricsMiddleware)
-
-# Add performance monitoring middleware
-if os.getenv("PERFORMANCE_MONITORING_ENABLED", "true").lower() == "true":
-    app.add_middleware(PerformanceMiddleware)
-
-# Add cache middleware (after logging, before other middleware)
+# Add cache middleware (inside observability, before other middleware)
 if os.getenv("CACHE_ENABLED", "true").lower() == "true":
     app.add_middleware(CacheMiddleware)
 
@@ -108,6 +113,15 @@ async def global_exception_handler(request: Request, exc: Exception):
         detail="Internal server error"
     )
 
+# Add request logging, metrics and performance monitoring in one layer
+# (after CORS, before other middleware). Registered after the middleware
+# above so it wraps them and its request_context is bound while they log
+app.add_middleware(
+    ObservabilityMiddleware,
+    metrics=os.getenv("METRICS_ENABLED", "true").lower() == "true",
+    performance=os.getenv("PERFORMANCE_MONITORING_ENABLED", "true").lower() == "true",
+)
+
 # Security headers middleware (must be first)
 app.add_middleware(SecurityHeadersMiddleware)
 
@@ -296,6 +310,12 @@ async def health_check(request: Request):
         "version": "1.0.0"
     }
 
+@app.get("/metrics")
+@limiter.exempt
+async def metrics(request: Request):
+    """Prometheus metrics (queued updates are applied before rendering)"""
+    return Response(content=get_metrics(), media_type=get_metrics_content_type())
+
 @app.post("/api/auth/token", response_model=Token)
 @limiter.limit("10/minute")
 async def create_token(request: Request, auth_request: AuthRequest):
@@ -542,27 +562,26 @@ async def get_score_history(
 async def get_score_trends(
     request: Request,
     address: str,
-    current_user: Optional[str] = Depends(get_current_user)
+    current_user: Optional[str] = Depends(get_current_user),
+    scores: ScoreLoader = Depends(get_score_loader)
 ):
     """
     Get score trends and statistics for an address
     """
     try:
         from datetime import datetime, timedelta
-        from database.connection import get_db_session
-        from database.repositories import ScoreHistoryRepository, ScoreRepository
+        from database.repositories import ScoreHistoryRepository
         
         # Validate address
         address = validate_ethereum_address(address)
         
         # Get current score
-        async with get_db_session() as session:
-            current_score_entry = await ScoreRepository.get_score(session, address)
-            current_score = current_score_entry.score if current_score_entry else 0
-            
-            # Get history for last 30 days
-            start_date = datetime.utcnow() - timedelta(days=30)
-            history = await ScoreHistoryRepository.get_history(session, address, limit=100, start_date=start_date)
+        current_score_entry = await scores.load(address)
+        current_score = current_score_entry.score if current_score_entry else 0
+        
+        # Get history for last 30 days
+        start_date = datetime.utcnow() - timedelta(days=30)
+        history = await ScoreHistoryRepository.get_history(scores.session, address, limit=100, start_date=start_date)
         
         if not history:
             return ScoreTrendsResponse(
@@ -625,7 +644,7 @@ async def predict_score_change(
     """
     try:
         from database.connection import get_db_session
-        from database.repositories import ScoreRepository
+        from database.cache import get_score as get_cached_score_row
         from services.score_predictor import ScorePredictorService
         
         # Validate address
@@ -633,8 +652,8 @@ async def predict_score_change(
         
         # Get current score
         async with get_db_session() as session:
-            score_entry = await ScoreRepository.get_score(session, address)
-            current_score = score_entry.score if score_entry else 500
+            score_entry = await get_cached_score_row(session, address)
+            current_score = score_entry["score"] if score_entry else 500
         
         # Predict change
         prediction = ScorePredictorService.predict_score_change(
@@ -690,6 +709,38 @@ async def get_score(request: Request, address: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/profile/{address}")
+@limiter.limit("60/minute")
+async def get_wallet_profile(request: Request, address: str):
+    """Get dashboard summary (score, open loans, unread alerts) for a wallet"""
+    try:
+        from database.connection import get_db_session
+        from database.repositories import WalletProfileRepository
+        
+        address = validate_ethereum_address(address)
+        
+        async with get_db_session() as session:
+            profile = await WalletProfileRepository.get_profile(session, address)
+        
+        if not profile:
+            raise HTTPException(status_code=404, detail="Wallet profile not found")
+        
+        return {
+            "address": address,
+            "score": profile.score,
+            "riskBand": profile.risk_band,
+            "activeLoanCount": profile.active_loan_count,
+            "totalBorrowed": float(profile.total_borrowed or 0),
+            "unreadAlertCount": profile.unread_alert_count,
+            "lastScoreChangeAt": profile.last_score_change_at.isoformat() if profile.last_score_change_at else None,
+            "updatedAt": profile.updated_at.isoformat() if profile.updated_at else None
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting wallet profile: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/api/oracle/price")
 @limiter.limit("60/minute")
 async def get_oracle_price(request: Request):
@@ -1363,6 +1414,7 @@ async def browse_offers(
     max_interest_rate: Optional[float] = None,
     term_days: Optional[int] = None,
     borrower_address: Optional[str] = None,
+    collateral_token: Optional[str] = None,
     limit: int = 100
 ):
     """Browse available loan offers"""
@@ -1383,6 +1435,8 @@ async def browse_offers(
             filters['term_days'] = term_days
         if borrower_address:
             filters['borrower_address'] = validate_ethereum_address(borrower_address)
+        if collateral_token:
+            filters['collateral_token'] = validate_ethereum_address(collateral_token)
         
         async with get_session() as session:
             offers = await marketplace.get_available_offers(filters, limit, session)
@@ -1420,7 +1474,9 @@ async def create_offer(
                 offer_data.term_days_min,
                 offer_data.term_days_max,
                 offer_data.collateral_required,
-                offer_data.accepted_collateral_tokens,
+                # Checksummed so token filters (JSONB containment) match
+                [validate_ethereum_address(t) for t in offer_data.accepted_collateral_tokens]
+                if offer_data.accepted_collateral_tokens else None,
                 Decimal(str(offer_data.ltv_ratio)) if offer_data.ltv_ratio else None,
                 expires_at,
                 validate_ethereum_address(offer_data.borrower_address) if offer_data.borrower_address else None,
@@ -2139,7 +2195,8 @@ async def record_share(
 ):
     """Record share event"""
     try:
-        from database.connection import get_session
+        from database.connection import get_db_session
+        from database.cache import get_score as get_cached_score_row
         from database.models import ScoreShare
         
         address = validate_ethereum_address(address)
@@ -2147,17 +2204,20 @@ async def record_share(
         badge_style = share_data.get('badge_style', 'minimal')
         share_url = share_data.get('share_url')
         
-        async with get_session() as session:
+        async with get_db_session() as session:
+            score_row = await get_cached_score_row(session, address)
             share = ScoreShare(
                 wallet_address=address,
                 share_type=share_type,
                 badge_style=badge_style,
-                share_url=share_url
+                share_url=share_url,
+                score_at_share=score_row["score"] if score_row else None,
+                risk_band_at_share=score_row["risk_band"] if score_row else None,
             )
             session.add(share)
             await session.commit()
         
-        return {"success": True, "share_id": share.id}
+        return {"success": True, "share_id": share.id, "score_at_share": share.score_at_share}
     except Exception as e:
         logger.error(f"Error recording share: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -2209,7 +2269,7 @@ async def get_share_links(
 @limiter.limit("60/minute")
 async def get_top_scores(
     request: Request,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=TOP_SCORES_MAX_LIMIT),
     timeframe: Optional[str] = None,
     current_user: Optional[str] = Depends(get_current_user)
 ):
@@ -2219,9 +2279,19 @@ async def get_top_scores(
         
         service = LeaderboardService()
         
-        top_scores = await service.get_top_scores(limit, timeframe)
+        # Cached, pre-serialized rows go out as-is
+        top_scores = await service.get_top_scores_json(limit, timeframe)
         
-        return {"leaderboard": top_scores, "limit": limit, "timeframe": timeframe or "all_time"}
+        return Response(
+            content=orjson.dumps({
+                "leaderboard": orjson.Fragment(top_scores),
+                "limit": limit,
+                "timeframe": timeframe or "all_time",
+            }),
+            media_type="application/json"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting top scores: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -2267,9 +2337,13 @@ async def get_leaderboard_category(
         
         service = LeaderboardService()
         
-        leaderboard = await service.get_leaderboard_category(category, limit)
+        board = category if category in LeaderboardService.CATEGORIES else 'all_time'
+        leaderboard = await service.get_top_scores_json(limit, board)
         
-        return {"category": category, "leaderboard": leaderboard}
+        return Response(
+            content=orjson.dumps({"category": category, "leaderboard": orjson.Fragment(leaderboard)}),
+            media_type="application/json"
+        )
     except Exception as e:
         logger.error(f"Error getting leaderboard category: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -2337,6 +2411,7 @@ async def get_reward_history(
     try:
         from database.connection import get_session
         from database.models import ReferralReward
+        from services.referral_rewards import wei_to_ncrd
         from sqlalchemy import select
         
         address = validate_ethereum_address(address)
@@ -2355,7 +2430,7 @@ async def get_reward_history(
                     {
                         "id": r.id,
                         "reward_type": r.reward_type,
-                        "amount_ncrd": float(r.amount_ncrd),
+                        "amount_ncrd": float(wei_to_ncrd(r.amount_wei)),
                         "status": r.status,
                         "distribution_tx_hash": r.distribution_tx_hash,
                         "distributed_at": r.distributed_at.isoformat() if r.distributed_at else None,
@@ -3024,13 +3099,6 @@ async def delete_webhook(
         logger.error(f"Error deleting webhook: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
-# Add rate limit exception handler
-from slowapi.errors import RateLimitExceeded
-from slowapi import _rate_limit_exceeded_handler
-
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -4,13 +4,15 @@ Database package for NeuroCred
 from .connection import get_db_session, get_db_pool, init_db
 from .models import (
     Score, ScoreHistory, UserData, BatchUpdate,
-    User, Loan, LoanPayment, Transaction, TokenTransfer, GDPRRequest, DataRetentionLog,
-    ABExperiment, ABAllocation, ABMetric
+    User, Loan, LoanPayment, Transaction, TransactionInput, TokenTransfer, GDPRRequest, DataRetentionLog,
+    ABExperiment, ABAllocation, ABMetric, WalletProfile
 )
 from .repositories import (
     ScoreRepository, ScoreHistoryRepository, UserDataRepository,
-    UserRepository, LoanRepository, TransactionRepository, GDPRRepository
+    UserRepository, LoanRepository, TransactionRepository, GDPRRepository,
+    WalletProfileRepository
 )
+from . import cache  # registers wallet cache invalidation listeners
 
 __all__ = [
     "get_db_session",
@@ -24,12 +26,14 @@ __all__ = [
     "Loan",
     "LoanPayment",
     "Transaction",
+    "TransactionInput",
     "TokenTransfer",
     "GDPRRequest",
     "DataRetentionLog",
     "ABExperiment",
     "ABAllocation",
     "ABMetric",
+    "WalletProfile",
     "ScoreRepository",
     "ScoreHistoryRepository",
     "UserDataRepository",
@@ -37,5 +41,6 @@ __all__ = [
     "LoanRepository",
     "TransactionRepository",
     "GDPRRepository",
+    "WalletProfileRepository",
 ]
 
@@ -0,0 +1,194 @@
+"""
+Bulk loading helpers for high-volume tables
+
+Large batches go through PostgreSQL COPY (asyncpg copy_records_to_table),
+which skips per-row statement parsing and planning; small batches use a
+regular executemany INSERT. Indexer replays go through the upsert helpers,
+which resolve duplicates with ON CONFLICT in one statement per chunk.
+"""
+from typing import Any, Dict, Iterator, List, Type
+from sqlalchemy import insert, func, JSON
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import TypeDecorator
+from .connection import json_serializer
+from .models import Transaction, TransactionInput, TokenTransfer
+from .types import TxHash
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Below this many rows, COPY setup costs more than it saves
+COPY_THRESHOLD = 100
+
+# PostgreSQL bind parameter limit per statement
+MAX_BIND_PARAMS = 65535
+
+# Transaction columns refreshed when a replayed tx_hash is seen again;
+# NULLs in the replay never overwrite stored values
+TRANSACTION_UPSERT_COLUMNS = (
+    "status", "block_number", "gas_used", "gas_price"
+)
+
+
+def _record_converters(dialect, columns) -> List[Any]:
+    """Per-column value converters matching what the ORM would bind"""
+    converters = []
+    for column in columns:
+        if isinstance(column.type, JSON):
+            converters.append(lambda v: None if v is None else json_serializer(v))
+        elif isinstance(column.type, TypeDecorator):
+            converters.append(lambda v, t=column.type: t.process_bind_param(v, dialect))
+        else:
+            converters.append(None)
+    return converters
+
+
+async def bulk_copy(session: AsyncSession, model: Type, rows: List[Dict[str, Any]]) -> int:
+    """
+    Bulk insert rows for a model, using COPY for large batches
+    
+    Every row must carry the same keys (column names); omitted columns get
+    their server defaults. Runs in the caller's transaction.
+    
+    Args:
+        session: Database session
+        model: Mapped model class (e.g. Transaction, TokenTransfer)
+        rows: Row dicts keyed by column name
+    
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+    
+    if len(rows) < COPY_THRESHOLD:
+        await session.execute(insert(model), rows)
+        return len(rows)
+    
+    table = model.__table__
+    column_names = [name for name in table.columns.keys() if name in rows[0]]
+    columns = [table.columns[name] for name in column_names]
+    
+    try:
+        connection = await session.connection()
+        converters = _record_converters(connection.dialect, columns)
+        records = [
+            tuple(
+                convert(row.get(name)) if convert else row.get(name)
+                for name, convert in zip(column_names, converters)
+            )
+            for row in rows
+        ]
+        
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name,
+            records=records,
+            columns=column_names
+        )
+        return len(records)
+    except Exception as e:
+        logger.error(f"Error bulk copying into {table.name}: {e}", exc_info=True, extra={"rows": len(rows)})
+        raise
+
+
+def _chunks(rows: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """Split rows so each multi-VALUES statement stays under the bind limit"""
+    size = max(1, MAX_BIND_PARAMS // max(1, len(rows[0])))
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def upsert_transactions(session: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[bytes, int]:
+    """
+    Insert transactions, updating mutable fields for tx hashes already stored
+    
+    Rows may carry an "input_data" key, which is written to transaction_inputs.
+    Duplicate tx hashes within the batch collapse to the last row; rows must
+    have a block_timestamp (partition key). Runs in the caller's transaction.
+    
+    Args:
+        session: Database session
+        rows: Row dicts keyed by column name
+    
+    Returns:
+        Dict of raw tx hash bytes to transaction id
+    """
+    if not rows:
+        return {}
+    
+    tx_hash_type = TxHash()
+    deduped = {}
+    inputs = {}
+    for row in rows:
+        row = dict(row)
+        key = tx_hash_type.process_bind_param(row["tx_hash"], None)
+        input_data = row.pop("input_data", None)
+        deduped[key] = row
+        if input_data:
+            inputs[key] = input_data
+        else:
+            inputs.pop(key, None)
+    
+    table = Transaction.__table__
+    ids = {}
+    try:
+        for chunk in _chunks(list(deduped.values())):
+            stmt = pg_insert(Transaction).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["tx_hash", "block_timestamp"],
+                set_={
+                    name: func.coalesce(stmt.excluded[name], table.c[name])
+                    for name in TRANSACTION_UPSERT_COLUMNS
+                    if name in chunk[0]
+                }
+            ).returning(table.c.id, table.c.tx_hash, table.c.block_timestamp)
+            result = await session.execute(stmt)
+            for tx_id, tx_hash, block_timestamp in result.all():
+                ids[tx_hash_type.process_bind_param(tx_hash, None)] = (tx_id, block_timestamp)
+        
+        input_rows = [
+            {"tx_id": ids[key][0], "block_timestamp": ids[key][1], "data": data}
+            for key, data in inputs.items()
+            if key in ids
+        ]
+        if input_rows:
+            for chunk in _chunks(input_rows):
+                stmt = pg_insert(TransactionInput).values(chunk)
+                await session.execute(stmt.on_conflict_do_nothing(index_elements=["tx_id", "block_timestamp"]))
+        
+        return {key: tx_id for key, (tx_id, _) in ids.items()}
+    except Exception as e:
+        logger.error(f"Error upserting transactions: {e}", exc_info=True, extra={"rows": len(rows)})
+        raise
+
+
+async def upsert_token_transfers(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert token transfers, skipping ones already stored (uq_transfer_dedup)
+    
+    Parent transactions must already exist (FK on tx_hash, block_timestamp).
+    Runs in the caller's transaction.
+    
+    Args:
+        session: Database session
+        rows: Row dicts keyed by column name
+    
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+    
+    inserted = 0
+    try:
+        for chunk in _chunks(rows):
+            stmt = pg_insert(TokenTransfer).values(chunk)
+            stmt = stmt.on_conflict_do_nothing(constraint="uq_transfer_dedup")
+            result = await session.execute(stmt)
+            inserted += result.rowcount
+        return inserted
+    except Exception as e:
+        logger.error(f"Error upserting token transfers: {e}", exc_info=True, extra={"rows": len(rows)})
+        raise
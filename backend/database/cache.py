@@ -0,0 +1,153 @@
+"""
+Read-through cache for per-wallet rows (User, Score, UserPreferences) and
+public API keys (APIAccess, keyed by key hash)
+
+These rows are read on most API requests but change rarely. Lookups go to
+Redis first and fall back to the database; a row is evicted once a session
+that updated or deleted it commits, and otherwise expires after CACHE_TTL.
+
+Rows are returned as JSON-shaped dicts (timestamps as ISO strings, numerics
+as strings) whether they come from Redis or the database.
+"""
+import os
+from typing import Any, Dict, Optional
+import orjson
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from .models import APIAccess, Score, User, UserPreferences
+from utils.cache import get_redis_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_TTL = int(os.getenv("CACHE_TTL_WALLET_ROWS", "60"))
+
+KEY_PREFIXES = {
+    User: "neurocred:user",
+    Score: "neurocred:score",
+    UserPreferences: "neurocred:prefs",
+    APIAccess: "neurocred:api_key",
+}
+
+# Column each model's cache key is built from
+KEY_COLUMNS = {
+    User: "wallet_address",
+    Score: "wallet_address",
+    UserPreferences: "wallet_address",
+    APIAccess: "api_key",
+}
+
+# session.info entry collecting keys to evict on commit
+_STALE_KEYS = "wallet_cache_stale_keys"
+
+
+def cache_key(model, key: str) -> str:
+    """Redis key for a model row (key: wallet address, or API key hash)"""
+    return f"{KEY_PREFIXES[model]}:{key.lower()}"
+
+
+def _client():
+    if os.getenv("CACHE_ENABLED", "true").lower() != "true":
+        return None
+    return get_redis_client()
+
+
+def _serialize(row) -> bytes:
+    values = {attr.key: getattr(row, attr.key) for attr in inspect(row).mapper.column_attrs}
+    return orjson.dumps(values, default=str)
+
+
+async def _read_through(session: AsyncSession, model, lookup: str, query) -> Optional[Dict[str, Any]]:
+    key = cache_key(model, lookup)
+    client = _client()
+    
+    if client:
+        try:
+            cached = client.get(key)
+            if cached:
+                return orjson.loads(cached)
+        except Exception as e:
+            logger.warning(f"Cache get error: {e}", extra={"key": key})
+    
+    result = await session.execute(query)
+    row = result.scalar_one_or_none()
+    if row is None:
+        return None
+    
+    payload = _serialize(row)
+    if client:
+        try:
+            client.setex(key, CACHE_TTL, payload)
+        except Exception as e:
+            logger.warning(f"Cache set error: {e}", extra={"key": key})
+    return orjson.loads(payload)
+
+
+async def get_user(session: AsyncSession, wallet_address: str) -> Optional[Dict[str, Any]]:
+    """Get a (non-deleted) user row by wallet"""
+    query = select(User).where(User.wallet_address == wallet_address, User.deleted_at.is_(None))
+    return await _read_through(session, User, wallet_address, query)
+
+
+async def get_score(session: AsyncSession, wallet_address: str) -> Optional[Dict[str, Any]]:
+    """Get a score row by wallet"""
+    query = select(Score).where(Score.wallet_address == wallet_address)
+    return await _read_through(session, Score, wallet_address, query)
+
+
+async def get_prefs(session: AsyncSession, wallet_address: str) -> Optional[Dict[str, Any]]:
+    """Get a user preferences row by wallet"""
+    query = select(UserPreferences).where(UserPreferences.wallet_address == wallet_address)
+    return await _read_through(session, UserPreferences, wallet_address, query)
+
+
+async def get_api_access(session: AsyncSession, key_hash: str) -> Optional[Dict[str, Any]]:
+    """Get an API key row by key hash (revoked and expired keys included)"""
+    query = select(APIAccess).where(APIAccess.api_key == key_hash)
+    return await _read_through(session, APIAccess, key_hash, query)
+
+
+def mark_stale(session, model, keys) -> None:
+    """
+    Evict rows for these wallets (or API key hashes) when the session commits
+    
+    ORM updates and deletes are tracked automatically; call this after bulk
+    insert/update statements, which bypass mapper events.
+    """
+    session.info.setdefault(_STALE_KEYS, set()).update(
+        cache_key(model, key) for key in keys
+    )
+
+
+def _mark_stale(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        model = type(target)
+        mark_stale(session, model, [getattr(target, KEY_COLUMNS[model])])
+
+
+for _model in KEY_PREFIXES:
+    event.listen(_model, "after_update", _mark_stale)
+    event.listen(_model, "after_delete", _mark_stale)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_stale(session):
+    """Evict rows changed in the committed transaction"""
+    keys = session.info.pop(_STALE_KEYS, None)
+    if not keys:
+        return
+    
+    client = _client()
+    if client:
+        try:
+            client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Cache delete error: {e}", extra={"keys": sorted(keys)})
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_stale(session, previous_transaction):
+    """Nothing changed on rollback; forget pending evictions"""
+    session.info.pop(_STALE_KEYS, None)
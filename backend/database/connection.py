@@ -2,23 +2,51 @@
 Database connection and session management with connection pooling
 """
 import os
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Optional
+from uuid import uuid4
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
 from sqlalchemy import event, text
 from contextlib import asynccontextmanager
 from utils.logger import get_logger
+from utils.metrics import track_db_pool
 
 logger = get_logger(__name__)
 
 # Database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "").replace("postgresql://", "postgresql+asyncpg://")
 
-# Connection pool configuration
-POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+# Connection pool configuration (per worker process). The default size is
+# (cores * 2) + 1; keep POOL_SIZE + MAX_OVERFLOW times the worker count
+# under the server's max_connections.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str((os.cpu_count() or 4) * 2 + 1)))
 MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
-POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # 1 hour
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 30 minutes
+# Test connections on checkout so ones dropped by the server or a failover
+# are replaced instead of failing the request
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Set when DATABASE_URL points at PgBouncer in transaction pooling mode.
+# PgBouncer then owns the pooling (no in-process pool), and consecutive
+# statements may run on different server connections, so prepared
+# statements are neither cached nor reused by name.
+PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+# Statement caching: SQLAlchemy's compiled SQL cache (per engine) and the
+# asyncpg prepared statement caches (per connection; always 0 with PGBOUNCER)
+QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+STATEMENT_CACHE_SIZE = 0 if PGBOUNCER else int(os.getenv("DB_STATEMENT_CACHE_SIZE", "1024"))
+
+# Rows per multi-VALUES statement when insert() runs with a list of rows
+INSERT_PAGE_SIZE = int(os.getenv("DB_INSERT_PAGE_SIZE", "1000"))
+
+
+def json_serializer(value: Any) -> str:
+    """JSON/JSONB bind serializer (orjson; integer keys stringified like stdlib json)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
 
 # Global engine and session factory
 engine = None
@@ -34,13 +62,32 @@ def get_engine():
             logger.warning("DATABASE_URL not set, database features disabled")
             return None
         
+        connect_args = {
+            "prepared_statement_cache_size": STATEMENT_CACHE_SIZE,
+            "statement_cache_size": STATEMENT_CACHE_SIZE,
+        }
+        if PGBOUNCER:
+            pool_args = {"poolclass": NullPool}
+            # asyncpg numbers statements per client connection; those names collide on shared server connections
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        else:
+            pool_args = {
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_size": POOL_SIZE,
+                "max_overflow": MAX_OVERFLOW,
+                "pool_timeout": POOL_TIMEOUT,
+                "pool_recycle": POOL_RECYCLE,
+                "pool_pre_ping": POOL_PRE_PING,
+            }
+        
         engine = create_async_engine(
             DATABASE_URL,
-            poolclass=QueuePool,
-            pool_size=POOL_SIZE,
-            max_overflow=MAX_OVERFLOW,
-            pool_timeout=POOL_TIMEOUT,
-            pool_recycle=POOL_RECYCLE,
+            **pool_args,
+            query_cache_size=QUERY_CACHE_SIZE,
+            insertmanyvalues_page_size=INSERT_PAGE_SIZE,
+            json_serializer=json_serializer,
+            json_deserializer=orjson.loads,
+            connect_args=connect_args,
             echo=os.getenv("DB_ECHO", "false").lower() == "true",
             future=True,
         )
@@ -51,12 +98,19 @@ def get_engine():
             """Set connection-level settings"""
             pass  # PostgreSQL doesn't need pragma
         
+        if not PGBOUNCER:
+            track_db_pool(engine.pool)
+        
         logger.info(
             "Database engine created",
             extra={
+                "pgbouncer": PGBOUNCER,
                 "pool_size": POOL_SIZE,
                 "max_overflow": MAX_OVERFLOW,
                 "pool_timeout": POOL_TIMEOUT,
+                "pool_recycle": POOL_RECYCLE,
+                "pool_pre_ping": POOL_PRE_PING,
+                "statement_cache_size": STATEMENT_CACHE_SIZE,
             }
         )
     
@@ -128,10 +182,22 @@ async def init_db():
     
     try:
         from .models import Base
+        from .partitions import PARTITIONED_TABLES, ensure_monthly_partitions
+        from .triggers import create_triggers
+        from .views import create_views
+        
+        tables = [table for table in Base.metadata.tables.values() if not table.info.get('is_view')]
         
         async with engine.begin() as conn:
-            # Create all tables
-            await conn.run_sync(Base.metadata.create_all)
+            # Create all tables, then the triggers and materialized views over them
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
+            await create_triggers(conn)
+            await create_views(conn)
+        
+        # Partitioned tables reject rows until a partition covers them
+        async with get_db_session() as session:
+            for table in PARTITIONED_TABLES:
+                await ensure_monthly_partitions(session, table)
         
         logger.info("Database initialized successfully")
     except Exception as e:
@@ -153,6 +219,10 @@ async def check_db_health() -> dict:
             result = await conn.execute(text("SELECT 1"))
             result.scalar()
         
+        # Pooling happens in PgBouncer; NullPool keeps no counters
+        if PGBOUNCER:
+            return {"status": "healthy", "pooler": "pgbouncer"}
+        
         pool = engine.pool
         return {
             "status": "healthy",
@@ -1,38 +1,27 @@
 """
 Database constraint definitions and validation
 """
+import re
 from sqlalchemy import CheckConstraint, ForeignKeyConstraint, UniqueConstraint
 from typing import List, Dict, Any
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+_WALLET_ADDRESS = re.compile(r'^0x[a-fA-F0-9]{40}$')
+
 
 # Constraint definitions for reference
 CONSTRAINTS = {
-    "users": [
-        CheckConstraint("wallet_address ~ '^0x[a-fA-F0-9]{40}$'", name="chk_wallet_format"),
-    ],
     "loans": [
         CheckConstraint("amount > 0", name="chk_loan_amount"),
         CheckConstraint("interest_rate >= 0 AND interest_rate <= 100", name="chk_interest_rate"),
         CheckConstraint("term_days > 0", name="chk_term_days"),
-        CheckConstraint("status IN ('pending', 'active', 'repaid', 'defaulted', 'liquidated')", name="chk_loan_status"),
     ],
     "loan_payments": [
         CheckConstraint("amount > 0", name="chk_payment_amount"),
-        CheckConstraint("payment_type IN ('principal', 'interest', 'both')", name="chk_payment_type"),
-    ],
-    "transactions": [
-        CheckConstraint("status IN ('pending', 'success', 'failed') OR status IS NULL", name="chk_tx_status"),
-    ],
-    "gdpr_requests": [
-        CheckConstraint("request_type IN ('deletion', 'export', 'access')", name="chk_gdpr_request_type"),
-        CheckConstraint("status IN ('pending', 'processing', 'completed', 'failed')", name="chk_gdpr_status"),
-    ],
-    "data_retention_log": [
-        CheckConstraint("status IN ('success', 'failed', 'partial') OR status IS NULL", name="chk_retention_status"),
     ],
+    # Status/type columns are enforced by PostgreSQL enum types (see models.py)
 }
 
 # Foreign key relationships
@@ -56,9 +45,7 @@ UNIQUE_CONSTRAINTS = {
 
 def validate_wallet_address(address: str) -> bool:
     """Validate Ethereum wallet address format"""
-    import re
-    pattern = r'^0x[a-fA-F0-9]{40}$'
-    return bool(re.match(pattern, address))
+    return bool(_WALLET_ADDRESS.match(address))
 
 
 def validate_loan_status(status: str) -> bool:
@@ -0,0 +1,82 @@
+"""
+Request-scoped batch loaders
+
+A loader collects the lookups made while handling one request and resolves
+them with a single IN/ANY query per event-loop tick, instead of one SELECT
+per key. Results are memoized for the loader's lifetime, so asking for the
+same wallet twice in a request costs nothing.
+
+Usage (FastAPI):
+    async def endpoint(scores: ScoreLoader = Depends(get_score_loader)):
+        own, peer = await scores.load_many([address, peer_address])
+"""
+import asyncio
+from typing import AsyncGenerator, Dict, Iterable, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from .connection import get_db_session
+from .models import Score
+from .repositories import ScoreRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ScoreLoader:
+    """
+    Coalesces Score lookups into ScoreRepository.get_scores_batch calls
+    
+    Batches run one at a time on the loader's session; don't run other
+    statements on that session concurrently with pending loads.
+    """
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._lock = asyncio.Lock()
+    
+    def load(self, wallet_address: str) -> "asyncio.Future[Optional[Score]]":
+        """Score row for a wallet (None if it has no score)"""
+        key = wallet_address.lower()
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        return future
+    
+    async def load_many(self, wallet_addresses: Iterable[str]) -> List[Optional[Score]]:
+        """Score rows for several wallets, in the order given"""
+        return list(await asyncio.gather(*(self.load(address) for address in wallet_addresses)))
+    
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        asyncio.ensure_future(self._fetch(keys))
+    
+    async def _fetch(self, keys: List[str]) -> None:
+        try:
+            async with self._lock:
+                rows = await ScoreRepository.get_scores_batch(self.session, keys)
+        except Exception as e:
+            logger.error(f"Error loading scores: {e}", exc_info=True, extra={"count": len(keys)})
+            for key in keys:
+                # Forget failed keys so a later load retries them
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        by_address = {row.wallet_address.lower(): row for row in rows}
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(by_address.get(key))
+
+
+async def get_score_loader() -> AsyncGenerator[ScoreLoader, None]:
+    """FastAPI dependency: a ScoreLoader on its own session for the request"""
+    async with get_db_session() as session:
+        yield ScoreLoader(session)
@@ -0,0 +1,105 @@
+"""child_counters
+
+Revision ID: 017_child_counters
+Revises: 016_developer_api
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '017_child_counters'
+down_revision = '016_developer_api'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Counter columns on loans
+    op.add_column('loans', sa.Column('payments_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('loans', sa.Column('total_repaid', sa.Numeric(precision=20, scale=8), nullable=True, server_default='0'))
+    
+    # Backfill from existing payments
+    op.execute("""
+        UPDATE loans l
+        SET payments_count = p.cnt, total_repaid = p.total
+        FROM (
+            SELECT loan_id, COUNT(*) AS cnt, COALESCE(SUM(amount), 0) AS total
+            FROM loan_payments
+            GROUP BY loan_id
+        ) p
+        WHERE l.id = p.loan_id
+    """)
+    op.execute("""
+        UPDATE transactions t
+        SET token_transfers_count = c.cnt
+        FROM (
+            SELECT tx_hash, COUNT(*) AS cnt
+            FROM token_transfers
+            GROUP BY tx_hash
+        ) c
+        WHERE t.tx_hash = c.tx_hash
+    """)
+    
+    # loan_payments -> loans.payments_count / loans.total_repaid
+    op.execute("""
+        CREATE OR REPLACE FUNCTION loan_payments_counter() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE loans
+                SET payments_count = payments_count + 1,
+                    total_repaid = COALESCE(total_repaid, 0) + NEW.amount
+                WHERE id = NEW.loan_id;
+                RETURN NEW;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE loans
+                SET payments_count = payments_count - 1,
+                    total_repaid = COALESCE(total_repaid, 0) - OLD.amount
+                WHERE id = OLD.loan_id;
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_loan_payments_counter
+        AFTER INSERT OR DELETE ON loan_payments
+        FOR EACH ROW EXECUTE FUNCTION loan_payments_counter()
+    """)
+    
+    # token_transfers -> transactions.token_transfers_count
+    op.execute("""
+        CREATE OR REPLACE FUNCTION token_transfers_counter() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE transactions
+                SET token_transfers_count = COALESCE(token_transfers_count, 0) + 1
+                WHERE tx_hash = NEW.tx_hash;
+                RETURN NEW;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE transactions
+                SET token_transfers_count = COALESCE(token_transfers_count, 0) - 1
+                WHERE tx_hash = OLD.tx_hash;
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_token_transfers_counter
+        AFTER INSERT OR DELETE ON token_transfers
+        FOR EACH ROW EXECUTE FUNCTION token_transfers_counter()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_token_transfers_counter ON token_transfers")
+    op.execute("DROP FUNCTION IF EXISTS token_transfers_counter()")
+    op.execute("DROP TRIGGER IF EXISTS trg_loan_payments_counter ON loan_payments")
+    op.execute("DROP FUNCTION IF EXISTS loan_payments_counter()")
+    
+    op.drop_column('loans', 'total_repaid')
+    op.drop_column('loans', 'payments_count')
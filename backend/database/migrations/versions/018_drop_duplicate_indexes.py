@@ -0,0 +1,44 @@
+"""drop_duplicate_indexes
+
+Revision ID: 018_drop_duplicate_indexes
+Revises: 017_child_counters
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '018_drop_duplicate_indexes'
+down_revision = '017_child_counters'
+branch_labels = None
+depends_on = None
+
+
+# Indexes that duplicate a primary key, unique constraint or an explicitly
+# named index on the same column. Some were only ever created by
+# metadata.create_all() (inline index=True), hence IF EXISTS.
+DUPLICATE_INDEXES = [
+    'ix_users_wallet_address',          # users_pkey
+    'idx_transactions_hash',            # transactions_tx_hash_key
+    'ix_transactions_tx_hash',          # transactions_tx_hash_key
+    'ix_batch_updates_batch_id',        # batch_updates_batch_id_key
+    'idx_batch_id',                     # batch_updates_batch_id_key
+    'ix_ab_experiments_experiment_name',  # ab_experiments_experiment_name_key
+    'ix_loans_wallet_address',          # idx_loans_wallet
+    'ix_loans_status',                  # idx_loans_status
+    'ix_loans_created_at',              # idx_loans_created
+    'ix_loan_payments_loan_id',         # idx_payments_loan
+]
+
+
+def upgrade() -> None:
+    for index_name in DUPLICATE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    # Only restore the indexes created by migration 002; the rest came from
+    # metadata.create_all() and never existed under Alembic
+    op.create_index('idx_transactions_hash', 'transactions', ['tx_hash'], unique=True)
+    op.create_index('ix_users_wallet_address', 'users', ['wallet_address'], unique=True)
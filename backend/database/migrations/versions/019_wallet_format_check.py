@@ -0,0 +1,35 @@
+"""wallet_format_check
+
+Revision ID: 019_wallet_format_check
+Revises: 018_drop_duplicate_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '019_wallet_format_check'
+down_revision = '018_drop_duplicate_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Addresses are lowercased on bind (database.types.WalletAddress), so the
+    # regex CHECK is replaced with a cheap length/prefix test
+    op.drop_constraint('chk_wallet_format', 'users', type_='check')
+    op.create_check_constraint(
+        'chk_wallet_format',
+        'users',
+        "length(wallet_address) = 42 AND wallet_address LIKE '0x%'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('chk_wallet_format', 'users', type_='check')
+    op.create_check_constraint(
+        'chk_wallet_format',
+        'users',
+        "wallet_address ~ '^0x[a-fA-F0-9]{40}$'"
+    )
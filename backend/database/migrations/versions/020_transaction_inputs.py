@@ -0,0 +1,46 @@
+"""transaction_inputs
+
+Revision ID: 020_transaction_inputs
+Revises: 019_wallet_format_check
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '020_transaction_inputs'
+down_revision = '019_wallet_format_check'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Move transaction input data out of the transactions heap
+    op.create_table(
+        'transaction_inputs',
+        sa.Column('tx_id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['tx_id'], ['transactions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tx_id')
+    )
+    
+    # input_data was added outside the migration chain, so it may be missing
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('transactions')}
+    if 'input_data' in columns:
+        op.execute("""
+            INSERT INTO transaction_inputs (tx_id, data)
+            SELECT id, input_data FROM transactions WHERE input_data IS NOT NULL
+        """)
+        op.drop_column('transactions', 'input_data')
+
+
+def downgrade() -> None:
+    op.add_column('transactions', sa.Column('input_data', sa.Text(), nullable=True))
+    op.execute("""
+        UPDATE transactions t
+        SET input_data = i.data
+        FROM transaction_inputs i
+        WHERE t.id = i.tx_id
+    """)
+    op.drop_table('transaction_inputs')
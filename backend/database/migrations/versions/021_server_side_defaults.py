@@ -0,0 +1,46 @@
+"""server_side_defaults
+
+Revision ID: 021_server_side_defaults
+Revises: 020_transaction_inputs
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '021_server_side_defaults'
+down_revision = '020_transaction_inputs'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, server default)
+SERVER_DEFAULTS = [
+    ('users', 'gdpr_consent', 'false'),
+    ('users', 'data_deletion_requested', 'false'),
+    ('batch_updates', 'processed_count', '0'),
+    ('batch_updates', 'failed_count', '0'),
+    ('transactions', 'token_transfers_count', '0'),
+    ('data_retention_log', 'archived_count', '0'),
+]
+
+
+def _existing_columns(table_name):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table_name)}
+
+
+def upgrade() -> None:
+    # Defaults move to the server so INSERTs can omit these columns
+    for table_name, column_name, default in SERVER_DEFAULTS:
+        if column_name in _existing_columns(table_name):
+            op.alter_column(table_name, column_name, server_default=sa.text(default))
+
+
+def downgrade() -> None:
+    # users and data_retention_log had server defaults before this revision
+    for table_name, column_name, _ in SERVER_DEFAULTS:
+        if table_name in ('users', 'data_retention_log'):
+            continue
+        if column_name in _existing_columns(table_name):
+            op.alter_column(table_name, column_name, server_default=None)
@@ -0,0 +1,65 @@
+"""indexer_staging
+
+Revision ID: 022_indexer_staging
+Revises: 021_server_side_defaults
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '022_indexer_staging'
+down_revision = '021_server_side_defaults'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # UNLOGGED intake tables (no WAL); flushed by workers/staging_flush_job.py
+    op.create_table(
+        'transactions_staging',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('wallet_address', sa.String(length=42), nullable=False),
+        sa.Column('tx_hash', sa.String(length=66), nullable=False),
+        sa.Column('tx_type', sa.String(length=50), nullable=False),
+        sa.Column('chain_id', sa.Integer(), nullable=False, server_default='1983'),
+        sa.Column('chain_name', sa.String(length=50), nullable=True),
+        sa.Column('block_number', sa.Integer(), nullable=True),
+        sa.Column('block_timestamp', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('from_address', sa.String(length=42), nullable=True),
+        sa.Column('to_address', sa.String(length=42), nullable=True),
+        sa.Column('value', sa.Numeric(precision=20, scale=8), nullable=True),
+        sa.Column('gas_used', sa.Integer(), nullable=True),
+        sa.Column('gas_price', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('input_data', sa.Text(), nullable=True),
+        sa.Column('contract_address', sa.String(length=42), nullable=True),
+        sa.Column('method_id', sa.String(length=10), nullable=True),
+        sa.Column('tx_metadata', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        prefixes=['UNLOGGED']
+    )
+    
+    op.create_table(
+        'token_transfers_staging',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('tx_hash', sa.String(length=66), nullable=False),
+        sa.Column('chain_id', sa.Integer(), nullable=False, server_default='1983'),
+        sa.Column('token_address', sa.String(length=42), nullable=False),
+        sa.Column('token_type', sa.String(length=20), nullable=False),
+        sa.Column('from_address', sa.String(length=42), nullable=True),
+        sa.Column('to_address', sa.String(length=42), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=36, scale=0), nullable=True),
+        sa.Column('token_id', sa.Numeric(precision=36, scale=0), nullable=True),
+        sa.Column('block_number', sa.Integer(), nullable=True),
+        sa.Column('block_timestamp', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        prefixes=['UNLOGGED']
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('token_transfers_staging')
+    op.drop_table('transactions_staging')
@@ -0,0 +1,107 @@
+"""native_enums
+
+Revision ID: 023_native_enums
+Revises: 022_indexer_staging
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '023_native_enums'
+down_revision = '022_indexer_staging'
+branch_labels = None
+depends_on = None
+
+
+ENUM_TYPES = {
+    'batch_status': ('pending', 'processing', 'completed', 'failed'),
+    'loan_status': ('pending', 'active', 'repaid', 'defaulted', 'liquidated'),
+    'payment_type': ('principal', 'interest', 'both'),
+    'tx_status': ('pending', 'success', 'failed'),
+    'gdpr_request_type': ('deletion', 'export', 'access'),
+    'gdpr_status': ('pending', 'processing', 'completed', 'failed'),
+    'retention_status': ('success', 'failed', 'partial'),
+    'experiment_status': ('draft', 'active', 'paused', 'completed'),
+    'offer_status': ('active', 'filled', 'cancelled', 'expired'),
+    'loan_request_type': ('standard', 'auction'),
+    'loan_request_status': ('open', 'bidding', 'accepted', 'expired', 'cancelled'),
+    'rebalance_type': ('auto', 'manual'),
+    'strategy_type': ('staking', 'yield_farming', 'auto_compound'),
+    'negotiation_status': ('active', 'completed', 'cancelled', 'expired'),
+    'alert_severity': ('info', 'warning', 'critical'),
+}
+
+# (table, column, enum type, CHECK constraint replaced, nullable)
+ENUM_COLUMNS = [
+    ('batch_updates', 'status', 'batch_status', 'chk_batch_status', False),
+    ('loans', 'status', 'loan_status', 'chk_loan_status', False),
+    ('loan_payments', 'payment_type', 'payment_type', 'chk_payment_type', False),
+    ('transactions', 'status', 'tx_status', 'chk_tx_status', True),
+    ('transactions_staging', 'status', 'tx_status', None, True),
+    ('gdpr_requests', 'request_type', 'gdpr_request_type', 'chk_gdpr_request_type', False),
+    ('gdpr_requests', 'status', 'gdpr_status', 'chk_gdpr_status', False),
+    ('data_retention_log', 'status', 'retention_status', 'chk_retention_status', True),
+    ('ab_experiments', 'status', 'experiment_status', 'chk_experiment_status', False),
+    ('loan_offers', 'status', 'offer_status', 'chk_offer_status', False),
+    ('loan_requests', 'request_type', 'loan_request_type', 'chk_request_type', False),
+    ('loan_requests', 'status', 'loan_request_status', 'chk_request_status', False),
+    ('rebalance_history', 'rebalance_type', 'rebalance_type', 'chk_rebalance_type', False),
+    ('yield_strategies', 'strategy_type', 'strategy_type', 'chk_strategy_type', False),
+    ('negotiation_sessions', 'status', 'negotiation_status', 'chk_negotiation_status', False),
+    ('alerts', 'severity', 'alert_severity', 'chk_alert_severity', False),
+]
+
+
+def _column_default(table_name, column_name):
+    """Return (exists, default) for a column; some tables predate the migration chain"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return False, None
+    for column in inspector.get_columns(table_name):
+        if column['name'] == column_name:
+            return True, column['default']
+    return False, None
+
+
+def _retype_column(table_name, column_name, new_type):
+    exists, default = _column_default(table_name, column_name)
+    if not exists:
+        return
+    # Defaults such as 'active'::character varying cannot be cast in place
+    if default:
+        op.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column_name} DROP DEFAULT")
+    op.execute(
+        f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+        f"TYPE {new_type} USING {column_name}::text::{new_type}"
+    )
+    if default:
+        literal = default.split('::')[0]
+        op.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column_name} SET DEFAULT {literal}::{new_type}")
+
+
+def upgrade() -> None:
+    for type_name, values in ENUM_TYPES.items():
+        labels = ", ".join(f"'{v}'" for v in values)
+        op.execute(f"CREATE TYPE {type_name} AS ENUM ({labels})")
+    
+    for table_name, column_name, type_name, check_name, _ in ENUM_COLUMNS:
+        if check_name:
+            op.execute(f"ALTER TABLE IF EXISTS {table_name} DROP CONSTRAINT IF EXISTS {check_name}")
+        _retype_column(table_name, column_name, type_name)
+
+
+def downgrade() -> None:
+    for table_name, column_name, type_name, check_name, nullable in ENUM_COLUMNS:
+        exists, _ = _column_default(table_name, column_name)
+        _retype_column(table_name, column_name, 'varchar(20)')
+        if exists and check_name:
+            labels = ", ".join(f"'{v}'" for v in ENUM_TYPES[type_name])
+            condition = f"{column_name} IN ({labels})"
+            if nullable:
+                condition += f" OR {column_name} IS NULL"
+            op.create_check_constraint(check_name, table_name, condition)
+    
+    for type_name in ENUM_TYPES:
+        op.execute(f"DROP TYPE IF EXISTS {type_name}")
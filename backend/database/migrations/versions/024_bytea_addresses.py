@@ -0,0 +1,160 @@
+"""bytea_addresses
+
+Revision ID: 024_bytea_addresses
+Revises: 023_native_enums
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '024_bytea_addresses'
+down_revision = '023_native_enums'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, byte length): 20 = EVM address, 32 = transaction hash
+HEX_COLUMNS = [
+    ('users', 'wallet_address', 20),
+    ('scores', 'wallet_address', 20),
+    ('score_history', 'wallet_address', 20),
+    ('user_data', 'wallet_address', 20),
+    ('loans', 'wallet_address', 20),
+    ('loans', 'collateral_token', 20),
+    ('loans', 'tx_hash', 32),
+    ('loan_payments', 'tx_hash', 32),
+    ('transactions', 'wallet_address', 20),
+    ('transactions', 'tx_hash', 32),
+    ('transactions', 'from_address', 20),
+    ('transactions', 'to_address', 20),
+    ('transactions', 'contract_address', 20),
+    ('token_transfers', 'tx_hash', 32),
+    ('token_transfers', 'token_address', 20),
+    ('token_transfers', 'from_address', 20),
+    ('token_transfers', 'to_address', 20),
+    ('transactions_staging', 'wallet_address', 20),
+    ('transactions_staging', 'tx_hash', 32),
+    ('transactions_staging', 'from_address', 20),
+    ('transactions_staging', 'to_address', 20),
+    ('transactions_staging', 'contract_address', 20),
+    ('token_transfers_staging', 'tx_hash', 32),
+    ('token_transfers_staging', 'token_address', 20),
+    ('token_transfers_staging', 'from_address', 20),
+    ('token_transfers_staging', 'to_address', 20),
+    ('gdpr_requests', 'wallet_address', 20),
+    ('ab_allocations', 'wallet_address', 20),
+    ('ab_metrics', 'wallet_address', 20),
+    ('loan_offers', 'lender_address', 20),
+    ('loan_offers', 'borrower_address', 20),
+    ('loan_requests', 'borrower_address', 20),
+    ('collateral_positions', 'wallet_address', 20),
+    ('collateral_positions', 'token_address', 20),
+    ('rebalance_history', 'from_token', 20),
+    ('rebalance_history', 'to_token', 20),
+    ('rebalance_history', 'tx_hash', 32),
+    ('yield_strategies', 'wallet_address', 20),
+    ('yield_strategies', 'token_address', 20),
+    ('user_preferences', 'wallet_address', 20),
+    ('negotiation_sessions', 'wallet_address', 20),
+    ('negotiation_sessions', 'preferences_id', 20),
+    ('alerts', 'wallet_address', 20),
+    ('notification_preferences', 'wallet_address', 20),
+    ('score_shares', 'wallet_address', 20),
+    ('leaderboard_entries', 'wallet_address', 20),
+    ('referral_rewards', 'recipient_address', 20),
+    ('referral_rewards', 'distribution_tx_hash', 32),
+    ('teams', 'admin_address', 20),
+    ('team_members', 'wallet_address', 20),
+    ('credit_reports', 'wallet_address', 20),
+    ('report_shares', 'wallet_address', 20),
+    ('report_shares', 'shared_with_address', 20),
+    ('api_access', 'protocol_address', 20),
+]
+
+
+def _plan():
+    """
+    Resolve the columns to convert and the foreign keys that must be dropped
+    around the type change (PostgreSQL requires matching FK column types).
+    
+    Columns on tables outside the models (referrals, device_tokens, ...) that
+    reference a converted column are converted with it.
+    """
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    existing = {
+        table_name: {c['name'] for c in inspector.get_columns(table_name)}
+        for table_name in tables
+    }
+    
+    columns = {
+        (table_name, column_name): length
+        for table_name, column_name, length in HEX_COLUMNS
+        if column_name in existing.get(table_name, ())
+    }
+    
+    foreign_keys = []
+    for table_name in sorted(tables):
+        for fk in inspector.get_foreign_keys(table_name):
+            if len(fk['constrained_columns']) != 1:
+                continue
+            local = (table_name, fk['constrained_columns'][0])
+            remote = (fk['referred_table'], fk['referred_columns'][0])
+            if local in columns or remote in columns:
+                columns.setdefault(local, columns.get(remote))
+                foreign_keys.append((table_name, fk))
+    
+    return columns, foreign_keys
+
+
+def _drop_foreign_keys(foreign_keys):
+    for table_name, fk in foreign_keys:
+        op.drop_constraint(fk['name'], table_name, type_='foreignkey')
+
+
+def _create_foreign_keys(foreign_keys):
+    for table_name, fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'],
+            table_name,
+            fk['referred_table'],
+            fk['constrained_columns'],
+            fk['referred_columns'],
+            ondelete=fk.get('options', {}).get('ondelete')
+        )
+
+
+def upgrade() -> None:
+    columns, foreign_keys = _plan()
+    
+    op.execute("ALTER TABLE users DROP CONSTRAINT IF EXISTS chk_wallet_format")
+    _drop_foreign_keys(foreign_keys)
+    
+    for (table_name, column_name), length in columns.items():
+        op.execute(
+            f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE bytea "
+            f"USING decode(substring({column_name} from 3), 'hex')"
+        )
+    
+    _create_foreign_keys(foreign_keys)
+
+
+def downgrade() -> None:
+    columns, foreign_keys = _plan()
+    
+    _drop_foreign_keys(foreign_keys)
+    
+    for (table_name, column_name), length in columns.items():
+        op.execute(
+            f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE varchar({2 + 2 * length}) "
+            f"USING '0x' || encode({column_name}, 'hex')"
+        )
+    
+    _create_foreign_keys(foreign_keys)
+    op.create_check_constraint(
+        'chk_wallet_format',
+        'users',
+        "length(wallet_address) = 42 AND wallet_address LIKE '0x%'"
+    )
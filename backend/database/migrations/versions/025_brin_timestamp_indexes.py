@@ -0,0 +1,66 @@
+"""brin_timestamp_indexes
+
+Revision ID: 025_brin_timestamp_indexes
+Revises: 024_bytea_addresses
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '025_brin_timestamp_indexes'
+down_revision = '024_bytea_addresses'
+branch_labels = None
+depends_on = None
+
+
+# (BRIN index, table, column, btree indexes it replaces)
+BRIN_INDEXES = [
+    ('brin_score_history_computed', 'score_history', 'computed_at',
+     ['idx_score_history_computed']),
+    ('brin_transactions_block_ts', 'transactions', 'block_timestamp',
+     ['idx_transactions_timestamp', 'ix_transactions_block_timestamp']),
+    ('brin_transactions_created', 'transactions', 'created_at',
+     ['ix_transactions_created_at']),
+    ('brin_token_transfers_block', 'token_transfers', 'block_number',
+     ['idx_token_transfers_block', 'ix_token_transfers_block_number']),
+    ('brin_token_transfers_block_ts', 'token_transfers', 'block_timestamp',
+     ['ix_token_transfers_block_timestamp']),
+    ('brin_alerts_created', 'alerts', 'created_at',
+     ['idx_alerts_created_at', 'ix_alerts_created_at']),
+    ('brin_retention_executed', 'data_retention_log', 'executed_at',
+     ['idx_retention_executed', 'ix_data_retention_log_executed_at']),
+    ('brin_metric_recorded', 'ab_metrics', 'recorded_at',
+     ['idx_metric_recorded', 'ix_ab_metrics_recorded_at']),
+    ('brin_rebalance_created', 'rebalance_history', 'created_at',
+     ['idx_rebalance_created']),
+]
+
+
+def upgrade() -> None:
+    # Append-only timestamp/block columns correlate with heap order, so a
+    # BRIN summary per 32 pages replaces a full btree at a fraction of the size
+    inspector = sa.inspect(op.get_bind())
+    for index_name, table_name, column_name, replaced in BRIN_INDEXES:
+        if not inspector.has_table(table_name):
+            continue
+        op.create_index(
+            index_name,
+            table_name,
+            [column_name],
+            unique=False,
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32}
+        )
+        for old_index in replaced:
+            op.execute(f"DROP INDEX IF EXISTS {old_index}")
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for index_name, table_name, column_name, replaced in BRIN_INDEXES:
+        if not inspector.has_table(table_name):
+            continue
+        op.drop_index(index_name, table_name=table_name)
+        op.create_index(replaced[0], table_name, [column_name], unique=False)
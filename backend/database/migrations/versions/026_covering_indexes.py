@@ -0,0 +1,56 @@
+"""covering_indexes
+
+Revision ID: 026_covering_indexes
+Revises: 025_brin_timestamp_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '026_covering_indexes'
+down_revision = '025_brin_timestamp_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Wallet transaction feed served from the index (no heap fetches)
+    op.create_index(
+        'idx_tx_wallet_chain_covering',
+        'transactions',
+        ['wallet_address', 'chain_id', 'block_timestamp'],
+        unique=False,
+        postgresql_include=['tx_hash', 'tx_type', 'value', 'status']
+    )
+    op.drop_index('idx_transactions_wallet_chain', table_name='transactions')
+    
+    op.create_index(
+        'idx_loans_wallet_covering',
+        'loans',
+        ['wallet_address'],
+        unique=False,
+        postgresql_include=['status', 'amount', 'due_date']
+    )
+    op.drop_index('idx_loans_wallet', table_name='loans')
+    
+    # Unread alerts for a wallet: partial + covering
+    op.create_index(
+        'idx_alerts_unread_covering',
+        'alerts',
+        ['wallet_address', 'created_at'],
+        unique=False,
+        postgresql_include=['alert_type', 'severity'],
+        postgresql_where=sa.text('read = false AND dismissed = false')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_alerts_unread_covering', table_name='alerts')
+    
+    op.create_index('idx_loans_wallet', 'loans', ['wallet_address'], unique=False)
+    op.drop_index('idx_loans_wallet_covering', table_name='loans')
+    
+    op.create_index('idx_transactions_wallet_chain', 'transactions', ['wallet_address', 'chain_id'], unique=False)
+    op.drop_index('idx_tx_wallet_chain_covering', table_name='transactions')
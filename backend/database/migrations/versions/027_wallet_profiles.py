@@ -0,0 +1,97 @@
+"""wallet_profiles
+
+Revision ID: 027_wallet_profiles
+Revises: 026_covering_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '027_wallet_profiles'
+down_revision = '026_covering_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Denormalized dashboard row per wallet
+    op.create_table(
+        'wallet_profiles',
+        sa.Column('wallet_address', sa.LargeBinary(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.Column('risk_band', sa.Integer(), nullable=True),
+        sa.Column('active_loan_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_borrowed', sa.Numeric(precision=20, scale=8), nullable=False, server_default='0'),
+        sa.Column('unread_alert_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_score_change_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['wallet_address'], ['users.wallet_address'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('wallet_address')
+    )
+    
+    # Recompute one wallet's row from its source tables
+    op.execute("""
+        CREATE OR REPLACE FUNCTION refresh_wallet_profile(addr bytea) RETURNS void AS $$
+        BEGIN
+            INSERT INTO wallet_profiles (
+                wallet_address, score, risk_band, active_loan_count, total_borrowed,
+                unread_alert_count, last_score_change_at, updated_at
+            )
+            SELECT
+                addr,
+                s.score,
+                s.risk_band,
+                (SELECT count(*) FROM loans l WHERE l.wallet_address = addr AND l.status = 'active'),
+                (SELECT COALESCE(sum(l.amount), 0) FROM loans l WHERE l.wallet_address = addr),
+                (SELECT count(*) FROM alerts a
+                 WHERE a.wallet_address = addr AND a.read = false AND a.dismissed = false),
+                s.last_updated,
+                now()
+            FROM (SELECT 1) AS one
+            LEFT JOIN scores s ON s.wallet_address = addr
+            WHERE EXISTS (SELECT 1 FROM users u WHERE u.wallet_address = addr)
+            ON CONFLICT (wallet_address) DO UPDATE SET
+                score = EXCLUDED.score,
+                risk_band = EXCLUDED.risk_band,
+                active_loan_count = EXCLUDED.active_loan_count,
+                total_borrowed = EXCLUDED.total_borrowed,
+                unread_alert_count = EXCLUDED.unread_alert_count,
+                last_score_change_at = EXCLUDED.last_score_change_at,
+                updated_at = EXCLUDED.updated_at;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION wallet_profile_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM refresh_wallet_profile(OLD.wallet_address);
+                RETURN OLD;
+            END IF;
+            PERFORM refresh_wallet_profile(NEW.wallet_address);
+            IF TG_OP = 'UPDATE' AND OLD.wallet_address IS DISTINCT FROM NEW.wallet_address THEN
+                PERFORM refresh_wallet_profile(OLD.wallet_address);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table_name in ('scores', 'loans', 'alerts'):
+        op.execute(f"""
+            CREATE TRIGGER trg_{table_name}_wallet_profile
+            AFTER INSERT OR UPDATE OR DELETE ON {table_name}
+            FOR EACH ROW EXECUTE FUNCTION wallet_profile_trigger()
+        """)
+    
+    # Backfill
+    op.execute("SELECT refresh_wallet_profile(wallet_address) FROM users")
+
+
+def downgrade() -> None:
+    for table_name in ('scores', 'loans', 'alerts'):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_wallet_profile ON {table_name}")
+    op.execute("DROP FUNCTION IF EXISTS wallet_profile_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_wallet_profile(bytea)")
+    op.drop_table('wallet_profiles')
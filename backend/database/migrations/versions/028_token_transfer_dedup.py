@@ -0,0 +1,41 @@
+"""token_transfer_dedup
+
+Revision ID: 028_token_transfer_dedup
+Revises: 027_wallet_profiles
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '028_token_transfer_dedup'
+down_revision = '027_wallet_profiles'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Drop replay duplicates (keep the first row) before adding the constraint
+    op.execute("""
+        DELETE FROM token_transfers t
+        USING token_transfers d
+        WHERE t.id > d.id
+          AND t.tx_hash = d.tx_hash
+          AND t.token_address = d.token_address
+          AND t.from_address IS NOT DISTINCT FROM d.from_address
+          AND t.to_address IS NOT DISTINCT FROM d.to_address
+          AND t.token_id IS NOT DISTINCT FROM d.token_id
+    """)
+    
+    # NULLS NOT DISTINCT (PostgreSQL 15+) so ERC-20 rows (token_id NULL) dedupe
+    op.create_unique_constraint(
+        'uq_transfer_dedup',
+        'token_transfers',
+        ['tx_hash', 'from_address', 'to_address', 'token_address', 'token_id'],
+        postgresql_nulls_not_distinct=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_transfer_dedup', 'token_transfers', type_='unique')
@@ -0,0 +1,255 @@
+"""partition_time_series
+
+Revision ID: 029_partition_time_series
+Revises: 028_token_transfer_dedup
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '029_partition_time_series'
+down_revision = '028_token_transfer_dedup'
+branch_labels = None
+depends_on = None
+
+# Monthly partitions are created up to this many months past the current one;
+# database.partitions.ensure_monthly_partitions() keeps the window rolling
+# (rows older than the window go to the DEFAULT partitions added in 057)
+PARTITIONS_AHEAD = 2
+
+# (table, partition key) in parent-before-child order
+PARTITIONED = [
+    ('transactions', 'block_timestamp'),
+    ('transaction_inputs', 'block_timestamp'),
+    ('token_transfers', 'block_timestamp'),
+    ('score_history', 'computed_at'),
+]
+
+# Secondary indexes, identical before and after partitioning
+INDEXES = {
+    'transactions': [
+        "CREATE INDEX idx_transactions_wallet ON transactions (wallet_address)",
+        "CREATE INDEX idx_transactions_type ON transactions (tx_type)",
+        "CREATE INDEX ix_transactions_block_number ON transactions (block_number)",
+        "CREATE INDEX ix_transactions_chain_id ON transactions (chain_id)",
+        "CREATE INDEX ix_transactions_from_address ON transactions (from_address)",
+        "CREATE INDEX ix_transactions_to_address ON transactions (to_address)",
+        "CREATE INDEX ix_transactions_contract_address ON transactions (contract_address)",
+        "CREATE INDEX brin_transactions_block_ts ON transactions USING brin (block_timestamp) WITH (pages_per_range = 32)",
+        "CREATE INDEX brin_transactions_created ON transactions USING brin (created_at) WITH (pages_per_range = 32)",
+        "CREATE INDEX idx_tx_wallet_chain_covering ON transactions (wallet_address, chain_id, block_timestamp) "
+        "INCLUDE (tx_hash, tx_type, value, status)",
+    ],
+    'transaction_inputs': [],
+    'token_transfers': [
+        "CREATE INDEX idx_token_transfers_token ON token_transfers (token_address)",
+        "CREATE INDEX idx_token_transfers_from ON token_transfers (from_address)",
+        "CREATE INDEX idx_token_transfers_to ON token_transfers (to_address)",
+        "CREATE INDEX idx_token_transfers_chain ON token_transfers (chain_id)",
+        "CREATE INDEX ix_token_transfers_tx_hash ON token_transfers (tx_hash)",
+        "CREATE INDEX brin_token_transfers_block ON token_transfers USING brin (block_number) WITH (pages_per_range = 32)",
+        "CREATE INDEX brin_token_transfers_block_ts ON token_transfers USING brin (block_timestamp) WITH (pages_per_range = 32)",
+    ],
+    'score_history': [
+        "CREATE INDEX idx_score_history_wallet ON score_history (wallet_address)",
+        "CREATE INDEX idx_score_history_wallet_computed ON score_history (wallet_address, computed_at)",
+        "CREATE INDEX brin_score_history_computed ON score_history USING brin (computed_at) WITH (pages_per_range = 32)",
+    ],
+}
+
+# Keys and foreign keys; unique keys on a partitioned table must include the partition key
+PARTITIONED_CONSTRAINTS = {
+    'transactions': [
+        "ALTER TABLE transactions ADD PRIMARY KEY (id, block_timestamp)",
+        "ALTER TABLE transactions ADD CONSTRAINT uq_transactions_tx_hash UNIQUE (tx_hash, block_timestamp)",
+        "ALTER TABLE transactions ADD FOREIGN KEY (wallet_address) REFERENCES users (wallet_address)",
+    ],
+    'transaction_inputs': [
+        "ALTER TABLE transaction_inputs ADD PRIMARY KEY (tx_id, block_timestamp)",
+        "ALTER TABLE transaction_inputs ADD FOREIGN KEY (tx_id, block_timestamp) "
+        "REFERENCES transactions (id, block_timestamp) ON DELETE CASCADE",
+    ],
+    'token_transfers': [
+        "ALTER TABLE token_transfers ADD PRIMARY KEY (id, block_timestamp)",
+        "ALTER TABLE token_transfers ADD FOREIGN KEY (tx_hash, block_timestamp) "
+        "REFERENCES transactions (tx_hash, block_timestamp)",
+        "ALTER TABLE token_transfers ADD CONSTRAINT uq_transfer_dedup UNIQUE NULLS NOT DISTINCT "
+        "(tx_hash, from_address, to_address, token_address, token_id, block_timestamp)",
+    ],
+    'score_history': [
+        "ALTER TABLE score_history ADD PRIMARY KEY (id, computed_at)",
+        "ALTER TABLE score_history ADD FOREIGN KEY (wallet_address) REFERENCES scores (wallet_address)",
+    ],
+}
+
+UNPARTITIONED_CONSTRAINTS = {
+    'transactions': [
+        "ALTER TABLE transactions ADD PRIMARY KEY (id)",
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_tx_hash_key UNIQUE (tx_hash)",
+        "ALTER TABLE transactions ADD FOREIGN KEY (wallet_address) REFERENCES users (wallet_address)",
+    ],
+    'transaction_inputs': [
+        "ALTER TABLE transaction_inputs ADD PRIMARY KEY (tx_id)",
+        "ALTER TABLE transaction_inputs ADD FOREIGN KEY (tx_id) REFERENCES transactions (id) ON DELETE CASCADE",
+    ],
+    'token_transfers': [
+        "ALTER TABLE token_transfers ADD PRIMARY KEY (id)",
+        "ALTER TABLE token_transfers ADD FOREIGN KEY (tx_hash) REFERENCES transactions (tx_hash)",
+        "ALTER TABLE token_transfers ADD CONSTRAINT uq_transfer_dedup UNIQUE NULLS NOT DISTINCT "
+        "(tx_hash, from_address, to_address, token_address, token_id)",
+    ],
+    'score_history': [
+        "ALTER TABLE score_history ADD PRIMARY KEY (id)",
+        "ALTER TABLE score_history ADD FOREIGN KEY (wallet_address) REFERENCES scores (wallet_address)",
+    ],
+}
+
+# Same counter as 017, with the partition key so the parent UPDATE is pruned
+# (database.triggers.CHILD_COUNTER_TRIGGERS installs it on fresh databases)
+TOKEN_TRANSFERS_COUNTER = """
+    CREATE OR REPLACE FUNCTION token_transfers_counter() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE transactions
+            SET token_transfers_count = COALESCE(token_transfers_count, 0) + 1
+            WHERE tx_hash = NEW.tx_hash{new_ts};
+            RETURN NEW;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE transactions
+            SET token_transfers_count = COALESCE(token_transfers_count, 0) - 1
+            WHERE tx_hash = OLD.tx_hash{old_ts};
+            RETURN OLD;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+TOKEN_TRANSFERS_TRIGGER = """
+    CREATE TRIGGER trg_token_transfers_counter
+    AFTER INSERT OR DELETE ON token_transfers
+    FOR EACH ROW EXECUTE FUNCTION token_transfers_counter()
+"""
+
+
+def _create_monthly_partitions(table: str, key: str, source: str) -> None:
+    """One UTC-month partition from the oldest source row through PARTITIONS_AHEAD"""
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', COALESCE((SELECT min({key}) FROM {source}), now()));
+            last_month date := date_trunc('month', now()) + interval '{PARTITIONS_AHEAD} months';
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+                    to_char(month_start, 'YYYY-MM-DD') || ' 00:00:00+00',
+                    to_char(month_start + interval '1 month', 'YYYY-MM-DD') || ' 00:00:00+00'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+
+
+def _rebuild_table(table: str, partition_by: str = None) -> None:
+    """Swap a table for a (partitioned or plain) copy with the same columns and data"""
+    old = f"{table}_old"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    
+    partition_clause = f" PARTITION BY RANGE ({partition_by})" if partition_by else ""
+    op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS){partition_clause}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    
+    # The partition key becomes part of the primary key, so it can't be NULL.
+    # Child rows take their parent transaction's timestamp.
+    op.execute("""
+        UPDATE transactions SET block_timestamp = COALESCE(created_at, now())
+        WHERE block_timestamp IS NULL
+    """)
+    op.execute("""
+        UPDATE token_transfers s SET block_timestamp = t.block_timestamp
+        FROM transactions t
+        WHERE t.tx_hash = s.tx_hash
+          AND s.block_timestamp IS DISTINCT FROM t.block_timestamp
+    """)
+    op.execute("UPDATE score_history SET computed_at = now() WHERE computed_at IS NULL")
+    op.add_column('transaction_inputs', sa.Column('block_timestamp', sa.DateTime(timezone=True), nullable=True))
+    op.execute("""
+        UPDATE transaction_inputs i SET block_timestamp = t.block_timestamp
+        FROM transactions t
+        WHERE t.id = i.tx_id
+    """)
+    
+    for table, key in PARTITIONED:
+        _rebuild_table(table, partition_by=key)
+    for table, key in PARTITIONED:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL")
+    
+    # Transaction-side tables share the transactions month range
+    for table, key in PARTITIONED:
+        source = 'score_history_old' if table == 'score_history' else 'transactions_old'
+        _create_monthly_partitions(table, key, source)
+    
+    for table, _ in PARTITIONED:
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    
+    # Keep the id sequences when the old tables (their owners) are dropped
+    for table in ('transactions', 'token_transfers', 'score_history'):
+        sequence = bind.execute(
+            sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": f"{table}_old"}
+        ).scalar()
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    
+    # Children first; this also drops trg_token_transfers_counter
+    for table, _ in reversed(PARTITIONED):
+        op.execute(f"DROP TABLE {table}_old")
+    
+    for table, _ in PARTITIONED:
+        for statement in PARTITIONED_CONSTRAINTS[table] + INDEXES[table]:
+            op.execute(statement)
+    
+    op.execute(TOKEN_TRANSFERS_COUNTER.format(
+        new_ts=" AND block_timestamp = NEW.block_timestamp",
+        old_ts=" AND block_timestamp = OLD.block_timestamp"
+    ))
+    op.execute(TOKEN_TRANSFERS_TRIGGER)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    
+    for table, _ in PARTITIONED:
+        _rebuild_table(table)
+    op.execute("ALTER TABLE transactions ALTER COLUMN block_timestamp DROP NOT NULL")
+    op.execute("ALTER TABLE token_transfers ALTER COLUMN block_timestamp DROP NOT NULL")
+    op.execute("ALTER TABLE score_history ALTER COLUMN computed_at DROP NOT NULL")
+    
+    for table, _ in PARTITIONED:
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    
+    for table in ('transactions', 'token_transfers', 'score_history'):
+        sequence = bind.execute(
+            sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": f"{table}_old"}
+        ).scalar()
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    
+    # Dropping a partitioned table drops its partitions
+    for table, _ in reversed(PARTITIONED):
+        op.execute(f"DROP TABLE {table}_old")
+    
+    op.drop_column('transaction_inputs', 'block_timestamp')
+    for table, _ in PARTITIONED:
+        for statement in UNPARTITIONED_CONSTRAINTS[table] + INDEXES[table]:
+            op.execute(statement)
+    
+    op.execute(TOKEN_TRANSFERS_COUNTER.format(new_ts="", old_ts=""))
+    op.execute(TOKEN_TRANSFERS_TRIGGER)
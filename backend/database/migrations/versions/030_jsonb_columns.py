@@ -0,0 +1,78 @@
+"""jsonb_columns
+
+Revision ID: 030_jsonb_columns
+Revises: 029_partition_time_series
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '030_jsonb_columns'
+down_revision = '029_partition_time_series'
+branch_labels = None
+depends_on = None
+
+
+# json is re-parsed on every access; jsonb is stored parsed and GIN-indexable
+JSON_COLUMNS = [
+    ('users', 'preferences'),
+    ('transactions', 'tx_metadata'),
+    ('transactions_staging', 'tx_metadata'),
+    ('ab_metrics', 'metric_data'),
+    ('loan_offers', 'accepted_collateral_tokens'),
+    ('loan_offers', 'extra_metadata'),
+    ('loan_requests', 'collateral_tokens'),
+    ('collateral_positions', 'extra_metadata'),
+    ('user_preferences', 'preferred_collateral_tokens'),
+    ('user_preferences', 'auto_accept_threshold'),
+    ('negotiation_sessions', 'negotiation_history'),
+    ('alerts', 'suggested_actions'),
+    ('referral_rewards', 'extra_metadata'),
+    ('credit_reports', 'extra_metadata'),
+    ('api_access', 'permissions'),
+]
+
+# (index, table, column) for containment lookups
+GIN_INDEXES = [
+    ('idx_loan_offers_collateral_tokens', 'loan_offers', 'accepted_collateral_tokens'),
+    ('idx_loan_requests_collateral_tokens', 'loan_requests', 'collateral_tokens'),
+]
+
+
+def _columns_of_type(type_class):
+    """JSON_COLUMNS entries that exist and currently have the given type"""
+    inspector = sa.inspect(op.get_bind())
+    found = []
+    for table, column in JSON_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        types = {c['name']: c['type'] for c in inspector.get_columns(table)}
+        if column in types and type(types[column]) is type_class:
+            found.append((table, column))
+    return found
+
+
+def upgrade() -> None:
+    for table, column in _columns_of_type(postgresql.JSON):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb")
+    
+    for name, table, column in GIN_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'jsonb_path_ops'}
+        )
+
+
+def downgrade() -> None:
+    for name, table, _ in GIN_INDEXES:
+        op.drop_index(name, table_name=table)
+    
+    for table, column in _columns_of_type(postgresql.JSONB):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE json USING {column}::json")
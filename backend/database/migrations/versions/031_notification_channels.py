@@ -0,0 +1,52 @@
+"""notification_channels
+
+Revision ID: 031_notification_channels
+Revises: 030_jsonb_columns
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '031_notification_channels'
+down_revision = '030_jsonb_columns'
+branch_labels = None
+depends_on = None
+
+
+# (boolean column, bit in channels) -- see models.NotificationChannel
+CHANNEL_BITS = [
+    ('in_app_enabled', 1),
+    ('email_enabled', 2),
+    ('push_enabled', 4),
+    ('sms_enabled', 8),
+]
+
+
+def upgrade() -> None:
+    op.add_column(
+        'notification_preferences',
+        sa.Column('channels', sa.SmallInteger(), nullable=False, server_default=sa.text('1'))
+    )
+    
+    # sms_enabled was added outside the migration chain, so it may be missing
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('notification_preferences')}
+    present = [(column, bit) for column, bit in CHANNEL_BITS if column in existing]
+    if present:
+        bits = " | ".join(f"(CASE WHEN {column} THEN {bit} ELSE 0 END)" for column, bit in present)
+        op.execute(f"UPDATE notification_preferences SET channels = {bits}")
+    
+    for column, _ in present:
+        op.drop_column('notification_preferences', column)
+
+
+def downgrade() -> None:
+    for column, bit in CHANNEL_BITS:
+        op.add_column(
+            'notification_preferences',
+            sa.Column(column, sa.Boolean(), nullable=False, server_default=sa.text('true' if bit == 1 else 'false'))
+        )
+        op.execute(f"UPDATE notification_preferences SET {column} = (channels & {bit}) <> 0")
+    
+    op.drop_column('notification_preferences', 'channels')
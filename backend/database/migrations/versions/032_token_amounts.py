@@ -0,0 +1,48 @@
+"""token_amounts
+
+Revision ID: 032_token_amounts
+Revises: 031_notification_channels
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '032_token_amounts'
+down_revision = '031_notification_channels'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, previous type) -- widened to models.TokenAmount (uint256)
+AMOUNT_COLUMNS = [
+    ('transactions', 'value', sa.Numeric(20, 8)),
+    ('transactions_staging', 'value', sa.Numeric(20, 8)),
+    ('token_transfers', 'amount', sa.Numeric(36, 0)),
+    ('token_transfers', 'token_id', sa.Numeric(36, 0)),
+    ('token_transfers_staging', 'amount', sa.Numeric(36, 0)),
+    ('token_transfers_staging', 'token_id', sa.Numeric(36, 0)),
+]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, column, _ in AMOUNT_COLUMNS:
+        if table in existing:
+            op.alter_column(
+                table, column,
+                type_=sa.Numeric(78, 0),
+                postgresql_using=f'round({column})::numeric(78, 0)'
+            )
+
+
+def downgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, column, previous in AMOUNT_COLUMNS:
+        if table in existing:
+            op.alter_column(
+                table, column,
+                type_=previous,
+                postgresql_using=f'{column}::numeric({previous.precision}, {previous.scale})'
+            )
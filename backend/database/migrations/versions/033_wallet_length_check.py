@@ -0,0 +1,30 @@
+"""wallet_length_check
+
+Revision ID: 033_wallet_length_check
+Revises: 032_token_amounts
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '033_wallet_length_check'
+down_revision = '032_token_amounts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 024 dropped the text-format check when wallets became BYTEA; the
+    # byte-length test replaces it without any pattern matching
+    op.execute("ALTER TABLE users DROP CONSTRAINT IF EXISTS chk_wallet_format")
+    op.create_check_constraint(
+        'chk_wallet_format',
+        'users',
+        "octet_length(wallet_address) = 20"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('chk_wallet_format', 'users', type_='check')
@@ -0,0 +1,46 @@
+"""partial_status_indexes
+
+Revision ID: 034_partial_status_indexes
+Revises: 033_wallet_length_check
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '034_partial_status_indexes'
+down_revision = '033_wallet_length_check'
+branch_labels = None
+depends_on = None
+
+
+# (full status index it replaces or None, partial index, table, columns, predicate)
+PARTIAL_INDEXES = [
+    (None, 'idx_batch_pending', 'batch_updates', ['created_at'],
+     "status IN ('pending', 'processing')"),
+    ('idx_loans_status', 'idx_loans_active', 'loans', ['wallet_address', 'created_at'],
+     "status = 'active'"),
+    ('idx_gdpr_status', 'idx_gdpr_pending', 'gdpr_requests', ['requested_at'],
+     "status = 'pending'"),
+    ('idx_loan_offers_status', 'idx_offers_open', 'loan_offers', ['interest_rate'],
+     "status = 'active'"),
+    ('idx_loan_requests_status', 'idx_requests_open', 'loan_requests', ['created_at'],
+     "status IN ('open', 'bidding')"),
+    ('idx_negotiation_status', 'idx_negotiation_active', 'negotiation_sessions', ['wallet_address'],
+     "status = 'active'"),
+]
+
+
+def upgrade() -> None:
+    for replaced, index_name, table, columns, predicate in PARTIAL_INDEXES:
+        op.create_index(index_name, table, columns, postgresql_where=sa.text(predicate))
+        if replaced:
+            op.execute(f"DROP INDEX IF EXISTS {replaced}")
+
+
+def downgrade() -> None:
+    for replaced, index_name, table, columns, predicate in PARTIAL_INDEXES:
+        if replaced:
+            op.create_index(replaced, table, ['status'])
+        op.drop_index(index_name, table_name=table)
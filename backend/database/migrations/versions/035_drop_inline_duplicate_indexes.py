@@ -0,0 +1,90 @@
+"""drop_inline_duplicate_indexes
+
+Revision ID: 035_drop_inline_duplicate_indexes
+Revises: 034_partial_status_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '035_drop_inline_duplicate_indexes'
+down_revision = '034_partial_status_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Indexes whose columns lead another index, key or unique constraint on the
+# same table (see 018). Most ix_* were only created by create_all() from
+# inline index=True, hence IF EXISTS.
+DUPLICATE_INDEXES = [
+    'idx_transactions_wallet',              # idx_tx_wallet_chain_covering
+    'ix_transactions_wallet_address',       # idx_tx_wallet_chain_covering
+    'ix_transactions_tx_type',              # idx_transactions_type
+    'idx_score_history_wallet',             # idx_score_history_wallet_computed
+    'ix_token_transfers_tx_hash',           # uq_transfer_dedup
+    'ix_token_transfers_token_address',     # idx_token_transfers_token
+    'ix_token_transfers_from_address',      # idx_token_transfers_from
+    'ix_token_transfers_to_address',        # idx_token_transfers_to
+    'ix_token_transfers_chain_id',          # idx_token_transfers_chain
+    'ix_gdpr_requests_wallet_address',      # idx_gdpr_wallet
+    'ix_data_retention_log_table_name',     # idx_retention_table
+    'ix_ab_allocations_experiment_id',      # idx_allocation_experiment_user
+    'ix_ab_metrics_experiment_id',          # idx_metric_experiment_variant
+    'ix_loan_offers_lender_address',        # idx_loan_offers_lender
+    'ix_loan_offers_status',                # idx_offers_open
+    'ix_loan_requests_borrower_address',    # idx_loan_requests_borrower
+    'ix_loan_requests_status',              # idx_requests_open
+    'ix_collateral_positions_loan_id',      # idx_collateral_loan
+    'ix_collateral_positions_token_address',  # idx_collateral_token
+    'ix_collateral_positions_wallet_address',  # idx_collateral_wallet
+    'ix_rebalance_history_loan_id',         # idx_rebalance_loan
+    'ix_yield_strategies_wallet_address',   # idx_yield_wallet
+    'ix_negotiation_sessions_status',       # idx_negotiation_active
+    'ix_negotiation_sessions_wallet_address',  # idx_negotiation_wallet
+    'ix_score_shares_shared_at',            # idx_score_shares_shared_at
+    'ix_score_shares_share_type',           # idx_score_shares_type
+    'ix_score_shares_wallet_address',       # idx_score_shares_wallet
+    'ix_leaderboard_entries_score',         # idx_leaderboard_score
+    'ix_leaderboard_entries_wallet_address',  # idx_leaderboard_wallet_category
+    'ix_leaderboard_entries_category',      # idx_leaderboard_category_rank
+    'ix_referral_rewards_recipient_address',  # idx_referral_rewards_recipient_status
+    'ix_referral_rewards_status',           # idx_referral_rewards_status
+    'ix_teams_admin_address',               # idx_teams_admin
+    'ix_team_members_wallet_address',       # idx_team_members_wallet
+    'ix_team_members_team_id',              # idx_team_members_team
+    'ix_team_scores_calculated_at',         # idx_team_scores_calculated
+    'ix_team_scores_team_id',               # idx_team_scores_team
+    'ix_credit_reports_generated_at',       # idx_credit_reports_generated
+    'ix_credit_reports_wallet_address',     # idx_credit_reports_wallet
+    'ix_report_shares_share_token',         # idx_report_shares_token (unique)
+    'ix_report_shares_wallet_address',      # idx_report_shares_wallet
+    'ix_report_shares_shared_with_address',  # idx_report_shares_shared_with
+    'ix_report_shares_expires_at',          # idx_report_shares_expires
+    'ix_api_access_api_key',                # idx_api_access_key (unique)
+    'ix_api_access_protocol_address',       # idx_api_access_protocol
+    'ix_api_access_expires_at',             # idx_api_access_expires
+]
+
+# Unique constraints from 013 shadowed by the unique idx_* on the same column
+DUPLICATE_UNIQUE_CONSTRAINTS = [
+    ('report_shares', 'uq_report_shares_token', 'share_token'),
+    ('api_access', 'uq_api_access_key', 'api_key'),
+]
+
+
+def upgrade() -> None:
+    for index_name in DUPLICATE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    for table, constraint_name, _ in DUPLICATE_UNIQUE_CONSTRAINTS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint_name}")
+
+
+def downgrade() -> None:
+    # Only restore the indexes created by earlier migrations
+    for table, constraint_name, column in DUPLICATE_UNIQUE_CONSTRAINTS:
+        op.create_unique_constraint(constraint_name, table, [column])
+    op.create_index('ix_token_transfers_tx_hash', 'token_transfers', ['tx_hash'])
+    op.create_index('idx_score_history_wallet', 'score_history', ['wallet_address'])
+    op.create_index('idx_transactions_wallet', 'transactions', ['wallet_address'])
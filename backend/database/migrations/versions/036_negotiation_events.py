@@ -0,0 +1,74 @@
+"""negotiation_events
+
+Revision ID: 036_negotiation_events
+Revises: 035_drop_inline_duplicate_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '036_negotiation_events'
+down_revision = '035_drop_inline_duplicate_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'negotiation_events',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=20), nullable=False),
+        sa.Column('offer_id', sa.Integer(), nullable=True),
+        sa.Column('payload', postgresql.JSONB(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['negotiation_sessions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['offer_id'], ['loan_offers.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id', 'seq', name='uq_negotiation_event_seq')
+    )
+    
+    # History entries were {"action", "timestamp", ...rest}; the rest becomes
+    # the payload. Offer ids only ever lived inside results, so stay unset.
+    op.execute("""
+        INSERT INTO negotiation_events (session_id, seq, event_type, payload, created_at)
+        SELECT s.id,
+               e.ord,
+               left(coalesce(e.value->>'action', 'unknown'), 20),
+               e.value - 'action' - 'timestamp',
+               coalesce((e.value->>'timestamp')::timestamp AT TIME ZONE 'UTC', s.created_at)
+        FROM negotiation_sessions s
+        CROSS JOIN LATERAL jsonb_array_elements(s.negotiation_history) WITH ORDINALITY AS e(value, ord)
+        WHERE jsonb_typeof(s.negotiation_history) = 'array'
+    """)
+    
+    op.drop_column('negotiation_sessions', 'negotiation_history')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'negotiation_sessions',
+        sa.Column('negotiation_history', postgresql.JSONB(), nullable=True)
+    )
+    op.execute("""
+        UPDATE negotiation_sessions s
+        SET negotiation_history = h.history
+        FROM (
+            SELECT session_id,
+                   jsonb_agg(
+                       jsonb_build_object(
+                           'action', event_type,
+                           'timestamp', to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US')
+                       ) || coalesce(payload, '{}'::jsonb)
+                       ORDER BY seq
+                   ) AS history
+            FROM negotiation_events
+            GROUP BY session_id
+        ) h
+        WHERE h.session_id = s.id
+    """)
+    op.drop_table('negotiation_events')
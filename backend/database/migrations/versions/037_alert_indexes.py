@@ -0,0 +1,41 @@
+"""alert_indexes
+
+Revision ID: 037_alert_indexes
+Revises: 036_negotiation_events
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '037_alert_indexes'
+down_revision = '036_negotiation_events'
+branch_labels = None
+depends_on = None
+
+
+# Unread lookups use idx_alerts_unread_covering (026); a boolean btree on
+# read is never selective, and the rest duplicate idx_alerts_wallet_address
+# or idx_alerts_type_severity. ix_* only exist on create_all() databases.
+REDUNDANT_INDEXES = [
+    'idx_alerts_wallet_read',
+    'idx_alerts_read',
+    'ix_alerts_read',
+    'idx_alerts_alert_type',
+    'ix_alerts_alert_type',
+    'ix_alerts_wallet_address',
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_alerts_wallet_address ON alerts (wallet_address)")
+    for index_name in REDUNDANT_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    # Only restore the indexes created by earlier migrations
+    op.create_index('idx_alerts_wallet_read', 'alerts', ['wallet_address', 'read'], unique=False)
+    op.create_index('idx_alerts_read', 'alerts', ['read'], unique=False)
+    op.create_index('idx_alerts_alert_type', 'alerts', ['alert_type'], unique=False)
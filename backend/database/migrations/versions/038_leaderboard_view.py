@@ -0,0 +1,74 @@
+"""leaderboard_view
+
+Revision ID: 038_leaderboard_view
+Revises: 037_alert_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '038_leaderboard_view'
+down_revision = '037_alert_indexes'
+branch_labels = None
+depends_on = None
+
+
+LEADERBOARD_ENTRIES_VIEW = """
+    CREATE MATERIALIZED VIEW leaderboard_entries AS
+    WITH periods (category, period_start, period_end) AS (
+        VALUES
+            ('all_time', NULL::timestamptz, NULL::timestamptz),
+            ('monthly', date_trunc('month', now()), date_trunc('month', now()) + interval '1 month'),
+            ('weekly', date_trunc('week', now()), date_trunc('week', now()) + interval '1 week')
+    )
+    SELECT s.wallet_address,
+           s.score,
+           s.risk_band,
+           (RANK() OVER (PARTITION BY p.category ORDER BY s.score DESC))::integer AS rank,
+           p.category::varchar(20) AS category,
+           p.period_start,
+           p.period_end,
+           now() AS updated_at
+    FROM periods p
+    JOIN scores s ON p.period_start IS NULL OR s.last_updated >= p.period_start
+    JOIN users u ON u.wallet_address = s.wallet_address AND u.deleted_at IS NULL
+"""
+
+
+def upgrade() -> None:
+    # Rows were rebuilt from scores by the leaderboard job, so nothing to keep
+    op.drop_table('leaderboard_entries')
+    op.execute(LEADERBOARD_ENTRIES_VIEW)
+    # REFRESH ... CONCURRENTLY needs a unique index over all rows
+    op.create_index(
+        'idx_leaderboard_wallet_category', 'leaderboard_entries', ['wallet_address', 'category'], unique=True
+    )
+    op.create_index('idx_leaderboard_category_rank', 'leaderboard_entries', ['category', 'rank'])
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW leaderboard_entries")
+    op.create_table(
+        'leaderboard_entries',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('wallet_address', postgresql.BYTEA(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('risk_band', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=20), nullable=False),
+        sa.Column('period_start', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('period_end', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['wallet_address'], ['users.wallet_address'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.CheckConstraint('score >= 0 AND score <= 1000', name='chk_leaderboard_score_range'),
+        sa.CheckConstraint('risk_band >= 0 AND risk_band <= 3', name='chk_leaderboard_risk_band'),
+        sa.CheckConstraint('rank > 0', name='chk_leaderboard_rank'),
+        sa.CheckConstraint("category IN ('all_time', 'monthly', 'weekly')", name='chk_leaderboard_category')
+    )
+    op.create_index('idx_leaderboard_wallet_category', 'leaderboard_entries', ['wallet_address', 'category'])
+    op.create_index('idx_leaderboard_category_rank', 'leaderboard_entries', ['category', 'rank'])
+    op.create_index('idx_leaderboard_score', 'leaderboard_entries', ['score'])
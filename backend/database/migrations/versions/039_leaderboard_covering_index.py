@@ -0,0 +1,34 @@
+"""leaderboard_covering_index
+
+Revision ID: 039_leaderboard_covering_index
+Revises: 038_leaderboard_view
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '039_leaderboard_covering_index'
+down_revision = '038_leaderboard_view'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('idx_leaderboard_category_rank', table_name='leaderboard_entries')
+    op.create_index(
+        'idx_leaderboard_category_rank',
+        'leaderboard_entries',
+        ['category', 'rank'],
+        postgresql_include=['wallet_address', 'score', 'risk_band', 'updated_at']
+    )
+    # Keep the visibility map current between refreshes so index-only
+    # scans skip the heap
+    op.execute("ALTER MATERIALIZED VIEW leaderboard_entries SET (autovacuum_vacuum_scale_factor = 0.02)")
+
+
+def downgrade() -> None:
+    op.execute("ALTER MATERIALIZED VIEW leaderboard_entries RESET (autovacuum_vacuum_scale_factor)")
+    op.drop_index('idx_leaderboard_category_rank', table_name='leaderboard_entries')
+    op.create_index('idx_leaderboard_category_rank', 'leaderboard_entries', ['category', 'rank'])
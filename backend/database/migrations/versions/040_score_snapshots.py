@@ -0,0 +1,57 @@
+"""score_snapshots
+
+Revision ID: 040_score_snapshots
+Revises: 039_leaderboard_covering_index
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '040_score_snapshots'
+down_revision = '039_leaderboard_covering_index'
+branch_labels = None
+depends_on = None
+
+
+# (table, wallet column, event time column, score column, risk band column)
+SNAPSHOTS = [
+    ('score_shares', 'wallet_address', 'shared_at', 'score_at_share', 'risk_band_at_share'),
+    ('referral_rewards', 'recipient_address', 'created_at', 'score_at_reward', 'risk_band_at_reward'),
+]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, wallet, event_time, score_column, band_column in SNAPSHOTS:
+        if table not in existing:
+            continue
+        op.add_column(table, sa.Column(score_column, sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column(band_column, sa.SmallInteger(), nullable=True))
+        
+        # Backfill from the last score computed at or before the event
+        op.execute(f"""
+            UPDATE {table} t
+            SET {score_column} = h.score, {band_column} = h.risk_band
+            FROM (
+                SELECT t2.id, sh.score, sh.risk_band
+                FROM {table} t2
+                CROSS JOIN LATERAL (
+                    SELECT score, risk_band
+                    FROM score_history
+                    WHERE wallet_address = t2.{wallet} AND computed_at <= t2.{event_time}
+                    ORDER BY computed_at DESC
+                    LIMIT 1
+                ) sh
+            ) h
+            WHERE h.id = t.id
+        """)
+
+
+def downgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, _, _, score_column, band_column in SNAPSHOTS:
+        if table in existing:
+            op.drop_column(table, band_column)
+            op.drop_column(table, score_column)
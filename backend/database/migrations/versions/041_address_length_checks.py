@@ -0,0 +1,37 @@
+"""address_length_checks
+
+Revision ID: 041_address_length_checks
+Revises: 040_score_snapshots
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '041_address_length_checks'
+down_revision = '040_score_snapshots'
+branch_labels = None
+depends_on = None
+
+
+# Address columns with no foreign key to users.wallet_address (which already
+# guarantees 20 bytes via chk_wallet_format)
+CHECKS = [
+    ('chk_shared_with_address_format', 'report_shares', 'shared_with_address'),
+    ('chk_protocol_address_format', 'api_access', 'protocol_address'),
+]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for name, table, column in CHECKS:
+        if table in existing:
+            op.create_check_constraint(name, table, f"octet_length({column}) = 20")
+
+
+def downgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for name, table, _ in CHECKS:
+        if table in existing:
+            op.drop_constraint(name, table, type_='check')
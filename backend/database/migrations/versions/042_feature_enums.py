@@ -0,0 +1,88 @@
+"""feature_enums
+
+Revision ID: 042_feature_enums
+Revises: 041_address_length_checks
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '042_feature_enums'
+down_revision = '041_address_length_checks'
+branch_labels = None
+depends_on = None
+
+
+ENUM_TYPES = {
+    'share_type': ('twitter', 'linkedin', 'facebook', 'custom'),
+    'badge_style': ('minimal', 'detailed', 'verified'),
+    'reward_type': ('referrer', 'referred', 'milestone'),
+    'reward_status': ('pending', 'distributed', 'failed'),
+    'team_type': ('dao', 'organization', 'custom'),
+    'team_role': ('admin', 'member'),
+    'report_type': ('full', 'summary', 'custom'),
+    'report_format': ('pdf', 'json', 'csv'),
+}
+
+# (table, column, enum type, CHECK constraint replaced, varchar length)
+ENUM_COLUMNS = [
+    ('score_shares', 'share_type', 'share_type', 'chk_share_type', 20),
+    ('score_shares', 'badge_style', 'badge_style', 'chk_badge_style', 20),
+    ('referral_rewards', 'reward_type', 'reward_type', 'chk_reward_type', 20),
+    ('referral_rewards', 'status', 'reward_status', 'chk_reward_status', 20),
+    ('teams', 'team_type', 'team_type', 'chk_team_type', 20),
+    ('team_members', 'role', 'team_role', 'chk_team_member_role', 20),
+    ('credit_reports', 'report_type', 'report_type', 'chk_report_type', 20),
+    ('credit_reports', 'format', 'report_format', 'chk_report_format', 10),
+]
+
+
+def _column_default(table_name, column_name):
+    """Return (exists, default) for a column; some tables predate the migration chain"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return False, None
+    for column in inspector.get_columns(table_name):
+        if column['name'] == column_name:
+            return True, column['default']
+    return False, None
+
+
+def _retype_column(table_name, column_name, new_type):
+    exists, default = _column_default(table_name, column_name)
+    if not exists:
+        return
+    # Defaults such as 'pending'::character varying cannot be cast in place
+    if default:
+        op.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column_name} DROP DEFAULT")
+    op.execute(
+        f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+        f"TYPE {new_type} USING {column_name}::text::{new_type}"
+    )
+    if default:
+        literal = default.split('::')[0]
+        op.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column_name} SET DEFAULT {literal}::{new_type}")
+
+
+def upgrade() -> None:
+    for type_name, values in ENUM_TYPES.items():
+        labels = ", ".join(f"'{v}'" for v in values)
+        op.execute(f"CREATE TYPE {type_name} AS ENUM ({labels})")
+    
+    for table_name, column_name, type_name, check_name, _ in ENUM_COLUMNS:
+        op.execute(f"ALTER TABLE IF EXISTS {table_name} DROP CONSTRAINT IF EXISTS {check_name}")
+        _retype_column(table_name, column_name, type_name)
+
+
+def downgrade() -> None:
+    for table_name, column_name, type_name, check_name, length in ENUM_COLUMNS:
+        exists, _ = _column_default(table_name, column_name)
+        _retype_column(table_name, column_name, f'varchar({length})')
+        if exists:
+            labels = ", ".join(f"'{v}'" for v in ENUM_TYPES[type_name])
+            op.create_check_constraint(check_name, table_name, f"{column_name} IN ({labels})")
+    
+    for type_name in ENUM_TYPES:
+        op.execute(f"DROP TYPE IF EXISTS {type_name}")
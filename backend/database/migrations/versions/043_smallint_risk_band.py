@@ -0,0 +1,72 @@
+"""smallint_risk_band
+
+Revision ID: 043_smallint_risk_band
+Revises: 042_feature_enums
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '043_smallint_risk_band'
+down_revision = '042_feature_enums'
+branch_labels = None
+depends_on = None
+
+
+RISK_BAND_TABLES = ['scores', 'score_history', 'wallet_profiles']
+
+# Columns ordered widest-alignment first so rows carry no padding
+LEADERBOARD_ENTRIES_VIEW = """
+    CREATE MATERIALIZED VIEW leaderboard_entries AS
+    WITH periods (category, period_start, period_end) AS (
+        VALUES
+            ('all_time', NULL::timestamptz, NULL::timestamptz),
+            ('monthly', date_trunc('month', now()), date_trunc('month', now()) + interval '1 month'),
+            ('weekly', date_trunc('week', now()), date_trunc('week', now()) + interval '1 week')
+    )
+    SELECT p.period_start,
+           p.period_end,
+           now() AS updated_at,
+           s.score,
+           (RANK() OVER (PARTITION BY p.category ORDER BY s.score DESC))::integer AS rank,
+           s.risk_band,
+           s.wallet_address,
+           p.category::varchar(20) AS category
+    FROM periods p
+    JOIN scores s ON p.period_start IS NULL OR s.last_updated >= p.period_start
+    JOIN users u ON u.wallet_address = s.wallet_address AND u.deleted_at IS NULL
+"""
+
+
+def _recreate_leaderboard_view():
+    op.execute(LEADERBOARD_ENTRIES_VIEW)
+    op.create_index(
+        'idx_leaderboard_wallet_category', 'leaderboard_entries', ['wallet_address', 'category'], unique=True
+    )
+    op.create_index(
+        'idx_leaderboard_category_rank',
+        'leaderboard_entries',
+        ['category', 'rank'],
+        postgresql_include=['wallet_address', 'score', 'risk_band', 'updated_at']
+    )
+    op.execute("ALTER MATERIALIZED VIEW leaderboard_entries SET (autovacuum_vacuum_scale_factor = 0.02)")
+
+
+def _retype_risk_band(new_type):
+    # The view depends on scores.risk_band, so it is rebuilt around the change
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS leaderboard_entries")
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table in RISK_BAND_TABLES:
+        if table in existing:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN risk_band TYPE {new_type}")
+    _recreate_leaderboard_view()
+
+
+def upgrade() -> None:
+    _retype_risk_band('smallint')
+
+
+def downgrade() -> None:
+    _retype_risk_band('integer')
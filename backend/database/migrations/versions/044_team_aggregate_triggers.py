@@ -0,0 +1,126 @@
+"""team_aggregate_triggers
+
+Revision ID: 044_team_aggregate_triggers
+Revises: 043_smallint_risk_band
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '044_team_aggregate_triggers'
+down_revision = '043_smallint_risk_band'
+branch_labels = None
+depends_on = None
+
+
+TEAM_AGGREGATE_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION team_members_aggregate_trigger() RETURNS trigger AS $$
+    DECLARE
+        member_score integer;
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            SELECT score INTO member_score FROM scores WHERE wallet_address = OLD.wallet_address;
+            UPDATE teams SET
+                member_count = member_count - 1,
+                weighted_score_sum = weighted_score_sum
+                    - COALESCE(member_score * COALESCE(OLD.contribution_score, 1.0), 0),
+                score_weight_sum = score_weight_sum
+                    - CASE WHEN member_score IS NULL THEN 0 ELSE COALESCE(OLD.contribution_score, 1.0) END
+            WHERE id = OLD.team_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            SELECT score INTO member_score FROM scores WHERE wallet_address = NEW.wallet_address;
+            UPDATE teams SET
+                member_count = member_count + 1,
+                weighted_score_sum = weighted_score_sum
+                    + COALESCE(member_score * COALESCE(NEW.contribution_score, 1.0), 0),
+                score_weight_sum = score_weight_sum
+                    + CASE WHEN member_score IS NULL THEN 0 ELSE COALESCE(NEW.contribution_score, 1.0) END
+            WHERE id = NEW.team_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION scores_team_aggregate_trigger() RETURNS trigger AS $$
+    DECLARE
+        old_score integer := CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE OLD.score END;
+        new_score integer := CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.score END;
+        wallet bytea := CASE WHEN TG_OP = 'DELETE' THEN OLD.wallet_address ELSE NEW.wallet_address END;
+    BEGIN
+        UPDATE teams t SET
+            weighted_score_sum = t.weighted_score_sum + w.delta_score,
+            score_weight_sum = t.score_weight_sum + w.delta_weight
+        FROM (
+            SELECT tm.team_id,
+                   sum((COALESCE(new_score, 0) - COALESCE(old_score, 0))
+                       * COALESCE(tm.contribution_score, 1.0)) AS delta_score,
+                   sum(CASE
+                       WHEN old_score IS NULL AND new_score IS NOT NULL THEN COALESCE(tm.contribution_score, 1.0)
+                       WHEN old_score IS NOT NULL AND new_score IS NULL THEN -COALESCE(tm.contribution_score, 1.0)
+                       ELSE 0
+                   END) AS delta_weight
+            FROM team_members tm
+            WHERE tm.wallet_address = wallet
+            GROUP BY tm.team_id
+        ) w
+        WHERE t.id = w.team_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_team_members_aggregate ON team_members",
+    """
+    CREATE TRIGGER trg_team_members_aggregate
+    AFTER INSERT OR DELETE OR UPDATE OF team_id, wallet_address, contribution_score ON team_members
+    FOR EACH ROW EXECUTE FUNCTION team_members_aggregate_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_scores_team_aggregate ON scores",
+    """
+    CREATE TRIGGER trg_scores_team_aggregate
+    AFTER INSERT OR DELETE OR UPDATE OF score ON scores
+    FOR EACH ROW EXECUTE FUNCTION scores_team_aggregate_trigger()
+    """,
+]
+
+
+def upgrade() -> None:
+    op.add_column('teams', sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('teams', sa.Column('weighted_score_sum', sa.Numeric(20, 2), server_default='0', nullable=False))
+    op.add_column('teams', sa.Column('score_weight_sum', sa.Numeric(12, 2), server_default='0', nullable=False))
+    
+    for statement in TEAM_AGGREGATE_TRIGGERS:
+        op.execute(statement)
+    
+    # Backfill
+    op.execute("""
+        UPDATE teams t SET
+            member_count = a.member_count,
+            weighted_score_sum = a.weighted_score_sum,
+            score_weight_sum = a.score_weight_sum
+        FROM (
+            SELECT tm.team_id,
+                   count(*) AS member_count,
+                   COALESCE(sum(s.score * COALESCE(tm.contribution_score, 1.0)), 0) AS weighted_score_sum,
+                   COALESCE(sum(COALESCE(tm.contribution_score, 1.0)) FILTER (WHERE s.score IS NOT NULL), 0)
+                       AS score_weight_sum
+            FROM team_members tm
+            LEFT JOIN scores s ON s.wallet_address = tm.wallet_address
+            GROUP BY tm.team_id
+        ) a
+        WHERE t.id = a.team_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_scores_team_aggregate ON scores")
+    op.execute("DROP TRIGGER IF EXISTS trg_team_members_aggregate ON team_members")
+    op.execute("DROP FUNCTION IF EXISTS scores_team_aggregate_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS team_members_aggregate_trigger()")
+    op.drop_column('teams', 'score_weight_sum')
+    op.drop_column('teams', 'weighted_score_sum')
+    op.drop_column('teams', 'member_count')
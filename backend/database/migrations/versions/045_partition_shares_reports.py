@@ -0,0 +1,149 @@
+"""partition_shares_reports
+
+Revision ID: 045_partition_shares_reports
+Revises: 044_team_aggregate_triggers
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '045_partition_shares_reports'
+down_revision = '044_team_aggregate_triggers'
+branch_labels = None
+depends_on = None
+
+# Same window as 029; database.partitions.ensure_monthly_partitions() keeps it rolling
+# (rows older than the window go to the DEFAULT partitions added in 057)
+PARTITIONS_AHEAD = 2
+
+# (table, partition key)
+PARTITIONED = [
+    ('score_shares', 'shared_at'),
+    ('credit_reports', 'generated_at'),
+]
+
+# Secondary indexes, identical before and after partitioning
+INDEXES = {
+    'score_shares': [
+        "CREATE INDEX idx_score_shares_wallet ON score_shares (wallet_address)",
+        "CREATE INDEX idx_score_shares_type ON score_shares (share_type)",
+        "CREATE INDEX idx_score_shares_shared_at ON score_shares (shared_at)",
+    ],
+    'credit_reports': [
+        "CREATE INDEX idx_credit_reports_wallet ON credit_reports (wallet_address)",
+        "CREATE INDEX idx_credit_reports_generated ON credit_reports (generated_at)",
+    ],
+}
+
+# Keys; a primary key on a partitioned table must include the partition key
+PARTITIONED_CONSTRAINTS = {
+    'score_shares': [
+        "ALTER TABLE score_shares ADD PRIMARY KEY (id, shared_at)",
+        "ALTER TABLE score_shares ADD FOREIGN KEY (wallet_address) REFERENCES users (wallet_address)",
+    ],
+    'credit_reports': [
+        "ALTER TABLE credit_reports ADD PRIMARY KEY (id, generated_at)",
+        "ALTER TABLE credit_reports ADD FOREIGN KEY (wallet_address) REFERENCES users (wallet_address)",
+    ],
+}
+
+UNPARTITIONED_CONSTRAINTS = {
+    'score_shares': [
+        "ALTER TABLE score_shares ADD PRIMARY KEY (id)",
+        "ALTER TABLE score_shares ADD FOREIGN KEY (wallet_address) REFERENCES users (wallet_address)",
+    ],
+    'credit_reports': [
+        "ALTER TABLE credit_reports ADD PRIMARY KEY (id)",
+        "ALTER TABLE credit_reports ADD FOREIGN KEY (wallet_address) REFERENCES users (wallet_address)",
+    ],
+}
+
+
+def _create_monthly_partitions(table: str, key: str) -> None:
+    """One UTC-month partition from the oldest existing row through PARTITIONS_AHEAD"""
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', COALESCE((SELECT min({key}) FROM {table}_old), now()));
+            last_month date := date_trunc('month', now()) + interval '{PARTITIONS_AHEAD} months';
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+                    to_char(month_start, 'YYYY-MM-DD') || ' 00:00:00+00',
+                    to_char(month_start + interval '1 month', 'YYYY-MM-DD') || ' 00:00:00+00'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+
+
+def _rebuild_table(table: str, partition_by: str = None) -> None:
+    """Swap a table for a (partitioned or plain) copy with the same columns and data"""
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    partition_clause = f" PARTITION BY RANGE ({partition_by})" if partition_by else ""
+    op.execute(f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS){partition_clause}")
+
+
+def _swap_in(partitioned: bool) -> None:
+    bind = op.get_bind()
+    
+    for table, _ in PARTITIONED:
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    
+    # Keep the id sequences when the old tables (their owners) are dropped
+    for table, _ in PARTITIONED:
+        sequence = bind.execute(
+            sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": f"{table}_old"}
+        ).scalar()
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    
+    for table, _ in PARTITIONED:
+        op.execute(f"DROP TABLE {table}_old")
+    
+    constraints = PARTITIONED_CONSTRAINTS if partitioned else UNPARTITIONED_CONSTRAINTS
+    for table, _ in PARTITIONED:
+        for statement in constraints[table] + INDEXES[table]:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    # Shares carry their report's partition key so the foreign key can
+    # reference (id, generated_at)
+    op.add_column('report_shares', sa.Column('report_generated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("""
+        UPDATE report_shares s SET report_generated_at = r.generated_at
+        FROM credit_reports r
+        WHERE r.id = s.report_id
+    """)
+    op.alter_column('report_shares', 'report_generated_at', nullable=False)
+    op.execute("ALTER TABLE report_shares DROP CONSTRAINT IF EXISTS report_shares_report_id_fkey")
+    
+    for table, key in PARTITIONED:
+        _rebuild_table(table, partition_by=key)
+        _create_monthly_partitions(table, key)
+    _swap_in(partitioned=True)
+    
+    op.create_foreign_key(
+        'report_shares_report_fkey', 'report_shares', 'credit_reports',
+        ['report_id', 'report_generated_at'], ['id', 'generated_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('report_shares_report_fkey', 'report_shares', type_='foreignkey')
+    
+    # Dropping a partitioned table drops its partitions
+    for table, _ in PARTITIONED:
+        _rebuild_table(table)
+    _swap_in(partitioned=False)
+    
+    op.create_foreign_key(
+        'report_shares_report_id_fkey', 'report_shares', 'credit_reports', ['report_id'], ['id']
+    )
+    op.drop_column('report_shares', 'report_generated_at')
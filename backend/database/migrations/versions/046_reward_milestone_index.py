@@ -0,0 +1,28 @@
+"""reward_milestone_index
+
+Revision ID: 046_reward_milestone_index
+Revises: 045_partition_shares_reports
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '046_reward_milestone_index'
+down_revision = '045_partition_shares_reports'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_referral_rewards_milestone',
+        'referral_rewards',
+        ['recipient_address', sa.text("(extra_metadata ->> 'milestone_score')")],
+        postgresql_where=sa.text("reward_type = 'milestone'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_referral_rewards_milestone', table_name='referral_rewards')
@@ -0,0 +1,40 @@
+"""hash_token_indexes
+
+Revision ID: 047_hash_token_indexes
+Revises: 046_reward_milestone_index
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '047_hash_token_indexes'
+down_revision = '046_reward_milestone_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Share tokens are random and only matched exactly; the exclusion
+    # constraint keeps them unique through a hash index
+    op.execute(
+        "ALTER TABLE report_shares ADD CONSTRAINT excl_report_shares_token "
+        "EXCLUDE USING hash (share_token WITH =)"
+    )
+    op.drop_index('idx_report_shares_token', table_name='report_shares')
+    
+    # Only create_all() made the inline index
+    op.execute("DROP INDEX IF EXISTS ix_referral_rewards_distribution_tx_hash")
+    op.create_index(
+        'idx_referral_rewards_distribution_tx',
+        'referral_rewards',
+        ['distribution_tx_hash'],
+        postgresql_using='hash'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_referral_rewards_distribution_tx', table_name='referral_rewards')
+    op.create_index('idx_report_shares_token', 'report_shares', ['share_token'], unique=True)
+    op.drop_constraint('excl_report_shares_token', 'report_shares', type_='exclude')
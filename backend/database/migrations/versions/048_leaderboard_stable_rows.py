@@ -0,0 +1,64 @@
+"""leaderboard_stable_rows
+
+Revision ID: 048_leaderboard_stable_rows
+Revises: 047_hash_token_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '048_leaderboard_stable_rows'
+down_revision = '047_hash_token_indexes'
+branch_labels = None
+depends_on = None
+
+
+# updated_at is the score's last update rather than the refresh time, so
+# REFRESH ... CONCURRENTLY leaves entries with an unchanged score and rank alone
+LEADERBOARD_ENTRIES_VIEW = """
+    CREATE MATERIALIZED VIEW leaderboard_entries AS
+    WITH periods (category, period_start, period_end) AS (
+        VALUES
+            ('all_time', NULL::timestamptz, NULL::timestamptz),
+            ('monthly', date_trunc('month', now()), date_trunc('month', now()) + interval '1 month'),
+            ('weekly', date_trunc('week', now()), date_trunc('week', now()) + interval '1 week')
+    )
+    SELECT p.period_start,
+           p.period_end,
+           s.last_updated AS updated_at,
+           s.score,
+           (RANK() OVER (PARTITION BY p.category ORDER BY s.score DESC))::integer AS rank,
+           s.risk_band,
+           s.wallet_address,
+           p.category::varchar(20) AS category
+    FROM periods p
+    JOIN scores s ON p.period_start IS NULL OR s.last_updated >= p.period_start
+    JOIN users u ON u.wallet_address = s.wallet_address AND u.deleted_at IS NULL
+"""
+
+
+def _recreate_leaderboard_view(view_sql):
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS leaderboard_entries")
+    op.execute(view_sql)
+    op.create_index(
+        'idx_leaderboard_wallet_category', 'leaderboard_entries', ['wallet_address', 'category'], unique=True
+    )
+    op.create_index(
+        'idx_leaderboard_category_rank',
+        'leaderboard_entries',
+        ['category', 'rank'],
+        postgresql_include=['wallet_address', 'score', 'risk_band', 'updated_at']
+    )
+    op.execute("ALTER MATERIALIZED VIEW leaderboard_entries SET (autovacuum_vacuum_scale_factor = 0.02)")
+
+
+def upgrade() -> None:
+    _recreate_leaderboard_view(LEADERBOARD_ENTRIES_VIEW)
+
+
+def downgrade() -> None:
+    _recreate_leaderboard_view(
+        LEADERBOARD_ENTRIES_VIEW.replace("s.last_updated AS updated_at", "now() AS updated_at")
+    )
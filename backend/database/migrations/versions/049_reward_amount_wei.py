@@ -0,0 +1,47 @@
+"""reward_amount_wei
+
+Revision ID: 049_reward_amount_wei
+Revises: 048_leaderboard_stable_rows
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '049_reward_amount_wei'
+down_revision = '048_leaderboard_stable_rows'
+branch_labels = None
+depends_on = None
+
+
+# NCRD is an 18-decimal ERC-20
+NCRD_WEI = 10 ** 18
+
+
+def upgrade() -> None:
+    if 'referral_rewards' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    
+    op.add_column('referral_rewards', sa.Column('amount_wei', sa.Numeric(78, 0), nullable=True))
+    op.execute(
+        f"UPDATE referral_rewards SET amount_wei = round(amount_ncrd * {NCRD_WEI})::numeric(78, 0)"
+    )
+    op.alter_column('referral_rewards', 'amount_wei', nullable=False)
+    op.drop_constraint('chk_reward_amount', 'referral_rewards', type_='check')
+    op.drop_column('referral_rewards', 'amount_ncrd')
+    op.create_check_constraint('chk_reward_amount', 'referral_rewards', 'amount_wei > 0')
+
+
+def downgrade() -> None:
+    if 'referral_rewards' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    
+    op.add_column('referral_rewards', sa.Column('amount_ncrd', sa.Numeric(20, 8), nullable=True))
+    op.execute(
+        f"UPDATE referral_rewards SET amount_ncrd = (amount_wei / {NCRD_WEI})::numeric(20, 8)"
+    )
+    op.alter_column('referral_rewards', 'amount_ncrd', nullable=False)
+    op.drop_constraint('chk_reward_amount', 'referral_rewards', type_='check')
+    op.drop_column('referral_rewards', 'amount_wei')
+    op.create_check_constraint('chk_reward_amount', 'referral_rewards', 'amount_ncrd > 0')
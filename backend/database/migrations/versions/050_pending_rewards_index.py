@@ -0,0 +1,30 @@
+"""pending_rewards_index
+
+Revision ID: 050_pending_rewards_index
+Revises: 049_reward_amount_wei
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '050_pending_rewards_index'
+down_revision = '049_reward_amount_wei'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_referral_rewards_pending',
+        'referral_rewards',
+        ['id'],
+        postgresql_where=sa.text("status = 'pending'")
+    )
+    op.drop_index('idx_referral_rewards_status', table_name='referral_rewards')
+
+
+def downgrade() -> None:
+    op.create_index('idx_referral_rewards_status', 'referral_rewards', ['status'], unique=False)
+    op.drop_index('idx_referral_rewards_pending', table_name='referral_rewards')
@@ -0,0 +1,36 @@
+"""drop_constraint_duplicate_indexes
+
+Revision ID: 051_drop_constraint_duplicate_indexes
+Revises: 050_pending_rewards_index
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '051_drop_constraint_duplicate_indexes'
+down_revision = '050_pending_rewards_index'
+branch_labels = None
+depends_on = None
+
+
+# (table, index, columns) -- each leads the unique constraint's own index
+# (uq_experiment_user, uq_team_member). ab_allocations is only created by
+# create_all(), hence IF EXISTS.
+DUPLICATE_INDEXES = [
+    ('ab_allocations', 'idx_allocation_experiment_user', ['experiment_id', 'wallet_address']),
+    ('team_members', 'idx_team_members_team', ['team_id']),
+]
+
+
+def upgrade() -> None:
+    for _, index_name, _ in DUPLICATE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, index_name, columns in DUPLICATE_INDEXES:
+        if table in existing:
+            op.create_index(index_name, table, columns, unique=False)
@@ -0,0 +1,58 @@
+"""brin_share_report_timestamps
+
+Revision ID: 052_brin_share_report_timestamps
+Revises: 051_drop_constraint_duplicate_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '052_brin_share_report_timestamps'
+down_revision = '051_drop_constraint_duplicate_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (BRIN index, table, column, btree index it replaces) -- as in 025
+BRIN_INDEXES = [
+    ('brin_score_shares_shared_at', 'score_shares', 'shared_at', 'idx_score_shares_shared_at'),
+    ('brin_credit_reports_generated', 'credit_reports', 'generated_at', 'idx_credit_reports_generated'),
+    ('brin_team_scores_calculated', 'team_scores', 'calculated_at', 'idx_team_scores_calculated'),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for index_name, table_name, column_name, replaced in BRIN_INDEXES:
+        if not inspector.has_table(table_name):
+            continue
+        op.create_index(
+            index_name,
+            table_name,
+            [column_name],
+            unique=False,
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32}
+        )
+        op.execute(f"DROP INDEX IF EXISTS {replaced}")
+    
+    # Latest-score-per-team reads ordered by calculated_at relied on the
+    # btree; BRIN cannot return rows in order
+    if inspector.has_table('team_scores'):
+        op.create_index('idx_team_scores_team_calculated', 'team_scores', ['team_id', 'calculated_at'], unique=False)
+        op.execute("DROP INDEX IF EXISTS idx_team_scores_team")
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('team_scores'):
+        op.create_index('idx_team_scores_team', 'team_scores', ['team_id'], unique=False)
+        op.drop_index('idx_team_scores_team_calculated', table_name='team_scores')
+    
+    for index_name, table_name, column_name, replaced in BRIN_INDEXES:
+        if not inspector.has_table(table_name):
+            continue
+        op.create_index(replaced, table_name, [column_name], unique=False)
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,40 @@
+"""bigint_cached_ids
+
+Revision ID: 053_bigint_cached_ids
+Revises: 052_brin_share_report_timestamps
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '053_bigint_cached_ids'
+down_revision = '052_brin_share_report_timestamps'
+branch_labels = None
+depends_on = None
+
+
+# (table, id sequence) -- the serial sequences, kept through 045's rebuild
+BIGINT_ID_TABLES = [
+    ('score_shares', 'score_shares_id_seq'),
+    ('referral_rewards', 'referral_rewards_id_seq'),
+]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, sequence in BIGINT_ID_TABLES:
+        if table not in existing:
+            continue
+        op.execute(f"ALTER SEQUENCE {sequence} AS bigint CACHE 100")
+        op.alter_column(table, 'id', type_=sa.BigInteger(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, sequence in BIGINT_ID_TABLES:
+        if table not in existing:
+            continue
+        op.alter_column(table, 'id', type_=sa.Integer(), existing_nullable=False)
+        op.execute(f"ALTER SEQUENCE {sequence} AS integer CACHE 1")
@@ -0,0 +1,40 @@
+"""user_data_unique_key
+
+Revision ID: 054_user_data_unique_key
+Revises: 053_bigint_cached_ids
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '054_user_data_unique_key'
+down_revision = '053_bigint_cached_ids'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if 'user_data' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    
+    # Keep the newest entry per (wallet, key) before enforcing uniqueness
+    op.execute("""
+        DELETE FROM user_data d
+        USING user_data newer
+        WHERE newer.wallet_address = d.wallet_address
+          AND newer.data_key = d.data_key
+          AND newer.id > d.id
+    """)
+    op.create_unique_constraint('uq_user_data_wallet_key', 'user_data', ['wallet_address', 'data_key'])
+    # Leading column of the unique constraint
+    op.execute("DROP INDEX IF EXISTS idx_user_data_wallet")
+
+
+def downgrade() -> None:
+    if 'user_data' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    
+    op.create_index('idx_user_data_wallet', 'user_data', ['wallet_address'], unique=False)
+    op.drop_constraint('uq_user_data_wallet_key', 'user_data', type_='unique')
@@ -0,0 +1,49 @@
+"""wallet_ordered_indexes
+
+Revision ID: 055_wallet_ordered_indexes
+Revises: 054_user_data_unique_key
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '055_wallet_ordered_indexes'
+down_revision = '054_user_data_unique_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # get_loans_by_user: WHERE wallet_address = ? ORDER BY created_at DESC
+    op.create_index(
+        'idx_loans_wallet_created_covering',
+        'loans',
+        ['wallet_address', 'created_at'],
+        unique=False,
+        postgresql_include=['status', 'amount', 'due_date']
+    )
+    op.drop_index('idx_loans_wallet_covering', table_name='loans')
+    
+    # get_transactions_by_user: WHERE wallet_address = ? ORDER BY block_timestamp
+    # DESC LIMIT n; idx_tx_wallet_chain_covering has chain_id in between
+    op.create_index(
+        'idx_tx_wallet_block_ts',
+        'transactions',
+        ['wallet_address', 'block_timestamp'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tx_wallet_block_ts', table_name='transactions')
+    
+    op.create_index(
+        'idx_loans_wallet_covering',
+        'loans',
+        ['wallet_address'],
+        unique=False,
+        postgresql_include=['status', 'amount', 'due_date']
+    )
+    op.drop_index('idx_loans_wallet_created_covering', table_name='loans')
@@ -0,0 +1,44 @@
+"""api_key_hash_bytea
+
+Revision ID: 056_api_key_hash_bytea
+Revises: 055_wallet_ordered_indexes
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '056_api_key_hash_bytea'
+down_revision = '055_wallet_ordered_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('idx_api_access_key', table_name='api_access')
+    
+    # Stored hashes are sha256 hexdigests; keep the 32 raw bytes
+    op.execute(
+        "ALTER TABLE api_access ALTER COLUMN api_key TYPE BYTEA "
+        "USING decode(api_key, 'hex')"
+    )
+    op.create_check_constraint(
+        'chk_api_key_hash_format', 'api_access', "octet_length(api_key) = 32"
+    )
+    
+    # Keys are only matched exactly; stay unique through a hash index
+    op.execute(
+        "ALTER TABLE api_access ADD CONSTRAINT excl_api_access_key "
+        "EXCLUDE USING hash (api_key WITH =)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('excl_api_access_key', 'api_access', type_='exclude')
+    op.drop_constraint('chk_api_key_hash_format', 'api_access', type_='check')
+    op.execute(
+        "ALTER TABLE api_access ALTER COLUMN api_key TYPE VARCHAR(100) "
+        "USING encode(api_key, 'hex')"
+    )
+    op.create_index('idx_api_access_key', 'api_access', ['api_key'], unique=True)
@@ -0,0 +1,78 @@
+"""default_partitions
+
+Revision ID: 057_default_partitions
+Revises: 056_api_key_hash_bytea
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+import re
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '057_default_partitions'
+down_revision = '056_api_key_hash_bytea'
+branch_labels = None
+depends_on = None
+
+# Partitioned tables (029, 045) in parent-before-child order, with their
+# partition keys. Rows dated before the first monthly partition (transactions
+# indexed from block 0, backdated history and reports) land in
+# <table>_default instead of failing the whole insert. A CHECK bounds each
+# DEFAULT partition below that first month: rows past the monthly window
+# still fail, and attaching a new monthly partition skips scanning it.
+PARTITIONED = [
+    ('transactions', 'block_timestamp'),
+    ('transaction_inputs', 'block_timestamp'),
+    ('token_transfers', 'block_timestamp'),
+    ('score_history', 'computed_at'),
+    ('score_shares', 'shared_at'),
+    ('credit_reports', 'generated_at'),
+]
+
+_PARTITION_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def _first_month(bind, table: str) -> datetime:
+    names = bind.execute(sa.text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :table
+    """), {"table": table}).scalars()
+    months = [
+        datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+        for match in (_PARTITION_NAME.search(name) for name in names)
+        if match
+    ]
+    now = datetime.now(timezone.utc)
+    return min(months, default=datetime(now.year, now.month, 1, tzinfo=timezone.utc))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, key in PARTITIONED:
+        first_month = _first_month(bind, table)
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} "
+            f"(CONSTRAINT {table}_default_before_window "
+            f"CHECK ({key} < '{first_month.isoformat()}')) DEFAULT"
+        )
+
+
+def downgrade() -> None:
+    # Rows in a DEFAULT partition have no monthly partition to go back to
+    for table, _ in reversed(PARTITIONED):
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM {table}_default) THEN
+                    RAISE EXCEPTION '{table}_default still holds rows; create monthly partitions for them first';
+                END IF;
+            END $$
+        """)
+        op.execute(f"ALTER TABLE {table} DETACH PARTITION {table}_default")
+        op.execute(f"DROP TABLE {table}_default")
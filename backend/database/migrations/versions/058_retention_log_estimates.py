@@ -0,0 +1,28 @@
+"""retention_log_estimates
+
+Revision ID: 058_retention_log_estimates
+Revises: 057_default_partitions
+Create Date: 2026-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '058_retention_log_estimates'
+down_revision = '057_default_partitions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Dropped partitions are counted from reltuples; keep those estimates
+    # apart from records_deleted, which is exact
+    op.add_column(
+        'data_retention_log',
+        sa.Column('estimated_rows_dropped', sa.Integer(), nullable=False, server_default=sa.text('0'))
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('data_retention_log', 'estimated_rows_dropped')
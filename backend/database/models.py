@@ -2,27 +2,61 @@
 Database models for NeuroCred
 """
 from sqlalchemy import (
-    Column, Integer, String, Numeric, DateTime, Boolean, Text, JSON,
-    ForeignKey, Index, CheckConstraint, UniqueConstraint, func
+    Column, BigInteger, Integer, SmallInteger, String, Numeric, DateTime, Boolean, Text,
+    ForeignKey, ForeignKeyConstraint, Index, CheckConstraint, Sequence, UniqueConstraint,
+    func, text
 )
+from sqlalchemy.dialects.postgresql import ENUM, JSONB, ExcludeConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from .types import EthAddress, KeyHash, TokenAmount, TxHash
 from datetime import datetime
 from decimal import Decimal
+from enum import IntFlag
 
 Base = declarative_base()
 
+# PostgreSQL native enum types (4-byte values instead of text + CHECK)
+BatchStatus = ENUM('pending', 'processing', 'completed', 'failed', name='batch_status')
+LoanStatus = ENUM('pending', 'active', 'repaid', 'defaulted', 'liquidated', name='loan_status')
+PaymentType = ENUM('principal', 'interest', 'both', name='payment_type')
+TxStatus = ENUM('pending', 'success', 'failed', name='tx_status')
+GDPRRequestType = ENUM('deletion', 'export', 'access', name='gdpr_request_type')
+GDPRStatus = ENUM('pending', 'processing', 'completed', 'failed', name='gdpr_status')
+RetentionStatus = ENUM('success', 'failed', 'partial', name='retention_status')
+ExperimentStatus = ENUM('draft', 'active', 'paused', 'completed', name='experiment_status')
+OfferStatus = ENUM('active', 'filled', 'cancelled', 'expired', name='offer_status')
+RequestType = ENUM('standard', 'auction', name='loan_request_type')
+RequestStatus = ENUM('open', 'bidding', 'accepted', 'expired', 'cancelled', name='loan_request_status')
+RebalanceType = ENUM('auto', 'manual', name='rebalance_type')
+StrategyType = ENUM('staking', 'yield_farming', 'auto_compound', name='strategy_type')
+NegotiationStatus = ENUM('active', 'completed', 'cancelled', 'expired', name='negotiation_status')
+AlertSeverity = ENUM('info', 'warning', 'critical', name='alert_severity')
+ShareType = ENUM('twitter', 'linkedin', 'facebook', 'custom', name='share_type')
+BadgeStyle = ENUM('minimal', 'detailed', 'verified', name='badge_style')
+RewardType = ENUM('referrer', 'referred', 'milestone', name='reward_type')
+RewardStatus = ENUM('pending', 'distributed', 'failed', name='reward_status')
+TeamType = ENUM('dao', 'organization', 'custom', name='team_type')
+TeamRole = ENUM('admin', 'member', name='team_role')
+ReportType = ENUM('full', 'summary', 'custom', name='report_type')
+ReportFormat = ENUM('pdf', 'json', 'csv', name='report_format')
+
+# BIGINT id sequences for insert-heavy tables; each session reserves 100
+# values at a time instead of calling nextval() on the shared sequence per row
+ScoreShareIdSeq = Sequence('score_shares_id_seq', cache=100)
+ReferralRewardIdSeq = Sequence('referral_rewards_id_seq', cache=100)
+
 
 class User(Base):
     """User model for wallet addresses"""
     __tablename__ = "users"
     
-    wallet_address = Column(String(42), primary_key=True)
+    wallet_address = Column(EthAddress, primary_key=True)
     email = Column(String(255), nullable=True)
-    preferences = Column(JSON, nullable=True)
-    gdpr_consent = Column(Boolean, default=False, nullable=False)
+    preferences = Column(JSONB, nullable=True)
+    gdpr_consent = Column(Boolean, server_default=text('false'), nullable=False)
     consent_date = Column(DateTime(timezone=True), nullable=True)
-    data_deletion_requested = Column(Boolean, default=False, nullable=False)
+    data_deletion_requested = Column(Boolean, server_default=text('false'), nullable=False)
     deletion_requested_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -35,8 +69,8 @@ class User(Base):
     gdpr_requests = relationship("GDPRRequest", back_populates="user")
     
     __table_args__ = (
-        CheckConstraint("wallet_address ~ '^0x[a-fA-F0-9]{40}$'", name="chk_wallet_format"),
-        Index('ix_users_wallet_address', 'wallet_address', unique=True),
+        # Other wallet columns reference this one, so the width is checked once here
+        CheckConstraint("octet_length(wallet_address) = 20", name="chk_wallet_format"),
     )
 
 
@@ -44,9 +78,9 @@ class Score(Base):
     """Score model for credit scores"""
     __tablename__ = "scores"
     
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), primary_key=True)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), primary_key=True)
     score = Column(Integer, nullable=False)
-    risk_band = Column(Integer, nullable=False)
+    risk_band = Column(SmallInteger, nullable=False)
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     computed_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -60,26 +94,45 @@ class Score(Base):
     )
 
 
+class WalletProfile(Base):
+    """
+    Denormalized per-wallet summary (score, open loans, unread alerts).
+    
+    Maintained by PostgreSQL triggers on scores, loans and alerts (see
+    database/triggers.py) so dashboard reads are a single primary-key lookup.
+    """
+    __tablename__ = "wallet_profiles"
+    
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address", ondelete="CASCADE"), primary_key=True)
+    score = Column(Integer, nullable=True)
+    risk_band = Column(SmallInteger, nullable=True)
+    active_loan_count = Column(Integer, nullable=False, server_default=text('0'))
+    total_borrowed = Column(Numeric(20, 8), nullable=False, server_default=text('0'))
+    unread_alert_count = Column(Integer, nullable=False, server_default=text('0'))
+    last_score_change_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class ScoreHistory(Base):
     """Score history model for tracking score changes"""
     __tablename__ = "score_history"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("scores.wallet_address"), nullable=False)
+    wallet_address = Column(EthAddress, ForeignKey("scores.wallet_address"), nullable=False)
     score = Column(Integer, nullable=False)
-    risk_band = Column(Integer, nullable=False)
+    risk_band = Column(SmallInteger, nullable=False)
     previous_score = Column(Integer, nullable=True)  # Previous score before this change
     explanation = Column(Text, nullable=True)  # Human-readable explanation of score change
     change_reason = Column(String(50), nullable=True)  # Reason for change: "loan_repayment", "staking_boost", "oracle_penalty", etc.
-    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+    computed_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())  # Partition key (monthly)
     
     # Relationships
     score_rel = relationship("Score", back_populates="history")
     
     __table_args__ = (
-        Index('idx_score_history_wallet', 'wallet_address'),
-        Index('idx_score_history_computed', 'computed_at'),
+        Index('brin_score_history_computed', 'computed_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
         Index('idx_score_history_wallet_computed', 'wallet_address', 'computed_at'),  # Composite index for efficient queries
+        {'postgresql_partition_by': 'RANGE (computed_at)'},
     )
 
 
@@ -88,14 +141,15 @@ class UserData(Base):
     __tablename__ = "user_data"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
     data_key = Column(String(100), nullable=False)
     data_value = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     __table_args__ = (
-        Index('idx_user_data_wallet', 'wallet_address'),
+        # One value per wallet and key (upsert target); also serves wallet lookups
+        UniqueConstraint('wallet_address', 'data_key', name='uq_user_data_wallet_key'),
         Index('idx_user_data_key', 'data_key'),
     )
 
@@ -106,16 +160,15 @@ class BatchUpdate(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     batch_id = Column(String(100), nullable=False, unique=True)
-    status = Column(String(20), nullable=False)  # pending, processing, completed, failed
+    status = Column(BatchStatus, nullable=False)  # pending, processing, completed, failed
     total_count = Column(Integer, nullable=False)
-    processed_count = Column(Integer, default=0)
-    failed_count = Column(Integer, default=0)
+    processed_count = Column(Integer, server_default=text('0'))
+    failed_count = Column(Integer, server_default=text('0'))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
     __table_args__ = (
-        CheckConstraint("status IN ('pending', 'processing', 'completed', 'failed')", name="chk_batch_status"),
-        Index('idx_batch_id', 'batch_id'),
+        Index('idx_batch_pending', 'created_at', postgresql_where=text("status IN ('pending', 'processing')")),
     )
 
 
@@ -124,18 +177,21 @@ class Loan(Base):
     __tablename__ = "loans"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
     loan_id = Column(Integer, nullable=False)  # On-chain loan ID
     amount = Column(Numeric(20, 8), nullable=False)
     interest_rate = Column(Numeric(5, 2), nullable=False)
     term_days = Column(Integer, nullable=False)
-    status = Column(String(20), nullable=False, index=True)  # pending, active, repaid, defaulted, liquidated
+    status = Column(LoanStatus, nullable=False)  # pending, active, repaid, defaulted, liquidated
     collateral_amount = Column(Numeric(20, 8), nullable=True)
-    collateral_token = Column(String(42), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    collateral_token = Column(EthAddress, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     due_date = Column(DateTime(timezone=True), nullable=True)
     repaid_at = Column(DateTime(timezone=True), nullable=True)
-    tx_hash = Column(String(66), nullable=True)
+    tx_hash = Column(TxHash, nullable=True)
+    # Maintained by triggers on loan_payments (see migration 017)
+    payments_count = Column(Integer, server_default=text('0'), nullable=False)
+    total_repaid = Column(Numeric(20, 8), server_default=text('0'))
     
     # Relationships
     user = relationship("User", back_populates="loans")
@@ -145,9 +201,12 @@ class Loan(Base):
         CheckConstraint("amount > 0", name="chk_loan_amount"),
         CheckConstraint("interest_rate >= 0 AND interest_rate <= 100", name="chk_interest_rate"),
         CheckConstraint("term_days > 0", name="chk_term_days"),
-        CheckConstraint("status IN ('pending', 'active', 'repaid', 'defaulted', 'liquidated')", name="chk_loan_status"),
-        Index('idx_loans_wallet', 'wallet_address'),
-        Index('idx_loans_status', 'status'),
+        # Wallet loan list, newest first, read in index order
+        Index(
+            'idx_loans_wallet_created_covering', 'wallet_address', 'created_at',
+            postgresql_include=['status', 'amount', 'due_date']
+        ),
+        Index('idx_loans_active', 'wallet_address', 'created_at', postgresql_where=text("status = 'active'")),
         Index('idx_loans_created', 'created_at'),
     )
 
@@ -157,10 +216,10 @@ class LoanPayment(Base):
     __tablename__ = "loan_payments"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False, index=True)
+    loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False)
     amount = Column(Numeric(20, 8), nullable=False)
-    payment_type = Column(String(20), nullable=False)  # principal, interest, both
-    tx_hash = Column(String(66), nullable=True)
+    payment_type = Column(PaymentType, nullable=False)  # principal, interest, both
+    tx_hash = Column(TxHash, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -168,7 +227,6 @@ class LoanPayment(Base):
     
     __table_args__ = (
         CheckConstraint("amount > 0", name="chk_payment_amount"),
-        CheckConstraint("payment_type IN ('principal', 'interest', 'both')", name="chk_payment_type"),
         Index('idx_payments_loan', 'loan_id'),
     )
 
@@ -178,38 +236,65 @@ class Transaction(Base):
     __tablename__ = "transactions"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    tx_hash = Column(String(66), nullable=False, unique=True, index=True)
-    tx_type = Column(String(50), nullable=False, index=True)  # native_send, native_receive, erc20_transfer, contract_call, etc.
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    tx_hash = Column(TxHash, nullable=False)  # Unique with block_timestamp (uq_transactions_tx_hash)
+    tx_type = Column(String(50), nullable=False)  # native_send, native_receive, erc20_transfer, contract_call, etc.
     chain_id = Column(Integer, nullable=False, index=True)  # Chain ID (set from network config)
     chain_name = Column(String(50), nullable=True)  # Human-readable chain name (e.g., "QIE Testnet")
     block_number = Column(Integer, nullable=True, index=True)
-    block_timestamp = Column(DateTime(timezone=True), nullable=True, index=True)
-    from_address = Column(String(42), nullable=True, index=True)
-    to_address = Column(String(42), nullable=True, index=True)
-    value = Column(Numeric(20, 8), nullable=True)
+    block_timestamp = Column(DateTime(timezone=True), primary_key=True)  # Partition key (monthly)
+    from_address = Column(EthAddress, nullable=True, index=True)
+    to_address = Column(EthAddress, nullable=True, index=True)
+    value = Column(TokenAmount, nullable=True)  # wei
     gas_used = Column(Integer, nullable=True)
     gas_price = Column(Integer, nullable=True)
-    status = Column(String(20), nullable=True)  # pending, success, failed
-    # Enhanced fields for transaction indexing
-    input_data = Column(Text, nullable=True)  # Transaction input data (truncated)
-    contract_address = Column(String(42), nullable=True, index=True)  # Contract interacted with
+    status = Column(TxStatus, nullable=True)  # pending, success, failed
+    # Enhanced fields for transaction indexing (input data lives in transaction_inputs)
+    contract_address = Column(EthAddress, nullable=True, index=True)  # Contract interacted with
     method_id = Column(String(10), nullable=True)  # First 4 bytes of method signature
-    token_transfers_count = Column(Integer, default=0)  # Number of token transfers in this tx
-    tx_metadata = Column(JSON, nullable=True)  # Additional metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    token_transfers_count = Column(Integer, server_default=text('0'))  # Number of token transfers in this tx (trigger-maintained)
+    tx_metadata = Column(JSONB, nullable=True)  # Additional metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="transactions")
     token_transfers = relationship("TokenTransfer", back_populates="transaction")
+    input = relationship("TransactionInput", uselist=False, lazy="raise", back_populates="transaction")
     
     __table_args__ = (
-        CheckConstraint("status IN ('pending', 'success', 'failed') OR status IS NULL", name="chk_tx_status"),
-        Index('idx_transactions_wallet', 'wallet_address'),
-        Index('idx_transactions_hash', 'tx_hash', unique=True),
         Index('idx_transactions_type', 'tx_type'),
-        Index('idx_transactions_timestamp', 'block_timestamp'),
-        Index('idx_transactions_wallet_chain', 'wallet_address', 'chain_id'),  # Multi-chain queries
+        Index('brin_transactions_block_ts', 'block_timestamp', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        Index('brin_transactions_created', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        Index(
+            'idx_tx_wallet_chain_covering', 'wallet_address', 'chain_id', 'block_timestamp',
+            postgresql_include=['tx_hash', 'tx_type', 'value', 'status']
+        ),  # Multi-chain wallet feed, index-only
+        # Wallet history across chains, newest first (ORDER BY ... LIMIT without a sort)
+        Index('idx_tx_wallet_block_ts', 'wallet_address', 'block_timestamp'),
+        # Unique keys on a partitioned table must include the partition key
+        UniqueConstraint('tx_hash', 'block_timestamp', name='uq_transactions_tx_hash'),
+        {'postgresql_partition_by': 'RANGE (block_timestamp)'},
+    )
+
+
+class TransactionInput(Base):
+    """Transaction input data, kept out of the transactions heap"""
+    __tablename__ = "transaction_inputs"
+    
+    tx_id = Column(Integer, primary_key=True)
+    block_timestamp = Column(DateTime(timezone=True), primary_key=True)  # Partition key, copied from the transaction
+    data = Column(Text, nullable=True)  # Transaction input data (truncated)
+    
+    # Relationships
+    transaction = relationship("Transaction", back_populates="input")
+    
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['tx_id', 'block_timestamp'],
+            ['transactions.id', 'transactions.block_timestamp'],
+            ondelete='CASCADE'
+        ),
+        {'postgresql_partition_by': 'RANGE (block_timestamp)'},
     )
 
 
@@ -218,16 +303,16 @@ class TokenTransfer(Base):
     __tablename__ = "token_transfers"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    tx_hash = Column(String(66), ForeignKey("transactions.tx_hash"), nullable=False, index=True)
-    chain_id = Column(Integer, nullable=False, index=True)  # Chain ID (set from network config)
-    token_address = Column(String(42), nullable=False, index=True)
+    tx_hash = Column(TxHash, nullable=False)
+    chain_id = Column(Integer, nullable=False)  # Chain ID (set from network config)
+    token_address = Column(EthAddress, nullable=False)
     token_type = Column(String(20), nullable=False)  # ERC20, ERC721
-    from_address = Column(String(42), nullable=True, index=True)
-    to_address = Column(String(42), nullable=True, index=True)
-    amount = Column(Numeric(36, 0), nullable=True)  # For ERC20 (can be very large)
-    token_id = Column(Numeric(36, 0), nullable=True)  # For ERC721
-    block_number = Column(Integer, nullable=True, index=True)
-    block_timestamp = Column(DateTime(timezone=True), nullable=True, index=True)
+    from_address = Column(EthAddress, nullable=True)
+    to_address = Column(EthAddress, nullable=True)
+    amount = Column(TokenAmount, nullable=True)  # For ERC20, in base units
+    token_id = Column(TokenAmount, nullable=True)  # For ERC721
+    block_number = Column(Integer, nullable=True)
+    block_timestamp = Column(DateTime(timezone=True), primary_key=True)  # Partition key, copied from the transaction
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -237,19 +322,82 @@ class TokenTransfer(Base):
         Index('idx_token_transfers_token', 'token_address'),
         Index('idx_token_transfers_from', 'from_address'),
         Index('idx_token_transfers_to', 'to_address'),
-        Index('idx_token_transfers_block', 'block_number'),
+        Index('brin_token_transfers_block', 'block_number', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        Index('brin_token_transfers_block_ts', 'block_timestamp', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
         Index('idx_token_transfers_chain', 'chain_id'),
+        ForeignKeyConstraint(
+            ['tx_hash', 'block_timestamp'],
+            ['transactions.tx_hash', 'transactions.block_timestamp']
+        ),
+        # Replay dedup target for ON CONFLICT; token_id is NULL for ERC-20
+        UniqueConstraint(
+            'tx_hash', 'from_address', 'to_address', 'token_address', 'token_id', 'block_timestamp',
+            name='uq_transfer_dedup',
+            postgresql_nulls_not_distinct=True
+        ),
+        {'postgresql_partition_by': 'RANGE (block_timestamp)'},
     )
 
 
+class TransactionStaging(Base):
+    """
+    UNLOGGED intake table for the indexer.
+    
+    Rows are moved into transactions/token_transfers by
+    database.staging.flush_staging(); contents are lost on crash, which is
+    acceptable because they can be re-derived from chain.
+    """
+    __tablename__ = "transactions_staging"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    wallet_address = Column(EthAddress, nullable=False)
+    tx_hash = Column(TxHash, nullable=False)
+    tx_type = Column(String(50), nullable=False)
+    chain_id = Column(Integer, nullable=False, server_default=text('1983'))
+    chain_name = Column(String(50), nullable=True)
+    block_number = Column(Integer, nullable=True)
+    block_timestamp = Column(DateTime(timezone=True), nullable=True)
+    from_address = Column(EthAddress, nullable=True)
+    to_address = Column(EthAddress, nullable=True)
+    value = Column(TokenAmount, nullable=True)  # wei
+    gas_used = Column(Integer, nullable=True)
+    gas_price = Column(Integer, nullable=True)
+    status = Column(TxStatus, nullable=True)
+    input_data = Column(Text, nullable=True)  # Moved to transaction_inputs on flush
+    contract_address = Column(EthAddress, nullable=True)
+    method_id = Column(String(10), nullable=True)
+    tx_metadata = Column(JSONB, nullable=True)
+    
+    __table_args__ = {'prefixes': ['UNLOGGED']}
+
+
+class TokenTransferStaging(Base):
+    """UNLOGGED intake table for token transfers (see TransactionStaging)"""
+    __tablename__ = "token_transfers_staging"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tx_hash = Column(TxHash, nullable=False)
+    chain_id = Column(Integer, nullable=False, server_default=text('1983'))
+    token_address = Column(EthAddress, nullable=False)
+    token_type = Column(String(20), nullable=False)
+    from_address = Column(EthAddress, nullable=True)
+    to_address = Column(EthAddress, nullable=True)
+    amount = Column(TokenAmount, nullable=True)
+    token_id = Column(TokenAmount, nullable=True)
+    block_number = Column(Integer, nullable=True)
+    block_timestamp = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = {'prefixes': ['UNLOGGED']}
+
+
 class GDPRRequest(Base):
     """GDPR request model for tracking data access/deletion requests"""
     __tablename__ = "gdpr_requests"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    request_type = Column(String(20), nullable=False)  # deletion, export, access
-    status = Column(String(20), nullable=False)  # pending, processing, completed, failed
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    request_type = Column(GDPRRequestType, nullable=False)  # deletion, export, access
+    status = Column(GDPRStatus, nullable=False)  # pending, processing, completed, failed
     requested_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     export_file_path = Column(Text, nullable=True)
@@ -259,10 +407,8 @@ class GDPRRequest(Base):
     user = relationship("User", back_populates="gdpr_requests")
     
     __table_args__ = (
-        CheckConstraint("request_type IN ('deletion', 'export', 'access')", name="chk_gdpr_request_type"),
-        CheckConstraint("status IN ('pending', 'processing', 'completed', 'failed')", name="chk_gdpr_status"),
         Index('idx_gdpr_wallet', 'wallet_address'),
-        Index('idx_gdpr_status', 'status'),
+        Index('idx_gdpr_pending', 'requested_at', postgresql_where=text("status = 'pending'")),
     )
 
 
@@ -271,17 +417,17 @@ class DataRetentionLog(Base):
     __tablename__ = "data_retention_log"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    table_name = Column(String(100), nullable=False, index=True)
-    records_deleted = Column(Integer, nullable=False)
-    archived_count = Column(Integer, nullable=False, server_default='0')
+    table_name = Column(String(100), nullable=False)
+    records_deleted = Column(Integer, nullable=False)  # Exact, rows deleted one by one
+    estimated_rows_dropped = Column(Integer, nullable=False, server_default=text('0'))  # Planner estimate for dropped partitions
+    archived_count = Column(Integer, nullable=False, server_default=text('0'))
     retention_period_days = Column(Integer, nullable=False)
-    executed_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    status = Column(String(20), nullable=True)  # success, failed, partial
+    executed_at = Column(DateTime(timezone=True), server_default=func.now())
+    status = Column(RetentionStatus, nullable=True)  # success, failed, partial
     
     __table_args__ = (
-        CheckConstraint("status IN ('success', 'failed', 'partial') OR status IS NULL", name="chk_retention_status"),
         Index('idx_retention_table', 'table_name'),
-        Index('idx_retention_executed', 'executed_at'),
+        Index('brin_retention_executed', 'executed_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
     )
 
 
@@ -290,12 +436,12 @@ class ABExperiment(Base):
     __tablename__ = "ab_experiments"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    experiment_name = Column(String(100), nullable=False, unique=True, index=True)
+    experiment_name = Column(String(100), nullable=False, unique=True)
     description = Column(Text, nullable=True)
     variant_a_name = Column(String(50), nullable=False)  # e.g., "rule_based"
     variant_b_name = Column(String(50), nullable=False)  # e.g., "ml_model_v1"
     allocation_ratio = Column(Numeric(3, 2), nullable=False, default=0.5)  # 0.5 = 50/50 split
-    status = Column(String(20), nullable=False, default="draft")  # draft, active, paused, completed
+    status = Column(ExperimentStatus, nullable=False, default="draft")  # draft, active, paused, completed
     start_date = Column(DateTime(timezone=True), nullable=True)
     end_date = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -307,7 +453,6 @@ class ABExperiment(Base):
     
     __table_args__ = (
         CheckConstraint("allocation_ratio >= 0 AND allocation_ratio <= 1", name="chk_allocation_ratio"),
-        CheckConstraint("status IN ('draft', 'active', 'paused', 'completed')", name="chk_experiment_status"),
         Index('idx_experiment_status', 'status'),
     )
 
@@ -317,8 +462,8 @@ class ABAllocation(Base):
     __tablename__ = "ab_allocations"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    experiment_id = Column(Integer, ForeignKey("ab_experiments.id"), nullable=False, index=True)
-    wallet_address = Column(String(42), nullable=False, index=True)
+    experiment_id = Column(Integer, ForeignKey("ab_experiments.id"), nullable=False)
+    wallet_address = Column(EthAddress, nullable=False, index=True)
     variant = Column(String(50), nullable=False)  # "A" or "B"
     allocated_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -326,8 +471,8 @@ class ABAllocation(Base):
     experiment = relationship("ABExperiment", back_populates="allocations")
     
     __table_args__ = (
+        # Also serves experiment_id lookups
         UniqueConstraint('experiment_id', 'wallet_address', name='uq_experiment_user'),
-        Index('idx_allocation_experiment_user', 'experiment_id', 'wallet_address'),
     )
 
 
@@ -336,20 +481,20 @@ class ABMetric(Base):
     __tablename__ = "ab_metrics"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    experiment_id = Column(Integer, ForeignKey("ab_experiments.id"), nullable=False, index=True)
-    wallet_address = Column(String(42), nullable=True, index=True)
+    experiment_id = Column(Integer, ForeignKey("ab_experiments.id"), nullable=False)
+    wallet_address = Column(EthAddress, nullable=True, index=True)
     variant = Column(String(50), nullable=False)  # "A" or "B"
     metric_name = Column(String(50), nullable=False)  # e.g., "default_rate", "score_distribution"
     metric_value = Column(Numeric(20, 8), nullable=True)
-    metric_data = Column(JSON, nullable=True)  # Additional metric data
-    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    metric_data = Column(JSONB, nullable=True)  # Additional metric data
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     experiment = relationship("ABExperiment", back_populates="metrics")
     
     __table_args__ = (
         Index('idx_metric_experiment_variant', 'experiment_id', 'variant'),
-        Index('idx_metric_recorded', 'recorded_at'),
+        Index('brin_metric_recorded', 'recorded_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
     )
 
 
@@ -358,19 +503,19 @@ class LoanOffer(Base):
     __tablename__ = "loan_offers"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    lender_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    borrower_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=True, index=True)
+    lender_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    borrower_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=True, index=True)
     amount_min = Column(Numeric(20, 8), nullable=False)
     amount_max = Column(Numeric(20, 8), nullable=False)
     interest_rate = Column(Numeric(5, 2), nullable=False)  # APR percentage
     term_days_min = Column(Integer, nullable=False)
     term_days_max = Column(Integer, nullable=False)
     collateral_required = Column(Boolean, default=False, nullable=False)
-    accepted_collateral_tokens = Column(JSON, nullable=True)  # Array of token addresses
+    accepted_collateral_tokens = Column(JSONB, nullable=True)  # Array of token addresses
     ltv_ratio = Column(Numeric(5, 2), nullable=True)  # Loan-to-value ratio
-    status = Column(String(20), nullable=False, default='active', index=True)
+    status = Column(OfferStatus, nullable=False, default='active')
     expires_at = Column(DateTime(timezone=True), nullable=True)
-    extra_metadata = Column(JSON, nullable=True)  # Additional terms (renamed from 'metadata' - reserved word)
+    extra_metadata = Column(JSONB, nullable=True)  # Additional terms (renamed from 'metadata' - reserved word)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -382,10 +527,13 @@ class LoanOffer(Base):
         CheckConstraint("amount_min > 0 AND amount_max >= amount_min", name="chk_offer_amount_range"),
         CheckConstraint("interest_rate >= 0 AND interest_rate <= 100", name="chk_offer_interest_rate"),
         CheckConstraint("term_days_min > 0 AND term_days_max >= term_days_min", name="chk_offer_term_range"),
-        CheckConstraint("status IN ('active', 'filled', 'cancelled', 'expired')", name="chk_offer_status"),
         Index('idx_loan_offers_lender', 'lender_address'),
-        Index('idx_loan_offers_status', 'status'),
+        Index('idx_offers_open', 'interest_rate', postgresql_where=text("status = 'active'")),  # Browse order
         Index('idx_loan_offers_expires', 'expires_at'),
+        Index(
+            'idx_loan_offers_collateral_tokens', 'accepted_collateral_tokens',
+            postgresql_using='gin', postgresql_ops={'accepted_collateral_tokens': 'jsonb_path_ops'}
+        ),  # Containment (@>) lookups by token
     )
 
 
@@ -394,15 +542,15 @@ class LoanRequest(Base):
     __tablename__ = "loan_requests"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    borrower_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
+    borrower_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
     amount = Column(Numeric(20, 8), nullable=False)
     max_interest_rate = Column(Numeric(5, 2), nullable=False)  # Maximum acceptable APR
     term_days = Column(Integer, nullable=False)
     collateral_amount = Column(Numeric(20, 8), nullable=True)
-    collateral_tokens = Column(JSON, nullable=True)  # Array of available collateral tokens
-    request_type = Column(String(20), nullable=False, default='standard')  # 'standard' or 'auction'
+    collateral_tokens = Column(JSONB, nullable=True)  # Array of available collateral tokens
+    request_type = Column(RequestType, nullable=False, default='standard')  # 'standard' or 'auction'
     auction_end_time = Column(DateTime(timezone=True), nullable=True)
-    status = Column(String(20), nullable=False, default='open', index=True)
+    status = Column(RequestStatus, nullable=False, default='open')
     winning_offer_id = Column(Integer, ForeignKey("loan_offers.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -415,11 +563,13 @@ class LoanRequest(Base):
         CheckConstraint("amount > 0", name="chk_request_amount"),
         CheckConstraint("max_interest_rate >= 0 AND max_interest_rate <= 100", name="chk_request_max_rate"),
         CheckConstraint("term_days > 0", name="chk_request_term"),
-        CheckConstraint("request_type IN ('standard', 'auction')", name="chk_request_type"),
-        CheckConstraint("status IN ('open', 'bidding', 'accepted', 'expired', 'cancelled')", name="chk_request_status"),
         Index('idx_loan_requests_borrower', 'borrower_address'),
-        Index('idx_loan_requests_status', 'status'),
+        Index('idx_requests_open', 'created_at', postgresql_where=text("status IN ('open', 'bidding')")),  # Browse order
         Index('idx_loan_requests_type', 'request_type'),
+        Index(
+            'idx_loan_requests_collateral_tokens', 'collateral_tokens',
+            postgresql_using='gin', postgresql_ops={'collateral_tokens': 'jsonb_path_ops'}
+        ),  # Containment (@>) lookups by token
     )
 
 
@@ -428,15 +578,15 @@ class CollateralPosition(Base):
     __tablename__ = "collateral_positions"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False, index=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    token_address = Column(String(42), nullable=False, index=True)
+    loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    token_address = Column(EthAddress, nullable=False)
     amount = Column(Numeric(36, 0), nullable=False)  # Token amount (can be very large)
     value_usd = Column(Numeric(20, 8), nullable=False)  # USD value
     ltv_ratio = Column(Numeric(5, 2), nullable=True)  # Current LTV for this position
     health_ratio = Column(Numeric(5, 4), nullable=True)  # Health ratio (0-1)
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    extra_metadata = Column(JSON, nullable=True)  # Additional metadata (renamed from 'metadata' - reserved word)
+    extra_metadata = Column(JSONB, nullable=True)  # Additional metadata (renamed from 'metadata' - reserved word)
     
     # Relationships
     loan = relationship("Loan")
@@ -457,13 +607,13 @@ class RebalanceHistory(Base):
     __tablename__ = "rebalance_history"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False, index=True)
-    rebalance_type = Column(String(20), nullable=False)  # 'auto' or 'manual'
-    from_token = Column(String(42), nullable=False)
-    to_token = Column(String(42), nullable=False)
+    loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False)
+    rebalance_type = Column(RebalanceType, nullable=False)  # 'auto' or 'manual'
+    from_token = Column(EthAddress, nullable=False)
+    to_token = Column(EthAddress, nullable=False)
     from_amount = Column(Numeric(36, 0), nullable=False)
     to_amount = Column(Numeric(36, 0), nullable=False)
-    tx_hash = Column(String(66), nullable=True, index=True)
+    tx_hash = Column(TxHash, nullable=True, index=True)
     reason = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -471,9 +621,8 @@ class RebalanceHistory(Base):
     loan = relationship("Loan")
     
     __table_args__ = (
-        CheckConstraint("rebalance_type IN ('auto', 'manual')", name="chk_rebalance_type"),
         Index('idx_rebalance_loan', 'loan_id'),
-        Index('idx_rebalance_created', 'created_at'),
+        Index('brin_rebalance_created', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
     )
 
 
@@ -482,10 +631,10 @@ class YieldStrategy(Base):
     __tablename__ = "yield_strategies"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    strategy_type = Column(String(20), nullable=False)  # 'staking', 'yield_farming', 'auto_compound'
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    strategy_type = Column(StrategyType, nullable=False)  # 'staking', 'yield_farming', 'auto_compound'
     protocol = Column(String(100), nullable=False)
-    token_address = Column(String(42), nullable=False, index=True)
+    token_address = Column(EthAddress, nullable=False, index=True)
     amount = Column(Numeric(36, 0), nullable=False)
     apy = Column(Numeric(5, 2), nullable=True)  # Current APY percentage
     auto_compound_enabled = Column(Boolean, default=False, nullable=False)
@@ -498,7 +647,6 @@ class YieldStrategy(Base):
     user = relationship("User")
     
     __table_args__ = (
-        CheckConstraint("strategy_type IN ('staking', 'yield_farming', 'auto_compound')", name="chk_strategy_type"),
         CheckConstraint("amount > 0", name="chk_strategy_amount"),
         CheckConstraint("apy >= 0 AND apy <= 1000", name="chk_strategy_apy"),  # Allow high APY
         Index('idx_yield_wallet', 'wallet_address'),
@@ -511,14 +659,14 @@ class UserPreferences(Base):
     """User preferences model for loan negotiation and auto-acceptance"""
     __tablename__ = "user_preferences"
     
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), primary_key=True)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), primary_key=True)
     max_interest_rate = Column(Numeric(5, 2), nullable=True)  # Maximum acceptable APR
     term_days_min = Column(Integer, nullable=True)
     term_days_max = Column(Integer, nullable=True)
     max_loan_amount = Column(Numeric(20, 8), nullable=True)
-    preferred_collateral_tokens = Column(JSON, nullable=True)  # Array of preferred token addresses
+    preferred_collateral_tokens = Column(JSONB, nullable=True)  # Array of preferred token addresses
     auto_negotiate_enabled = Column(Boolean, default=False, nullable=False)
-    auto_accept_threshold = Column(JSON, nullable=True)  # Conditions for auto-acceptance
+    auto_accept_threshold = Column(JSONB, nullable=True)  # Conditions for auto-acceptance
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -538,12 +686,11 @@ class NegotiationSession(Base):
     __tablename__ = "negotiation_sessions"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
     loan_request_id = Column(Integer, ForeignKey("loan_requests.id"), nullable=True)
-    preferences_id = Column(String(42), ForeignKey("user_preferences.wallet_address"), nullable=True)
-    status = Column(String(20), nullable=False, default='active', index=True)
+    preferences_id = Column(EthAddress, ForeignKey("user_preferences.wallet_address"), nullable=True)
+    status = Column(NegotiationStatus, nullable=False, default='active')
     current_offer_id = Column(Integer, ForeignKey("loan_offers.id"), nullable=True)
-    negotiation_history = Column(JSON, nullable=True)  # Track offers, counters, and actions
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -552,11 +699,33 @@ class NegotiationSession(Base):
     loan_request = relationship("LoanRequest")
     preferences = relationship("UserPreferences", foreign_keys=[preferences_id])
     current_offer = relationship("LoanOffer", foreign_keys=[current_offer_id])
+    events = relationship("NegotiationEvent", back_populates="negotiation", order_by="NegotiationEvent.seq")
     
     __table_args__ = (
-        CheckConstraint("status IN ('active', 'completed', 'cancelled', 'expired')", name="chk_negotiation_status"),
         Index('idx_negotiation_wallet', 'wallet_address'),
-        Index('idx_negotiation_status', 'status'),
+        Index('idx_negotiation_active', 'wallet_address', postgresql_where=text("status = 'active'")),
+    )
+
+
+class NegotiationEvent(Base):
+    """Negotiation event model (one row per action in a negotiation session)"""
+    __tablename__ = "negotiation_events"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(Integer, ForeignKey("negotiation_sessions.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)  # 1-based position within the session
+    event_type = Column(String(20), nullable=False)  # 'started', 'initial_search', 'continued', 'cancelled'
+    offer_id = Column(Integer, ForeignKey("loan_offers.id"), nullable=True)
+    payload = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    negotiation = relationship("NegotiationSession", back_populates="events")
+    offer = relationship("LoanOffer")
+    
+    __table_args__ = (
+        # Also serves the per-session lookups (ORDER BY seq DESC LIMIT n)
+        UniqueConstraint('session_id', 'seq', name='uq_negotiation_event_seq'),
     )
 
 
@@ -565,14 +734,14 @@ class Alert(Base):
     __tablename__ = "alerts"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    alert_type = Column(String(50), nullable=False, index=True)  # 'score_drop', 'loan_risk', etc.
-    severity = Column(String(20), nullable=False, default='warning')  # 'info', 'warning', 'critical'
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    alert_type = Column(String(50), nullable=False)  # 'score_drop', 'loan_risk', etc.
+    severity = Column(AlertSeverity, nullable=False, default='warning')  # 'info', 'warning', 'critical'
     message = Column(Text, nullable=False)
-    suggested_actions = Column(JSON, nullable=True)  # Array of suggested actions
-    read = Column(Boolean, default=False, nullable=False, index=True)
+    suggested_actions = Column(JSONB, nullable=True)  # Array of suggested actions
+    read = Column(Boolean, default=False, nullable=False)
     dismissed = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     read_at = Column(DateTime(timezone=True), nullable=True)
     dismissed_at = Column(DateTime(timezone=True), nullable=True)
     
@@ -580,21 +749,44 @@ class Alert(Base):
     user = relationship("User")
     
     __table_args__ = (
-        CheckConstraint("severity IN ('info', 'warning', 'critical')", name="chk_alert_severity"),
-        Index('idx_alerts_wallet_read', 'wallet_address', 'read'),
+        Index('idx_alerts_wallet_address', 'wallet_address'),
         Index('idx_alerts_type_severity', 'alert_type', 'severity'),
+        Index('brin_alerts_created', 'created_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        Index(
+            # Unread feed; the read flag itself is only ever queried through this
+            'idx_alerts_unread_covering', 'wallet_address', 'created_at',
+            postgresql_include=['alert_type', 'severity'],
+            postgresql_where=text('read = false AND dismissed = false')
+        ),
     )
 
 
+class NotificationChannel(IntFlag):
+    """Bits of NotificationPreference.channels"""
+    IN_APP = 1
+    EMAIL = 2
+    PUSH = 4
+    SMS = 8
+
+
+def _channel_property(channel: NotificationChannel) -> property:
+    """Boolean view of one channels bit (the pre-bitmask column name)"""
+    def getter(self) -> bool:
+        return bool(self._channel_bits() & channel)
+    
+    def setter(self, enabled: bool):
+        bits = self._channel_bits()
+        self.channels = int(bits | channel if enabled else bits & ~channel)
+    
+    return property(getter, setter)
+
+
 class NotificationPreference(Base):
     """Notification preferences model for multi-channel notifications"""
     __tablename__ = "notification_preferences"
     
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), primary_key=True)
-    in_app_enabled = Column(Boolean, default=True, nullable=False)
-    email_enabled = Column(Boolean, default=False, nullable=False)
-    push_enabled = Column(Boolean, default=False, nullable=False)
-    sms_enabled = Column(Boolean, default=False, nullable=False)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), primary_key=True)
+    channels = Column(SmallInteger, nullable=False, server_default=text('1'))  # NotificationChannel bitmask, in-app by default
     email_address = Column(String(255), nullable=True)
     phone_number = Column(String(20), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -606,84 +798,100 @@ class NotificationPreference(Base):
     __table_args__ = (
         CheckConstraint("email_address IS NULL OR email_address ~ '^[^@]+@[^@]+\\.[^@]+$'", name="chk_email_format"),
     )
+    
+    in_app_enabled = _channel_property(NotificationChannel.IN_APP)
+    email_enabled = _channel_property(NotificationChannel.EMAIL)
+    push_enabled = _channel_property(NotificationChannel.PUSH)
+    sms_enabled = _channel_property(NotificationChannel.SMS)
+    
+    def _channel_bits(self) -> NotificationChannel:
+        # Unflushed rows have no channels yet; start from the server default
+        if self.channels is None:
+            return NotificationChannel.IN_APP
+        return NotificationChannel(self.channels)
 
 
 class ScoreShare(Base):
     """Score share model for tracking social media shares"""
     __tablename__ = "score_shares"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    share_type = Column(String(20), nullable=False, index=True)  # 'twitter', 'linkedin', 'facebook', 'custom'
-    badge_style = Column(String(20), nullable=False, default='minimal')
-    shared_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    id = Column(BigInteger, ScoreShareIdSeq, server_default=ScoreShareIdSeq.next_value(), primary_key=True)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    share_type = Column(ShareType, nullable=False)
+    badge_style = Column(BadgeStyle, nullable=False, default='minimal')
+    shared_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())  # Partition key (monthly)
     share_url = Column(String(500), nullable=True)
     clicks = Column(Integer, default=0, nullable=False)
+    # Snapshot of the wallet's score when shared (NULL if it had none yet)
+    score_at_share = Column(Integer, nullable=True)
+    risk_band_at_share = Column(SmallInteger, nullable=True)
     
     # Relationships
-    user = relationship("User")
+    user = relationship("User", lazy="raise")
     
     __table_args__ = (
-        CheckConstraint("share_type IN ('twitter', 'linkedin', 'facebook', 'custom')", name="chk_share_type"),
-        CheckConstraint("badge_style IN ('minimal', 'detailed', 'verified')", name="chk_badge_style"),
         Index('idx_score_shares_wallet', 'wallet_address'),
         Index('idx_score_shares_type', 'share_type'),
-        Index('idx_score_shares_shared_at', 'shared_at'),
+        Index('brin_score_shares_shared_at', 'shared_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        {'postgresql_partition_by': 'RANGE (shared_at)'},
     )
 
 
 class LeaderboardEntry(Base):
-    """Leaderboard entry model for ranking users"""
+    """
+    Leaderboard entry (read-only; rows come from the leaderboard_entries
+    materialized view, see database/views.py)
+    """
     __tablename__ = "leaderboard_entries"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    score = Column(Integer, nullable=False, index=True)
-    risk_band = Column(Integer, nullable=False)
-    rank = Column(Integer, nullable=False, index=True)
-    category = Column(String(20), nullable=False, index=True)  # 'all_time', 'monthly', 'weekly'
+    wallet_address = Column(EthAddress, primary_key=True)
+    score = Column(Integer, nullable=False)
+    risk_band = Column(SmallInteger, nullable=False)
+    rank = Column(Integer, nullable=False)
+    category = Column(String(20), primary_key=True)  # 'all_time', 'monthly', 'weekly'
     period_start = Column(DateTime(timezone=True), nullable=True)
     period_end = Column(DateTime(timezone=True), nullable=True)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=True)  # Score's last update
     
-    # Relationships
-    user = relationship("User")
-    
-    __table_args__ = (
-        CheckConstraint("score >= 0 AND score <= 1000", name="chk_leaderboard_score_range"),
-        CheckConstraint("risk_band >= 0 AND risk_band <= 3", name="chk_leaderboard_risk_band"),
-        CheckConstraint("rank > 0", name="chk_leaderboard_rank"),
-        CheckConstraint("category IN ('all_time', 'monthly', 'weekly')", name="chk_leaderboard_category"),
-        Index('idx_leaderboard_wallet_category', 'wallet_address', 'category'),
-        Index('idx_leaderboard_category_rank', 'category', 'rank'),
-        Index('idx_leaderboard_score', 'score'),
-    )
+    # Not created by create_all(); the view and its indexes (including the
+    # covering idx_leaderboard_category_rank) are, in database/views.py
+    __table_args__ = {'info': {'is_view': True}}
 
 
 class ReferralReward(Base):
     """Referral reward model for tracking NCRD token rewards"""
     __tablename__ = "referral_rewards"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(BigInteger, ReferralRewardIdSeq, server_default=ReferralRewardIdSeq.next_value(), primary_key=True)
     referral_id = Column(Integer, ForeignKey("referrals.id"), nullable=True, index=True)
-    recipient_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    reward_type = Column(String(20), nullable=False, index=True)  # 'referrer', 'referred', 'milestone'
-    amount_ncrd = Column(Numeric(20, 8), nullable=False)
-    status = Column(String(20), nullable=False, default='pending', index=True)  # 'pending', 'distributed', 'failed'
-    distribution_tx_hash = Column(String(66), nullable=True, index=True)
+    recipient_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    reward_type = Column(RewardType, nullable=False, index=True)
+    amount_wei = Column(TokenAmount, nullable=False)  # NCRD base units (18 decimals)
+    status = Column(RewardStatus, nullable=False, default='pending')
+    distribution_tx_hash = Column(TxHash, nullable=True)
     distributed_at = Column(DateTime(timezone=True), nullable=True)
-    extra_metadata = Column(JSON, nullable=True)  # Additional metadata (renamed from 'metadata' - reserved word)  # Additional reward metadata
+    extra_metadata = Column(JSONB, nullable=True)  # Additional metadata (renamed from 'metadata' - reserved word)  # Additional reward metadata
+    # Snapshot of the recipient's score when the reward was created
+    score_at_reward = Column(Integer, nullable=True)
+    risk_band_at_reward = Column(SmallInteger, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
-    recipient = relationship("User", foreign_keys=[recipient_address])
+    recipient = relationship("User", foreign_keys=[recipient_address], lazy="raise")
     
     __table_args__ = (
-        CheckConstraint("reward_type IN ('referrer', 'referred', 'milestone')", name="chk_reward_type"),
-        CheckConstraint("status IN ('pending', 'distributed', 'failed')", name="chk_reward_status"),
-        CheckConstraint("amount_ncrd > 0", name="chk_reward_amount"),
+        CheckConstraint("amount_wei > 0", name="chk_reward_amount"),
         Index('idx_referral_rewards_recipient_status', 'recipient_address', 'status'),
-        Index('idx_referral_rewards_status', 'status'),
+        # Distribution job pages through pending rewards by id; distributed
+        # rows (the bulk of the table) stay out of the index
+        Index('idx_referral_rewards_pending', 'id', postgresql_where=text("status = 'pending'")),
+        # Equality-only key; hash indexes also skip the NULLs of undistributed rewards
+        Index('idx_referral_rewards_distribution_tx', 'distribution_tx_hash', postgresql_using='hash'),
+        # Milestone dedup: has this wallet been paid for this score milestone?
+        Index(
+            'idx_referral_rewards_milestone', 'recipient_address', text("(extra_metadata ->> 'milestone_score')"),
+            postgresql_where=text("reward_type = 'milestone'")
+        ),
     )
 
 
@@ -693,17 +901,20 @@ class Team(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     team_name = Column(String(100), nullable=False, index=True)
-    team_type = Column(String(20), nullable=False, default='custom')  # 'dao', 'organization', 'custom'
-    admin_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
+    team_type = Column(TeamType, nullable=False, default='custom')
+    admin_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    # Maintained by triggers on team_members and scores (see database/triggers.py)
+    member_count = Column(Integer, nullable=False, server_default=text('0'))
+    weighted_score_sum = Column(Numeric(20, 2), nullable=False, server_default=text('0'))
+    score_weight_sum = Column(Numeric(12, 2), nullable=False, server_default=text('0'))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
-    admin = relationship("User", foreign_keys=[admin_address])
-    members = relationship("TeamMember", back_populates="team")
-    scores = relationship("TeamScore", back_populates="team")
+    admin = relationship("User", foreign_keys=[admin_address], lazy="raise")
+    members = relationship("TeamMember", back_populates="team", lazy="raise")
+    scores = relationship("TeamScore", back_populates="team", lazy="raise")
     
     __table_args__ = (
-        CheckConstraint("team_type IN ('dao', 'organization', 'custom')", name="chk_team_type"),
         Index('idx_teams_admin', 'admin_address'),
     )
 
@@ -713,20 +924,19 @@ class TeamMember(Base):
     __tablename__ = "team_members"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False, index=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    role = Column(String(20), nullable=False, default='member')  # 'admin', 'member'
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    role = Column(TeamRole, nullable=False, default='member')
     joined_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     contribution_score = Column(Numeric(5, 2), nullable=True)  # For weighted calculations
     
     # Relationships
-    team = relationship("Team", back_populates="members")
-    user = relationship("User", foreign_keys=[wallet_address])
+    team = relationship("Team", back_populates="members", lazy="raise")
+    user = relationship("User", foreign_keys=[wallet_address], lazy="raise")
     
     __table_args__ = (
-        CheckConstraint("role IN ('admin', 'member')", name="chk_team_member_role"),
+        # Also serves team_id lookups
         UniqueConstraint('team_id', 'wallet_address', name='uq_team_member'),
-        Index('idx_team_members_team', 'team_id'),
         Index('idx_team_members_wallet', 'wallet_address'),
     )
 
@@ -736,19 +946,20 @@ class TeamScore(Base):
     __tablename__ = "team_scores"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
     aggregate_score = Column(Integer, nullable=False)
     member_count = Column(Integer, nullable=False)
-    calculated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    calculated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
-    team = relationship("Team", back_populates="scores")
+    team = relationship("Team", back_populates="scores", lazy="raise")
     
     __table_args__ = (
         CheckConstraint("aggregate_score >= 0 AND aggregate_score <= 1000", name="chk_team_score_range"),
         CheckConstraint("member_count > 0", name="chk_team_member_count"),
-        Index('idx_team_scores_team', 'team_id'),
-        Index('idx_team_scores_calculated', 'calculated_at'),
+        # Latest score per team (ORDER BY calculated_at DESC LIMIT 1, MAX())
+        Index('idx_team_scores_team_calculated', 'team_id', 'calculated_at'),
+        Index('brin_team_scores_calculated', 'calculated_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
     )
 
 
@@ -757,23 +968,22 @@ class CreditReport(Base):
     __tablename__ = "credit_reports"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    report_type = Column(String(20), nullable=False, default='full')  # 'full', 'summary', 'custom'
-    format = Column(String(10), nullable=False, default='pdf')  # 'pdf', 'json', 'csv'
-    generated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    report_type = Column(ReportType, nullable=False, default='full')
+    format = Column(ReportFormat, nullable=False, default='pdf')
+    generated_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())  # Partition key (monthly)
     file_path = Column(String(500), nullable=True)
     file_url = Column(String(500), nullable=True)
-    extra_metadata = Column(JSON, nullable=True)  # Additional metadata (renamed from 'metadata' - reserved word)  # Report metadata and data
+    extra_metadata = Column(JSONB, nullable=True)  # Additional metadata (renamed from 'metadata' - reserved word)  # Report metadata and data
     
     # Relationships
-    user = relationship("User")
-    shares = relationship("ReportShare", back_populates="report")
+    user = relationship("User", lazy="raise")
+    shares = relationship("ReportShare", back_populates="report", lazy="raise")
     
     __table_args__ = (
-        CheckConstraint("report_type IN ('full', 'summary', 'custom')", name="chk_report_type"),
-        CheckConstraint("format IN ('pdf', 'json', 'csv')", name="chk_report_format"),
         Index('idx_credit_reports_wallet', 'wallet_address'),
-        Index('idx_credit_reports_generated', 'generated_at'),
+        Index('brin_credit_reports_generated', 'generated_at', postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        {'postgresql_partition_by': 'RANGE (generated_at)'},
     )
 
 
@@ -782,21 +992,28 @@ class ReportShare(Base):
     __tablename__ = "report_shares"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    report_id = Column(Integer, ForeignKey("credit_reports.id"), nullable=False, index=True)
-    wallet_address = Column(String(42), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    shared_with_address = Column(String(42), nullable=False, index=True)  # Protocol or user address
-    share_token = Column(String(100), nullable=False, unique=True, index=True)
-    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    report_id = Column(Integer, nullable=False, index=True)
+    report_generated_at = Column(DateTime(timezone=True), nullable=False)  # Report's partition key
+    wallet_address = Column(EthAddress, ForeignKey("users.wallet_address"), nullable=False)
+    shared_with_address = Column(EthAddress, nullable=False)  # Protocol or user address
+    share_token = Column(String(100), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
     accessed_at = Column(DateTime(timezone=True), nullable=True)
     access_count = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
-    report = relationship("CreditReport", back_populates="shares")
-    user = relationship("User", foreign_keys=[wallet_address])
+    report = relationship("CreditReport", back_populates="shares", lazy="joined", innerjoin=True)
+    user = relationship("User", foreign_keys=[wallet_address], lazy="raise")
     
     __table_args__ = (
-        Index('idx_report_shares_token', 'share_token', unique=True),
+        ForeignKeyConstraint(
+            ['report_id', 'report_generated_at'],
+            ['credit_reports.id', 'credit_reports.generated_at']
+        ),
+        CheckConstraint("octet_length(shared_with_address) = 20", name="chk_shared_with_address_format"),
+        # Unique via a hash index: tokens are random and only ever matched exactly
+        ExcludeConstraint(('share_token', '='), name='excl_report_shares_token', using='hash'),
         Index('idx_report_shares_wallet', 'wallet_address'),
         Index('idx_report_shares_shared_with', 'shared_with_address'),
         Index('idx_report_shares_expires', 'expires_at'),
@@ -808,18 +1025,20 @@ class APIAccess(Base):
     __tablename__ = "api_access"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    protocol_address = Column(String(42), nullable=False, index=True)
-    api_key = Column(String(100), nullable=False, unique=True, index=True)  # Hashed API key
-    permissions = Column(JSON, nullable=True)  # Scoped permissions
+    protocol_address = Column(EthAddress, nullable=False)
+    api_key = Column(KeyHash, nullable=False)  # SHA-256 of the API key
+    permissions = Column(JSONB, nullable=True)  # Scoped permissions
     rate_limit = Column(Integer, default=60, nullable=False)  # Requests per minute
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     last_used_at = Column(DateTime(timezone=True), nullable=True)
-    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
     revoked_at = Column(DateTime(timezone=True), nullable=True)
     
     __table_args__ = (
         CheckConstraint("rate_limit > 0", name="chk_rate_limit"),
+        CheckConstraint("octet_length(protocol_address) = 20", name="chk_protocol_address_format"),
+        CheckConstraint("octet_length(api_key) = 32", name="chk_api_key_hash_format"),
+        ExcludeConstraint(('api_key', '='), name='excl_api_access_key', using='hash'),
         Index('idx_api_access_protocol', 'protocol_address'),
-        Index('idx_api_access_key', 'api_key', unique=True),
         Index('idx_api_access_expires', 'expires_at'),
     )
@@ -0,0 +1,254 @@
+"""
+Monthly range partitions for time-series tables
+
+transactions, transaction_inputs, token_transfers and score_history are
+partitioned by month (see migration 029), as are score_shares and
+credit_reports (migration 045). Partitions are named
+<table>_yYYYYmMM; new ones are created ahead of time by
+ensure_monthly_partitions(), and retention drops whole partitions instead of
+deleting rows.
+
+Each table also has a DEFAULT partition, <table>_default (migration 057),
+for rows older than the first monthly partition: historical transactions
+indexed from block 0, or backdated score history and reports. A CHECK
+constraint bounds it below that first month, so rows dated past the
+monthly window still fail loudly, and creating a new monthly partition
+never has to scan it.
+
+Retention drops whole expired months with drop_partitions_before(), then
+deletes what is left before the cutoff (the month containing it, and the
+DEFAULT partition) in chunks with delete_rows_before().
+"""
+import asyncio
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Partitioned table -> partition key
+PARTITIONED_TABLES = {
+    "transactions": "block_timestamp",
+    "transaction_inputs": "block_timestamp",
+    "token_transfers": "block_timestamp",
+    "score_history": "computed_at",
+    "score_shares": "shared_at",
+    "credit_reports": "generated_at",
+}
+
+# Tables whose partitions must go before the parent's (foreign keys)
+PARTITION_CHILDREN = {
+    "transactions": ["transaction_inputs", "token_transfers"],
+}
+
+# Primary key of each partitioned table (it includes the partition key)
+PARTITION_PRIMARY_KEYS = {
+    "transactions": ("id", "block_timestamp"),
+    "transaction_inputs": ("tx_id", "block_timestamp"),
+    "token_transfers": ("id", "block_timestamp"),
+    "score_history": ("id", "computed_at"),
+    "score_shares": ("id", "shared_at"),
+    "credit_reports": ("id", "generated_at"),
+}
+
+# Row-by-row retention: rows per DELETE (one transaction each) and the pause
+# between chunks that lets concurrent writers and autovacuum keep up
+DELETE_CHUNK_SIZE = 10000
+DELETE_PAUSE = 0.05
+
+_PARTITION_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+LIST_PARTITIONS = text("""
+    SELECT c.relname, c.reltuples
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = :table
+""")
+
+
+def _month_start(dt: datetime) -> datetime:
+    return datetime(dt.year, dt.month, 1, tzinfo=timezone.utc)
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """Partition name for the month containing a timestamp"""
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of the DEFAULT partition catching rows older than the monthly ones"""
+    return f"{table}_default"
+
+
+def default_partition_ddl(table: str, first_month: datetime) -> str:
+    """CREATE statement for a table's DEFAULT partition, bounded below first_month"""
+    name = default_partition_name(table)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"(CONSTRAINT {name}_before_window "
+        f"CHECK ({PARTITIONED_TABLES[table]} < '{first_month.isoformat()}')) DEFAULT"
+    )
+
+
+async def _first_partition_month(session: AsyncSession, table: str) -> Optional[datetime]:
+    """Start of the table's earliest monthly partition"""
+    result = await session.execute(LIST_PARTITIONS, {"table": table})
+    months = [
+        datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+        for match in (_PARTITION_NAME.search(name) for name, _ in result.all())
+        if match
+    ]
+    return min(months, default=None)
+
+
+async def ensure_monthly_partitions(
+    session: AsyncSession,
+    table: str,
+    months_ahead: int = 2
+) -> List[str]:
+    """
+    Create partitions for the current month and the next months_ahead months
+    
+    Also creates the table's DEFAULT partition if missing, bounded below the
+    earliest monthly partition, so rows dated before the monthly window are
+    stored instead of failing the whole insert. Existing partitions are left
+    alone. Runs in the caller's transaction.
+    
+    Args:
+        session: Database session
+        table: Partitioned table name (see PARTITIONED_TABLES)
+        months_ahead: Number of future months to cover
+    
+    Returns:
+        Names of the partitions covered
+    """
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"{table} is not a partitioned table")
+    
+    current = _month_start(datetime.now(timezone.utc))
+    names = []
+    try:
+        for offset in range(months_ahead + 1):
+            start = _add_months(current, offset)
+            end = _add_months(start, 1)
+            name = partition_name(table, start)
+            await session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+            names.append(name)
+        
+        first_month = await _first_partition_month(session, table) or current
+        await session.execute(text(default_partition_ddl(table, first_month)))
+        return names
+    except Exception as e:
+        logger.error(f"Error creating partitions for {table}: {e}", exc_info=True)
+        raise
+
+
+async def drop_partitions_before(
+    session: AsyncSession,
+    table: str,
+    cutoff: datetime
+) -> Dict[str, int]:
+    """
+    Drop partitions whose whole month ends on or before cutoff
+    
+    Child tables (PARTITION_CHILDREN) lose the same months first. Rows in
+    the month containing cutoff, and in the DEFAULT partition, are left for
+    delete_rows_before(). Runs in the caller's transaction.
+    
+    Args:
+        session: Database session
+        table: Partitioned table name (see PARTITIONED_TABLES)
+        cutoff: Rows older than this may be removed
+    
+    Returns:
+        Dict of dropped partition name to its estimated row count
+    """
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"{table} is not a partitioned table")
+    
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+    
+    dropped = {}
+    try:
+        for child in PARTITION_CHILDREN.get(table, []):
+            await drop_partitions_before(session, child, cutoff)
+        
+        result = await session.execute(LIST_PARTITIONS, {"table": table})
+        for name, reltuples in result.all():
+            match = _PARTITION_NAME.search(name)
+            if not match:
+                continue
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            if _add_months(month, 1) > cutoff:
+                continue
+            
+            # DETACH validates incoming foreign keys; DROP is then metadata-only
+            await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            await session.execute(text(f"DROP TABLE {name}"))
+            dropped[name] = max(int(reltuples), 0)
+        
+        if dropped:
+            logger.info(f"Dropped {len(dropped)} {table} partitions", extra={"partitions": list(dropped)})
+        return dropped
+    except Exception as e:
+        logger.error(f"Error dropping partitions for {table}: {e}", exc_info=True)
+        raise
+
+
+async def delete_rows_before(
+    session: AsyncSession,
+    table: str,
+    cutoff: datetime
+) -> int:
+    """
+    Delete rows older than cutoff, DELETE_CHUNK_SIZE rows at a time
+    
+    Removes what drop_partitions_before() leaves behind, so retention keeps
+    an exact cutoff. Child tables (PARTITION_CHILDREN) are cleared first.
+    Commits after each chunk, so no single transaction holds locks or WAL
+    for the whole range; anything pending in the session is committed with
+    the first chunk.
+    
+    Returns:
+        Rows deleted from table (child rows not counted)
+    """
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"{table} is not a partitioned table")
+    
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+    
+    try:
+        for child in PARTITION_CHILDREN.get(table, []):
+            await delete_rows_before(session, child, cutoff)
+        
+        columns = ", ".join(PARTITION_PRIMARY_KEYS[table])
+        statement = text(
+            f"DELETE FROM {table} WHERE ({columns}) IN ("
+            f"SELECT {columns} FROM {table} WHERE {PARTITIONED_TABLES[table]} < :cutoff "
+            f"LIMIT :limit)"
+        )
+        deleted = 0
+        while True:
+            result = await session.execute(statement, {"cutoff": cutoff, "limit": DELETE_CHUNK_SIZE})
+            await session.commit()
+            deleted += result.rowcount
+            if result.rowcount < DELETE_CHUNK_SIZE:
+                return deleted
+            await asyncio.sleep(DELETE_PAUSE)
+    except Exception as e:
+        logger.error(f"Error deleting expired {table} rows: {e}", exc_info=True)
+        raise
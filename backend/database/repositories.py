@@ -4,18 +4,21 @@ Repository pattern for data access layer
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, func, and_
+from sqlalchemy import select, delete, update, func, and_, insert, any_, bindparam, lambda_stmt
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.orm import selectinload
 from .models import (
     Score, ScoreHistory, UserData, BatchUpdate,
-    User, Loan, LoanPayment, Transaction, GDPRRequest
+    User, Loan, LoanPayment, Transaction, GDPRRequest, WalletProfile
 )
+from .cache import mark_stale
+from .partitions import drop_partitions_before, delete_rows_before
+from .types import EthAddress
 from decimal import Decimal
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-
 class ScoreRepository:
     """Repository for score data access"""
     
@@ -23,8 +26,9 @@ class ScoreRepository:
     async def get_score(session: AsyncSession, wallet_address: str) -> Optional[Score]:
         """Get score for a wallet address"""
         try:
+            # lambda_stmt: compiled once per code location, the address is the only bind
             result = await session.execute(
-                select(Score).where(Score.wallet_address == wallet_address)
+                lambda_stmt(lambda: select(Score).where(Score.wallet_address == wallet_address))
             )
             return result.scalar_one_or_none()
         except Exception as e:
@@ -39,30 +43,78 @@ class ScoreRepository:
         risk_band: int,
         computed_at: Optional[datetime] = None
     ) -> Score:
-        """Insert or update score"""
+        """Insert or update score (one INSERT ... ON CONFLICT round trip)"""
         try:
-            existing = await ScoreRepository.get_score(session, wallet_address)
-            
-            if existing:
-                existing.score = score
-                existing.risk_band = risk_band
-                existing.last_updated = datetime.utcnow()
-                existing.computed_at = computed_at or datetime.utcnow()
-                return existing
-            else:
-                new_score = Score(
-                    wallet_address=wallet_address,
-                    score=score,
-                    risk_band=risk_band,
-                    last_updated=datetime.utcnow(),
-                    computed_at=computed_at or datetime.utcnow()
-                )
-                session.add(new_score)
-                return new_score
+            now = datetime.utcnow()
+            stmt = pg_insert(Score).values(
+                wallet_address=wallet_address,
+                score=score,
+                risk_band=risk_band,
+                last_updated=now,
+                computed_at=computed_at or now
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Score.wallet_address],
+                set_={
+                    "score": stmt.excluded.score,
+                    "risk_band": stmt.excluded.risk_band,
+                    "last_updated": stmt.excluded.last_updated,
+                    "computed_at": stmt.excluded.computed_at,
+                }
+            ).returning(Score)
+            result = await session.execute(stmt, execution_options={"populate_existing": True})
+            mark_stale(session, Score, [wallet_address])
+            return result.scalar_one()
         except Exception as e:
             logger.error(f"Error upserting score: {e}", exc_info=True, extra={"address": wallet_address})
             raise
     
+    @staticmethod
+    async def upsert_scores(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update many scores in one statement
+        
+        Args:
+            session: Database session
+            rows: Dicts with wallet_address, score, risk_band and optional computed_at
+        
+        Returns:
+            Number of rows written
+        """
+        if not rows:
+            return 0
+        
+        try:
+            now = datetime.utcnow()
+            # One row per wallet: ON CONFLICT cannot update a row twice
+            latest = {row["wallet_address"]: row for row in rows}
+            values = [
+                {
+                    "wallet_address": row["wallet_address"],
+                    "score": row["score"],
+                    "risk_band": row["risk_band"],
+                    "last_updated": now,
+                    "computed_at": row.get("computed_at") or now,
+                }
+                for row in latest.values()
+            ]
+            stmt = pg_insert(Score).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Score.wallet_address],
+                set_={
+                    "score": stmt.excluded.score,
+                    "risk_band": stmt.excluded.risk_band,
+                    "last_updated": stmt.excluded.last_updated,
+                    "computed_at": stmt.excluded.computed_at,
+                }
+            )
+            await session.execute(stmt)
+            mark_stale(session, Score, [row["wallet_address"] for row in values])
+            return len(values)
+        except Exception as e:
+            logger.error(f"Error upserting scores: {e}", exc_info=True, extra={"count": len(rows)})
+            raise
+    
     @staticmethod
     async def get_scores_batch(
         session: AsyncSession,
@@ -70,9 +122,20 @@ class ScoreRepository:
         min_score: Optional[int] = None,
         max_score: Optional[int] = None
     ) -> List[Score]:
-        """Get scores for multiple addresses"""
+        """
+        Get scores for multiple addresses
+        
+        The addresses go out as one BYTEA[] parameter (= ANY), so the SQL text
+        and its prepared statement are the same for every batch size.
+        """
+        addresses = list({address.lower() for address in wallet_addresses})
+        if not addresses:
+            return []
+        
         try:
-            query = select(Score).where(Score.wallet_address.in_(wallet_addresses))
+            query = select(Score).where(
+                Score.wallet_address == any_(bindparam("addresses", addresses, type_=ARRAY(EthAddress)))
+            )
             
             if min_score is not None:
                 query = query.where(Score.score >= min_score)
@@ -137,6 +200,32 @@ class ScoreHistoryRepository:
             logger.error(f"Error adding history: {e}", exc_info=True, extra={"address": wallet_address})
             raise
     
+    @staticmethod
+    async def add_history_batch(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """
+        Add many score history entries in one multi-row INSERT
+        
+        Args:
+            session: Database session
+            rows: Dicts of ScoreHistory columns (wallet_address, score, risk_band, ...)
+        
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        
+        try:
+            now = datetime.utcnow()
+            await session.execute(
+                insert(ScoreHistory),
+                [{**row, "computed_at": row.get("computed_at") or now} for row in rows]
+            )
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error adding history batch: {e}", exc_info=True, extra={"count": len(rows)})
+            raise
+    
     @staticmethod
     async def get_history(
         session: AsyncSession,
@@ -187,13 +276,27 @@ class ScoreHistoryRepository:
         session: AsyncSession,
         days: int = 90
     ) -> int:
-        """Delete history older than specified days"""
+        """
+        Delete history older than specified days
+        
+        Months wholly before the cutoff are dropped as partitions; the rest
+        is deleted in chunks by delete_rows_before(), the same rule
+        DataRetentionService applies.
+        
+        Returns:
+            Rows deleted row-by-row (dropped partitions are logged with
+            their estimated size)
+        """
         try:
             cutoff = datetime.utcnow() - timedelta(days=days)
-            result = await session.execute(
-                delete(ScoreHistory).where(ScoreHistory.computed_at < cutoff)
-            )
-            return result.rowcount
+            dropped = await drop_partitions_before(session, "score_history", cutoff)
+            await session.commit()
+            if dropped:
+                logger.info(
+                    "Dropped expired score history partitions",
+                    extra={"estimated_rows": sum(dropped.values())}
+                )
+            return await delete_rows_before(session, "score_history", cutoff)
         except Exception as e:
             logger.error(f"Error cleaning up history: {e}", exc_info=True)
             return 0
@@ -207,7 +310,7 @@ class UserDataRepository:
         """Get user data for a wallet address"""
         try:
             result = await session.execute(
-                select(UserData).where(UserData.wallet_address == wallet_address)
+                lambda_stmt(lambda: select(UserData).where(UserData.wallet_address == wallet_address))
             )
             return result.scalar_one_or_none()
         except Exception as e:
@@ -218,24 +321,25 @@ class UserDataRepository:
     async def upsert_user_data(
         session: AsyncSession,
         wallet_address: str,
-        metadata: Optional[Dict[str, Any]] = None
+        data_key: str,
+        data_value: Optional[str] = None
     ) -> UserData:
-        """Insert or update user data"""
+        """Insert or update one user data entry (one INSERT ... ON CONFLICT round trip)"""
         try:
-            existing = await UserDataRepository.get_user_data(session, wallet_address)
-            
-            if existing:
-                if metadata:
-                    existing.tx_metadata = metadata
-                existing.updated_at = datetime.utcnow()
-                return existing
-            else:
-                new_data = UserData(
-                    wallet_address=wallet_address,
-                    metadata=metadata or {}
-                )
-                session.add(new_data)
-                return new_data
+            stmt = pg_insert(UserData).values(
+                wallet_address=wallet_address,
+                data_key=data_key,
+                data_value=data_value
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint='uq_user_data_wallet_key',
+                set_={
+                    "data_value": stmt.excluded.data_value,
+                    "updated_at": func.now(),
+                }
+            ).returning(UserData)
+            result = await session.execute(stmt, execution_options={"populate_existing": True})
+            return result.scalar_one()
         except Exception as e:
             logger.error(f"Error upserting user data: {e}", exc_info=True, extra={"address": wallet_address})
             raise
@@ -268,7 +372,7 @@ class BatchUpdateRepository:
         """Get batch update by ID"""
         try:
             result = await session.execute(
-                select(BatchUpdate).where(BatchUpdate.batch_id == batch_id)
+                lambda_stmt(lambda: select(BatchUpdate).where(BatchUpdate.batch_id == batch_id))
             )
             return result.scalar_one_or_none()
         except Exception as e:
@@ -282,19 +386,19 @@ class BatchUpdateRepository:
         status: str,
         error_message: Optional[str] = None
     ) -> bool:
-        """Update batch status"""
+        """Update batch status (single UPDATE, no prior SELECT)"""
         try:
-            batch = await BatchUpdateRepository.get_batch(session, batch_id)
-            if not batch:
-                return False
-            
-            batch.status = status
+            values = {"status": status}
             if status in ["completed", "failed"]:
-                batch.completed_at = datetime.utcnow()
+                values["completed_at"] = datetime.utcnow()
             if error_message:
-                batch.error_message = error_message
+                # batch_updates has no error column
+                logger.warning(f"Batch {batch_id} {status}: {error_message}", extra={"batch_id": batch_id})
             
-            return True
+            result = await session.execute(
+                update(BatchUpdate).where(BatchUpdate.batch_id == batch_id).values(**values)
+            )
+            return result.rowcount > 0
         except Exception as e:
             logger.error(f"Error updating batch status: {e}", exc_info=True, extra={"batch_id": batch_id})
             return False
@@ -308,10 +412,10 @@ class UserRepository:
         """Get user by wallet address"""
         try:
             result = await session.execute(
-                select(User).where(
+                lambda_stmt(lambda: select(User).where(
                     User.wallet_address == wallet_address,
                     User.deleted_at.is_(None)
-                )
+                ))
             )
             return result.scalar_one_or_none()
         except Exception as e:
@@ -344,18 +448,18 @@ class UserRepository:
         wallet_address: str,
         consent: bool
     ) -> bool:
-        """Update GDPR consent"""
+        """Update GDPR consent (single UPDATE ... RETURNING)"""
         try:
-            user = await UserRepository.get_user(session, wallet_address)
-            if not user:
+            result = await session.execute(
+                update(User)
+                .where(User.wallet_address == wallet_address, User.deleted_at.is_(None))
+                .values(gdpr_consent=consent, consent_date=datetime.utcnow() if consent else None)
+                .returning(User.wallet_address)
+            )
+            if result.scalar_one_or_none() is None:
                 return False
             
-            user.gdpr_consent = consent
-            if consent:
-                user.consent_date = datetime.utcnow()
-            else:
-                user.consent_date = None
-            
+            mark_stale(session, User, [wallet_address])
             return True
         except Exception as e:
             logger.error(f"Error updating GDPR consent: {e}", exc_info=True, extra={"address": wallet_address})
@@ -366,15 +470,18 @@ class UserRepository:
         session: AsyncSession,
         wallet_address: str
     ) -> bool:
-        """Request data deletion (soft delete)"""
+        """Request data deletion (soft delete; single UPDATE ... RETURNING)"""
         try:
-            user = await UserRepository.get_user(session, wallet_address)
-            if not user:
+            result = await session.execute(
+                update(User)
+                .where(User.wallet_address == wallet_address, User.deleted_at.is_(None))
+                .values(data_deletion_requested=True, deletion_requested_at=datetime.utcnow())
+                .returning(User.wallet_address)
+            )
+            if result.scalar_one_or_none() is None:
                 return False
             
-            user.data_deletion_requested = True
-            user.deletion_requested_at = datetime.utcnow()
-            
+            mark_stale(session, User, [wallet_address])
             return True
         except Exception as e:
             logger.error(f"Error requesting deletion: {e}", exc_info=True, extra={"address": wallet_address})
@@ -420,13 +527,22 @@ class LoanRepository:
     async def get_loans_by_user(
         session: AsyncSession,
         wallet_address: str,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        load_payments: bool = False
     ) -> List[Loan]:
-        """Get loans for a user"""
+        """
+        Get loans for a user
+        
+        With load_payments, Loan.payments for all returned loans is loaded by
+        one extra SELECT ... WHERE loan_id IN (...) (lazy loads do not work
+        under asyncio).
+        """
         try:
             query = select(Loan).where(Loan.wallet_address == wallet_address)
             if status:
                 query = query.where(Loan.status == status)
+            if load_payments:
+                query = query.options(selectinload(Loan.payments))
             
             result = await session.execute(query.order_by(Loan.created_at.desc()))
             return list(result.scalars().all())
@@ -550,7 +666,7 @@ class GDPRRepository:
         """Get GDPR request by ID"""
         try:
             result = await session.execute(
-                select(GDPRRequest).where(GDPRRequest.id == request_id)
+                lambda_stmt(lambda: select(GDPRRequest).where(GDPRRequest.id == request_id))
             )
             return result.scalar_one_or_none()
         except Exception as e:
@@ -565,22 +681,36 @@ class GDPRRepository:
         export_file_path: Optional[str] = None,
         error_message: Optional[str] = None
     ) -> bool:
-        """Update GDPR request status"""
+        """Update GDPR request status (single UPDATE, no prior SELECT)"""
         try:
-            request = await GDPRRepository.get_request(session, request_id)
-            if not request:
-                return False
-            
-            request.status = status
+            values = {"status": status}
             if status == "completed":
-                request.completed_at = datetime.utcnow()
+                values["completed_at"] = datetime.utcnow()
             if export_file_path:
-                request.export_file_path = export_file_path
+                values["export_file_path"] = export_file_path
             if error_message:
-                request.error_message = error_message
+                values["error_message"] = error_message
             
-            return True
+            result = await session.execute(
+                update(GDPRRequest).where(GDPRRequest.id == request_id).values(**values)
+            )
+            return result.rowcount > 0
         except Exception as e:
             logger.error(f"Error updating GDPR request: {e}", exc_info=True, extra={"request_id": request_id})
             return False
 
+
+class WalletProfileRepository:
+    """Repository for the denormalized wallet profile"""
+    
+    @staticmethod
+    async def get_profile(session: AsyncSession, wallet_address: str) -> Optional[WalletProfile]:
+        """Get the trigger-maintained profile for a wallet address"""
+        try:
+            result = await session.execute(
+                select(WalletProfile).where(WalletProfile.wallet_address == wallet_address)
+            )
+            return result.scalar_one_or_none()
+        except Exception as e:
+            logger.error(f"Error getting wallet profile: {e}", exc_info=True, extra={"address": wallet_address})
+            return None
@@ -0,0 +1,112 @@
+"""
+UNLOGGED staging tables for indexer intake
+
+The indexer can write into transactions_staging / token_transfers_staging,
+which skip WAL, and a periodic job moves the rows into the logged tables
+with INSERT ... SELECT inside a single transaction.
+"""
+from typing import Dict, Any, List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from .bulk import bulk_copy
+from .models import TransactionStaging, TokenTransferStaging
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Columns copied verbatim from transactions_staging into transactions
+TRANSACTION_COLUMNS = (
+    "wallet_address, tx_hash, tx_type, chain_id, chain_name, block_number, "
+    "block_timestamp, from_address, to_address, value, gas_used, gas_price, "
+    "status, contract_address, method_id, tx_metadata"
+)
+
+TOKEN_TRANSFER_COLUMNS = (
+    "tx_hash, chain_id, token_address, token_type, from_address, to_address, "
+    "amount, token_id, block_number"
+)
+
+# Writers are blocked (reads are not) until commit, so rows staged while a
+# flush runs are never truncated without being moved
+LOCK_STAGING = text(
+    "LOCK TABLE transactions_staging, token_transfers_staging IN EXCLUSIVE MODE"
+)
+
+# Latest staged row per tx_hash wins; input data goes to the side table.
+# Rows without block_timestamp (the partition key) can't be moved.
+FLUSH_TRANSACTIONS = text(f"""
+    WITH staged AS (
+        SELECT DISTINCT ON (tx_hash) *
+        FROM transactions_staging
+        WHERE block_timestamp IS NOT NULL
+        ORDER BY tx_hash, id DESC
+    ), moved AS (
+        INSERT INTO transactions ({TRANSACTION_COLUMNS})
+        SELECT {TRANSACTION_COLUMNS} FROM staged
+        ON CONFLICT (tx_hash, block_timestamp) DO NOTHING
+        RETURNING id, tx_hash, block_timestamp
+    ), inputs AS (
+        INSERT INTO transaction_inputs (tx_id, block_timestamp, data)
+        SELECT moved.id, moved.block_timestamp, staged.input_data
+        FROM moved JOIN staged USING (tx_hash)
+        WHERE staged.input_data IS NOT NULL
+    )
+    SELECT count(*) FROM moved
+""")
+
+# Transfers take their parent transaction's block_timestamp (partition key);
+# ones whose parent is not indexed are dropped
+FLUSH_TOKEN_TRANSFERS = text(f"""
+    INSERT INTO token_transfers ({TOKEN_TRANSFER_COLUMNS}, block_timestamp)
+    SELECT s.tx_hash, s.chain_id, s.token_address, s.token_type, s.from_address,
+           s.to_address, s.amount, s.token_id, s.block_number, t.block_timestamp
+    FROM token_transfers_staging s
+    JOIN transactions t ON t.tx_hash = s.tx_hash
+    ON CONFLICT ON CONSTRAINT uq_transfer_dedup DO NOTHING
+""")
+
+TRUNCATE_STAGING = text("TRUNCATE transactions_staging, token_transfers_staging")
+
+COUNT_STAGED = text("SELECT count(*) FROM transactions_staging")
+
+
+async def stage_rows(
+    session: AsyncSession,
+    transactions: List[Dict[str, Any]],
+    token_transfers: List[Dict[str, Any]]
+) -> None:
+    """Append indexer rows to the staging tables (COPY for large batches)"""
+    await bulk_copy(session, TransactionStaging, transactions)
+    await bulk_copy(session, TokenTransferStaging, token_transfers)
+
+
+async def count_staged(session: AsyncSession) -> int:
+    """Number of staged transactions waiting for a flush"""
+    result = await session.execute(COUNT_STAGED)
+    return result.scalar_one()
+
+
+async def flush_staging(session: AsyncSession) -> Dict[str, int]:
+    """
+    Move staged rows into the logged tables and empty the staging tables
+    
+    Runs in the caller's transaction; the caller commits.
+    
+    Returns:
+        Dict with moved transaction and token transfer counts
+    """
+    try:
+        await session.execute(LOCK_STAGING)
+        result = await session.execute(FLUSH_TRANSACTIONS)
+        transactions_moved = result.scalar_one()
+        result = await session.execute(FLUSH_TOKEN_TRANSFERS)
+        token_transfers_moved = result.rowcount
+        await session.execute(TRUNCATE_STAGING)
+        
+        return {
+            "transactions": transactions_moved,
+            "token_transfers": token_transfers_moved,
+        }
+    except Exception as e:
+        logger.error(f"Error flushing staging tables: {e}", exc_info=True)
+        raise
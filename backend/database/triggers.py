@@ -0,0 +1,226 @@
+"""
+Trigger-maintained aggregates
+
+- loans.payments_count / total_repaid and transactions.token_transfers_count
+  are counted by triggers on loan_payments and token_transfers.
+- wallet_profiles holds one denormalized dashboard row per wallet, refreshed
+  by triggers on scores, loans and alerts.
+- teams.weighted_score_sum / score_weight_sum / member_count are kept current
+  by triggers on team_members and scores, so a team's aggregate score is read
+  from its own row instead of scanning and joining every member. A member's
+  weight is its contribution_score (1.0 when unset); only members with a
+  score count towards score_weight_sum.
+
+init_db installs all of them on fresh databases; migrations install the
+same statements.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Keep in sync with migrations 017_child_counters and 029_partition_time_series
+# (token_transfers_counter matches on the partition key so the parent UPDATE
+# is pruned)
+CHILD_COUNTER_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION loan_payments_counter() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE loans
+            SET payments_count = payments_count + 1,
+                total_repaid = COALESCE(total_repaid, 0) + NEW.amount
+            WHERE id = NEW.loan_id;
+            RETURN NEW;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE loans
+            SET payments_count = payments_count - 1,
+                total_repaid = COALESCE(total_repaid, 0) - OLD.amount
+            WHERE id = OLD.loan_id;
+            RETURN OLD;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION token_transfers_counter() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE transactions
+            SET token_transfers_count = COALESCE(token_transfers_count, 0) + 1
+            WHERE tx_hash = NEW.tx_hash AND block_timestamp = NEW.block_timestamp;
+            RETURN NEW;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE transactions
+            SET token_transfers_count = COALESCE(token_transfers_count, 0) - 1
+            WHERE tx_hash = OLD.tx_hash AND block_timestamp = OLD.block_timestamp;
+            RETURN OLD;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_loan_payments_counter ON loan_payments",
+    """
+    CREATE TRIGGER trg_loan_payments_counter
+    AFTER INSERT OR DELETE ON loan_payments
+    FOR EACH ROW EXECUTE FUNCTION loan_payments_counter()
+    """,
+    "DROP TRIGGER IF EXISTS trg_token_transfers_counter ON token_transfers",
+    """
+    CREATE TRIGGER trg_token_transfers_counter
+    AFTER INSERT OR DELETE ON token_transfers
+    FOR EACH ROW EXECUTE FUNCTION token_transfers_counter()
+    """,
+]
+
+WALLET_PROFILE_TABLES = ("scores", "loans", "alerts")
+
+# Keep in sync with migration 027_wallet_profiles
+WALLET_PROFILE_TRIGGERS = [
+    # Recompute one wallet's row from its source tables
+    """
+    CREATE OR REPLACE FUNCTION refresh_wallet_profile(addr bytea) RETURNS void AS $$
+    BEGIN
+        INSERT INTO wallet_profiles (
+            wallet_address, score, risk_band, active_loan_count, total_borrowed,
+            unread_alert_count, last_score_change_at, updated_at
+        )
+        SELECT
+            addr,
+            s.score,
+            s.risk_band,
+            (SELECT count(*) FROM loans l WHERE l.wallet_address = addr AND l.status = 'active'),
+            (SELECT COALESCE(sum(l.amount), 0) FROM loans l WHERE l.wallet_address = addr),
+            (SELECT count(*) FROM alerts a
+             WHERE a.wallet_address = addr AND a.read = false AND a.dismissed = false),
+            s.last_updated,
+            now()
+        FROM (SELECT 1) AS one
+        LEFT JOIN scores s ON s.wallet_address = addr
+        WHERE EXISTS (SELECT 1 FROM users u WHERE u.wallet_address = addr)
+        ON CONFLICT (wallet_address) DO UPDATE SET
+            score = EXCLUDED.score,
+            risk_band = EXCLUDED.risk_band,
+            active_loan_count = EXCLUDED.active_loan_count,
+            total_borrowed = EXCLUDED.total_borrowed,
+            unread_alert_count = EXCLUDED.unread_alert_count,
+            last_score_change_at = EXCLUDED.last_score_change_at,
+            updated_at = EXCLUDED.updated_at;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION wallet_profile_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM refresh_wallet_profile(OLD.wallet_address);
+            RETURN OLD;
+        END IF;
+        PERFORM refresh_wallet_profile(NEW.wallet_address);
+        IF TG_OP = 'UPDATE' AND OLD.wallet_address IS DISTINCT FROM NEW.wallet_address THEN
+            PERFORM refresh_wallet_profile(OLD.wallet_address);
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+] + [
+    statement
+    for table in WALLET_PROFILE_TABLES
+    for statement in (
+        f"DROP TRIGGER IF EXISTS trg_{table}_wallet_profile ON {table}",
+        f"""
+    CREATE TRIGGER trg_{table}_wallet_profile
+    AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION wallet_profile_trigger()
+    """,
+    )
+]
+
+# Profiles for wallets that have none yet (all of them on first install);
+# cheap to repeat once every wallet has its row
+WALLET_PROFILE_BACKFILL = """
+    SELECT refresh_wallet_profile(u.wallet_address)
+    FROM users u
+    WHERE NOT EXISTS (SELECT 1 FROM wallet_profiles p WHERE p.wallet_address = u.wallet_address)
+"""
+
+# Keep in sync with migration 044_team_aggregate_triggers
+TEAM_AGGREGATE_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION team_members_aggregate_trigger() RETURNS trigger AS $$
+    DECLARE
+        member_score integer;
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            SELECT score INTO member_score FROM scores WHERE wallet_address = OLD.wallet_address;
+            UPDATE teams SET
+                member_count = member_count - 1,
+                weighted_score_sum = weighted_score_sum
+                    - COALESCE(member_score * COALESCE(OLD.contribution_score, 1.0), 0),
+                score_weight_sum = score_weight_sum
+                    - CASE WHEN member_score IS NULL THEN 0 ELSE COALESCE(OLD.contribution_score, 1.0) END
+            WHERE id = OLD.team_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            SELECT score INTO member_score FROM scores WHERE wallet_address = NEW.wallet_address;
+            UPDATE teams SET
+                member_count = member_count + 1,
+                weighted_score_sum = weighted_score_sum
+                    + COALESCE(member_score * COALESCE(NEW.contribution_score, 1.0), 0),
+                score_weight_sum = score_weight_sum
+                    + CASE WHEN member_score IS NULL THEN 0 ELSE COALESCE(NEW.contribution_score, 1.0) END
+            WHERE id = NEW.team_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION scores_team_aggregate_trigger() RETURNS trigger AS $$
+    DECLARE
+        old_score integer := CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE OLD.score END;
+        new_score integer := CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.score END;
+        wallet bytea := CASE WHEN TG_OP = 'DELETE' THEN OLD.wallet_address ELSE NEW.wallet_address END;
+    BEGIN
+        UPDATE teams t SET
+            weighted_score_sum = t.weighted_score_sum + w.delta_score,
+            score_weight_sum = t.score_weight_sum + w.delta_weight
+        FROM (
+            SELECT tm.team_id,
+                   sum((COALESCE(new_score, 0) - COALESCE(old_score, 0))
+                       * COALESCE(tm.contribution_score, 1.0)) AS delta_score,
+                   sum(CASE
+                       WHEN old_score IS NULL AND new_score IS NOT NULL THEN COALESCE(tm.contribution_score, 1.0)
+                       WHEN old_score IS NOT NULL AND new_score IS NULL THEN -COALESCE(tm.contribution_score, 1.0)
+                       ELSE 0
+                   END) AS delta_weight
+            FROM team_members tm
+            WHERE tm.wallet_address = wallet
+            GROUP BY tm.team_id
+        ) w
+        WHERE t.id = w.team_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_team_members_aggregate ON team_members",
+    """
+    CREATE TRIGGER trg_team_members_aggregate
+    AFTER INSERT OR DELETE OR UPDATE OF team_id, wallet_address, contribution_score ON team_members
+    FOR EACH ROW EXECUTE FUNCTION team_members_aggregate_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_scores_team_aggregate ON scores",
+    """
+    CREATE TRIGGER trg_scores_team_aggregate
+    AFTER INSERT OR DELETE OR UPDATE OF score ON scores
+    FOR EACH ROW EXECUTE FUNCTION scores_team_aggregate_trigger()
+    """,
+]
+
+
+async def create_triggers(conn: AsyncConnection) -> None:
+    """Install aggregate triggers and backfill missing wallet profiles (see init_db)"""
+    for statement in CHILD_COUNTER_TRIGGERS + WALLET_PROFILE_TRIGGERS + TEAM_AGGREGATE_TRIGGERS:
+        await conn.execute(text(statement))
+    await conn.execute(text(WALLET_PROFILE_BACKFILL))
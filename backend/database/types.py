@@ -0,0 +1,92 @@
+"""
+Custom column types for NeuroCred models
+"""
+import sys
+from decimal import Decimal
+from sqlalchemy.dialects.postgresql import BYTEA, NUMERIC
+from sqlalchemy.types import TypeDecorator
+
+
+class _FixedHexBytes(TypeDecorator):
+    """
+    Fixed-width hex value ("0x..." in Python) stored as raw bytes.
+    
+    Binding accepts hex strings in any case, with or without the 0x prefix,
+    or raw bytes; results always come back as lowercase "0x" strings.
+    
+    With intern_results set, result strings are interned so rows sharing a
+    value (the same wallet on thousands of transfers) share one str object.
+    """
+    impl = BYTEA
+    cache_ok = True
+    
+    byte_length = None
+    intern_results = False
+    result_prefix = "0x"
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            raw = bytes(value)
+        else:
+            if value[:2] in ("0x", "0X"):
+                value = value[2:]
+            raw = bytes.fromhex(value)
+        if len(raw) != self.byte_length:
+            raise ValueError(
+                f"{type(self).__name__} expects {self.byte_length} bytes, got {len(raw)}"
+            )
+        return raw
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        result = self.result_prefix + bytes(value).hex()
+        return sys.intern(result) if self.intern_results else result
+
+
+class EthAddress(_FixedHexBytes):
+    """EVM address stored as 20 raw bytes (BYTEA) instead of 42 hex chars"""
+    byte_length = 20
+    intern_results = True
+
+
+class TxHash(_FixedHexBytes):
+    """Transaction hash stored as 32 raw bytes (BYTEA) instead of 66 hex chars"""
+    byte_length = 32
+
+
+class KeyHash(_FixedHexBytes):
+    """
+    SHA-256 digest stored as 32 raw bytes (BYTEA) instead of 64 hex chars.
+    
+    Results come back as bare lowercase hex, matching hashlib's hexdigest().
+    """
+    byte_length = 32
+    result_prefix = ""
+
+
+class TokenAmount(TypeDecorator):
+    """
+    Token amount in integer base units (wei), up to uint256.
+    
+    Stored as NUMERIC(78, 0): BIGINT tops out at ~9.2 ETH in wei. Results
+    come back as Python int, so sums and balances stay in exact integer
+    arithmetic instead of Decimal.
+    """
+    impl = NUMERIC(78, 0)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        amount = Decimal(value)
+        if amount != amount.to_integral_value():
+            raise ValueError(f"TokenAmount expects integer base units, got {value}")
+        return amount
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        return int(value)
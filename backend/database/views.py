@@ -0,0 +1,71 @@
+"""
+Materialized views
+
+leaderboard_entries ranks every score per leaderboard category. The RANK()
+window runs once per refresh (workers/leaderboard_job.py) instead of on
+every leaderboard request; reads are index scans on the view.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Keep in sync with migrations 038_leaderboard_view, 039_leaderboard_covering_index,
+# 043_smallint_risk_band and 048_leaderboard_stable_rows. Columns run
+# widest-alignment first (timestamps, integers, smallint, then variable-length)
+# so rows carry no padding. Every column is a function of the underlying
+# score, so a refresh only rewrites entries whose score or rank changed.
+LEADERBOARD_ENTRIES_VIEW = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS leaderboard_entries AS
+    WITH periods (category, period_start, period_end) AS (
+        VALUES
+            ('all_time', NULL::timestamptz, NULL::timestamptz),
+            ('monthly', date_trunc('month', now()), date_trunc('month', now()) + interval '1 month'),
+            ('weekly', date_trunc('week', now()), date_trunc('week', now()) + interval '1 week')
+    )
+    SELECT p.period_start,
+           p.period_end,
+           s.last_updated AS updated_at,
+           s.score,
+           (RANK() OVER (PARTITION BY p.category ORDER BY s.score DESC))::integer AS rank,
+           s.risk_band,
+           s.wallet_address,
+           p.category::varchar(20) AS category
+    FROM periods p
+    JOIN scores s ON p.period_start IS NULL OR s.last_updated >= p.period_start
+    JOIN users u ON u.wallet_address = s.wallet_address AND u.deleted_at IS NULL
+"""
+
+LEADERBOARD_ENTRIES_INDEXES = [
+    # REFRESH ... CONCURRENTLY needs a unique index over all rows
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_leaderboard_wallet_category ON leaderboard_entries (wallet_address, category)",
+    # Covers the top-N page, so it is answered by an index-only scan
+    "CREATE INDEX IF NOT EXISTS idx_leaderboard_category_rank ON leaderboard_entries (category, rank) "
+    "INCLUDE (wallet_address, score, risk_band, updated_at)",
+    # Each refresh rewrites most rows; vacuum soon after so the visibility
+    # map lets index-only scans skip the heap
+    "ALTER MATERIALIZED VIEW leaderboard_entries SET (autovacuum_vacuum_scale_factor = 0.02)",
+]
+
+
+async def create_views(conn: AsyncConnection) -> None:
+    """Create materialized views and their indexes (fresh databases; see init_db)"""
+    await conn.execute(text(LEADERBOARD_ENTRIES_VIEW))
+    for statement in LEADERBOARD_ENTRIES_INDEXES:
+        await conn.execute(text(statement))
+
+
+async def refresh_leaderboard(session: AsyncSession) -> None:
+    """
+    Recompute leaderboard_entries
+    
+    CONCURRENTLY keeps the old rows readable while the new ranking is built,
+    and diffs old against new so unchanged entries are not rewritten. Runs in
+    the caller's transaction.
+    """
+    try:
+        await session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY leaderboard_entries"))
+    except Exception as e:
+        logger.error(f"Error refreshing leaderboard: {e}", exc_info=True)
+        raise
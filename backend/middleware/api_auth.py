@@ -1,24 +1,43 @@
 """
 API key authentication middleware for public API
+
+Key rows come from the read-through cache (database.cache) and each key's
+per-minute rate_limit is counted in Redis, so an authenticated request
+normally makes no database round trip. last_used_at is not written by the
+request: used key ids are queued with services.api_access.record_key_use
+and flushed in one UPDATE by a background task.
 """
+import time
 from typing import Optional
 from fastapi import HTTPException, Request, status
+from middleware.rate_limit import RATE_LIMIT_ENABLED, count_request
 from utils.logger import get_logger
+from database.cache import get_api_access
 from database.connection import get_db_session
 from database.models import APIAccess
-from sqlalchemy import select
+from services.api_access import record_key_use
 import hashlib
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = get_logger(__name__)
 
+RATE_LIMIT_PREFIX = "neurocred:rate:api_key"
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
 
 async def get_api_key(request: Request) -> Optional[APIAccess]:
     """
     Get API key from request and validate
     
     Returns:
-        APIAccess object if valid, None otherwise
+        APIAccess object (detached, built from the cached row) if valid,
+        None otherwise
     """
     try:
         # Get API key from header
@@ -30,29 +49,32 @@ async def get_api_key(request: Request) -> Optional[APIAccess]:
         # Hash the API key
         key_hash = hashlib.sha256(api_key.encode()).hexdigest()
         
-        # Look up API key in database
+        # Look up API key (Redis first, then database)
         async with get_db_session() as session:
-            result = await session.execute(
-                select(APIAccess).where(APIAccess.api_key == key_hash)
-            )
-            api_key_obj = result.scalar_one_or_none()
-            
-            if not api_key_obj:
-                return None
-            
-            # Check if revoked
-            if api_key_obj.revoked_at:
-                return None
-            
-            # Check if expired
-            if api_key_obj.expires_at and api_key_obj.expires_at < datetime.utcnow():
-                return None
-            
-            # Update last used
-            api_key_obj.last_used_at = datetime.utcnow()
-            await session.commit()
-            
-            return api_key_obj
+            row = await get_api_access(session, key_hash)
+        
+        if not row:
+            return None
+        
+        # Check if revoked
+        if row["revoked_at"]:
+            return None
+        
+        # Check if expired
+        expires_at = _parse_timestamp(row["expires_at"])
+        if expires_at and expires_at < datetime.now(timezone.utc):
+            return None
+        
+        return APIAccess(
+            id=row["id"],
+            protocol_address=row["protocol_address"],
+            api_key=row["api_key"],
+            permissions=row["permissions"],
+            rate_limit=row["rate_limit"],
+            created_at=_parse_timestamp(row["created_at"]),
+            last_used_at=_parse_timestamp(row["last_used_at"]),
+            expires_at=expires_at,
+        )
     except Exception as e:
         logger.error(f"Error validating API key: {e}", exc_info=True)
         return None
@@ -60,7 +82,7 @@ async def get_api_key(request: Request) -> Optional[APIAccess]:
 
 async def require_api_key(request: Request) -> APIAccess:
     """
-    Require valid API key, raise exception if not present
+    Require valid API key within its rate limit, raise exception otherwise
     
     Returns:
         APIKey object
@@ -72,5 +94,16 @@ async def require_api_key(request: Request) -> APIAccess:
             detail="Invalid or missing API key",
             headers={"WWW-Authenticate": "ApiKey"},
         )
+    
+    if RATE_LIMIT_ENABLED:
+        now = int(time.time())
+        count = count_request(f"{RATE_LIMIT_PREFIX}:{api_key.api_key}:{now // 60}", 60)
+        if count is not None and count > api_key.rate_limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded: {api_key.rate_limit} requests per minute",
+                headers={"Retry-After": str(60 - now % 60)},
+            )
+    
+    record_key_use(api_key.id)
     return api_key
-
@@ -3,13 +3,19 @@ Authentication middleware
 Supports both API keys and JWT tokens
 """
 from fastapi import Request, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import HTTPBearer
 from typing import Optional
-from utils.jwt_handler import verify_token
+from utils.jwt_handler import verify_token_cached
 from utils.api_keys import validate_api_key, get_api_key_from_header
+from middleware.rbac import role_level
 
 security = HTTPBearer(auto_error=False)
 
+
+def _is_jwt(token: str) -> bool:
+    """JWTs are three dot-separated base64url segments"""
+    return token.count(".") == 2
+
 class AuthMiddleware:
     """Authentication middleware"""
     
@@ -45,31 +51,25 @@ class AuthMiddleware:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Try API key first
-        api_key = get_api_key_from_header(authorization)
-        if api_key and validate_api_key(api_key):
-            # API key is valid
-            request.state.auth_type = "api_key"
-            request.state.authenticated = True
-            return
+        # Parse the header once ("Bearer <token>", "ApiKey <key>" or a bare key)
+        # and send the credential to the validator matching its shape
+        token = get_api_key_from_header(authorization)
         
-        # Try JWT token
-        try:
-            credentials = HTTPAuthorizationCredentials(
-                scheme="bearer",
-                credentials=authorization.replace("Bearer ", "").replace("bearer ", "")
-            )
-            token = credentials.credentials
-            payload = verify_token(token)
-            
+        if _is_jwt(token):
+            payload = verify_token_cached(token)
             if payload:
                 request.state.auth_type = "jwt"
                 request.state.authenticated = True
                 request.state.user_address = payload.get("sub")
                 request.state.user_role = payload.get("role", "user")
+                # Parsed once here so RBAC checks are a single int compare
+                request.state.user_role_level = role_level(request.state.user_role)
                 return
-        except Exception:
-            pass
+        
+        if validate_api_key(token):
+            request.state.auth_type = "api_key"
+            request.state.authenticated = True
+            return
         
         # Authentication failed
         raise HTTPException(
@@ -1,52 +1,70 @@
 """
 Cache middleware for API responses
+
+Response bodies are cached as the raw JSON bytes the endpoint produced and
+served back unchanged, so neither a hit nor a miss parses or re-encodes JSON.
+On a miss the body streams to the client as it is produced and is stored
+once complete; responses that can't be cached are passed through untouched.
+Keys are an XXH3 fingerprint of the path and raw query string. Hits are
+served from a small per-worker LRU (utils.cache) before going to Redis.
 """
-import hashlib
-import json
+import os
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-from utils.cache import cache_api_response, get_cached_api_response, cache_key
+from starlette.responses import Response, StreamingResponse
+from utils.cache import cache_api_response_raw, clear_api_response_l1, get_cached_api_response_raw
 from utils.logger import get_logger
 from utils.metrics import record_error
 
 logger = get_logger(__name__)
 
-# Cacheable endpoints (GET requests only)
-CACHEABLE_ENDPOINTS = [
+# Cacheable endpoint prefixes (GET requests only); a tuple so
+# str.startswith checks them all in one call
+CACHEABLE_ENDPOINTS = (
     "/api/score/",
     "/api/staking/",
     "/api/lending/ltv/",
     "/api/oracle/price",
-]
+)
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Larger bodies are passed through uncached so they don't evict hot entries
+MAX_CACHE_BYTES = int(os.getenv("CACHE_MAX_RESPONSE_BYTES", str(256 * 1024)))
 
 
 class CacheMiddleware(BaseHTTPMiddleware):
     """Middleware for caching API responses"""
     
     async def dispatch(self, request: Request, call_next):
-        # Only cache GET requests
-        if request.method != "GET":
-            return await call_next(request)
+        # Read path and query straight from the scope; request.url would
+        # build a URL object just to split them back out
+        scope = request.scope
+        path = scope["path"]
         
         # Check if endpoint is cacheable
-        is_cacheable = any(request.url.path.startswith(endpoint) for endpoint in CACHEABLE_ENDPOINTS)
-        if not is_cacheable:
+        if not path.startswith(CACHEABLE_ENDPOINTS):
             return await call_next(request)
         
-        # Generate cache key from request
-        cache_params = {
-            "path": request.url.path,
-            "query": str(request.query_params)
-        }
-        cache_key_str = cache_key("api", request.url.path, cache_params)
+        # Only cache GET requests; a write to a cacheable endpoint drops this
+        # worker's in-memory copies
+        method = scope["method"]
+        if method != "GET":
+            if method in WRITE_METHODS:
+                clear_api_response_l1()
+            return await call_next(request)
+        
+        query = scope.get("query_string", b"").decode("latin-1")
         
         # Try to get from cache
-        cached_response = get_cached_api_response(request.url.path, cache_params)
-        if cached_response is not None:
-            logger.debug("Cache hit", extra={"endpoint": request.url.path})
+        cached_body = get_cached_api_response_raw(path, query)
+        if cached_body is not None:
+            # Served without routing; ObservabilityMiddleware leaves it out
+            # of route metrics and slow-request checks
+            scope.setdefault("state", {})["cache_hit"] = True
+            logger.debug("Cache hit", extra={"endpoint": path})
             return Response(
-                content=json.dumps(cached_response),
+                content=cached_body,
                 media_type="application/json",
                 headers={"X-Cache": "HIT"}
             )
@@ -54,32 +72,37 @@ class CacheMiddleware(BaseHTTPMiddleware):
         # Process request
         response = await call_next(request)
         
-        # Cache successful responses (200 OK)
-        if response.status_code == 200:
-            try:
-                # Read response body
-                body = b""
-                async for chunk in response.body_iterator:
-                    body += chunk
-                
-                # Parse JSON if possible
-                try:
-                    response_data = json.loads(body.decode())
-                    cache_api_response(request.url.path, cache_params, response_data)
-                    logger.debug("Cached response", extra={"endpoint": request.url.path})
-                except json.JSONDecodeError:
-                    pass  # Don't cache non-JSON responses
-                
-                # Return response with cache header
-                return Response(
-                    content=body,
-                    status_code=response.status_code,
-                    headers={**dict(response.headers), "X-Cache": "MISS"},
-                    media_type=response.media_type
-                )
-            except Exception as e:
-                logger.warning(f"Cache middleware error: {e}", extra={"error": str(e)})
-                return response
+        # Cache successful JSON responses (200 OK); anything else, or a body
+        # known to be over the size cap, streams through without buffering
+        content_type = response.headers.get("content-type", "")
+        content_length = response.headers.get("content-length")
+        if (
+            response.status_code != 200
+            or not content_type.startswith("application/json")
+            or (content_length is not None and int(content_length) > MAX_CACHE_BYTES)
+        ):
+            return response
         
-        return response
-
+        async def tee():
+            # Pass chunks on as they arrive, caching the body once it completes
+            chunks = []
+            size = 0
+            async for chunk in response.body_iterator:
+                if size <= MAX_CACHE_BYTES:
+                    chunks.append(chunk)
+                    size += len(chunk)
+                yield chunk
+            
+            if size <= MAX_CACHE_BYTES:
+                body = b"".join(chunks)
+                if body[:1] in (b"{", b"["):
+                    cache_api_response_raw(path, query, body)
+                    logger.debug("Cached response", extra={"endpoint": path})
+        
+        return StreamingResponse(
+            tee(),
+            status_code=response.status_code,
+            headers={**dict(response.headers), "X-Cache": "MISS"},
+            media_type=response.media_type,
+            background=response.background,
+        )
@@ -0,0 +1,342 @@
+"""
+Request observability middleware
+
+One pure-ASGI layer does request logging, Prometheus metrics and
+slow-request monitoring, sharing a single send wrapper, clock reading and
+exception handler:
+
+- Logging: correlation/request IDs go to request state and response
+  headers, and the request's fields are bound once in
+  utils.logger.request_context for every log line emitted while it runs.
+- Metrics: requests are labelled with the matched route template
+  ("/api/score/{address}") rather than the raw path. The labelled metric
+  children for each (method, route, status) are looked up once and
+  reused, and updates are queued with inc_later/observe_later.
+- Performance: X-Response-Time (time to first response byte, off by
+  default in production via RESPONSE_TIME_HEADER_ENABLED) and slow-request
+  reports. Timing is in integer perf_counter_ns nanoseconds.
+
+Log lines and Sentry calls for completed requests run off the request path
+(utils.logger.emit_later).
+"""
+import logging
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.logger import emit_later, get_logger, request_context
+from utils.metrics import (
+    PROBE_PATHS,
+    record_http_request,
+    record_api_request,
+    active_requests,
+    record_error,
+    http_requests_total,
+    http_request_duration_seconds,
+    api_requests_total,
+    api_request_duration_seconds,
+    errors_total,
+    inc_later,
+    observe_later,
+)
+from utils.monitoring import capture_message, add_breadcrumb
+
+logger = get_logger(__name__)
+
+# Performance thresholds
+SLOW_REQUEST_THRESHOLD = 1.0  # 1 second
+VERY_SLOW_REQUEST_THRESHOLD = 5.0  # 5 seconds
+_SLOW_REQUEST_THRESHOLD_NS = int(SLOW_REQUEST_THRESHOLD * 1_000_000_000)
+_VERY_SLOW_REQUEST_THRESHOLD_NS = int(VERY_SLOW_REQUEST_THRESHOLD * 1_000_000_000)
+
+# Endpoint label for requests that matched no route (keeps 404 scans from
+# creating a series per probed path)
+UNMATCHED_ENDPOINT = "unmatched"
+
+# Method label values; anything else (WebDAV verbs, scanner junk) is
+# recorded as OTHER_METHOD so the method label stays bounded too
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "OTHER"
+
+# Upper bound on cached label combinations; beyond it children are
+# resolved per request
+LABEL_CACHE_SIZE = 4096
+
+
+def _response_time_header_enabled() -> bool:
+    default = "false" if os.getenv("ENVIRONMENT", "development") == "production" else "true"
+    return os.getenv("RESPONSE_TIME_HEADER_ENABLED", default).lower() == "true"
+
+
+def _endpoint_label(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ENDPOINT
+
+
+class ObservabilityMiddleware:
+    """Middleware for request logging, metrics and slow-request monitoring"""
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        metrics: bool = True,
+        performance: bool = True,
+        emit_header: Optional[bool] = None,
+        skip_paths: Iterable[str] = PROBE_PATHS,
+    ):
+        """
+        Initialize observability middleware
+        
+        Args:
+            metrics: Record Prometheus metrics (METRICS_ENABLED)
+            performance: Report slow requests and add X-Response-Time
+                (PERFORMANCE_MONITORING_ENABLED)
+            emit_header: Add X-Response-Time (default: RESPONSE_TIME_HEADER_ENABLED)
+            skip_paths: Paths passed through untouched (scrapes, health probes)
+        """
+        self.app = app
+        self.metrics = metrics
+        self.performance = performance
+        self.emit_header = _response_time_header_enabled() if emit_header is None else emit_header
+        self.skip_paths = frozenset(skip_paths)
+        self._children: Dict[Tuple[str, str, int, bool], Tuple] = {}
+    
+    def _metric_children(self, method: str, endpoint: str, status_code: int, is_api: bool) -> Tuple:
+        """(requests counter, duration histogram, API counter, API histogram, error counter) for a label set"""
+        key = (method, endpoint, status_code, is_api)
+        children = self._children.get(key)
+        if children is None:
+            api_status = "success" if status_code < 400 else "error"
+            children = (
+                http_requests_total.labels(method=method, endpoint=endpoint, status_code=status_code),
+                http_request_duration_seconds.labels(method=method, endpoint=endpoint),
+                api_requests_total.labels(endpoint=endpoint, status=api_status) if is_api else None,
+                api_request_duration_seconds.labels(endpoint=endpoint) if is_api else None,
+                errors_total.labels(error_type=f"http_{status_code}", endpoint=endpoint) if status_code >= 400 else None,
+            )
+            if len(self._children) < LABEL_CACHE_SIZE:
+                self._children[key] = children
+        return children
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        path = scope["path"]
+        
+        request_id = forwarded_for = None
+        user_agent = "unknown"
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+            elif name == b"x-forwarded-for":
+                forwarded_for = value.decode("latin-1")
+            elif name == b"user-agent":
+                user_agent = value.decode("latin-1")
+        
+        # Reuse an upstream request ID as the correlation ID; only untraced
+        # requests need a fresh one (32 hex chars)
+        correlation_id = request_id or os.urandom(16).hex()
+        request_id = request_id or correlation_id
+        
+        endpoint = f"{method} {path}"
+        
+        # Add correlation ID to request state, with the endpoint label for
+        # inner middleware and endpoints
+        state = scope.setdefault("state", {})
+        state["correlation_id"] = correlation_id
+        state["request_id"] = request_id
+        state["endpoint"] = endpoint
+        
+        # Get client IP
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        if forwarded_for:
+            # First hop only; partition stops at the first comma
+            head, _, _ = forwarded_for.partition(",")
+            client_ip = head.strip() or client_ip
+        
+        # Bind the request's fields once for every log line below it
+        context_token = request_context.set({
+            "correlation_id": correlation_id,
+            "request_id": request_id,
+            "endpoint": endpoint,
+            "method": method,
+            "path": path,
+            "ip_address": client_ip,
+        })
+        try:
+            await self._handle(scope, receive, send, correlation_id, request_id, user_agent)
+        finally:
+            request_context.reset(context_token)
+    
+    async def _handle(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        correlation_id: str,
+        request_id: str,
+        user_agent: str,
+    ):
+        # Log request (formatted and written off the request path)
+        if logger.isEnabledFor(logging.INFO):
+            emit_later(
+                logger.info,
+                "Request started",
+                extra={
+                    "user_agent": user_agent,
+                    "query_params": scope.get("query_string", b"").decode("latin-1"),
+                }
+            )
+        
+        status_code = 500
+        response_headers = [
+            (b"x-correlation-id", correlation_id.encode()),
+            (b"x-request-id", request_id.encode("latin-1")),
+        ]
+        emit_header = self.performance and self.emit_header
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [*message.get("headers", ()), *response_headers]
+                # Add performance header
+                if emit_header:
+                    elapsed_ns = time.perf_counter_ns() - start_ns
+                    headers.append((b"x-response-time", f"{elapsed_ns / 1_000_000_000:.3f}s".encode()))
+                message["headers"] = headers
+            await send(message)
+        
+        if self.metrics:
+            active_requests.inc()
+        start_ns = time.perf_counter_ns()
+        
+        # Process request
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # Calculate duration
+            duration_ns = time.perf_counter_ns() - start_ns
+            
+            # Record error
+            if self.metrics:
+                duration = duration_ns / 1_000_000_000
+                label = _endpoint_label(scope)
+                record_error(type(e).__name__, label)
+                record_http_request(self._method_label(scope), label, 500, duration)
+                record_api_request(label, "error", duration)
+            
+            # Log error
+            logger.error(
+                "Request failed",
+                exc_info=True,
+                extra={
+                    "duration_ms": duration_ns / 1_000_000,
+                    "error_type": type(e).__name__,
+                    "error_message": str(e),
+                }
+            )
+            
+            raise
+        finally:
+            if self.metrics:
+                active_requests.dec()
+        
+        duration_ns = time.perf_counter_ns() - start_ns
+        
+        # Log response (duration converted to ms only when it is logged)
+        if logger.isEnabledFor(logging.INFO):
+            emit_later(
+                logger.info,
+                "Request completed",
+                extra={"status_code": status_code, "duration_ms": duration_ns / 1_000_000}
+            )
+        
+        # Responses served by CacheMiddleware matched no route; they were
+        # never counted or timed
+        if scope["state"].get("cache_hit"):
+            return
+        
+        if self.metrics:
+            self._record_metrics(scope, status_code, duration_ns)
+        
+        if self.performance and duration_ns > _SLOW_REQUEST_THRESHOLD_NS:
+            self._report_slow_request(scope["state"]["endpoint"], status_code, duration_ns)
+    
+    @staticmethod
+    def _method_label(scope: Scope) -> str:
+        method = scope["method"]
+        return method if method in HTTP_METHODS else OTHER_METHOD
+    
+    def _record_metrics(self, scope: Scope, status_code: int, duration_ns: int) -> None:
+        duration = duration_ns / 1_000_000_000
+        is_api = scope["path"].startswith("/api/")
+        requests, durations, api_requests, api_durations, errors = self._metric_children(
+            self._method_label(scope), _endpoint_label(scope), status_code, is_api
+        )
+        
+        # Record HTTP metrics
+        inc_later(requests)
+        observe_later(durations, duration)
+        
+        # Record API metrics for API endpoints
+        if api_requests is not None:
+            inc_later(api_requests)
+            observe_later(api_durations, duration)
+        
+        # Record errors
+        if errors is not None:
+            inc_later(errors)
+    
+    def _report_slow_request(self, endpoint: str, status_code: int, duration_ns: int) -> None:
+        duration = duration_ns / 1_000_000_000
+        
+        # Log slow requests; the log lines and Sentry calls run off the
+        # request path
+        if duration_ns > _VERY_SLOW_REQUEST_THRESHOLD_NS:
+            emit_later(
+                logger.warning,
+                "Very slow request detected",
+                extra={
+                    "duration": duration,
+                    "threshold": VERY_SLOW_REQUEST_THRESHOLD,
+                    "status_code": status_code,
+                }
+            )
+            
+            # Send to Sentry
+            emit_later(
+                capture_message,
+                f"Very slow request: {endpoint} took {duration:.2f}s",
+                level="warning",
+                endpoint=endpoint,
+                duration=duration,
+                status_code=status_code
+            )
+            
+            # Add breadcrumb
+            emit_later(
+                add_breadcrumb,
+                message=f"Slow request: {endpoint}",
+                category="performance",
+                level="warning",
+                data={
+                    "duration": duration,
+                    "endpoint": endpoint
+                }
+            )
+        
+        else:
+            emit_later(
+                logger.info,
+                "Slow request detected",
+                extra={
+                    "duration": duration,
+                    "threshold": SLOW_REQUEST_THRESHOLD,
+                    "status_code": status_code,
+                }
+            )
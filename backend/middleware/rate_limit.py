@@ -1,29 +1,161 @@
 """
 Rate limiting middleware
+
+Each check is one EVALSHA of a fixed-window counter script in Redis: INCR
+the window's key and set its expiry on the first hit, atomically and in a
+single round trip. Counters live in Redis, so limits hold across workers.
+When RATE_LIMIT_ENABLED is false the decorators return the endpoint
+unchanged; when Redis is unavailable requests are let through.
 """
+import functools
+import hashlib
 import os
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from fastapi import Request
-from typing import Callable
+import re
+import time
+from fastapi import HTTPException, Request, status
+from typing import Callable, Optional, Tuple
+from redis.exceptions import NoScriptError
+from utils.cache import get_redis_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Configuration
 RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
-RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
-RATE_LIMIT_PER_HOUR = int(os.getenv("RATE_LIMIT_PER_HOUR", "1000"))
 
-# Initialize limiter
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=[f"{RATE_LIMIT_PER_MINUTE}/minute", f"{RATE_LIMIT_PER_HOUR}/hour"],
-    storage_uri=os.getenv("REDIS_URL"),  # Use Redis if available, otherwise in-memory
-)
+RATE_LIMIT_PREFIX = "neurocred:rate:route"
+
+# KEYS[1] = window counter, ARGV[1] = window TTL in seconds
+WINDOW_COUNTER_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+WINDOW_COUNTER_SHA = hashlib.sha1(WINDOW_COUNTER_SCRIPT.encode()).hexdigest()
+
+PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+_LIMIT_PATTERN = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+
+def parse_limit(limit: str) -> Tuple[int, int]:
+    """
+    Parse a limit string such as "60/minute" or "100 per 2 hours"
+    
+    Returns:
+        (requests allowed per window, window length in seconds)
+    """
+    match = _LIMIT_PATTERN.match(limit)
+    if not match:
+        raise ValueError(f"Invalid rate limit: {limit!r}")
+    amount, multiple, period = match.groups()
+    return int(amount), int(multiple or 1) * PERIODS[period]
+
+
+def get_remote_address(request: Request) -> str:
+    """Client IP address of the request (127.0.0.1 if unknown)"""
+    return request.client.host if request.client else "127.0.0.1"
+
+
+def count_request(key: str, window: int) -> Optional[int]:
+    """
+    Count a request against a fixed window
+    
+    Args:
+        key: Counter key, including the window index
+        window: Window length in seconds
+    
+    Returns:
+        Requests made in this window, or None if Redis is unavailable
+    """
+    client = get_redis_client()
+    if not client:
+        return None
+    
+    # Expire a little after the window so a late INCR never resets it
+    ttl = window + 5
+    try:
+        try:
+            return int(client.evalsha(WINDOW_COUNTER_SHA, 1, key, ttl))
+        except NoScriptError:
+            # First call after a Redis restart: EVAL loads the script
+            return int(client.eval(WINDOW_COUNTER_SCRIPT, 1, key, ttl))
+    except Exception as e:
+        logger.warning(f"Rate limit counter error: {e}", extra={"key": key})
+        return None
 
-# Register rate limit exceeded handler
-def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    """Custom rate limit exceeded handler"""
-    return _rate_limit_exceeded_handler(request, exc)
+
+def _find_request(args, kwargs) -> Optional[Request]:
+    request = kwargs.get("request")
+    if isinstance(request, Request):
+        return request
+    for arg in args:
+        if isinstance(arg, Request):
+            return arg
+    return None
+
+
+class RateLimiter:
+    """Per-endpoint fixed-window rate limits kept in Redis"""
+    
+    def __init__(self, key_func: Callable[[Request], str] = get_remote_address, enabled: bool = True):
+        self.key_func = key_func
+        self.enabled = enabled
+    
+    def limit(self, limit: str, key_func: Optional[Callable[[Request], str]] = None) -> Callable:
+        """
+        Decorator limiting an endpoint to `limit` requests per key
+        
+        The endpoint must take a `request: Request` parameter.
+        
+        Args:
+            limit: Rate limit string (e.g., "60/minute")
+            key_func: Identifies the caller (default: the limiter's key_func)
+        
+        Returns:
+            Decorator function
+        """
+        amount, window = parse_limit(limit)
+        key_func = key_func or self.key_func
+        detail = f"Rate limit exceeded: {limit}"
+        
+        def decorator(func):
+            if not self.enabled:
+                return func
+            
+            scope = f"{RATE_LIMIT_PREFIX}:{func.__module__}.{func.__qualname__}:{amount}/{window}"
+            
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                request = _find_request(args, kwargs)
+                if request is not None:
+                    now = int(time.time())
+                    count = count_request(f"{scope}:{now // window}:{key_func(request)}", window)
+                    if count is not None and count > amount:
+                        raise HTTPException(
+                            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail=detail,
+                            headers={"Retry-After": str(window - now % window)},
+                        )
+                
+                return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def exempt(self, func: Callable) -> Callable:
+        """Mark an endpoint as not rate limited"""
+        return func
+
+
+# Initialize limiter
+limiter = RateLimiter(key_func=get_remote_address, enabled=RATE_LIMIT_ENABLED)
 
 
 def get_user_identifier(request: Request) -> str:
@@ -58,4 +190,3 @@ def rate_limit_user(limit: str) -> Callable:
         Decorator function
     """
     return limiter.limit(limit, key_func=get_user_identifier)
-
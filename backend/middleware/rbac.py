@@ -1,15 +1,42 @@
 """
 Role-Based Access Control (RBAC) middleware
 """
+import functools
+from enum import IntEnum
 from fastapi import Request, HTTPException, status
 from typing import List, Optional
 
-# Role definitions
-ROLES = {
-    "user": 1,
-    "service": 2,
-    "admin": 3,
-}
+
+class Role(IntEnum):
+    """Role hierarchy levels; a higher level includes the lower ones"""
+    USER = 1
+    SERVICE = 2
+    ADMIN = 3
+
+
+# Role definitions (string API, kept for callers that pass role names)
+ROLES = {role.name.lower(): role for role in Role}
+
+_ADMIN_DETAIL = "Insufficient permissions. Required roles: admin"
+
+
+def role_level(role: str) -> int:
+    """Hierarchy level for a role name (0 for unknown roles)"""
+    return ROLES.get(role, 0)
+
+
+def get_user_role_level(request: Request) -> int:
+    """
+    Get user role level from request state
+    
+    Uses the level stored at authentication time, falling back to the
+    role name for requests authenticated some other way.
+    """
+    level = getattr(request.state, "user_role_level", None)
+    if level is None:
+        level = role_level(getattr(request.state, "user_role", "user"))
+    return level
+
 
 def require_role(allowed_roles: List[str]):
     """
@@ -21,22 +48,27 @@ def require_role(allowed_roles: List[str]):
     Returns:
         Decorator function
     """
+    # Resolved once per decorated endpoint rather than on every denied request
+    allowed_levels = frozenset(ROLES[role] for role in allowed_roles if role in ROLES)
+    required_level = max(allowed_levels, default=0)
+    # Role names outside the hierarchy can only be matched by name
+    unranked_roles = frozenset(role for role in allowed_roles if role not in ROLES)
+    detail = f"Insufficient permissions. Required roles: {', '.join(allowed_roles)}"
+    
     def decorator(func):
+        @functools.wraps(func)
         async def wrapper(request: Request, *args, **kwargs):
-            # Get user role from request state
-            user_role = getattr(request.state, "user_role", "user")
-            
-            # Check if user has required role
-            if user_role not in allowed_roles:
-                # Check role hierarchy
-                user_role_level = ROLES.get(user_role, 0)
-                required_level = max(ROLES.get(role, 0) for role in allowed_roles)
-                
-                if user_role_level < required_level:
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail=f"Insufficient permissions. Required roles: {', '.join(allowed_roles)}"
-                    )
+            # Check role hierarchy, then whether the user has an allowed role
+            level = get_user_role_level(request)
+            if (
+                level < required_level
+                and level not in allowed_levels
+                and not (unranked_roles and getattr(request.state, "user_role", "user") in unranked_roles)
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=detail
+                )
             
             return await func(request, *args, **kwargs)
         return wrapper
@@ -44,8 +76,22 @@ def require_role(allowed_roles: List[str]):
 
 
 def require_admin(func):
-    """Decorator to require admin role"""
-    return require_role(["admin"])(func)
+    """
+    Decorator to require admin role
+    
+    Admin is the top of the hierarchy, so this is a single level
+    comparison rather than require_role's set and level checks.
+    """
+    @functools.wraps(func)
+    async def wrapper(request: Request, *args, **kwargs):
+        if get_user_role_level(request) != Role.ADMIN:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=_ADMIN_DETAIL
+            )
+        
+        return await func(request, *args, **kwargs)
+    return wrapper
 
 
 def require_service(func):
@@ -1,59 +1,82 @@
 """
 Security headers middleware
+
+Pure ASGI: the encoded header tuple is built once per configuration and
+added to each http.response.start message.
 """
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from functools import lru_cache
+from typing import FrozenSet, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import os
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses"""
+Headers = Tuple[Tuple[bytes, bytes], ...]
+
+
+@lru_cache(maxsize=4)
+def build_security_headers(frontend_url: str, environment: str) -> Tuple[Headers, FrozenSet[bytes]]:
+    """
+    Encoded security headers for a frontend URL and environment
     
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-        self.frontend_url = os.getenv("FRONTEND_URL", "https://localhost:3000")
+    Returns:
+        (header tuples, lowercased header names); shared by every
+        middleware instance with the same configuration
+    """
+    # Content Security Policy
+    csp = (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "  # Allow inline for Next.js
+        "style-src 'self' 'unsafe-inline'; "  # Allow inline styles
+        "img-src 'self' data: https:; "
+        "font-src 'self' data: https:; "
+        f"connect-src 'self' {frontend_url} https://*.qie.digital wss://*.qie.digital; "
+        "frame-ancestors 'none'; "
+        "base-uri 'self'; "
+        "form-action 'self';"
+    )
     
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Content Security Policy
-        csp = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "  # Allow inline for Next.js
-            "style-src 'self' 'unsafe-inline'; "  # Allow inline styles
-            "img-src 'self' data: https:; "
-            "font-src 'self' data: https:; "
-            f"connect-src 'self' {self.frontend_url} https://*.qie.digital wss://*.qie.digital; "
-            "frame-ancestors 'none'; "
-            "base-uri 'self'; "
-            "form-action 'self';"
-        )
-        response.headers["Content-Security-Policy"] = csp
-        
-        # X-Frame-Options
-        response.headers["X-Frame-Options"] = "DENY"
-        
-        # X-Content-Type-Options
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        
-        # X-XSS-Protection
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        
-        # Referrer-Policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
-        # Strict-Transport-Security (HSTS) - only in production
-        if os.getenv("ENVIRONMENT") == "production":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        # Permissions-Policy
-        response.headers["Permissions-Policy"] = (
+    headers = {
+        "content-security-policy": csp,
+        "x-frame-options": "DENY",
+        "x-content-type-options": "nosniff",
+        "x-xss-protection": "1; mode=block",
+        "referrer-policy": "strict-origin-when-cross-origin",
+        "permissions-policy": (
             "geolocation=(), "
             "microphone=(), "
             "camera=(), "
             "payment=(), "
             "usb=()"
-        )
-        
-        return response
+        ),
+    }
+    
+    # Strict-Transport-Security (HSTS) - only in production
+    if environment == "production":
+        headers["strict-transport-security"] = "max-age=31536000; includeSubDomains"
+    
+    encoded = tuple((name.encode(), value.encode()) for name, value in headers.items())
+    return encoded, frozenset(name for name, _ in encoded)
+
 
+class SecurityHeadersMiddleware:
+    """Add security headers to all responses"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.frontend_url = os.getenv("FRONTEND_URL", "https://localhost:3000")
+        self.headers, self._names = build_security_headers(self.frontend_url, os.getenv("ENVIRONMENT", ""))
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                # These headers replace any the endpoint set itself
+                message["headers"] = [
+                    *(header for header in message.get("headers", ()) if header[0].lower() not in self._names),
+                    *self.headers,
+                ]
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
@@ -1,12 +1,14 @@
 """
 Audit log models
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 
 class AuditLog(BaseModel):
     """Audit log entry"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     timestamp: datetime
     user_address: Optional[str]
     action: str
@@ -1,22 +1,28 @@
 """
 Authentication models
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 class Token(BaseModel):
     """JWT token response"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     access_token: str
     token_type: str = "bearer"
     expires_in: int  # seconds
 
 class TokenData(BaseModel):
     """Token payload data"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     address: Optional[str] = None
     role: Optional[str] = None
 
 class AuthRequest(BaseModel):
     """Authentication request"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     address: str = Field(..., description="Wallet address")
     signature: str = Field(..., description="EIP-191 signature proving ownership")
     message: str = Field(..., description="Message that was signed")
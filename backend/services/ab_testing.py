@@ -6,24 +6,198 @@ Experiment tracking, user allocation, metric collection, and statistical analysi
 
 import os
 import hashlib
-import statistics
-from typing import Dict, List, Optional, Any, Tuple
+import time
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple
 from datetime import datetime
+import numpy as np
+import orjson
+from scipy import stats
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
 
 from database.models import ABExperiment, ABAllocation, ABMetric
 from database.connection import get_db_session
+from utils.cache import get_redis_client
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Allocations are cached per experiment in a Redis hash (wallet -> variant),
+# which expires once an experiment stops allocating. With
+# AB_ALLOCATION_WRITE_BEHIND, new ones are queued on a list instead of
+# inserted inline; workers/ab_allocation_flush_job.py must then be running
+# to write them in batches. A flush moves its batch to the processing list
+# and only removes it after the commit; entries the database rejects go to
+# the dead-letter list.
+ALLOCATION_HASH_PREFIX = "neurocred:abtest:alloc"
+ALLOCATION_HASH_TTL = int(os.getenv("AB_ALLOCATION_CACHE_TTL", "604800"))  # 7 days
+ALLOCATION_QUEUE_KEY = "neurocred:abtest:alloc:pending"
+ALLOCATION_PROCESSING_KEY = "neurocred:abtest:alloc:processing"
+ALLOCATION_DEAD_LETTER_KEY = "neurocred:abtest:alloc:dead"
+ALLOCATION_FLUSH_ROWS = 1000
+
+
+@lru_cache(maxsize=256)
+def _experiment_prefix(experiment_name: str) -> bytes:
+    """Hash input prefix for an experiment's allocations"""
+    return f"{experiment_name}:".encode()
+
+
+def _cached_variant(client, experiment_id: int, wallet_address: str) -> Optional[str]:
+    """Variant recorded for a wallet in Redis, if any"""
+    try:
+        return client.hget(f"{ALLOCATION_HASH_PREFIX}:{experiment_id}", wallet_address)
+    except Exception as e:
+        logger.warning(f"Allocation cache read error: {e}")
+        return None
+
+
+def _queue_allocation(client, experiment_id: int, wallet_address: str, variant: str, persist: bool = True) -> bool:
+    """
+    Record an allocation in Redis, queueing it for the database when persist is set
+    
+    Returns:
+        False if Redis is unavailable (the caller writes the row itself)
+    """
+    try:
+        hash_key = f"{ALLOCATION_HASH_PREFIX}:{experiment_id}"
+        pipe = client.pipeline(transaction=False)
+        pipe.hsetnx(hash_key, wallet_address, variant)
+        pipe.expire(hash_key, ALLOCATION_HASH_TTL)
+        if persist:
+            # Duplicates from concurrent first touches are dropped by the
+            # flush's ON CONFLICT DO NOTHING
+            pipe.lpush(ALLOCATION_QUEUE_KEY, orjson.dumps({
+                "experiment_id": experiment_id,
+                "wallet_address": wallet_address,
+                "variant": variant,
+            }))
+        pipe.execute()
+        return True
+    except Exception as e:
+        logger.warning(f"Allocation queue error: {e}")
+        return False
+
+
+def _allocation_insert(rows: List[Dict[str, Any]]):
+    return pg_insert(ABAllocation).values(rows).on_conflict_do_nothing(constraint='uq_experiment_user')
+
+
+async def flush_pending_allocations(session: AsyncSession, limit: int = ALLOCATION_FLUSH_ROWS) -> int:
+    """
+    Insert up to `limit` queued allocations in one statement, oldest first
+    
+    Entries left on the processing list by a flush that failed before
+    committing are retried first. If the batch insert is rejected, rows are
+    inserted one by one and the ones that still fail are dead-lettered.
+    Other errors propagate with the batch still on the processing list.
+    
+    Returns:
+        Number of allocations taken off the queue
+    """
+    client = get_redis_client()
+    if not client:
+        return 0
+    
+    entries = client.lrange(ALLOCATION_PROCESSING_KEY, 0, -1)
+    if not entries:
+        # LPUSH adds at the head, so the oldest entries are at the tail
+        pipe = client.pipeline(transaction=True)
+        for _ in range(limit):
+            pipe.lmove(ALLOCATION_QUEUE_KEY, ALLOCATION_PROCESSING_KEY, "RIGHT", "LEFT")
+        entries = [entry for entry in pipe.execute() if entry is not None]
+        if not entries:
+            return 0
+    
+    parsed, dead = [], []
+    for entry in entries:
+        try:
+            parsed.append((entry, orjson.loads(entry)))
+        except orjson.JSONDecodeError:
+            dead.append(entry)
+    
+    try:
+        if parsed:
+            await session.execute(_allocation_insert([row for _, row in parsed]))
+        await session.commit()
+    except (IntegrityError, DataError):
+        # One bad row fails the whole statement; isolate it
+        await session.rollback()
+        for entry, row in parsed:
+            try:
+                async with session.begin_nested():
+                    await session.execute(_allocation_insert([row]))
+            except (IntegrityError, DataError):
+                dead.append(entry)
+        await session.commit()
+    
+    pipe = client.pipeline(transaction=True)
+    if dead:
+        logger.warning(f"Dead-lettering {len(dead)} A/B allocations", extra={"key": ALLOCATION_DEAD_LETTER_KEY})
+        pipe.rpush(ALLOCATION_DEAD_LETTER_KEY, *dead)
+    # New batches are moved in at the head; this one is the tail
+    pipe.ltrim(ALLOCATION_PROCESSING_KEY, 0, -len(entries) - 1)
+    pipe.execute()
+    
+    return len(entries)
+
+
+class ExperimentSnapshot(NamedTuple):
+    """Detached copy of the experiment columns used on the allocation path"""
+    id: int
+    status: str
+    allocation_ratio: Any
+    variant_a_name: str
+    variant_b_name: str
+
 
 class ABTestingService:
     """Service for A/B testing"""
     
     def __init__(self):
         self.default_allocation_ratio = 0.5  # 50/50 split
+        self.enroll_batch_size = 5000  # rows per INSERT (3 bind params each)
+        # Queue first-touch allocations for ab_allocation_flush_job instead of committing inline
+        self.write_behind = os.getenv("AB_ALLOCATION_WRITE_BEHIND", "false").lower() == "true"
+        # experiment_name -> (snapshot, expiry on the monotonic clock)
+        self._exp_cache: Dict[str, Tuple[ExperimentSnapshot, float]] = {}
+        self._exp_cache_ttl = 30.0  # seconds
+    
+    async def _get_experiment_cached(
+        self,
+        session: AsyncSession,
+        experiment_name: str
+    ) -> Optional[ExperimentSnapshot]:
+        """
+        Look up an experiment, reusing a snapshot for up to _exp_cache_ttl seconds
+        
+        Only found experiments are cached; status changes made through this
+        service invalidate the entry immediately.
+        """
+        cached = self._exp_cache.get(experiment_name)
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+        
+        stmt = select(
+            ABExperiment.id,
+            ABExperiment.status,
+            ABExperiment.allocation_ratio,
+            ABExperiment.variant_a_name,
+            ABExperiment.variant_b_name,
+        ).where(ABExperiment.experiment_name == experiment_name)
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        
+        if row is None:
+            self._exp_cache.pop(experiment_name, None)
+            return None
+        
+        snapshot = ExperimentSnapshot(*row)
+        self._exp_cache[experiment_name] = (snapshot, time.monotonic() + self._exp_cache_ttl)
+        return snapshot
     
     async def create_experiment(
         self,
@@ -67,6 +241,7 @@ class ABTestingService:
                 session.add(experiment)
                 await session.commit()
                 await session.refresh(experiment)
+                self._exp_cache.pop(experiment_name, None)
                 
                 logger.info(f"Created A/B experiment: {experiment_name}")
                 
@@ -102,6 +277,7 @@ class ABTestingService:
                 experiment.status = "active"
                 experiment.start_date = datetime.now()
                 await session.commit()
+                self._exp_cache.pop(experiment_name, None)
                 
                 logger.info(f"Started experiment: {experiment_name}")
                 
@@ -131,16 +307,17 @@ class ABTestingService:
         try:
             async with get_db_session() as session:
                 # Get experiment
-                stmt = select(ABExperiment).where(
-                    ABExperiment.experiment_name == experiment_name,
-                    ABExperiment.status == "active"
-                )
-                result = await session.execute(stmt)
-                experiment = result.scalar_one_or_none()
+                experiment = await self._get_experiment_cached(session, experiment_name)
                 
-                if not experiment:
+                if not experiment or experiment.status != "active":
                     return "A"  # Default to variant A if experiment not found
                 
+                client = get_redis_client()
+                if client:
+                    variant = _cached_variant(client, experiment.id, wallet_address)
+                    if variant:
+                        return variant
+                
                 # Check existing allocation
                 stmt = select(ABAllocation).where(
                     and_(
@@ -152,14 +329,17 @@ class ABTestingService:
                 allocation = result.scalar_one_or_none()
                 
                 if allocation:
+                    if client:
+                        _queue_allocation(client, experiment.id, wallet_address, allocation.variant, persist=False)
                     return allocation.variant
                 
-                # Deterministic allocation based on address hash
-                hash_input = f"{experiment_name}:{wallet_address}"
-                hash_value = int(hashlib.md5(hash_input.encode()).hexdigest(), 16)
-                allocation_ratio = float(experiment.allocation_ratio)
+                variant = self._assign_variant(experiment_name, wallet_address, experiment.allocation_ratio)
                 
-                variant = "B" if (hash_value % 100) < (allocation_ratio * 100) else "A"
+                # Queue the allocation for a batched insert (write-behind);
+                # otherwise, or without Redis, it is written here
+                if self.write_behind and client and _queue_allocation(client, experiment.id, wallet_address, variant):
+                    logger.debug(f"Allocated {wallet_address} to variant {variant} in {experiment_name}")
+                    return variant
                 
                 # Store allocation
                 allocation = ABAllocation(
@@ -170,6 +350,9 @@ class ABTestingService:
                 session.add(allocation)
                 await session.commit()
                 
+                if client:
+                    _queue_allocation(client, experiment.id, wallet_address, variant, persist=False)
+                
                 logger.debug(f"Allocated {wallet_address} to variant {variant} in {experiment_name}")
                 
                 return variant
@@ -178,6 +361,61 @@ class ABTestingService:
             logger.error(f"Error getting variant: {e}", exc_info=True)
             return "A"  # Default to variant A on error
     
+    async def enroll_wallets(
+        self,
+        experiment_name: str,
+        wallet_addresses: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Allocate many wallets to an active experiment at once
+        
+        Uses the same deterministic assignment as get_variant; wallets that
+        are already allocated keep their variant.
+        
+        Returns:
+            Number of wallets newly allocated
+        """
+        try:
+            async with get_db_session() as session:
+                experiment = await self._get_experiment_cached(session, experiment_name)
+                
+                if not experiment or experiment.status != "active":
+                    return {"status": "error", "message": f"Experiment {experiment_name} not active"}
+                
+                rows = [
+                    {
+                        "experiment_id": experiment.id,
+                        "wallet_address": wallet_address,
+                        "variant": self._assign_variant(experiment_name, wallet_address, experiment.allocation_ratio),
+                    }
+                    for wallet_address in dict.fromkeys(wallet_addresses)
+                ]
+                
+                enrolled = 0
+                for i in range(0, len(rows), self.enroll_batch_size):
+                    insert_stmt = pg_insert(ABAllocation).values(rows[i:i + self.enroll_batch_size])
+                    insert_stmt = insert_stmt.on_conflict_do_nothing(constraint='uq_experiment_user')
+                    result = await session.execute(insert_stmt)
+                    enrolled += result.rowcount
+                
+                logger.info(f"Enrolled {enrolled} wallets in {experiment_name}")
+                
+                return {"status": "success", "enrolled": enrolled}
+        
+        except Exception as e:
+            logger.error(f"Error enrolling wallets: {e}", exc_info=True)
+            return {"status": "error", "message": str(e)}
+    
+    @staticmethod
+    def _assign_variant(experiment_name: str, wallet_address: str, allocation_ratio) -> str:
+        """Deterministic allocation based on address hash"""
+        digest = hashlib.blake2b(
+            _experiment_prefix(experiment_name) + wallet_address.encode(), digest_size=8
+        ).digest()
+        bucket = int.from_bytes(digest, "big") % 100
+        
+        return "B" if bucket < (float(allocation_ratio) * 100) else "A"
+    
     async def record_metric(
         self,
         experiment_name: str,
@@ -190,11 +428,7 @@ class ABTestingService:
         try:
             async with get_db_session() as session:
                 # Get experiment
-                stmt = select(ABExperiment).where(
-                    ABExperiment.experiment_name == experiment_name
-                )
-                result = await session.execute(stmt)
-                experiment = result.scalar_one_or_none()
+                experiment = await self._get_experiment_cached(session, experiment_name)
                 
                 if not experiment:
                     return False
@@ -241,16 +475,22 @@ class ABTestingService:
                         "error": "Experiment not found",
                     }
                 
-                # Get metrics
-                stmt = select(ABMetric).where(
+                # Per-variant aggregates; the value aggregates skip NULLs.
+                # var_samp is exact on NUMERIC, unlike sum-of-squares in floats
+                stmt = select(
+                    ABMetric.variant,
+                    func.count(),
+                    func.count(ABMetric.metric_value),
+                    func.avg(ABMetric.metric_value),
+                    func.var_samp(ABMetric.metric_value),
+                ).where(
                     ABMetric.experiment_id == experiment.id
-                )
+                ).group_by(ABMetric.variant)
                 result = await session.execute(stmt)
-                metrics = list(result.scalars().all())
+                aggregates = {row[0]: row[1:] for row in result.all()}
                 
-                # Group by variant
-                variant_a_metrics = [m for m in metrics if m.variant == "A"]
-                variant_b_metrics = [m for m in metrics if m.variant == "B"]
+                count_a, n_a, mean_a, var_a = aggregates.get("A", (0, 0, None, None))
+                count_b, n_b, mean_b, var_b = aggregates.get("B", (0, 0, None, None))
                 
                 # Calculate statistics
                 results = {
@@ -258,38 +498,31 @@ class ABTestingService:
                     "status": experiment.status,
                     "variant_a": {
                         "name": experiment.variant_a_name,
-                        "count": len(variant_a_metrics),
+                        "count": count_a,
                     },
                     "variant_b": {
                         "name": experiment.variant_b_name,
-                        "count": len(variant_b_metrics),
+                        "count": count_b,
                     },
                 }
                 
                 # Calculate metric statistics if numeric values exist
-                metric_values_a = [m.metric_value for m in variant_a_metrics if m.metric_value is not None]
-                metric_values_b = [m.metric_value for m in variant_b_metrics if m.metric_value is not None]
-                
-                if metric_values_a and metric_values_b:
-                    mean_a = statistics.mean(metric_values_a)
-                    mean_b = statistics.mean(metric_values_b)
+                if n_a and n_b:
+                    means = np.array([mean_a, mean_b], dtype=np.float64)
                     
-                    results["variant_a"]["mean"] = float(mean_a)
-                    results["variant_b"]["mean"] = float(mean_b)
+                    results["variant_a"]["mean"] = float(means[0])
+                    results["variant_b"]["mean"] = float(means[1])
                     
-                    # Calculate p-value (simplified t-test)
-                    if len(metric_values_a) > 1 and len(metric_values_b) > 1:
-                        std_a = statistics.stdev(metric_values_a)
-                        std_b = statistics.stdev(metric_values_b)
-                        
-                        # Simplified statistical test
-                        diff = abs(mean_a - mean_b)
-                        pooled_std = ((std_a ** 2 + std_b ** 2) / 2) ** 0.5
+                    # Welch's t-test from the aggregates
+                    if n_a > 1 and n_b > 1:
+                        std_a, std_b = np.sqrt(np.array([var_a, var_b], dtype=np.float64))
                         
-                        if pooled_std > 0:
-                            t_stat = diff / pooled_std
-                            # Simplified p-value (would use proper t-test in production)
-                            p_value = max(0.0, min(1.0, 1.0 - (t_stat / 3.0)))
+                        if std_a > 0 or std_b > 0:
+                            p_value = float(stats.ttest_ind_from_stats(
+                                means[0], std_a, n_a,
+                                means[1], std_b, n_b,
+                                equal_var=False,
+                            ).pvalue)
                         else:
                             p_value = 1.0
                         
@@ -1,17 +1,67 @@
 """
 API access manager for third-party protocol access
 """
-from typing import Dict, Optional, Any
+import asyncio
+import os
+from typing import Dict, Optional, Any, Set
 import secrets
 import hashlib
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from utils.logger import get_logger
-from database.connection import get_session
+from database.cache import get_api_access
+from database.connection import get_db_session
 from database.models import APIAccess
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 
 logger = get_logger(__name__)
 
+LAST_USED_FLUSH_INTERVAL = int(os.getenv("API_KEY_LAST_USED_FLUSH_INTERVAL", "30"))
+
+# Key ids used since the last flush, and the task that flushes them
+_used_key_ids: Set[int] = set()
+_flush_task: Optional[asyncio.Task] = None
+
+
+async def flush_last_used() -> int:
+    """
+    Write last_used_at for every key used since the previous flush
+    
+    A Core UPDATE, so cached key rows are not evicted.
+    
+    Returns:
+        Number of keys written
+    """
+    if not _used_key_ids:
+        return 0
+    
+    key_ids = list(_used_key_ids)
+    _used_key_ids.clear()
+    try:
+        async with get_db_session() as session:
+            await session.execute(
+                update(APIAccess).where(APIAccess.id.in_(key_ids)).values(last_used_at=func.now())
+            )
+            await session.commit()
+        return len(key_ids)
+    except Exception as e:
+        logger.warning(f"Error updating API key last use: {e}", extra={"api_key_ids": key_ids})
+        return 0
+
+
+async def _flush_periodically() -> None:
+    # Exits once a whole interval passes without use; the next request restarts it
+    while _used_key_ids:
+        await asyncio.sleep(LAST_USED_FLUSH_INTERVAL)
+        await flush_last_used()
+
+
+def record_key_use(api_key_id: int) -> None:
+    """Queue a last_used_at write for a key (flushed every LAST_USED_FLUSH_INTERVAL)"""
+    global _flush_task
+    _used_key_ids.add(api_key_id)
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.create_task(_flush_periodically())
+
 
 class APIAccessManager:
     """Service for managing API access for third-party protocols"""
@@ -52,7 +102,7 @@ class APIAccessManager:
                 expires_at = datetime.utcnow() + timedelta(days=expires_in_days)
             
             if session is None:
-                async with get_session() as db_session:
+                async with get_db_session() as db_session:
                     return await self._create_api_key(
                         protocol_address, api_key, api_key_hash,
                         permissions, rate_limit, expires_at, db_session
@@ -124,7 +174,7 @@ class APIAccessManager:
             api_key_hash = self._hash_api_key(api_key)
             
             if session is None:
-                async with get_session() as db_session:
+                async with get_db_session() as db_session:
                     return await self._validate_api_key(api_key_hash, db_session)
             else:
                 return await self._validate_api_key(api_key_hash, session)
@@ -137,37 +187,35 @@ class APIAccessManager:
         api_key_hash: str,
         session
     ) -> Optional[Dict[str, Any]]:
-        """Validate API key from database"""
+        """Validate API key (cached row; last use is queued, not committed)"""
         try:
-            result = await session.execute(
-                select(APIAccess).where(APIAccess.api_key == api_key_hash)
-            )
-            api_access = result.scalar_one_or_none()
+            api_access = await get_api_access(session, api_key_hash)
             
             if not api_access:
                 return None
             
             # Check if revoked
-            if api_access.revoked_at:
+            if api_access["revoked_at"]:
                 return None
             
             # Check if expired
-            if api_access.expires_at and api_access.expires_at < datetime.utcnow():
-                return None
+            expires_at = api_access["expires_at"] and datetime.fromisoformat(api_access["expires_at"])
+            if expires_at:
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                if expires_at < datetime.now(timezone.utc):
+                    return None
             
-            # Update last used
-            api_access.last_used_at = datetime.utcnow()
-            await session.commit()
+            record_key_use(api_access["id"])
             
             return {
-                "id": api_access.id,
-                "protocol_address": api_access.protocol_address,
-                "permissions": api_access.permissions or {},
-                "rate_limit": api_access.rate_limit,
+                "id": api_access["id"],
+                "protocol_address": api_access["protocol_address"],
+                "permissions": api_access["permissions"] or {},
+                "rate_limit": api_access["rate_limit"],
             }
         except Exception as e:
             logger.error(f"Error in _validate_api_key: {e}", exc_info=True)
-            await session.rollback()
             return None
     
     async def get_api_permissions(
@@ -214,7 +262,7 @@ class APIAccessManager:
             api_key_hash = self._hash_api_key(api_key)
             
             if session is None:
-                async with get_session() as db_session:
+                async with get_db_session() as db_session:
                     return await self._revoke_api_key(api_key_hash, db_session)
             else:
                 return await self._revoke_api_key(api_key_hash, session)
@@ -20,6 +20,9 @@ class AutoNegotiationService:
     # Negotiation timeout (hours)
     NEGOTIATION_TIMEOUT_HOURS = 24
     
+    # Most recent events returned with a negotiation's status
+    HISTORY_LIMIT = 20
+    
     def __init__(self):
         self.agent = NeuroLendAgent()
         self.recommender = LoanRecommender()
@@ -99,28 +102,24 @@ class AutoNegotiationService:
                 loan_request_id=loan_request_id,
                 preferences_id=address,  # Use wallet_address as FK
                 status='active',
-                negotiation_history=[{
-                    "action": "started",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "loan_request": loan_request,
-                }]
             )
             session.add(session_obj)
+            await session.flush()
+            await self._record_event(session, session_obj.id, "started", {"loan_request": loan_request})
             await session.commit()
             
             # Start negotiation process
             negotiation_result = await self.agent.auto_negotiate(address, loan_request, preferences)
             
             # Update session with initial results
-            session_obj.negotiation_history.append({
-                "action": "initial_search",
-                "timestamp": datetime.utcnow().isoformat(),
-                "result": negotiation_result,
-            })
+            accepted_offer_id = (negotiation_result.get('accepted_offer') or {}).get('id')
+            await self._record_event(
+                session, session_obj.id, "initial_search", {"result": negotiation_result}, accepted_offer_id
+            )
             
             if negotiation_result.get('accepted_offer'):
                 session_obj.status = 'completed'
-                session_obj.current_offer_id = negotiation_result['accepted_offer'].get('id')
+                session_obj.current_offer_id = accepted_offer_id
             
             await session.commit()
             
@@ -222,11 +221,17 @@ class AutoNegotiationService:
                     }
             
             if not loan_request:
-                # Use last negotiation history to reconstruct request
-                history = negotiation.negotiation_history or []
-                if history:
-                    last_request = history[0].get('loan_request', {})
-                    loan_request = last_request
+                # Reconstruct request from the session's start event
+                from database.models import NegotiationEvent
+                started = await session.execute(
+                    select(NegotiationEvent.payload).where(
+                        NegotiationEvent.session_id == negotiation_id,
+                        NegotiationEvent.event_type == "started"
+                    ).order_by(NegotiationEvent.seq).limit(1)
+                )
+                payload = started.scalar_one_or_none()
+                if payload:
+                    loan_request = payload.get('loan_request', {})
             
             # Continue negotiation
             negotiation_result = await self.agent.auto_negotiate(
@@ -236,15 +241,14 @@ class AutoNegotiationService:
             )
             
             # Update session
-            negotiation.negotiation_history.append({
-                "action": "continued",
-                "timestamp": datetime.utcnow().isoformat(),
-                "result": negotiation_result,
-            })
+            accepted_offer_id = (negotiation_result.get('accepted_offer') or {}).get('id')
+            await self._record_event(
+                session, negotiation_id, "continued", {"result": negotiation_result}, accepted_offer_id
+            )
             
             if negotiation_result.get('accepted_offer'):
                 negotiation.status = 'completed'
-                negotiation.current_offer_id = negotiation_result['accepted_offer'].get('id')
+                negotiation.current_offer_id = accepted_offer_id
             
             negotiation.updated_at = datetime.utcnow()
             await session.commit()
@@ -295,7 +299,7 @@ class AutoNegotiationService:
         session
     ) -> Optional[Dict[str, Any]]:
         """Get negotiation status from database"""
-        from database.models import NegotiationSession
+        from database.models import NegotiationSession, NegotiationEvent
         from sqlalchemy import select
         
         try:
@@ -307,13 +311,28 @@ class AutoNegotiationService:
             if not negotiation:
                 return None
             
+            events_result = await session.execute(
+                select(NegotiationEvent)
+                .where(NegotiationEvent.session_id == negotiation_id)
+                .order_by(NegotiationEvent.seq.desc())
+                .limit(self.HISTORY_LIMIT)
+            )
+            events = list(reversed(events_result.scalars().all()))
+            
             return {
                 "negotiation_id": negotiation.id,
                 "wallet_address": negotiation.wallet_address,
                 "status": negotiation.status,
                 "loan_request_id": negotiation.loan_request_id,
                 "current_offer_id": negotiation.current_offer_id,
-                "negotiation_history": negotiation.negotiation_history or [],
+                "negotiation_history": [
+                    {
+                        "action": event.event_type,
+                        "timestamp": event.created_at.isoformat() if event.created_at else None,
+                        **(event.payload or {}),
+                    }
+                    for event in events
+                ],
                 "created_at": negotiation.created_at.isoformat() if negotiation.created_at else None,
                 "updated_at": negotiation.updated_at.isoformat() if negotiation.updated_at else None,
             }
@@ -378,10 +397,7 @@ class AutoNegotiationService:
                 return False
             
             negotiation.status = 'cancelled'
-            negotiation.negotiation_history.append({
-                "action": "cancelled",
-                "timestamp": datetime.utcnow().isoformat(),
-            })
+            await self._record_event(session, negotiation_id, "cancelled")
             negotiation.updated_at = datetime.utcnow()
             await session.commit()
             
@@ -391,4 +407,31 @@ class AutoNegotiationService:
             logger.error(f"Error in _cancel_negotiation: {e}", exc_info=True)
             await session.rollback()
             return False
-
+    
+    async def _record_event(
+        self,
+        session,
+        negotiation_id: int,
+        event_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        offer_id: Optional[int] = None
+    ) -> None:
+        """Append an event to a negotiation session (single-row INSERT)"""
+        from database.models import NegotiationEvent
+        from sqlalchemy import insert, select, func
+        
+        # uq_negotiation_event_seq rejects a concurrent writer taking the same seq
+        next_seq = (
+            select(func.coalesce(func.max(NegotiationEvent.seq), 0) + 1)
+            .where(NegotiationEvent.session_id == negotiation_id)
+            .scalar_subquery()
+        )
+        await session.execute(
+            insert(NegotiationEvent).values(
+                session_id=negotiation_id,
+                seq=next_seq,
+                event_type=event_type,
+                offer_id=offer_id,
+                payload=payload,
+            )
+        )
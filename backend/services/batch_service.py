@@ -6,7 +6,7 @@ import uuid
 from typing import List, Dict, Any
 from datetime import datetime
 from database.connection import get_db_session
-from database.repositories import BatchUpdateRepository, ScoreRepository
+from database.repositories import BatchUpdateRepository, ScoreRepository, ScoreHistoryRepository
 from services.scoring import ScoringService
 from services.blockchain import BlockchainService
 from utils.cache import cache_score, get_cached_score
@@ -176,16 +176,16 @@ class BatchService:
         if not os.getenv("DATABASE_URL"):
             return
         
+        rows = [
+            {"wallet_address": address, "score": score_data["score"], "risk_band": score_data["riskBand"]}
+            for address, score_data in scores.items()
+            if "error" not in score_data
+        ]
+        
         try:
             async with get_db_session() as session:
-                for address, score_data in scores.items():
-                    if "error" not in score_data:
-                        await ScoreRepository.upsert_score(
-                            session,
-                            address,
-                            score_data["score"],
-                            score_data["riskBand"],
-                        )
+                await ScoreRepository.upsert_scores(session, rows)
+                await ScoreHistoryRepository.add_history_batch(session, rows)
         except Exception as e:
             logger.error(f"Error storing batch scores: {e}", exc_info=True)
 
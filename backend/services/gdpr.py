@@ -69,7 +69,7 @@ class GDPRService:
                 } for h in history]
                 
                 # Get loans
-                loans = await LoanRepository.get_loans_by_user(session, wallet_address)
+                loans = await LoanRepository.get_loans_by_user(session, wallet_address, load_payments=True)
                 data["loans"] = [{
                     "loan_id": loan.loan_id,
                     "amount": str(loan.amount),
@@ -78,6 +78,12 @@ class GDPRService:
                     "status": loan.status,
                     "created_at": loan.created_at.isoformat() if loan.created_at else None,
                     "due_date": loan.due_date.isoformat() if loan.due_date else None,
+                    "payments": [{
+                        "amount": str(payment.amount),
+                        "payment_type": payment.payment_type,
+                        "tx_hash": payment.tx_hash,
+                        "created_at": payment.created_at.isoformat() if payment.created_at else None,
+                    } for payment in loan.payments],
                 } for loan in loans]
                 
                 # Get transactions
@@ -1,14 +1,23 @@
 """
 Leaderboard service for ranking and leaderboard management
 """
+import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
+import orjson
+from utils.cache import get_redis_client, invalidate_pattern
 from utils.logger import get_logger
 from services.scoring import ScoringService
 from database.repositories import ScoreRepository
 
 logger = get_logger(__name__)
 
+# Serialized top-N pages, dropped whenever the view is refreshed
+TOP_SCORES_CACHE_PREFIX = "neurocred:leaderboard"
+TOP_SCORES_CACHE_TTL = int(os.getenv("LEADERBOARD_CACHE_TTL", "30"))
+# Largest page served, which also bounds the number of cached pages
+TOP_SCORES_MAX_LIMIT = 500
+
 
 class LeaderboardService:
     """Service for managing leaderboards and rankings"""
@@ -37,12 +46,12 @@ class LeaderboardService:
             List of top score dicts
         """
         try:
-            from database.connection import get_session
+            from database.connection import get_db_session
             from database.models import LeaderboardEntry
             from sqlalchemy import select, desc
             
             if session is None:
-                async with get_session() as db_session:
+                async with get_db_session() as db_session:
                     return await self._get_top_scores(limit, timeframe, db_session)
             else:
                 return await self._get_top_scores(limit, timeframe, session)
@@ -58,17 +67,26 @@ class LeaderboardService:
     ) -> List[Dict[str, Any]]:
         """Get top scores from database"""
         from database.models import LeaderboardEntry
-        from sqlalchemy import select, desc
+        from sqlalchemy import lambda_stmt, select
         
         try:
             category = timeframe or 'all_time'
             
-            query = select(LeaderboardEntry).where(
+            # Only columns in idx_leaderboard_category_rank (index-only scan).
+            # lambda_stmt caches the statement by code location; category and
+            # limit are extracted as bound parameters on each call
+            query = lambda_stmt(lambda: select(
+                LeaderboardEntry.rank,
+                LeaderboardEntry.wallet_address,
+                LeaderboardEntry.score,
+                LeaderboardEntry.risk_band,
+                LeaderboardEntry.updated_at,
+            ).where(
                 LeaderboardEntry.category == category
-            ).order_by(desc(LeaderboardEntry.score)).limit(limit)
+            ).order_by(LeaderboardEntry.rank).limit(limit))
             
             result = await session.execute(query)
-            entries = result.scalars().all()
+            entries = result.all()
             
             return [
                 {
@@ -84,6 +102,54 @@ class LeaderboardService:
             logger.error(f"Error in _get_top_scores: {e}", exc_info=True)
             return []
     
+    async def get_top_scores_json(
+        self,
+        limit: int = 100,
+        timeframe: Optional[str] = None
+    ) -> bytes:
+        """
+        Get top N scores as serialized JSON, cached in Redis
+        
+        Read spikes are served from Redis without touching Postgres or
+        re-encoding the rows. Entries live for TOP_SCORES_CACHE_TTL seconds
+        or until the next leaderboard refresh.
+        
+        Args:
+            limit: Number of top scores to return (clamped to 1..TOP_SCORES_MAX_LIMIT)
+            timeframe: Optional timeframe ('all_time', 'monthly', 'weekly')
+        
+        Returns:
+            JSON array of top score dicts (see get_top_scores)
+        
+        Raises:
+            ValueError: If timeframe is not one of CATEGORIES
+        """
+        category = timeframe or 'all_time'
+        if category not in self.CATEGORIES:
+            raise ValueError(f"Invalid timeframe: {timeframe}")
+        limit = max(1, min(limit, TOP_SCORES_MAX_LIMIT))
+        key = f"{TOP_SCORES_CACHE_PREFIX}:{category}:{limit}"
+        client = get_redis_client() if os.getenv("CACHE_ENABLED", "true").lower() == "true" else None
+        
+        if client:
+            try:
+                cached = client.get(key)
+                if cached:
+                    return cached.encode() if isinstance(cached, str) else cached
+            except Exception as e:
+                logger.warning(f"Cache get error: {e}", extra={"key": key})
+        
+        entries = await self.get_top_scores(limit, category)
+        payload = orjson.dumps(entries)
+        
+        # An empty page may be a swallowed database error; don't pin it
+        if client and entries:
+            try:
+                client.setex(key, TOP_SCORES_CACHE_TTL, payload)
+            except Exception as e:
+                logger.warning(f"Cache set error: {e}", extra={"key": key})
+        return payload
+    
     async def get_user_rank(
         self,
         address: str,
@@ -102,12 +168,12 @@ class LeaderboardService:
             User rank dict or None if not found
         """
         try:
-            from database.connection import get_session
+            from database.connection import get_db_session
             from database.models import LeaderboardEntry
             from sqlalchemy import select
             
             if session is None:
-                async with get_session() as db_session:
+                async with get_db_session() as db_session:
                     return await self._get_user_rank(address, category, db_session)
             else:
                 return await self._get_user_rank(address, category, session)
@@ -123,14 +189,14 @@ class LeaderboardService:
     ) -> Optional[Dict[str, Any]]:
         """Get user rank from database"""
         from database.models import LeaderboardEntry
-        from sqlalchemy import select
+        from sqlalchemy import lambda_stmt, select
         
         try:
             result = await session.execute(
-                select(LeaderboardEntry).where(
+                lambda_stmt(lambda: select(LeaderboardEntry).where(
                     LeaderboardEntry.wallet_address == address,
                     LeaderboardEntry.category == category
-                )
+                ))
             )
             entry = result.scalar_one_or_none()
             
@@ -175,92 +241,29 @@ class LeaderboardService:
             logger.error(f"Error getting leaderboard category: {e}", exc_info=True)
             return []
     
-    async def update_leaderboard(
-        self,
-        category: str = 'all_time',
-        session=None
-    ) -> bool:
+    async def update_leaderboard(self, session=None) -> bool:
         """
-        Update leaderboard cache
+        Refresh the leaderboard_entries materialized view (all categories)
         
         Args:
-            category: Category to update
             session: Database session (optional)
             
         Returns:
-            True if updated successfully
+            True if refreshed successfully
         """
         try:
-            from database.connection import get_session
-            from database.models import LeaderboardEntry, Score
-            from sqlalchemy import select, desc, func
-            from datetime import datetime, timedelta
+            from database.connection import get_db_session
+            from database.views import refresh_leaderboard
             
             if session is None:
-                async with get_session() as db_session:
-                    return await self._update_leaderboard(category, db_session)
+                async with get_db_session() as db_session:
+                    await refresh_leaderboard(db_session)
             else:
-                return await self._update_leaderboard(category, session)
-        except Exception as e:
-            logger.error(f"Error updating leaderboard: {e}", exc_info=True)
-            return False
-    
-    async def _update_leaderboard(
-        self,
-        category: str,
-        session
-    ) -> bool:
-        """Update leaderboard in database"""
-        from database.models import LeaderboardEntry, Score
-        from sqlalchemy import select, desc, func, delete
-        from datetime import datetime, timedelta
-        
-        try:
-            # Calculate period dates
-            now = datetime.utcnow()
-            period_start = None
-            period_end = None
-            
-            if category == 'monthly':
-                period_start = datetime(now.year, now.month, 1)
-                period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            elif category == 'weekly':
-                period_start = now - timedelta(days=now.weekday())
-                period_start = period_start.replace(hour=0, minute=0, second=0, microsecond=0)
-                period_end = period_start + timedelta(days=7)
+                await refresh_leaderboard(session)
             
-            # Delete existing entries for this category
-            await session.execute(
-                delete(LeaderboardEntry).where(LeaderboardEntry.category == category)
-            )
-            
-            # Get all scores, ordered by score descending
-            result = await session.execute(
-                select(Score).order_by(desc(Score.score))
-            )
-            scores = result.scalars().all()
-            
-            # Create leaderboard entries
-            rank = 1
-            for score_obj in scores:
-                entry = LeaderboardEntry(
-                    wallet_address=score_obj.wallet_address,
-                    score=score_obj.score,
-                    risk_band=score_obj.riskBand,
-                    rank=rank,
-                    category=category,
-                    period_start=period_start,
-                    period_end=period_end,
-                )
-                session.add(entry)
-                rank += 1
-            
-            await session.commit()
-            
-            logger.info(f"Updated {category} leaderboard with {rank - 1} entries")
+            invalidate_pattern(f"{TOP_SCORES_CACHE_PREFIX}:*")
+            logger.info("Refreshed leaderboard")
             return True
         except Exception as e:
-            logger.error(f"Error in _update_leaderboard: {e}", exc_info=True)
-            await session.rollback()
+            logger.error(f"Error updating leaderboard: {e}", exc_info=True)
             return False
-
@@ -291,6 +291,10 @@ class LoanMarketplace:
                         (LoanOffer.borrower_address == filters['borrower_address']) |
                         (LoanOffer.borrower_address.is_(None))
                     )
+                if 'collateral_token' in filters:
+                    query = query.where(
+                        LoanOffer.accepted_collateral_tokens.contains([filters['collateral_token']])
+                    )
             
             # Filter expired offers
             query = query.where(
@@ -378,6 +382,10 @@ class LoanMarketplace:
                     query = query.where(LoanRequest.amount <= filters['amount_max'])
                 if 'max_interest_rate' in filters:
                     query = query.where(LoanRequest.max_interest_rate >= filters['max_interest_rate'])
+                if 'collateral_token' in filters:
+                    query = query.where(
+                        LoanRequest.collateral_tokens.contains([filters['collateral_token']])
+                    )
             
             # Filter expired auctions
             query = query.where(
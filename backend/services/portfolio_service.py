@@ -65,11 +65,11 @@ class PortfolioService:
             transfers = result.scalars().all()
             
             # Aggregate balances by token
-            balances = defaultdict(lambda: {"in": Decimal("0"), "out": Decimal("0")})
+            balances = defaultdict(lambda: {"in": 0, "out": 0})
             
             for transfer in transfers:
                 token_addr = transfer.token_address
-                amount = Decimal(str(transfer.amount)) if transfer.amount else Decimal("0")
+                amount = transfer.amount or 0
                 
                 if transfer.from_address and transfer.from_address.lower() == address.lower():
                     balances[token_addr]["out"] += amount
@@ -167,13 +167,13 @@ class PortfolioService:
             
             # Calculate statistics
             total_txs = len(transactions)
-            total_volume = Decimal("0")
+            total_volume = 0
             total_gas = 0
             tx_types = defaultdict(int)
             
             for tx in transactions:
                 if tx.value:
-                    total_volume += Decimal(str(tx.value))
+                    total_volume += tx.value
                 if tx.gas_used:
                     total_gas += tx.gas_used
                 tx_types[tx.tx_type] += 1
@@ -239,7 +239,7 @@ class PortfolioService:
             transactions = result.scalars().all()
             
             # Group by protocol/contract
-            protocol_activity = defaultdict(lambda: {"count": 0, "volume": Decimal("0")})
+            protocol_activity = defaultdict(lambda: {"count": 0, "volume": 0})
             
             for tx in transactions:
                 contract = tx.contract_address
@@ -247,7 +247,7 @@ class PortfolioService:
                 
                 protocol_activity[protocol_name]["count"] += 1
                 if tx.value:
-                    protocol_activity[protocol_name]["volume"] += Decimal(str(tx.value))
+                    protocol_activity[protocol_name]["volume"] += tx.value
             
             # Convert to list format
             protocols = []
@@ -143,30 +143,26 @@ class PreferenceManager:
         address: str,
         session
     ) -> Optional[Dict[str, Any]]:
-        """Get preferences from database"""
-        from database.models import UserPreferences
-        from sqlalchemy import select
+        """Get preferences from database (read-through wallet cache)"""
+        from database.cache import get_prefs
         
         try:
-            result = await session.execute(
-                select(UserPreferences).where(UserPreferences.wallet_address == address)
-            )
-            user_prefs = result.scalar_one_or_none()
+            user_prefs = await get_prefs(session, address)
             
             if not user_prefs:
                 return None
             
             return {
                 "wallet_address": address,
-                "max_interest_rate": float(user_prefs.max_interest_rate) if user_prefs.max_interest_rate else None,
-                "term_days_min": user_prefs.term_days_min,
-                "term_days_max": user_prefs.term_days_max,
-                "max_loan_amount": float(user_prefs.max_loan_amount) if user_prefs.max_loan_amount else None,
-                "preferred_collateral_tokens": user_prefs.preferred_collateral_tokens or [],
-                "auto_negotiate_enabled": user_prefs.auto_negotiate_enabled,
-                "auto_accept_threshold": user_prefs.auto_accept_threshold or {},
-                "created_at": user_prefs.created_at.isoformat() if user_prefs.created_at else None,
-                "updated_at": user_prefs.updated_at.isoformat() if user_prefs.updated_at else None,
+                "max_interest_rate": float(user_prefs["max_interest_rate"]) if user_prefs["max_interest_rate"] else None,
+                "term_days_min": user_prefs["term_days_min"],
+                "term_days_max": user_prefs["term_days_max"],
+                "max_loan_amount": float(user_prefs["max_loan_amount"]) if user_prefs["max_loan_amount"] else None,
+                "preferred_collateral_tokens": user_prefs["preferred_collateral_tokens"] or [],
+                "auto_negotiate_enabled": user_prefs["auto_negotiate_enabled"],
+                "auto_accept_threshold": user_prefs["auto_accept_threshold"] or {},
+                "created_at": user_prefs["created_at"],
+                "updated_at": user_prefs["updated_at"],
             }
         except Exception as e:
             logger.error(f"Error in _get_preferences: {e}", exc_info=True)
@@ -9,6 +9,20 @@ from services.scoring import ScoringService
 
 logger = get_logger(__name__)
 
+# NCRD is an 18-decimal ERC-20; rewards are stored in base units (wei)
+NCRD_DECIMALS = 18
+NCRD_WEI = 10 ** NCRD_DECIMALS
+
+
+def ncrd_to_wei(amount) -> int:
+    """Convert an NCRD amount to integer base units"""
+    return int((Decimal(str(amount)) * NCRD_WEI).to_integral_value())
+
+
+def wei_to_ncrd(amount_wei: int) -> Decimal:
+    """Convert integer base units to an NCRD amount"""
+    return Decimal(amount_wei) / NCRD_WEI
+
 
 class ReferralRewardsService:
     """Service for managing referral rewards"""
@@ -234,24 +248,21 @@ class ReferralRewardsService:
     ) -> Decimal:
         """Check if milestone reward already given"""
         from database.models import ReferralReward
-        from sqlalchemy import select
+        from sqlalchemy import select, literal_column
         
         try:
             # Check if this milestone was already rewarded
             result = await session.execute(
-                select(ReferralReward).where(
+                select(ReferralReward.id).where(
                     ReferralReward.recipient_address == address,
                     ReferralReward.reward_type == 'milestone',
+                    # Inline key so the expression matches idx_referral_rewards_milestone
+                    ReferralReward.extra_metadata.op('->>')(literal_column("'milestone_score'")) == str(milestone_score),
                     ReferralReward.status == 'distributed'
-                )
+                ).limit(1)
             )
-            existing_rewards = result.scalars().all()
-            
-            # Check metadata for milestone score
-            for reward in existing_rewards:
-                metadata = reward.extra_metadata or {}
-                if metadata.get('milestone_score') == milestone_score:
-                    return Decimal('0')  # Already rewarded
+            if result.scalar_one_or_none() is not None:
+                return Decimal('0')  # Already rewarded
             
             return reward_amount
         except Exception as e:
@@ -308,16 +319,20 @@ class ReferralRewardsService:
         session
     ) -> Optional[Dict[str, Any]]:
         """Track reward in database"""
+        from database.cache import get_score
         from database.models import ReferralReward
         
         try:
+            score_row = await get_score(session, recipient_address)
             reward = ReferralReward(
                 referral_id=referral_id,
                 recipient_address=recipient_address,
                 reward_type=reward_type,
-                amount_ncrd=amount,
+                amount_wei=ncrd_to_wei(amount),
                 status='pending',
-                metadata=metadata or {}
+                extra_metadata=metadata or {},
+                score_at_reward=score_row["score"] if score_row else None,
+                risk_band_at_reward=score_row["risk_band"] if score_row else None,
             )
             session.add(reward)
             await session.commit()
@@ -331,6 +346,7 @@ class ReferralRewardsService:
                 "reward_type": reward_type,
                 "amount_ncrd": float(amount),
                 "status": "pending",
+                "score_at_reward": reward.score_at_reward,
                 "created_at": reward.created_at.isoformat() if reward.created_at else None,
             }
         except Exception as e:
@@ -338,6 +354,84 @@ class ReferralRewardsService:
             await session.rollback()
             return None
     
+    async def track_referral_rewards(
+        self,
+        rewards: List[Dict[str, Any]],
+        session=None
+    ) -> int:
+        """
+        Track a batch of pending rewards
+        
+        Rows are written in one multi-row INSERT, or with COPY for large
+        batches (see database.bulk), instead of one INSERT per reward.
+        
+        Args:
+            rewards: Reward dicts with referral_id, recipient_address,
+                reward_type, amount and optional metadata
+            session: Database session (optional)
+        
+        Returns:
+            Number of rewards tracked
+        """
+        try:
+            from database.connection import get_db_session
+            
+            if session is None:
+                async with get_db_session() as db_session:
+                    return await self._track_referral_rewards(rewards, db_session)
+            else:
+                return await self._track_referral_rewards(rewards, session)
+        except Exception as e:
+            logger.error(f"Error tracking referral rewards: {e}", exc_info=True, extra={"rewards": len(rewards)})
+            return 0
+    
+    async def _track_referral_rewards(
+        self,
+        rewards: List[Dict[str, Any]],
+        session
+    ) -> int:
+        """Track reward batch in database"""
+        from database.bulk import bulk_copy
+        from database.models import ReferralReward, Score
+        from sqlalchemy import select
+        
+        if not rewards:
+            return 0
+        
+        try:
+            # Score snapshots for all recipients in one query
+            recipients = {reward['recipient_address'] for reward in rewards}
+            result = await session.execute(
+                select(Score.wallet_address, Score.score, Score.risk_band).where(
+                    Score.wallet_address.in_(recipients)
+                )
+            )
+            scores = {row.wallet_address.lower(): row for row in result}
+            
+            rows = []
+            for reward in rewards:
+                score = scores.get(reward['recipient_address'].lower())
+                rows.append({
+                    "referral_id": reward.get('referral_id'),
+                    "recipient_address": reward['recipient_address'],
+                    "reward_type": reward['reward_type'],
+                    "amount_wei": ncrd_to_wei(reward['amount']),
+                    "status": 'pending',
+                    "extra_metadata": reward.get('metadata') or {},
+                    "score_at_reward": score.score if score else None,
+                    "risk_band_at_reward": score.risk_band if score else None,
+                })
+            
+            written = await bulk_copy(session, ReferralReward, rows)
+            await session.commit()
+            
+            logger.info(f"Tracked {written} referral rewards")
+            return written
+        except Exception as e:
+            logger.error(f"Error in _track_referral_rewards: {e}", exc_info=True)
+            await session.rollback()
+            raise
+    
     async def get_pending_rewards(
         self,
         address: str,
@@ -390,7 +484,7 @@ class ReferralRewardsService:
                     "id": reward.id,
                     "referral_id": reward.referral_id,
                     "reward_type": reward.reward_type,
-                    "amount_ncrd": float(reward.amount_ncrd),
+                    "amount_ncrd": float(wei_to_ncrd(reward.amount_wei)),
                     "status": reward.status,
                     "created_at": reward.created_at.isoformat() if reward.created_at else None,
                     "metadata": reward.extra_metadata or {},
@@ -3,7 +3,7 @@ Referral service for managing user referrals and calculating referral boosts
 """
 import secrets
 import string
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from utils.logger import get_logger
 
@@ -197,7 +197,7 @@ class ReportExporter:
                 wallet_address=address,
                 report_type='full',
                 format='json',
-                metadata=report_data
+                extra_metadata=report_data
             )
             session.add(report)
             await session.flush()
@@ -208,6 +208,7 @@ class ReportExporter:
             # Create share record
             share = ReportShare(
                 report_id=report.id,
+                report_generated_at=report.generated_at,
                 wallet_address=address,
                 shared_with_address=protocol_address,
                 share_token=share_token,
@@ -274,7 +275,7 @@ class ReportExporter:
         session
     ) -> Optional[Dict[str, Any]]:
         """Validate token from database"""
-        from database.models import ReportShare, CreditReport
+        from database.models import ReportShare
         from sqlalchemy import select
         
         try:
@@ -295,11 +296,8 @@ class ReportExporter:
             share.accessed_at = datetime.utcnow()
             await session.commit()
             
-            # Get report
-            report_result = await session.execute(
-                select(CreditReport).where(CreditReport.id == share.report_id)
-            )
-            report = report_result.scalar_one_or_none()
+            # Loaded with the share (ReportShare.report is joined-eager)
+            report = share.report
             
             return {
                 "share_id": share.id,
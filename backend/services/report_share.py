@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 from utils.logger import get_logger
 from database.connection import get_session
 from database.models import ReportShare, CreditReport
-from sqlalchemy import select, desc
+from sqlalchemy import lambda_stmt, select, desc
 
 logger = get_logger(__name__)
 
@@ -61,6 +61,7 @@ class ReportShareManager:
                     
                     share = ReportShare(
                         report_id=report_id,
+                        report_generated_at=report.generated_at,
                         wallet_address=address,
                         shared_with_address=protocol_address,
                         share_token=share_token,
@@ -120,13 +121,13 @@ class ReportShareManager:
     ) -> List[Dict[str, Any]]:
         """Get shared reports from database"""
         try:
+            # ReportShare.report is joined-eager, so each report comes in the same query
             result = await session.execute(
-                select(ReportShare, CreditReport)
-                .join(CreditReport, ReportShare.report_id == CreditReport.id)
+                lambda_stmt(lambda: select(ReportShare)
                 .where(ReportShare.wallet_address == address)
-                .order_by(desc(ReportShare.created_at))
+                .order_by(desc(ReportShare.created_at)))
             )
-            rows = result.all()
+            shares = result.scalars().all()
             
             return [
                 {
@@ -138,12 +139,12 @@ class ReportShareManager:
                     "access_count": share.access_count,
                     "created_at": share.created_at.isoformat() if share.created_at else None,
                     "report": {
-                        "report_type": report.report_type,
-                        "format": report.format,
-                        "generated_at": report.generated_at.isoformat() if report.generated_at else None,
-                    } if report else None,
+                        "report_type": share.report.report_type,
+                        "format": share.report.format,
+                        "generated_at": share.report.generated_at.isoformat() if share.report.generated_at else None,
+                    },
                 }
-                for share, report in rows
+                for share in shares
             ]
         except Exception as e:
             logger.error(f"Error in _get_shared_reports: {e}", exc_info=True)
@@ -181,13 +182,13 @@ class ReportShareManager:
     ) -> List[Dict[str, Any]]:
         """Get received reports from database"""
         try:
+            # ReportShare.report is joined-eager, so each report comes in the same query
             result = await session.execute(
-                select(ReportShare, CreditReport)
-                .join(CreditReport, ReportShare.report_id == CreditReport.id)
+                lambda_stmt(lambda: select(ReportShare)
                 .where(ReportShare.shared_with_address == protocol_address)
-                .order_by(desc(ReportShare.created_at))
+                .order_by(desc(ReportShare.created_at)))
             )
-            rows = result.all()
+            shares = result.scalars().all()
             
             return [
                 {
@@ -199,12 +200,12 @@ class ReportShareManager:
                     "access_count": share.access_count,
                     "created_at": share.created_at.isoformat() if share.created_at else None,
                     "report": {
-                        "report_type": report.report_type,
-                        "format": report.format,
-                        "generated_at": report.generated_at.isoformat() if report.generated_at else None,
-                    } if report else None,
+                        "report_type": share.report.report_type,
+                        "format": share.report.format,
+                        "generated_at": share.report.generated_at.isoformat() if share.report.generated_at else None,
+                    },
                 }
-                for share, report in rows
+                for share in shares
             ]
         except Exception as e:
             logger.error(f"Error in _get_received_reports: {e}", exc_info=True)
@@ -5,11 +5,8 @@ import os
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from database.connection import get_db_session
-from database.models import (
-    ScoreHistory, Transaction, DataRetentionLog
-)
-from database.repositories import ScoreHistoryRepository
-from sqlalchemy import delete, and_, select, func
+from database.models import DataRetentionLog
+from database.partitions import drop_partitions_before, delete_rows_before
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -32,41 +29,35 @@ class DataRetentionService:
         
         try:
             async with get_db_session() as session:
-                # Count records to delete
-                result = await session.execute(
-                    select(func.count(ScoreHistory.id)).where(
-                        ScoreHistory.timestamp < cutoff_date
-                    )
-                )
-                count = result.scalar() or 0
+                # Archive if enabled
+                archived_count = 0
+                if archive:
+                    archived_count = await self._archive_score_history(session, cutoff_date)
+                
+                # Drop whole expired monthly partitions (row counts are planner estimates)
+                dropped = await drop_partitions_before(session, "score_history", cutoff_date)
+                estimated_dropped = sum(dropped.values())
+                # The rest of the cutoff month and the DEFAULT partition, in
+                # committed chunks
+                deleted_count = await delete_rows_before(session, "score_history", cutoff_date)
                 
-                if count == 0:
+                if not dropped and not deleted_count:
                     return {
                         "table": "score_history",
                         "records_deleted": 0,
-                        "archived_count": 0,
+                        "archived_count": archived_count,
                         "status": "success"
                     }
                 
-                # Archive if enabled
-                archived_count = 0
-                if archive:
-                    archived_count = await self._archive_score_history(session, cutoff_date)
-                
-                # Delete old records
-                result = await session.execute(
-                    delete(ScoreHistory).where(ScoreHistory.timestamp < cutoff_date)
-                )
-                deleted_count = result.rowcount
-                
                 # Log retention action
                 await self._log_retention_action(
                     session,
                     "score_history",
                     deleted_count,
+                    estimated_dropped,
                     archived_count,
                     retention_days,
-                    "success" if deleted_count > 0 else "failed"
+                    "success"
                 )
                 
                 logger.info(
@@ -74,6 +65,7 @@ class DataRetentionService:
                     extra={
                         "table": "score_history",
                         "deleted": deleted_count,
+                        "estimated_rows_dropped": estimated_dropped,
                         "archived": archived_count,
                         "cutoff_date": cutoff_date.isoformat()
                     }
@@ -82,6 +74,7 @@ class DataRetentionService:
                 return {
                     "table": "score_history",
                     "records_deleted": deleted_count,
+                    "estimated_rows_dropped": estimated_dropped,
                     "archived_count": archived_count,
                     "status": "success"
                 }
@@ -102,42 +95,36 @@ class DataRetentionService:
         
         try:
             async with get_db_session() as session:
-                # Count records to delete
-                from sqlalchemy import select, func
-                result = await session.execute(
-                    select(func.count(Transaction.id)).where(
-                        Transaction.block_timestamp < cutoff_date
-                    )
-                )
-                count = result.scalar() or 0
+                # Archive if enabled
+                archived_count = 0
+                if archive:
+                    archived_count = await self._archive_transactions(session, cutoff_date)
+                
+                # Drop whole expired monthly partitions, token transfers and
+                # inputs first (row counts are planner estimates)
+                dropped = await drop_partitions_before(session, "transactions", cutoff_date)
+                estimated_dropped = sum(dropped.values())
+                # The rest of the cutoff month and the DEFAULT partition, in
+                # committed chunks
+                deleted_count = await delete_rows_before(session, "transactions", cutoff_date)
                 
-                if count == 0:
+                if not dropped and not deleted_count:
                     return {
                         "table": "transactions",
                         "records_deleted": 0,
-                        "archived_count": 0,
+                        "archived_count": archived_count,
                         "status": "success"
                     }
                 
-                # Archive if enabled
-                archived_count = 0
-                if archive:
-                    archived_count = await self._archive_transactions(session, cutoff_date)
-                
-                # Delete old records
-                result = await session.execute(
-                    delete(Transaction).where(Transaction.block_timestamp < cutoff_date)
-                )
-                deleted_count = result.rowcount
-                
                 # Log retention action
                 await self._log_retention_action(
                     session,
                     "transactions",
                     deleted_count,
+                    estimated_dropped,
                     archived_count,
                     retention_days,
-                    "success" if deleted_count > 0 else "failed"
+                    "success"
                 )
                 
                 logger.info(
@@ -145,6 +132,7 @@ class DataRetentionService:
                     extra={
                         "table": "transactions",
                         "deleted": deleted_count,
+                        "estimated_rows_dropped": estimated_dropped,
                         "archived": archived_count,
                         "cutoff_date": cutoff_date.isoformat()
                     }
@@ -153,6 +141,7 @@ class DataRetentionService:
                 return {
                     "table": "transactions",
                     "records_deleted": deleted_count,
+                    "estimated_rows_dropped": estimated_dropped,
                     "archived_count": archived_count,
                     "status": "success"
                 }
@@ -195,6 +184,7 @@ class DataRetentionService:
         session,
         table_name: str,
         records_deleted: int,
+        estimated_rows_dropped: int,
         archived_count: int,
         retention_period_days: int,
         status: str
@@ -204,6 +194,7 @@ class DataRetentionService:
             log_entry = DataRetentionLog(
                 table_name=table_name,
                 records_deleted=records_deleted,
+                estimated_rows_dropped=estimated_rows_dropped,
                 archived_count=archived_count,
                 retention_period_days=retention_period_days,
                 status=status
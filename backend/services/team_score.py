@@ -2,7 +2,6 @@
 Team score service for DAO/organization team score aggregation
 """
 from typing import Dict, List, Optional, Any
-from decimal import Decimal
 from utils.logger import get_logger
 from services.scoring import ScoringService
 from services.referral_service import ReferralService
@@ -234,75 +233,44 @@ class TeamScoreService:
         team_id: int,
         session
     ) -> Optional[Dict[str, Any]]:
-        """Calculate team score from database"""
-        from database.models import Team, TeamMember, Score, TeamScore
-        from sqlalchemy import select, func
+        """Calculate team score from the trigger-maintained team aggregates"""
+        from database.models import Team, TeamScore
+        from sqlalchemy import select
         
         try:
-            # Get team
+            # Get team (re-read: the aggregate columns are written by triggers)
             result = await session.execute(
-                select(Team).where(Team.id == team_id)
+                select(Team).where(Team.id == team_id).execution_options(populate_existing=True)
             )
             team = result.scalar_one_or_none()
             
             if not team:
                 return None
             
-            # Get all members
-            members_result = await session.execute(
-                select(TeamMember).where(TeamMember.team_id == team_id)
-            )
-            members = members_result.scalars().all()
-            
-            if len(members) < self.MIN_TEAM_MEMBERS:
+            if team.member_count < self.MIN_TEAM_MEMBERS:
                 return {
                     "team_id": team_id,
                     "aggregate_score": 0,
-                    "member_count": len(members),
+                    "member_count": team.member_count,
                     "error": f"Team must have at least {self.MIN_TEAM_MEMBERS} members",
                 }
             
-            # Get scores for all members
-            member_addresses = [m.wallet_address for m in members]
-            scores_result = await session.execute(
-                select(Score).where(Score.wallet_address.in_(member_addresses))
-            )
-            scores = scores_result.scalars().all()
-            
-            if not scores:
+            if not team.score_weight_sum:
                 return {
                     "team_id": team_id,
                     "aggregate_score": 0,
-                    "member_count": len(members),
+                    "member_count": team.member_count,
                     "error": "No scores found for team members",
                 }
             
-            # Calculate weighted average (by contribution score if available)
-            total_weighted_score = Decimal('0')
-            total_weight = Decimal('0')
-            
-            for member in members:
-                # Find score for this member
-                member_score = next((s for s in scores if s.wallet_address == member.wallet_address), None)
-                if not member_score:
-                    continue
-                
-                # Weight by contribution score (default 1.0)
-                weight = Decimal(str(member.contribution_score)) if member.contribution_score else Decimal('1.0')
-                
-                total_weighted_score += Decimal(str(member_score.score)) * weight
-                total_weight += weight
-            
-            if total_weight == 0:
-                aggregate_score = 0
-            else:
-                aggregate_score = int(float(total_weighted_score / total_weight))
+            # Weighted average (by contribution score, default 1.0) over scored members
+            aggregate_score = int(team.weighted_score_sum / team.score_weight_sum)
             
             # Save team score
             team_score = TeamScore(
                 team_id=team_id,
                 aggregate_score=aggregate_score,
-                member_count=len(members)
+                member_count=team.member_count
             )
             session.add(team_score)
             await session.commit()
@@ -311,7 +279,7 @@ class TeamScoreService:
                 "team_id": team_id,
                 "team_name": team.team_name,
                 "aggregate_score": aggregate_score,
-                "member_count": len(members),
+                "member_count": team.member_count,
                 "calculated_at": team_score.calculated_at.isoformat() if team_score.calculated_at else None,
             }
         except Exception as e:
@@ -14,6 +14,8 @@ class TokenDistributorService:
     
     # Distribution threshold (NCRD)
     DISTRIBUTION_THRESHOLD = Decimal('100')  # Distribute when 100 NCRD total pending
+    # Pending rewards distributed per transaction
+    DISTRIBUTION_BATCH_SIZE = 1000
     
     def __init__(self):
         self.blockchain_service = BlockchainService()
@@ -69,12 +71,12 @@ class TokenDistributorService:
             Distribution result dict
         """
         try:
-            from database.connection import get_session
+            from database.connection import get_db_session
             from database.models import ReferralReward
             from sqlalchemy import select
             
             if session is None:
-                async with get_session() as db_session:
+                async with get_db_session() as db_session:
                     return await self._batch_distribute_rewards(rewards, db_session)
             else:
                 return await self._batch_distribute_rewards(rewards, session)
@@ -92,7 +94,8 @@ class TokenDistributorService:
     ) -> Dict[str, Any]:
         """Batch distribute rewards on-chain"""
         from database.models import ReferralReward
-        from sqlalchemy import select
+        from sqlalchemy import update
+        from datetime import datetime
         import os
         
         try:
@@ -107,34 +110,41 @@ class TokenDistributorService:
             
             # For now, simulate on-chain distribution
             # In production, would use web3 to call ERC20 transfer
-            distributed_count = 0
-            total_amount = Decimal('0')
-            
+            amounts = {}
             for reward in rewards:
                 reward_id = reward.get('id')
                 address = reward.get('address') or reward.get('recipient_address')
-                amount = Decimal(str(reward.get('amount', 0)))
-                
                 if not reward_id or not address:
                     continue
-                
-                # Update reward status
-                result = await session.execute(
-                    select(ReferralReward).where(ReferralReward.id == reward_id)
+                amounts[reward_id] = Decimal(str(reward.get('amount', 0)))
+            
+            if not amounts:
+                return {
+                    "success": True,
+                    "distributed_count": 0,
+                    "total_amount": 0.0,
+                }
+            
+            # In production: await self._transfer_tokens(address, amount, ncrd_token_address)
+            tx_hash = f"0x{'0' * 64}"  # Placeholder
+            
+            # One UPDATE for the batch; rows no longer pending are skipped
+            result = await session.execute(
+                update(ReferralReward)
+                .where(
+                    ReferralReward.id.in_(list(amounts)),
+                    ReferralReward.status == 'pending'
                 )
-                reward_obj = result.scalar_one_or_none()
-                
-                if reward_obj and reward_obj.status == 'pending':
-                    # Simulate on-chain transfer
-                    # In production: await self._transfer_tokens(address, amount, ncrd_token_address)
-                    tx_hash = f"0x{'0' * 64}"  # Placeholder
-                    
-                    reward_obj.status = 'distributed'
-                    reward_obj.distribution_tx_hash = tx_hash
-                    reward_obj.distributed_at = datetime.utcnow()
-                    
-                    distributed_count += 1
-                    total_amount += amount
+                .values(
+                    status='distributed',
+                    distribution_tx_hash=tx_hash,
+                    distributed_at=datetime.utcnow()
+                )
+                .returning(ReferralReward.id)
+            )
+            distributed_ids = result.scalars().all()
+            distributed_count = len(distributed_ids)
+            total_amount = sum((amounts[reward_id] for reward_id in distributed_ids), Decimal('0'))
             
             await session.commit()
             
@@ -167,12 +177,12 @@ class TokenDistributorService:
             Threshold check result dict
         """
         try:
-            from database.connection import get_session
+            from database.connection import get_db_session
             from database.models import ReferralReward
             from sqlalchemy import select, func
             
             if session is None:
-                async with get_session() as db_session:
+                async with get_db_session() as db_session:
                     return await self._check_distribution_threshold(db_session)
             else:
                 return await self._check_distribution_threshold(session)
@@ -189,16 +199,17 @@ class TokenDistributorService:
     ) -> Dict[str, Any]:
         """Check threshold from database"""
         from database.models import ReferralReward
+        from services.referral_rewards import wei_to_ncrd
         from sqlalchemy import select, func
         
         try:
-            # Sum pending rewards
+            # Sum pending rewards (integer base units)
             result = await session.execute(
-                select(func.sum(ReferralReward.amount_ncrd)).where(
+                select(func.sum(ReferralReward.amount_wei)).where(
                     ReferralReward.status == 'pending'
                 )
             )
-            total_pending = result.scalar() or Decimal('0')
+            total_pending = wei_to_ncrd(result.scalar() or 0)
             
             threshold_reached = total_pending >= self.DISTRIBUTION_THRESHOLD
             
@@ -231,12 +242,12 @@ class TokenDistributorService:
             Distribution result dict
         """
         try:
-            from database.connection import get_session
+            from database.connection import get_db_session
             from database.models import ReferralReward
             from sqlalchemy import select
             
             if session is None:
-                async with get_session() as db_session:
+                async with get_db_session() as db_session:
                     return await self._execute_onchain_distribution(pending_rewards, db_session)
             else:
                 return await self._execute_onchain_distribution(pending_rewards, session)
@@ -254,36 +265,72 @@ class TokenDistributorService:
     ) -> Dict[str, Any]:
         """Execute on-chain distribution"""
         from database.models import ReferralReward
+        from services.referral_rewards import wei_to_ncrd
         from sqlalchemy import select
-        from datetime import datetime
         
         try:
-            # Fetch pending rewards if not provided
-            if pending_rewards is None:
+            if pending_rewards is not None:
+                if not pending_rewards:
+                    return {
+                        "success": True,
+                        "message": "No pending rewards to distribute",
+                        "distributed_count": 0,
+                    }
+                return await self._batch_distribute_rewards(pending_rewards, session)
+            
+            # Page through pending rewards by id, selecting only the columns
+            # needed; each page is distributed and committed in its own short
+            # transaction, so memory and lock time stay bounded
+            distributed_count = 0
+            total_amount = 0.0
+            last_id = 0
+            while True:
                 result = await session.execute(
-                    select(ReferralReward).where(
-                        ReferralReward.status == 'pending'
-                    ).limit(100)  # Limit batch size
+                    select(
+                        ReferralReward.id,
+                        ReferralReward.recipient_address,
+                        ReferralReward.amount_wei
+                    ).where(
+                        ReferralReward.status == 'pending',
+                        ReferralReward.id > last_id
+                    ).order_by(ReferralReward.id).limit(self.DISTRIBUTION_BATCH_SIZE)
                 )
-                rewards = result.scalars().all()
-                pending_rewards = [
-                    {
-                        "id": r.id,
-                        "address": r.recipient_address,
-                        "amount": float(r.amount_ncrd),
-                    }
-                    for r in rewards
-                ]
+                rows = result.all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                
+                batch = await self._batch_distribute_rewards(
+                    [
+                        {
+                            "id": row.id,
+                            "address": row.recipient_address,
+                            "amount": wei_to_ncrd(row.amount_wei),
+                        }
+                        for row in rows
+                    ],
+                    session
+                )
+                if not batch.get("success"):
+                    return batch
+                distributed_count += batch["distributed_count"]
+                total_amount += batch["total_amount"]
+                
+                if len(rows) < self.DISTRIBUTION_BATCH_SIZE:
+                    break
             
-            if not pending_rewards:
+            if distributed_count == 0:
                 return {
                     "success": True,
                     "message": "No pending rewards to distribute",
                     "distributed_count": 0,
                 }
             
-            # Batch distribute
-            return await self._batch_distribute_rewards(pending_rewards, session)
+            return {
+                "success": True,
+                "distributed_count": distributed_count,
+                "total_amount": total_amount,
+            }
         except Exception as e:
             logger.error(f"Error in _execute_onchain_distribution: {e}", exc_info=True)
             return {
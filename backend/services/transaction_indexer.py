@@ -7,7 +7,7 @@ tracks contract interactions, and stores detailed transaction data.
 
 import os
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 from web3 import Web3
 from web3.types import TxReceipt, TxData
@@ -15,8 +15,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
-from database.models import Transaction, User, TokenTransfer
+from database.models import Transaction, User
 from database.connection import get_db_session
+from database.staging import stage_rows
+from database.bulk import upsert_transactions, upsert_token_transfers
 from utils.logger import get_logger
 from utils.metrics import (
     record_blockchain_rpc_call,
@@ -40,6 +42,8 @@ class TransactionIndexer:
         self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
         self.batch_size = int(os.getenv("INDEXER_BATCH_SIZE", "100"))
         self.max_blocks_per_request = int(os.getenv("INDEXER_MAX_BLOCKS", "1000"))
+        # Write into UNLOGGED staging tables, moved by workers/staging_flush_job.py
+        self.use_staging = os.getenv("INDEXER_USE_STAGING", "false").lower() == "true"
         
     async def index_address_transactions(
         self,
@@ -93,6 +97,7 @@ class TransactionIndexer:
                 
                 # Index transactions in batches
                 transactions_indexed = 0
+                transaction_rows = []
                 token_transfers = []
                 contract_interactions = []
                 
@@ -108,31 +113,33 @@ class TransactionIndexer:
                     )
                     
                     for tx_data in txs:
-                        # Index transaction
-                        tx_record = await self._index_transaction(
-                            session,
-                            user,
-                            tx_data,
-                            checksum_address
-                        )
+                        # Index transaction; raises if the block timestamp
+                        # can't be fetched, so the batch is retried from the
+                        # last indexed block instead of losing the row
+                        tx_record = self._build_transaction_row(tx_data, checksum_address)
+                        transaction_rows.append(tx_record)
+                        transactions_indexed += 1
                         
-                        if tx_record:
-                            transactions_indexed += 1
-                            
-                            # Extract token transfers
-                            transfers = await self._extract_token_transfers(tx_data)
-                            token_transfers.extend(transfers)
-                            
-                            # Extract contract interactions
-                            if tx_data.get("to") and tx_data["to"] != checksum_address:
-                                contract_interactions.append({
-                                    "tx_hash": tx_data["hash"].hex(),
-                                    "contract_address": tx_data["to"],
-                                    "method_id": tx_data.get("input", "0x")[:10] if tx_data.get("input") else None
-                                })
+                        # Extract token transfers (stored in the parent's partition)
+                        transfers = await self._extract_token_transfers(tx_data)
+                        for transfer in transfers:
+                            transfer["block_timestamp"] = tx_record["block_timestamp"]
+                        token_transfers.extend(transfers)
+                        
+                        # Extract contract interactions
+                        if tx_data.get("to") and tx_data["to"] != checksum_address:
+                            contract_interactions.append({
+                                "tx_hash": tx_data["hash"].hex(),
+                                "contract_address": tx_data["to"],
+                                "method_id": tx_data.get("input", "0x")[:10] if tx_data.get("input") else None
+                            })
                 
-                # Store token transfers and contract interactions
-                await self._store_token_transfers(session, token_transfers)
+                # Store transactions, token transfers and contract interactions
+                if self.use_staging:
+                    await stage_rows(session, transaction_rows, token_transfers)
+                else:
+                    await upsert_transactions(session, transaction_rows)
+                    await self._store_token_transfers(session, token_transfers)
                 await self._store_contract_interactions(session, contract_interactions)
                 
                 await session.commit()
@@ -262,63 +269,36 @@ class TransactionIndexer:
         
         return transactions
     
-    async def _index_transaction(
-        self,
-        session: AsyncSession,
-        user: User,
-        tx_data: Dict[str, Any],
-        address: str
-    ) -> Optional[Transaction]:
-        """Index a single transaction"""
-        try:
-            tx_hash = tx_data["hash"].hex() if hasattr(tx_data["hash"], "hex") else tx_data["hash"]
-            
-            # Check if already indexed
-            stmt = select(Transaction).where(Transaction.tx_hash == tx_hash)
-            result = await session.execute(stmt)
-            existing = result.scalar_one_or_none()
-            
-            if existing:
-                return existing
-            
-            # Determine transaction type
-            tx_type = self._classify_transaction_type(tx_data, address)
-            
-            # Get block info
-            block_number = tx_data.get("blockNumber")
-            block_timestamp = None
-            if block_number:
-                try:
-                    block = self.w3.eth.get_block(block_number)
-                    block_timestamp = block.timestamp
-                except:
-                    pass
-            
-            # Create transaction record
-            transaction = Transaction(
-                wallet_address=address,
-                tx_hash=tx_hash,
-                tx_type=tx_type,
-                block_number=block_number,
-                block_timestamp=block_timestamp,
-                from_address=tx_data.get("from"),
-                to_address=tx_data.get("to"),
-                value=tx_data.get("value", 0),
-                gas_used=tx_data.get("gas_used") or tx_data.get("gas"),
-                gas_price=tx_data.get("gasPrice"),
-                status=tx_data.get("status", "pending"),
-                input_data=tx_data.get("input", "0x")[:1000] if tx_data.get("input") else None,  # Truncate for storage
-                contract_address=tx_data.get("to") if tx_data.get("input") else None
-            )
-            
-            session.add(transaction)
-            await session.flush()
-            
-            return transaction
-            
-        except Exception as e:
-            logger.error(f"Error indexing transaction: {e}", exc_info=True)
-            return None
+    def _build_transaction_row(self, tx_data: Dict[str, Any], address: str) -> Dict[str, Any]:
+        """Column values for a transaction record (also used for staging rows)"""
+        tx_hash = tx_data["hash"].hex() if hasattr(tx_data["hash"], "hex") else tx_data["hash"]
+        
+        # Determine transaction type
+        tx_type = self._classify_transaction_type(tx_data, address)
+        
+        # Get block info; the timestamp is the partition key, so RPC errors
+        # propagate rather than producing a row that can't be stored
+        block_number = tx_data.get("blockNumber")
+        if block_number is None:
+            raise ValueError(f"Transaction {tx_hash} has no block number")
+        block = self.w3.eth.get_block(block_number)
+        block_timestamp = datetime.fromtimestamp(block.timestamp, tz=timezone.utc)
+        
+        return {
+            "wallet_address": address,
+            "tx_hash": tx_hash,
+            "tx_type": tx_type,
+            "block_number": block_number,
+            "block_timestamp": block_timestamp,
+            "from_address": tx_data.get("from"),
+            "to_address": tx_data.get("to"),
+            "value": tx_data.get("value", 0),
+            "gas_used": tx_data.get("gas_used") or tx_data.get("gas"),
+            "gas_price": tx_data.get("gasPrice"),
+            "status": tx_data.get("status", "pending"),
+            "input_data": tx_data.get("input", "0x")[:1000] if tx_data.get("input") else None,  # Truncate for storage
+            "contract_address": tx_data.get("to") if tx_data.get("input") else None
+        }
     
     def _classify_transaction_type(self, tx_data: Dict[str, Any], address: str) -> str:
         """Classify transaction type"""
@@ -388,40 +368,8 @@ class TransactionIndexer:
         session: AsyncSession,
         transfers: List[Dict[str, Any]]
     ):
-        """Store token transfers in database"""
-        for transfer in transfers:
-            try:
-                # Check if already stored
-                stmt = select(TokenTransfer).where(
-                    TokenTransfer.tx_hash == transfer["tx_hash"],
-                    TokenTransfer.token_address == transfer["token_address"],
-                    TokenTransfer.from_address == transfer["from_address"],
-                    TokenTransfer.to_address == transfer["to_address"]
-                )
-                result = await session.execute(stmt)
-                existing = result.scalar_one_or_none()
-                
-                if existing:
-                    continue
-                
-                # Create token transfer record
-                token_transfer = TokenTransfer(
-                    tx_hash=transfer["tx_hash"],
-                    token_address=transfer["token_address"],
-                    token_type=transfer["token_type"],
-                    from_address=transfer["from_address"],
-                    to_address=transfer["to_address"],
-                    amount=transfer.get("amount"),
-                    token_id=transfer.get("token_id"),
-                    block_number=transfer.get("block_number"),
-                    block_timestamp=transfer.get("block_timestamp")
-                )
-                
-                session.add(token_transfer)
-                
-            except Exception as e:
-                logger.warning(f"Error storing token transfer: {e}", extra={"transfer": transfer})
-                continue
+        """Store token transfers in database (replayed transfers are skipped)"""
+        await upsert_token_transfers(session, transfers)
     
     async def _store_contract_interactions(
         self,
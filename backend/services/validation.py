@@ -97,7 +97,7 @@ class DataValidationService:
             async with get_db_session() as session:
                 # Check scores -> users
                 result = await session.execute(text("""
-                    SELECT s.wallet_address 
+                    SELECT '0x' || encode(s.wallet_address, 'hex')
                     FROM scores s 
                     LEFT JOIN users u ON s.wallet_address = u.wallet_address 
                     WHERE u.wallet_address IS NULL
@@ -108,7 +108,7 @@ class DataValidationService:
                 
                 # Check loans -> users
                 result = await session.execute(text("""
-                    SELECT l.id, l.wallet_address 
+                    SELECT l.id, '0x' || encode(l.wallet_address, 'hex')
                     FROM loans l 
                     LEFT JOIN users u ON l.wallet_address = u.wallet_address 
                     WHERE u.wallet_address IS NULL
@@ -119,7 +119,7 @@ class DataValidationService:
                 
                 # Check transactions -> users
                 result = await session.execute(text("""
-                    SELECT t.id, t.wallet_address 
+                    SELECT t.id, '0x' || encode(t.wallet_address, 'hex')
                     FROM transactions t 
                     LEFT JOIN users u ON t.wallet_address = u.wallet_address 
                     WHERE u.wallet_address IS NULL
@@ -71,6 +71,21 @@ async def _store_score_in_db(wallet_address: str, score_data: Dict):
         logger.error(f"Error storing score in DB: {e}", exc_info=True, extra={"address": wallet_address})
 
 
+async def _store_scores_in_db(results: Dict[str, Dict]):
+    """Store a batch of scores (and their history) in two multi-row statements"""
+    rows = [
+        {"wallet_address": address, "score": score_data["score"], "risk_band": score_data["riskBand"]}
+        for address, score_data in results.items()
+        if "error" not in score_data
+    ]
+    try:
+        async with get_db_session() as session:
+            await ScoreRepository.upsert_scores(session, rows)
+            await ScoreHistoryRepository.add_history_batch(session, rows)
+    except Exception as e:
+        logger.error(f"Error storing batch scores in DB: {e}", exc_info=True, extra={"count": len(rows)})
+
+
 def compute_scores_batch(wallet_addresses: List[str]) -> Dict[str, Dict]:
     """
     Compute scores for multiple addresses in batch
@@ -92,15 +107,15 @@ def compute_scores_batch(wallet_addresses: List[str]) -> Dict[str, Dict]:
                 result = loop.run_until_complete(scoring_service.compute_score(address))
                 results[address] = result
                 
-                # Store in database if configured
-                if os.getenv("DATABASE_URL"):
-                    loop.run_until_complete(_store_score_in_db(address, result))
-                
                 # Cache result
                 cache_score(address, result)
             except Exception as e:
                 logger.error(f"Error computing score for {address}: {e}", exc_info=True)
                 results[address] = {"error": str(e)}
+        
+        # Store in database if configured
+        if os.getenv("DATABASE_URL"):
+            loop.run_until_complete(_store_scores_in_db(results))
     finally:
         loop.close()
     
@@ -127,24 +142,25 @@ def recalculate_stale_scores(hours: int = 24) -> int:
         
         cutoff = datetime.utcnow() - timedelta(hours=hours)
         
+        async def _get_stale_scores():
+            async with get_db_session() as session:
+                return await ScoreRepository.get_recent_scores(session, limit=1000, hours=hours)
+        
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            async with get_db_session() as session:
-                stale_scores = await ScoreRepository.get_recent_scores(session, limit=1000, hours=hours)
-                
-                count = 0
-                for score in stale_scores:
-                    if score.last_updated < cutoff:
-                        try:
-                            compute_score_task(score.wallet_address)
-                            count += 1
-                        except Exception as e:
-                            logger.error(f"Error recalculating score: {e}", exc_info=True)
+            stale_scores = loop.run_until_complete(_get_stale_scores())
         finally:
             loop.close()
         
-        return count
+        stale_addresses = [score.wallet_address for score in stale_scores if score.last_updated < cutoff]
+        if not stale_addresses:
+            return 0
+        
+        # compute_scores_batch runs its own event loop and stores the scores
+        # and their history rows in one multi-row statement each
+        results = compute_scores_batch(stale_addresses)
+        return sum(1 for result in results.values() if "error" not in result)
     except Exception as e:
         logger.error(f"Error in recalculate_stale_scores: {e}", exc_info=True)
         return 0
@@ -0,0 +1,71 @@
+"""
+Integration tests for /api/social endpoints
+"""
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi.testclient import TestClient
+from app import app
+
+
+@pytest.mark.integration
+class TestAPISocialShare:
+    """Test /api/social/share endpoint"""
+    
+    ADDRESS = "0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb0"
+    
+    @pytest.fixture
+    def client(self):
+        """Create test client"""
+        return TestClient(app)
+    
+    @pytest.fixture
+    def session(self):
+        """Mock database session that assigns an id on commit"""
+        session = Mock()
+        added = []
+        session.add = Mock(side_effect=added.append)
+        
+        async def commit():
+            for row in added:
+                row.id = 42
+        
+        session.commit = AsyncMock(side_effect=commit)
+        session.added = added
+        return session
+    
+    def _db_session(self, session):
+        @asynccontextmanager
+        async def get_db_session():
+            yield session
+        return get_db_session
+    
+    def test_record_share_snapshots_score(self, client, session):
+        """Test that a share stores the wallet's current score and risk band"""
+        with patch("database.connection.get_db_session", self._db_session(session)), \
+             patch("database.cache.get_score", AsyncMock(return_value={"score": 712, "risk_band": 1})):
+            response = client.post(
+                "/api/social/share",
+                params={"address": self.ADDRESS},
+                json={"share_type": "twitter", "badge_style": "minimal"},
+            )
+        
+        assert response.status_code == 200
+        assert response.json() == {"success": True, "share_id": 42, "score_at_share": 712}
+        share = session.added[0]
+        assert share.share_type == "twitter"
+        assert share.risk_band_at_share == 1
+    
+    def test_record_share_without_score(self, client, session):
+        """Test that a wallet without a score is shared with an empty snapshot"""
+        with patch("database.connection.get_db_session", self._db_session(session)), \
+             patch("database.cache.get_score", AsyncMock(return_value=None)):
+            response = client.post(
+                "/api/social/share",
+                params={"address": self.ADDRESS},
+                json={},
+            )
+        
+        assert response.status_code == 200
+        assert response.json()["score_at_share"] is None
+        assert session.added[0].share_type == "custom"
@@ -0,0 +1,59 @@
+"""
+Integration tests for application startup and shutdown
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from app import app
+
+
+@pytest.mark.integration
+class TestAppLifespan:
+    """Test work done when the application stops"""
+    
+    def test_shutdown_flushes_api_key_usage(self):
+        """Test that queued last_used_at writes are flushed on shutdown"""
+        with patch("app.flush_last_used", AsyncMock(return_value=2)) as flush:
+            with TestClient(app) as client:
+                client.get("/health")
+                flush.assert_not_awaited()
+            
+            flush.assert_awaited_once()
+    
+    def test_shutdown_flushes_metrics(self):
+        """Test that queued metric updates are applied on shutdown"""
+        with patch("app.flush_last_used", AsyncMock(return_value=0)), \
+             patch("app.flush_metrics") as flush:
+            with TestClient(app):
+                flush.assert_not_called()
+            
+            flush.assert_called_once()
+    
+    def test_shutdown_flushes_deferred_logs(self):
+        """Test that log records deferred with emit_later are written on shutdown"""
+        with patch("app.flush_last_used", AsyncMock(return_value=0)), \
+             patch("app.flush_deferred") as flush:
+            with TestClient(app):
+                flush.assert_not_called()
+            
+            flush.assert_called_once()
+
+
+@pytest.mark.integration
+class TestMetricsEndpoint:
+    """Test /metrics endpoint"""
+    
+    def test_scrape_includes_queued_updates(self):
+        """Test that a scrape sees counter increments still waiting for the flush task"""
+        from utils.metrics import errors_total, inc_later
+        
+        child = errors_total.labels(error_type="scrape_test", endpoint="/metrics-test")
+        before = child._value.get()
+        inc_later(child, 3)
+        
+        response = TestClient(app).get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert child._value.get() == before + 3
+        assert 'error_type="scrape_test"' in response.text
@@ -1,10 +1,23 @@
 """
 Unit tests for ABTestingService
 """
+import numpy as np
+import orjson
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from decimal import Decimal
-from services.ab_testing import ABTestingService
+from scipy import stats
+from sqlalchemy.exc import IntegrityError
+from services.ab_testing import (
+    ABTestingService,
+    ExperimentSnapshot,
+    ALLOCATION_HASH_PREFIX,
+    ALLOCATION_HASH_TTL,
+    ALLOCATION_QUEUE_KEY,
+    ALLOCATION_PROCESSING_KEY,
+    ALLOCATION_DEAD_LETTER_KEY,
+    flush_pending_allocations,
+)
 from database.models import ABExperiment, ABAllocation, ABMetric
 
 
@@ -163,3 +176,355 @@ class TestABTestingService:
             assert "variant_a" in result["results"]
             assert "variant_b" in result["results"]
 
+
+
+@pytest.mark.unit
+class TestVariantAssignment:
+    """Test deterministic variant hashing"""
+    
+    def test_assignment_is_deterministic(self):
+        """Test that a wallet always lands in the same variant of an experiment"""
+        wallet = "0x" + "ab" * 20
+        
+        assert ABTestingService._assign_variant("exp", wallet, Decimal("0.5")) == \
+            ABTestingService._assign_variant("exp", wallet, Decimal("0.5"))
+    
+    def test_ratio_bounds(self):
+        """Test that ratio 0 keeps everyone on A and ratio 1 moves everyone to B"""
+        wallets = [f"0x{i:040x}" for i in range(200)]
+        
+        assert {ABTestingService._assign_variant("exp", w, 0) for w in wallets} == {"A"}
+        assert {ABTestingService._assign_variant("exp", w, 1) for w in wallets} == {"B"}
+    
+    def test_split_follows_ratio(self):
+        """Test that allocations roughly follow the configured ratio"""
+        wallets = [f"0x{i:040x}" for i in range(5000)]
+        
+        share_b = sum(ABTestingService._assign_variant("exp", w, 0.3) == "B" for w in wallets) / len(wallets)
+        
+        assert 0.27 < share_b < 0.33
+
+
+@pytest.mark.unit
+class TestExperimentCache:
+    """Test the experiment snapshot cache"""
+    
+    @staticmethod
+    def _session(row):
+        session = Mock()
+        result = Mock()
+        result.one_or_none = Mock(return_value=row)
+        session.execute = AsyncMock(return_value=result)
+        return session
+    
+    @pytest.mark.asyncio
+    async def test_lookup_is_cached_within_ttl(self):
+        """Test that repeated lookups reuse the snapshot instead of querying"""
+        service = ABTestingService()
+        session = self._session((1, "active", Decimal("0.5"), "control", "treatment"))
+        
+        first = await service._get_experiment_cached(session, "exp")
+        second = await service._get_experiment_cached(session, "exp")
+        
+        assert first == second
+        assert first.id == 1 and first.status == "active"
+        assert session.execute.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_lookup_refreshes_after_ttl(self):
+        """Test that an expired snapshot is reloaded"""
+        service = ABTestingService()
+        service._exp_cache_ttl = 0.0
+        session = self._session((1, "draft", Decimal("0.5"), "control", "treatment"))
+        
+        await service._get_experiment_cached(session, "exp")
+        await service._get_experiment_cached(session, "exp")
+        
+        assert session.execute.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_missing_experiment_is_not_cached(self):
+        """Test that unknown experiments are looked up again"""
+        service = ABTestingService()
+        session = self._session(None)
+        
+        assert await service._get_experiment_cached(session, "missing") is None
+        assert await service._get_experiment_cached(session, "missing") is None
+        
+        assert session.execute.await_count == 2
+        assert "missing" not in service._exp_cache
+    
+    @pytest.mark.asyncio
+    async def test_start_experiment_invalidates_snapshot(self):
+        """Test that starting an experiment drops its cached draft snapshot"""
+        service = ABTestingService()
+        await service._get_experiment_cached(
+            self._session((1, "draft", Decimal("0.5"), "control", "treatment")), "exp"
+        )
+        
+        experiment = Mock()
+        result = Mock()
+        result.scalar_one_or_none = Mock(return_value=experiment)
+        session = AsyncMock()
+        session.execute = AsyncMock(return_value=result)
+        session_cm = AsyncMock()
+        session_cm.__aenter__.return_value = session
+        
+        with patch("services.ab_testing.get_db_session", return_value=session_cm):
+            response = await service.start_experiment("exp")
+        
+        assert response["status"] == "success"
+        assert "exp" not in service._exp_cache
+
+
+@pytest.mark.unit
+class TestAllocationQueue:
+    """Test write-behind allocation queueing"""
+    
+    WALLET = "0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb"
+    
+    @staticmethod
+    def _service(write_behind=True):
+        service = ABTestingService()
+        service.write_behind = write_behind
+        service._get_experiment_cached = AsyncMock(
+            return_value=ExperimentSnapshot(7, "active", Decimal("0.5"), "control", "treatment")
+        )
+        return service
+    
+    @staticmethod
+    def _session_cm(allocation=None):
+        result = Mock()
+        result.scalar_one_or_none = Mock(return_value=allocation)
+        session = AsyncMock()
+        session.add = Mock()
+        session.execute = AsyncMock(return_value=result)
+        session_cm = AsyncMock()
+        session_cm.__aenter__.return_value = session
+        return session_cm, session
+    
+    @pytest.mark.asyncio
+    async def test_cached_variant_skips_database(self):
+        """Test that a variant found in Redis is returned without a query"""
+        service = self._service()
+        client = Mock()
+        client.hget = Mock(return_value="B")
+        session_cm, session = self._session_cm()
+        
+        with patch("services.ab_testing.get_db_session", return_value=session_cm), \
+             patch("services.ab_testing.get_redis_client", return_value=client):
+            variant = await service.get_variant("exp", self.WALLET)
+        
+        assert variant == "B"
+        client.hget.assert_called_once_with(f"{ALLOCATION_HASH_PREFIX}:7", self.WALLET)
+        session.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_new_allocation_is_queued(self):
+        """Test that a first touch is queued in Redis instead of committed"""
+        service = self._service()
+        client = Mock()
+        client.hget = Mock(return_value=None)
+        pipe = client.pipeline.return_value
+        session_cm, session = self._session_cm()
+        
+        with patch("services.ab_testing.get_db_session", return_value=session_cm), \
+             patch("services.ab_testing.get_redis_client", return_value=client):
+            variant = await service.get_variant("exp", self.WALLET)
+        
+        assert variant == ABTestingService._assign_variant("exp", self.WALLET, Decimal("0.5"))
+        pipe.hsetnx.assert_called_once_with(f"{ALLOCATION_HASH_PREFIX}:7", self.WALLET, variant)
+        pipe.expire.assert_called_once_with(f"{ALLOCATION_HASH_PREFIX}:7", ALLOCATION_HASH_TTL)
+        queue_key, entry = pipe.lpush.call_args.args
+        assert queue_key == ALLOCATION_QUEUE_KEY
+        assert orjson.loads(entry) == {"experiment_id": 7, "wallet_address": self.WALLET, "variant": variant}
+        session.add.assert_not_called()
+        session.commit.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_allocation_written_inline_by_default(self):
+        """Test that without write-behind the allocation is committed and only cached in Redis"""
+        assert ABTestingService().write_behind is False
+        service = self._service(write_behind=False)
+        client = Mock()
+        client.hget = Mock(return_value=None)
+        pipe = client.pipeline.return_value
+        session_cm, session = self._session_cm()
+        
+        with patch("services.ab_testing.get_db_session", return_value=session_cm), \
+             patch("services.ab_testing.get_redis_client", return_value=client):
+            variant = await service.get_variant("exp", self.WALLET)
+        
+        session.add.assert_called_once()
+        session.commit.assert_awaited_once()
+        pipe.hsetnx.assert_called_once_with(f"{ALLOCATION_HASH_PREFIX}:7", self.WALLET, variant)
+        pipe.lpush.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_allocation_written_without_redis(self):
+        """Test that allocations are committed directly when Redis is unavailable"""
+        service = self._service()
+        session_cm, session = self._session_cm()
+        
+        with patch("services.ab_testing.get_db_session", return_value=session_cm), \
+             patch("services.ab_testing.get_redis_client", return_value=None):
+            await service.get_variant("exp", self.WALLET)
+        
+        session.add.assert_called_once()
+        session.commit.assert_awaited_once()
+    
+    @staticmethod
+    def _entries(count):
+        return [
+            orjson.dumps({"experiment_id": 7, "wallet_address": f"0x{i:040x}", "variant": "A"}).decode()
+            for i in range(count)
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_flush_takes_oldest_batch(self):
+        """Test that a flush moves the queue tail to processing and clears it after the commit"""
+        entries = self._entries(3)
+        client = Mock()
+        client.lrange = Mock(return_value=[])
+        pipe = client.pipeline.return_value
+        pipe.execute = Mock(return_value=entries + [None] * 997)
+        session = AsyncMock()
+        
+        with patch("services.ab_testing.get_redis_client", return_value=client):
+            flushed = await flush_pending_allocations(session, limit=1000)
+        
+        assert flushed == 3
+        assert pipe.lmove.call_count == 1000
+        pipe.lmove.assert_called_with(ALLOCATION_QUEUE_KEY, ALLOCATION_PROCESSING_KEY, "RIGHT", "LEFT")
+        session.execute.assert_awaited_once()
+        session.commit.assert_awaited_once()
+        pipe.ltrim.assert_called_once_with(ALLOCATION_PROCESSING_KEY, 0, -4)
+        pipe.rpush.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_flush_retries_processing_batch_first(self):
+        """Test that entries left by a failed flush are inserted before taking new ones"""
+        entries = self._entries(2)
+        client = Mock()
+        client.lrange = Mock(return_value=entries)
+        pipe = client.pipeline.return_value
+        session = AsyncMock()
+        
+        with patch("services.ab_testing.get_redis_client", return_value=client):
+            flushed = await flush_pending_allocations(session)
+        
+        assert flushed == 2
+        client.lrange.assert_called_once_with(ALLOCATION_PROCESSING_KEY, 0, -1)
+        pipe.lmove.assert_not_called()
+        pipe.ltrim.assert_called_once_with(ALLOCATION_PROCESSING_KEY, 0, -3)
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_batch_in_processing(self):
+        """Test that a batch stays on the processing list when the insert fails"""
+        client = Mock()
+        client.lrange = Mock(return_value=self._entries(1))
+        pipe = client.pipeline.return_value
+        session = AsyncMock()
+        session.execute = AsyncMock(side_effect=RuntimeError("db down"))
+        
+        with patch("services.ab_testing.get_redis_client", return_value=client):
+            with pytest.raises(RuntimeError):
+                await flush_pending_allocations(session)
+        
+        pipe.ltrim.assert_not_called()
+        session.commit.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_rejected_rows_are_dead_lettered(self):
+        """Test that rows the database rejects are dead-lettered and the rest inserted"""
+        entries = self._entries(2) + ["not json"]
+        rejected = IntegrityError("INSERT", {}, Exception("fk violation"))
+        client = Mock()
+        client.lrange = Mock(return_value=entries)
+        pipe = client.pipeline.return_value
+        session = AsyncMock()
+        session.begin_nested = Mock(return_value=AsyncMock())
+        session.execute = AsyncMock(side_effect=[rejected, None, rejected])
+        
+        with patch("services.ab_testing.get_redis_client", return_value=client):
+            flushed = await flush_pending_allocations(session)
+        
+        assert flushed == 3
+        session.rollback.assert_awaited_once()
+        session.commit.assert_awaited_once()
+        pipe.rpush.assert_called_once_with(ALLOCATION_DEAD_LETTER_KEY, "not json", entries[1])
+        pipe.ltrim.assert_called_once_with(ALLOCATION_PROCESSING_KEY, 0, -4)
+
+
+@pytest.mark.unit
+class TestExperimentResults:
+    """Test experiment statistics computed from SQL aggregates"""
+    
+    @staticmethod
+    def _aggregates(variant, values, count=None):
+        values = [Decimal(str(v)) for v in values]
+        mean = sum(values) / len(values)
+        return (
+            variant,
+            len(values) if count is None else count,
+            len(values),
+            mean,
+            sum((v - mean) ** 2 for v in values) / (len(values) - 1) if len(values) > 1 else None,
+        )
+    
+    async def _results(self, rows):
+        experiment = Mock()
+        experiment.id = 1
+        experiment.status = "active"
+        experiment.variant_a_name = "rule_based"
+        experiment.variant_b_name = "ml_model"
+        
+        experiment_result = Mock()
+        experiment_result.scalar_one_or_none = Mock(return_value=experiment)
+        aggregate_result = Mock()
+        aggregate_result.all = Mock(return_value=rows)
+        session = AsyncMock()
+        session.execute = AsyncMock(side_effect=[experiment_result, aggregate_result])
+        session_cm = AsyncMock()
+        session_cm.__aenter__.return_value = session
+        
+        with patch("services.ab_testing.get_db_session", return_value=session_cm):
+            return await ABTestingService().get_experiment_results("test_exp")
+    
+    @pytest.mark.asyncio
+    async def test_welch_matches_row_level_test(self):
+        """Test that aggregate statistics match a t-test over the raw values"""
+        values_a = [0.05, 0.07, 0.04, 0.06, 0.08]
+        values_b = [0.03, 0.02, 0.04, 0.03]
+        
+        results = await self._results([
+            self._aggregates("A", values_a, count=6),
+            self._aggregates("B", values_b),
+        ])
+        
+        expected = stats.ttest_ind(values_a, values_b, equal_var=False).pvalue
+        assert results["variant_a"]["count"] == 6
+        assert results["variant_b"]["count"] == 4
+        assert results["variant_a"]["mean"] == pytest.approx(np.mean(values_a))
+        assert results["variant_b"]["mean"] == pytest.approx(np.mean(values_b))
+        assert results["statistical_significance"]["p_value"] == pytest.approx(expected)
+        assert results["statistical_significance"]["significant"] is bool(expected < 0.05)
+    
+    @pytest.mark.asyncio
+    async def test_constant_values_are_not_significant(self):
+        """Test that zero variance in both variants gives p = 1"""
+        results = await self._results([
+            self._aggregates("A", [0.1, 0.1, 0.1]),
+            self._aggregates("B", [0.1, 0.1]),
+        ])
+        
+        assert results["statistical_significance"] == {"p_value": 1.0, "significant": False}
+    
+    @pytest.mark.asyncio
+    async def test_missing_variant_has_no_statistics(self):
+        """Test that a variant without metrics yields counts only"""
+        results = await self._results([self._aggregates("A", [0.1, 0.2])])
+        
+        assert results["variant_b"]["count"] == 0
+        assert "mean" not in results["variant_a"]
+        assert "statistical_significance" not in results
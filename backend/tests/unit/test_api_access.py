@@ -0,0 +1,51 @@
+"""
+Unit tests for API key validation and last-use batching
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from services import api_access
+from services.api_access import APIAccessManager
+
+
+def _session_factory(session):
+    factory = Mock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+@pytest.mark.unit
+class TestValidateApiKey:
+    """Test cached validation without per-call commits"""
+    
+    @pytest.mark.asyncio
+    async def test_valid_key_queues_last_use(self):
+        """Test that a valid key is read from the cache and its use queued"""
+        session = AsyncMock()
+        row = {
+            "id": 5, "protocol_address": "0x" + "ab" * 20, "permissions": None,
+            "rate_limit": 60, "revoked_at": None, "expires_at": None,
+        }
+        
+        with patch.object(api_access, "get_api_access", AsyncMock(return_value=row)), \
+                patch.object(api_access, "record_key_use") as record_use:
+            info = await APIAccessManager().validate_api_key("secret", session)
+        
+        assert info["id"] == 5
+        assert info["permissions"] == {}
+        record_use.assert_called_once_with(5)
+        session.commit.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_flush_last_used_one_update(self):
+        """Test that queued key uses are written in one UPDATE"""
+        session = AsyncMock()
+        api_access._used_key_ids.update({3, 4})
+        
+        with patch.object(api_access, "get_db_session", _session_factory(session)):
+            written = await api_access.flush_last_used()
+            assert await api_access.flush_last_used() == 0
+        
+        assert written == 2
+        session.execute.assert_awaited_once()
+        session.commit.assert_awaited_once()
@@ -0,0 +1,72 @@
+"""
+Unit tests for public API key authentication
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException
+from middleware import api_auth
+
+
+def _row(**overrides):
+    row = {
+        "id": 3,
+        "protocol_address": "0x" + "ab" * 20,
+        "api_key": "f" * 64,
+        "permissions": {},
+        "rate_limit": 2,
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "last_used_at": None,
+        "expires_at": None,
+        "revoked_at": None,
+    }
+    row.update(overrides)
+    return row
+
+
+def _request():
+    request = Mock()
+    request.headers = {"X-API-Key": "secret"}
+    return request
+
+
+@pytest.mark.unit
+class TestRequireApiKey:
+    """Test cached key lookup and Redis rate limiting"""
+    
+    @pytest.mark.asyncio
+    async def test_counts_requests_in_redis(self):
+        """Test that requests are counted per key and minute and their use queued"""
+        with patch.object(api_auth, "get_api_access", AsyncMock(return_value=_row())), \
+                patch.object(api_auth, "get_db_session"), \
+                patch.object(api_auth, "RATE_LIMIT_ENABLED", True), \
+                patch.object(api_auth, "count_request", side_effect=[1, 2]) as count, \
+                patch.object(api_auth, "record_key_use") as record_use:
+            first = await api_auth.require_api_key(_request())
+            await api_auth.require_api_key(_request())
+        
+        assert first.id == 3
+        key, window = count.call_args.args
+        assert key.startswith(f"{api_auth.RATE_LIMIT_PREFIX}:{'f' * 64}:")
+        assert window == 60
+        assert record_use.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_over_limit(self):
+        """Test that requests beyond rate_limit are rejected with 429"""
+        with patch.object(api_auth, "get_api_access", AsyncMock(return_value=_row())), \
+                patch.object(api_auth, "get_db_session"), \
+                patch.object(api_auth, "RATE_LIMIT_ENABLED", True), \
+                patch.object(api_auth, "count_request", return_value=3):
+            with pytest.raises(HTTPException) as exc_info:
+                await api_auth.require_api_key(_request())
+        
+        assert exc_info.value.status_code == 429
+        assert "Retry-After" in exc_info.value.headers
+    
+    @pytest.mark.asyncio
+    async def test_revoked_and_expired_keys(self):
+        """Test that revoked or expired cached rows are rejected"""
+        for row in (_row(revoked_at="2025-01-02T00:00:00+00:00"), _row(expires_at="2025-01-02T00:00:00+00:00")):
+            with patch.object(api_auth, "get_api_access", AsyncMock(return_value=row)), \
+                    patch.object(api_auth, "get_db_session"):
+                assert await api_auth.get_api_key(_request()) is None
@@ -0,0 +1,342 @@
+"""
+Unit tests for the pure ASGI observability and security header middleware
+"""
+import json
+import logging
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+import middleware.observability as observability
+from middleware.observability import ObservabilityMiddleware
+from middleware.security_headers import SecurityHeadersMiddleware
+import utils.logger as logger_utils
+from utils.logger import JSONFormatter, RequestContextFilter, emit_later, flush_deferred, request_context
+from utils.metrics import flush_metrics
+
+
+def _client():
+    app = FastAPI()
+    
+    @app.get("/api/ping")
+    async def ping(request: Request):
+        return {"request_id": request.state.request_id}
+    
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+    
+    @app.get("/api/context")
+    async def context():
+        return request_context.get()
+    
+    @app.get("/api/items/{item_id}")
+    async def item(item_id: int):
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="nope")
+    
+    app.add_middleware(ObservabilityMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestASGIMiddleware:
+    """Test response headers, request state and metrics"""
+    
+    def test_headers_added_and_request_id_propagated(self):
+        """Test that correlation, timing and security headers reach the client"""
+        response = _client().get("/api/ping", headers={"X-Request-ID": "req-1"})
+        
+        assert response.json() == {"request_id": "req-1"}
+        assert response.headers["x-request-id"] == "req-1"
+        assert response.headers["x-correlation-id"] == "req-1"
+        assert response.headers["x-response-time"].endswith("s")
+        assert response.headers["x-frame-options"] == "DENY"
+        assert "frame-ancestors 'none'" in response.headers["content-security-policy"]
+    
+    def test_correlation_id_generated_when_untraced(self):
+        """Test that requests without X-Request-ID get a random 128-bit hex ID"""
+        response = _client().get("/api/ping")
+        
+        correlation_id = response.headers["x-correlation-id"]
+        assert len(correlation_id) == 32
+        int(correlation_id, 16)
+        assert response.json() == {"request_id": correlation_id}
+    
+    def test_request_context_bound_for_request(self):
+        """Test that the request's fields are bound while it runs and reset after"""
+        response = _client().get("/api/context", headers={"X-Request-ID": "req-1"})
+        
+        assert response.json() == {
+            "correlation_id": "req-1",
+            "request_id": "req-1",
+            "endpoint": "GET /api/context",
+            "method": "GET",
+            "path": "/api/context",
+            "ip_address": "testclient",
+        }
+        assert request_context.get() is None
+    
+    def test_client_ip_from_first_forwarded_hop(self):
+        """Test that the first X-Forwarded-For hop is used, falling back to the peer"""
+        client = _client()
+        
+        forwarded = client.get("/api/context", headers={"X-Forwarded-For": " 203.0.113.7 , 10.0.0.1"})
+        blank = client.get("/api/context", headers={"X-Forwarded-For": " , 10.0.0.1"})
+        
+        assert forwarded.json()["ip_address"] == "203.0.113.7"
+        assert blank.json()["ip_address"] == "testclient"
+    
+    def test_request_logs_pass_only_line_fields(self):
+        """Test that request logs pass per-line fields and rely on the bound context"""
+        with patch("middleware.observability.logger") as mock_logger:
+            _client().get("/api/ping?x=1", headers={"X-Request-ID": "req-1"})
+        flush_deferred()
+        
+        (started, started_kwargs), (completed, completed_kwargs) = [
+            (c.args[0], c.kwargs) for c in mock_logger.info.call_args_list
+        ]
+        assert started == "Request started"
+        assert started_kwargs["extra"]["query_params"] == "x=1"
+        assert completed == "Request completed"
+        assert completed_kwargs["extra"]["status_code"] == 200
+        assert "endpoint" not in completed_kwargs["extra"]
+        assert "extra_data" not in completed_kwargs["extra"]
+    
+    def test_request_logs_skipped_when_info_disabled(self):
+        """Test that nothing is logged for successful requests above INFO"""
+        with patch("middleware.observability.logger") as mock_logger:
+            mock_logger.isEnabledFor.return_value = False
+            _client().get("/api/ping")
+        
+        mock_logger.info.assert_not_called()
+    
+    def test_formatter_emits_flat_request_fields(self):
+        """Test that the JSON formatter copies flat request fields"""
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "Request completed", None, None)
+        record.method = "GET"
+        record.status_code = 200
+        record.duration_ms = 1.5
+        
+        data = json.loads(JSONFormatter().format(record))
+        
+        assert data["method"] == "GET"
+        assert data["status_code"] == 200
+        assert data["duration_ms"] == 1.5
+        assert "path" not in data
+    
+    def test_context_filter_fills_missing_fields(self):
+        """Test that the filter adds bound fields without overriding explicit ones"""
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+        record.path = "/explicit"
+        
+        token = request_context.set({"method": "GET", "path": "/api/ping"})
+        try:
+            assert RequestContextFilter().filter(record)
+        finally:
+            request_context.reset(token)
+        
+        assert record.method == "GET"
+        assert record.path == "/explicit"
+    
+    def test_security_headers_shared_between_instances(self):
+        """Test that instances with the same configuration share one encoded header tuple"""
+        first = SecurityHeadersMiddleware(None)
+        second = SecurityHeadersMiddleware(None)
+        
+        assert first.headers is second.headers
+        assert isinstance(first.headers, tuple)
+        assert all(isinstance(name, bytes) and isinstance(value, bytes) for name, value in first.headers)
+    
+    def test_hsts_only_in_production(self, monkeypatch):
+        """Test that HSTS is added for production only"""
+        monkeypatch.setenv("ENVIRONMENT", "production")
+        production = dict(SecurityHeadersMiddleware(None).headers)
+        monkeypatch.setenv("ENVIRONMENT", "development")
+        development = dict(SecurityHeadersMiddleware(None).headers)
+        
+        assert b"strict-transport-security" in production
+        assert b"strict-transport-security" not in development
+    
+    def test_response_time_header_optional(self):
+        """Test that X-Response-Time is only added when enabled"""
+        app = FastAPI()
+        
+        @app.get("/api/ping")
+        async def ping():
+            return {}
+        
+        app.add_middleware(ObservabilityMiddleware, emit_header=False)
+        
+        assert "x-response-time" not in TestClient(app).get("/api/ping").headers
+    
+    def test_response_time_header_off_in_production(self, monkeypatch):
+        """Test the header default per environment"""
+        monkeypatch.delenv("RESPONSE_TIME_HEADER_ENABLED", raising=False)
+        monkeypatch.setenv("ENVIRONMENT", "production")
+        assert ObservabilityMiddleware(None).emit_header is False
+        
+        monkeypatch.setenv("RESPONSE_TIME_HEADER_ENABLED", "true")
+        assert ObservabilityMiddleware(None).emit_header is True
+    
+    def test_slow_request_logged_with_endpoint(self):
+        """Test that only requests over the threshold are reported"""
+        with patch("middleware.observability.logger") as mock_logger, \
+                patch("middleware.observability.capture_message") as capture, \
+                patch("middleware.observability.time") as mock_time:
+            mock_time.perf_counter_ns.side_effect = [0, 0, 6_000_000_000]
+            _client().get("/api/ping")
+        flush_deferred()
+        
+        mock_logger.warning.assert_called_once()
+        assert mock_logger.warning.call_args.kwargs["extra"]["status_code"] == 200
+        assert mock_logger.warning.call_args.kwargs["extra"]["duration"] == 6.0
+        assert capture.call_args.kwargs["endpoint"] == "GET /api/ping"
+        
+        with patch("middleware.observability.logger") as mock_logger:
+            _client().get("/api/ping")
+        flush_deferred()
+        
+        mock_logger.warning.assert_not_called()
+        assert [c.args[0] for c in mock_logger.info.call_args_list] == ["Request started", "Request completed"]
+    
+    @pytest.mark.asyncio
+    async def test_emit_later_runs_in_callers_context(self):
+        """Test that deferred calls run after the caller yields, with its request context"""
+        seen = []
+        
+        token = request_context.set({"request_id": "req-9"})
+        try:
+            emit_later(lambda: seen.append(request_context.get()["request_id"]))
+        finally:
+            request_context.reset(token)
+        
+        assert seen == []
+        await logger_utils._drain_task
+        assert seen == ["req-9"]
+    
+    def test_emit_later_drops_when_full(self, monkeypatch):
+        """Test that calls beyond the queue bound are dropped, not queued"""
+        monkeypatch.setattr(logger_utils, "LOG_QUEUE_SIZE", 0)
+        
+        assert emit_later(print, "dropped") is False
+        assert not logger_utils._deferred
+    
+    def test_metrics_use_response_status_and_route_template(self):
+        """Test that the response status and route template label the request"""
+        from prometheus_client import REGISTRY
+        
+        labels = {"method": "GET", "endpoint": "/api/items/{item_id}", "status_code": "404"}
+        before = REGISTRY.get_sample_value("http_requests_total", labels) or 0
+        
+        client = _client()
+        client.get("/api/items/1")
+        client.get("/api/items/2")
+        flush_metrics()
+        
+        assert REGISTRY.get_sample_value("http_requests_total", labels) == before + 2
+        assert REGISTRY.get_sample_value(
+            "errors_total", {"error_type": "http_404", "endpoint": "/api/items/{item_id}"}
+        ) >= 2
+    
+    def test_probe_paths_bypass_instrumentation(self):
+        """Test that health probes aren't counted, logged or timed"""
+        from prometheus_client import REGISTRY
+        
+        labels = {"method": "GET", "endpoint": "/health", "status_code": "200"}
+        with patch("middleware.observability.logger") as mock_logger:
+            response = _client().get("/health")
+        flush_metrics()
+        
+        assert response.json() == {"status": "healthy"}
+        assert REGISTRY.get_sample_value("http_requests_total", labels) is None
+        mock_logger.info.assert_not_called()
+        assert "x-response-time" not in response.headers
+        assert "x-correlation-id" not in response.headers
+        assert response.headers["x-frame-options"] == "DENY"
+    
+    def test_disabled_metrics_and_performance(self):
+        """Test that metrics and performance can be turned off while logging stays on"""
+        from prometheus_client import REGISTRY
+        
+        app = FastAPI()
+        
+        @app.get("/api/quiet")
+        async def quiet():
+            return {}
+        
+        app.add_middleware(ObservabilityMiddleware, metrics=False, performance=False)
+        response = TestClient(app).get("/api/quiet")
+        flush_metrics()
+        
+        labels = {"method": "GET", "endpoint": "/api/quiet", "status_code": "200"}
+        assert REGISTRY.get_sample_value("http_requests_total", labels) is None
+        assert "x-response-time" not in response.headers
+        assert response.headers["x-correlation-id"]
+    
+    def test_cache_hits_not_counted(self):
+        """Test that responses served by the cache middleware stay out of route metrics"""
+        from prometheus_client import REGISTRY
+        from fastapi import Request as FastAPIRequest
+        from starlette.middleware.base import BaseHTTPMiddleware
+        from starlette.responses import Response
+        
+        class Hit(BaseHTTPMiddleware):
+            async def dispatch(self, request: FastAPIRequest, call_next):
+                request.scope["state"]["cache_hit"] = True
+                return Response(b"{}", media_type="application/json")
+        
+        app = FastAPI()
+        app.add_middleware(Hit)
+        app.add_middleware(ObservabilityMiddleware)
+        
+        labels = {"method": "GET", "endpoint": observability.UNMATCHED_ENDPOINT, "status_code": "200"}
+        before = REGISTRY.get_sample_value("http_requests_total", labels)
+        response = TestClient(app).get("/api/score/0xabc")
+        flush_metrics()
+        
+        assert response.headers["x-correlation-id"]
+        assert REGISTRY.get_sample_value("http_requests_total", labels) == before
+    
+    def test_unknown_methods_share_one_label(self):
+        """Test that non-standard methods don't create a series per verb"""
+        from prometheus_client import REGISTRY
+        
+        labels = {"method": observability.OTHER_METHOD, "endpoint": "/api/ping", "status_code": "405"}
+        before = REGISTRY.get_sample_value("http_requests_total", labels) or 0
+        
+        client = _client()
+        client.request("PROPFIND", "/api/ping")
+        client.request("XYZZY", "/api/ping")
+        flush_metrics()
+        
+        assert REGISTRY.get_sample_value("http_requests_total", labels) == before + 2
+    
+    def test_unmatched_paths_share_one_label(self):
+        """Test that requests matching no route don't create a series per path"""
+        from prometheus_client import REGISTRY
+        
+        labels = {"method": "GET", "endpoint": observability.UNMATCHED_ENDPOINT, "status_code": "404"}
+        before = REGISTRY.get_sample_value("http_requests_total", labels) or 0
+        
+        client = _client()
+        client.get("/wp-admin")
+        client.get("/.env")
+        flush_metrics()
+        
+        assert REGISTRY.get_sample_value("http_requests_total", labels) == before + 2
+    
+    @pytest.mark.asyncio
+    async def test_metric_updates_applied_in_bulk(self):
+        """Test that queued updates reach the collectors only when flushed"""
+        from prometheus_client import Counter
+        from utils.metrics import inc_later
+        
+        counter = Counter("test_bulk_flush_total", "Test counter")
+        inc_later(counter)
+        inc_later(counter, 2)
+        
+        assert counter._value.get() == 0
+        flush_metrics()
+        assert counter._value.get() == 3
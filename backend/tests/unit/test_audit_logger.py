@@ -192,4 +192,20 @@ class TestAuditLogger:
             call_kwargs = mock_log.call_args[1]
             assert call_kwargs['action'] == "admin_update_config"
             assert call_kwargs['metadata'] == metadata
+    
+    def test_formatter_serializes_large_ints_and_datetimes(self):
+        """Test that audit records fall back to json for ints orjson can't encode"""
+        import json
+        import logging
+        from datetime import datetime
+        from utils.audit_logger import JSONFormatter
+        
+        record = logging.LogRecord("audit", logging.INFO, __file__, 1, "Audit: stake - success", None, None)
+        record.metadata = {"amount_wei": 10 ** 30}
+        wide = json.loads(JSONFormatter().format(record))
+        record.metadata = {"at": datetime(2025, 1, 1)}
+        dated = json.loads(JSONFormatter().format(record))
+        
+        assert wide["metadata"]["amount_wei"] == 10 ** 30
+        assert dated["metadata"]["at"] == "2025-01-01T00:00:00"
 
@@ -0,0 +1,64 @@
+"""
+Unit tests for the authentication middleware
+"""
+import pytest
+from fastapi import HTTPException
+from unittest.mock import Mock, patch
+import middleware.auth as auth
+from utils.jwt_handler import create_access_token
+
+
+def _request(authorization):
+    request = Mock()
+    request.headers = {"Authorization": authorization} if authorization else {}
+    request.state = Mock(spec=[])
+    return request
+
+
+@pytest.mark.unit
+class TestAuthMiddleware:
+    """Test credential classification and validation"""
+    
+    @pytest.mark.asyncio
+    async def test_jwt_skips_api_key_check(self):
+        """Test that a valid JWT authenticates without consulting API keys"""
+        token = create_access_token({"sub": "0xabc", "role": "admin"})
+        request = _request(f"Bearer {token}")
+        
+        with patch.object(auth, "validate_api_key") as validate:
+            await auth.AuthMiddleware()(request)
+        
+        validate.assert_not_called()
+        assert request.state.auth_type == "jwt"
+        assert request.state.user_address == "0xabc"
+        assert request.state.user_role == "admin"
+        assert request.state.user_role_level == 3
+    
+    @pytest.mark.asyncio
+    async def test_api_key_skips_jwt_decode(self):
+        """Test that a key-shaped credential never goes through JWT decoding"""
+        request = _request("ApiKey test-key-123")
+        
+        with patch.object(auth, "validate_api_key", return_value=True), \
+                patch.object(auth, "verify_token_cached") as verify:
+            await auth.AuthMiddleware()(request)
+        
+        verify.assert_not_called()
+        assert request.state.auth_type == "api_key"
+    
+    @pytest.mark.asyncio
+    async def test_invalid_credentials_rejected(self):
+        """Test that unknown credentials get a 401"""
+        with patch.object(auth, "validate_api_key", return_value=False):
+            with pytest.raises(HTTPException) as exc:
+                await auth.AuthMiddleware()(_request("Bearer not.a.jwt"))
+        
+        assert exc.value.status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_missing_header_rejected(self):
+        """Test that requests without an Authorization header get a 401"""
+        with pytest.raises(HTTPException) as exc:
+            await auth.AuthMiddleware()(_request(None))
+        
+        assert exc.value.detail == "Authorization header required"
@@ -0,0 +1,118 @@
+"""
+Unit tests for bulk loading helpers
+"""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy.dialects import postgresql
+from database.bulk import bulk_copy, upsert_transactions, upsert_token_transfers, COPY_THRESHOLD, MAX_BIND_PARAMS
+from database.models import TransactionStaging
+
+
+def _row(i):
+    return {
+        "wallet_address": "0x" + "ab" * 20,
+        "tx_hash": "0x" + f"{i:064x}",
+        "tx_type": "transfer",
+        "tx_metadata": {"index": i},
+    }
+
+
+@pytest.mark.unit
+class TestBulkCopy:
+    """Test COPY-based bulk insert"""
+    
+    @pytest.mark.asyncio
+    async def test_empty_rows(self):
+        """Test that nothing is written for an empty batch"""
+        session = AsyncMock()
+        assert await bulk_copy(session, TransactionStaging, []) == 0
+        session.execute.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_small_batch_uses_insert(self):
+        """Test that small batches use executemany INSERT"""
+        session = AsyncMock()
+        rows = [_row(i) for i in range(3)]
+        
+        assert await bulk_copy(session, TransactionStaging, rows) == 3
+        session.execute.assert_awaited_once()
+        session.connection.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_large_batch_uses_copy(self):
+        """Test that large batches are copied with converted values"""
+        driver = Mock()
+        driver.copy_records_to_table = AsyncMock()
+        raw_connection = Mock(driver_connection=driver)
+        connection = Mock(dialect=postgresql.dialect())
+        connection.get_raw_connection = AsyncMock(return_value=raw_connection)
+        session = AsyncMock()
+        session.connection = AsyncMock(return_value=connection)
+        
+        rows = [_row(i) for i in range(COPY_THRESHOLD)]
+        assert await bulk_copy(session, TransactionStaging, rows) == COPY_THRESHOLD
+        session.execute.assert_not_called()
+        
+        args, kwargs = driver.copy_records_to_table.call_args
+        assert args[0] == "transactions_staging"
+        columns = kwargs["columns"]
+        assert set(columns) == {"wallet_address", "tx_hash", "tx_type", "tx_metadata"}
+        record = dict(zip(columns, kwargs["records"][1]))
+        assert record["wallet_address"] == b"\xab" * 20
+        assert record["tx_hash"] == (1).to_bytes(32, "big")
+        assert record["tx_metadata"] == '{"index":1}'
+
+
+@pytest.mark.unit
+class TestUpserts:
+    """Test ON CONFLICT upsert helpers"""
+    
+    @pytest.mark.asyncio
+    async def test_upsert_transactions_dedupes_and_stores_inputs(self):
+        """Test that replayed hashes collapse and inputs go to the side table"""
+        tx_hash = "0x" + "cd" * 32
+        result = Mock()
+        block_timestamp = datetime(2026, 1, 15, tzinfo=timezone.utc)
+        result.all.return_value = [(7, tx_hash, block_timestamp)]
+        session = AsyncMock()
+        session.execute = AsyncMock(return_value=result)
+        
+        rows = [
+            {"tx_hash": tx_hash, "block_timestamp": block_timestamp, "status": "pending", "input_data": "0xa9059cbb"},
+            {"tx_hash": tx_hash.upper().replace("0X", "0x"), "block_timestamp": block_timestamp, "status": "success", "input_data": "0xa9059cbb"},
+        ]
+        ids = await upsert_transactions(session, rows)
+        
+        assert ids == {b"\xcd" * 32: 7}
+        assert session.execute.await_count == 2
+        
+        stmt = session.execute.await_args_list[0].args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (tx_hash, block_timestamp) DO UPDATE" in sql
+        assert "coalesce(excluded.status, transactions.status)" in sql
+        assert stmt.compile(dialect=postgresql.dialect()).params["status_m0"] == "success"
+        
+        input_stmt = session.execute.await_args_list[1].args[0].compile(dialect=postgresql.dialect())
+        assert "transaction_inputs" in str(input_stmt)
+        assert input_stmt.params["block_timestamp_m0"] == block_timestamp
+    
+    @pytest.mark.asyncio
+    async def test_upsert_token_transfers_chunks(self):
+        """Test that large batches are split under the bind parameter limit"""
+        result = Mock(rowcount=1)
+        session = AsyncMock()
+        session.execute = AsyncMock(return_value=result)
+        
+        row = {
+            "tx_hash": "0x" + "ab" * 32,
+            "token_address": "0x" + "01" * 20,
+            "token_type": "ERC20",
+            "block_timestamp": datetime(2026, 1, 15, tzinfo=timezone.utc),
+        }
+        rows = [dict(row) for _ in range(MAX_BIND_PARAMS // 4 + 1)]
+        
+        assert await upsert_token_transfers(session, rows) == 2
+        assert session.execute.await_count == 2
+        sql = str(session.execute.await_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT ON CONSTRAINT uq_transfer_dedup DO NOTHING" in sql
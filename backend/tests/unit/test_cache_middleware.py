@@ -0,0 +1,235 @@
+"""
+Unit tests for the API response cache middleware and cache helpers
+"""
+import pytest
+from decimal import Decimal
+from unittest.mock import Mock, patch
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+import middleware.cache as cache_middleware
+import utils.cache as cache_utils
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(cache_middleware.CacheMiddleware)
+    
+    @app.get("/api/score/{address}")
+    async def score(address: str):
+        return {"address": address, "score": 700}
+    
+    @app.get("/api/users/{address}")
+    async def user(address: str):
+        return {"address": address}
+    
+    @app.get("/api/staking/history")
+    async def history():
+        async def chunks():
+            yield b'{"items":'
+            yield b'[1,2,3]}'
+        return StreamingResponse(chunks(), media_type="application/json")
+    
+    @app.post("/api/staking/{address}")
+    async def stake(address: str):
+        return {"address": address}
+    
+    @app.get("/api/oracle/price")
+    async def price():
+        return PlainTextResponse("1.23")
+    
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestCacheMiddleware:
+    """Test raw-bytes response caching"""
+    
+    def test_hit_serves_cached_bytes(self):
+        """Test that a cached body is returned without re-encoding"""
+        body = b'{"address":"0xaaa","score":650}'
+        with patch.object(cache_middleware, "get_cached_api_response_raw", return_value=body):
+            response = _client().get("/api/score/0xaaa")
+        
+        assert response.content == body
+        assert response.headers["X-Cache"] == "HIT"
+        assert response.headers["content-type"] == "application/json"
+    
+    def test_hit_marked_for_observability(self):
+        """Test that cache hits are flagged so they stay out of route metrics"""
+        from prometheus_client import REGISTRY
+        from middleware.observability import ObservabilityMiddleware, UNMATCHED_ENDPOINT
+        from utils.metrics import flush_metrics
+        
+        client = _client()
+        client.app.add_middleware(ObservabilityMiddleware)
+        labels = {"method": "GET", "endpoint": UNMATCHED_ENDPOINT, "status_code": "200"}
+        before = REGISTRY.get_sample_value("http_requests_total", labels)
+        
+        with patch.object(cache_middleware, "get_cached_api_response_raw", return_value=b"{}"):
+            response = client.get("/api/score/0xaaa")
+        flush_metrics()
+        
+        assert response.headers["X-Cache"] == "HIT"
+        assert REGISTRY.get_sample_value("http_requests_total", labels) == before
+    
+    def test_key_uses_raw_path_and_query(self):
+        """Test that lookups use the scope's path and undecoded query string"""
+        with patch.object(cache_middleware, "get_cached_api_response_raw", return_value=b"{}") as lookup:
+            _client().get("/api/score/0xaaa?chain=qie&x=%20")
+        
+        lookup.assert_called_once_with("/api/score/0xaaa", "chain=qie&x=%20")
+    
+    def test_miss_caches_raw_body(self):
+        """Test that the endpoint's JSON bytes are cached as produced"""
+        with patch.object(cache_middleware, "get_cached_api_response_raw", return_value=None), \
+                patch.object(cache_middleware, "cache_api_response_raw") as store:
+            response = _client().get("/api/score/0xaaa")
+        
+        assert response.headers["X-Cache"] == "MISS"
+        store.assert_called_once()
+        assert store.call_args.args == ("/api/score/0xaaa", "", response.content)
+    
+    def test_other_endpoints_bypass_cache(self):
+        """Test that paths outside the cacheable prefixes never touch the cache"""
+        with patch.object(cache_middleware, "get_cached_api_response_raw") as lookup:
+            response = _client().get("/api/users/0xaaa")
+        
+        assert response.json() == {"address": "0xaaa"}
+        assert "X-Cache" not in response.headers
+        lookup.assert_not_called()
+    
+    def test_streamed_body_cached_once_complete(self):
+        """Test that a chunked JSON body reaches the client intact and is cached whole"""
+        with patch.object(cache_middleware, "get_cached_api_response_raw", return_value=None), \
+                patch.object(cache_middleware, "cache_api_response_raw") as store:
+            response = _client().get("/api/staking/history")
+        
+        assert response.json() == {"items": [1, 2, 3]}
+        store.assert_called_once_with("/api/staking/history", "", b'{"items":[1,2,3]}')
+        
+        with patch.object(cache_middleware, "MAX_CACHE_BYTES", 10), \
+                patch.object(cache_middleware, "get_cached_api_response_raw", return_value=None), \
+                patch.object(cache_middleware, "cache_api_response_raw") as store:
+            response = _client().get("/api/staking/history")
+        
+        assert response.json() == {"items": [1, 2, 3]}
+        store.assert_not_called()
+    
+    def test_oversized_body_not_cached(self):
+        """Test that bodies over the size cap are served but not cached"""
+        with patch.object(cache_middleware, "MAX_CACHE_BYTES", 10), \
+                patch.object(cache_middleware, "get_cached_api_response_raw", return_value=None), \
+                patch.object(cache_middleware, "cache_api_response_raw") as store:
+            response = _client().get("/api/score/0xaaa")
+        
+        assert response.json() == {"address": "0xaaa", "score": 700}
+        store.assert_not_called()
+    
+    def test_non_json_not_cached(self):
+        """Test that non-JSON responses are passed through uncached"""
+        with patch.object(cache_middleware, "get_cached_api_response_raw", return_value=None), \
+                patch.object(cache_middleware, "cache_api_response_raw") as store:
+            response = _client().get("/api/oracle/price")
+        
+        assert response.text == "1.23"
+        store.assert_not_called()
+    
+    def test_write_clears_in_process_cache(self):
+        """Test that a write to a cacheable endpoint drops the worker's L1 entries"""
+        with patch.object(cache_middleware, "clear_api_response_l1") as clear:
+            _client().post("/api/staking/0xaaa")
+        
+        clear.assert_called_once()
+
+
+@pytest.mark.unit
+class TestCacheHelpers:
+    """Test orjson-backed cache helpers"""
+    
+    def test_set_and_get_round_trip(self):
+        """Test that values with non-JSON types and int keys survive the cache"""
+        client = Mock()
+        with patch.object(cache_utils, "get_redis_client", return_value=client):
+            assert cache_utils.set_cache("k", {1: Decimal("1.5"), "a": [1, 2]}, ttl=10) is True
+            stored = client.setex.call_args.args[2]
+            client.get.return_value = stored
+            
+            assert cache_utils.get_cache("k") == {"1": "1.5", "a": [1, 2]}
+    
+    def test_cache_key_sorts_dict_params(self):
+        """Test that parameter order doesn't change the key"""
+        first = cache_utils.cache_key("api", "/x", {"b": 1, "a": 2})
+        second = cache_utils.cache_key("api", "/x", {"a": 2, "b": 1})
+        
+        assert first == second
+    
+    def test_api_response_key_fingerprints_path_and_query(self):
+        """Test that response keys are fixed-size and distinguish path from query"""
+        key = cache_utils.api_response_key("/api/score/0xaaa", "chain=1")
+        
+        assert key == cache_utils.api_response_key("/api/score/0xaaa", "chain=1")
+        assert key != cache_utils.api_response_key("/api/score/0xaaa", "chain=2")
+        assert cache_utils.api_response_key("/api/a?b", "c") != cache_utils.api_response_key("/api/a", "b?c")
+        assert len(key) == len("api:") + 32
+    
+    def test_l1_serves_hits_without_redis(self):
+        """Test that a cached body is served from memory until its TTL lapses"""
+        client = Mock()
+        client.get.return_value = b'{"score":700}'
+        cache_utils.clear_api_response_l1()
+        with patch.object(cache_utils, "get_raw_redis_client", return_value=client):
+            first = cache_utils.get_cached_api_response_raw("/api/score/0xaaa", "")
+            second = cache_utils.get_cached_api_response_raw("/api/score/0xaaa", "")
+            
+            assert first == second == b'{"score":700}'
+            assert client.get.call_count == 1
+            
+            with patch.object(cache_utils, "API_L1_TTL", -1):
+                cache_utils.clear_api_response_l1()
+                cache_utils.get_cached_api_response_raw("/api/score/0xaaa", "")
+            cache_utils.get_cached_api_response_raw("/api/score/0xaaa", "")
+            
+            assert client.get.call_count == 3
+        cache_utils.clear_api_response_l1()
+    
+    def test_l1_evicts_least_recently_used(self):
+        """Test that the in-process cache stays within its size"""
+        cache_utils.clear_api_response_l1()
+        with patch.object(cache_utils, "API_L1_SIZE", 2), \
+                patch.object(cache_utils, "get_raw_redis_client", return_value=None):
+            for path in ("/a", "/b", "/c"):
+                cache_utils.cache_api_response_raw(path, "", b"{}")
+            
+            assert cache_utils.get_cached_api_response_raw("/a", "") is None
+            assert cache_utils.get_cached_api_response_raw("/c", "") == b"{}"
+        cache_utils.clear_api_response_l1()
+    
+    def test_raw_responses_use_a_bytes_client(self):
+        """Test that response bodies go through a client that doesn't decode replies"""
+        cache_utils.clear_api_response_l1()
+        with patch.object(cache_utils, "_raw_redis_client", None), \
+                patch.object(cache_utils.redis, "from_url") as from_url:
+            client = from_url.return_value
+            client.get.return_value = b'{"score":700}'
+            
+            assert cache_utils.get_cached_api_response_raw("/api/score/0xaaa", "") == b'{"score":700}'
+            assert from_url.call_args.kwargs["decode_responses"] is False
+            
+            cache_utils.cache_api_response_raw("/api/score/0xbbb", "", b"{}", ttl=10)
+            client.setex.assert_called_once_with(cache_utils.api_response_key("/api/score/0xbbb", ""), 10, b"{}")
+        cache_utils.clear_api_response_l1()
+    
+    def test_invalidate_pattern_scans_in_batches(self):
+        """Test that pattern invalidation uses SCAN and deletes batch by batch"""
+        client = Mock()
+        client.scan_iter.return_value = iter(["k1", "k2", "k3"])
+        client.delete.side_effect = lambda *keys: len(keys)
+        
+        with patch.object(cache_utils, "get_redis_client", return_value=client), \
+                patch.object(cache_utils, "INVALIDATE_BATCH_SIZE", 2):
+            assert cache_utils.invalidate_pattern("neurocred:leaderboard:*") == 3
+        
+        client.scan_iter.assert_called_once_with(match="neurocred:leaderboard:*", count=2)
+        assert [call.args for call in client.delete.call_args_list] == [("k1", "k2"), ("k3",)]
+        client.keys.assert_not_called()
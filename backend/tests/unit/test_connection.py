@@ -0,0 +1,55 @@
+"""
+Unit tests for database engine configuration
+"""
+import pytest
+import orjson
+from unittest.mock import patch
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+import database.connection as connection
+
+
+@pytest.mark.unit
+class TestEngine:
+    """Test engine creation"""
+    
+    def test_engine_uses_async_pool_and_statement_caches(self):
+        """Test that the engine is created with an asyncio pool and cache sizes"""
+        with patch.object(connection, "DATABASE_URL", "postgresql+asyncpg://u:p@localhost/db"), \
+                patch.object(connection, "engine", None):
+            engine = connection.get_engine()
+            
+            assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+            assert engine.sync_engine._compiled_cache.capacity == connection.QUERY_CACHE_SIZE
+    
+    def test_pool_pre_ping_and_gauges(self):
+        """Test that the pool pre-pings connections and reports its usage"""
+        from prometheus_client import REGISTRY
+        
+        with patch.object(connection, "DATABASE_URL", "postgresql+asyncpg://u:p@localhost/db"), \
+                patch.object(connection, "engine", None):
+            engine = connection.get_engine()
+            
+            assert engine.pool._pre_ping is connection.POOL_PRE_PING
+            assert engine.pool._recycle == connection.POOL_RECYCLE
+            assert REGISTRY.get_sample_value("db_pool_checked_out") == engine.pool.checkedout()
+    
+    def test_pgbouncer_disables_pool_and_statement_reuse(self):
+        """Test that transaction pooling gets no in-process pool and unique statement names"""
+        with patch.object(connection, "DATABASE_URL", "postgresql+asyncpg://u:p@pgbouncer/db"), \
+                patch.object(connection, "PGBOUNCER", True), \
+                patch.object(connection, "STATEMENT_CACHE_SIZE", 0), \
+                patch.object(connection, "engine", None), \
+                patch.object(connection, "create_async_engine", wraps=connection.create_async_engine) as create_engine:
+            engine = connection.get_engine()
+            
+            assert isinstance(engine.pool, NullPool)
+            kwargs = create_engine.call_args.kwargs
+            assert "pool_size" not in kwargs
+            connect_args = kwargs["connect_args"]
+            assert connect_args["statement_cache_size"] == 0
+            name_func = connect_args["prepared_statement_name_func"]
+            assert name_func() != name_func()
+    
+    def test_json_serializer_matches_stdlib_keys(self):
+        """Test that the orjson serializer accepts non-string keys"""
+        assert orjson.loads(connection.json_serializer({1: "a", "b": [1, 2]})) == {"1": "a", "b": [1, 2]}
@@ -0,0 +1,90 @@
+"""
+Unit tests for the wallet row read-through cache
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+import orjson
+from database import cache
+from database.models import APIAccess, Score
+
+
+def _score_row():
+    return Score(
+        wallet_address="0xAbC",
+        score=720,
+        risk_band=1,
+        last_updated=datetime(2025, 1, 1),
+    )
+
+
+@pytest.mark.unit
+class TestWalletCache:
+    """Test read-through lookups and eviction"""
+    
+    @pytest.mark.asyncio
+    async def test_hit_skips_database(self):
+        """Test that a cached row is returned without a query"""
+        client = Mock()
+        client.get.return_value = orjson.dumps({"score": 700})
+        session = AsyncMock()
+        
+        with patch.object(cache, "_client", return_value=client):
+            row = await cache.get_score(session, "0xAbC")
+        
+        assert row == {"score": 700}
+        client.get.assert_called_once_with("neurocred:score:0xabc")
+        session.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_miss_populates_cache(self):
+        """Test that a database row is stored as JSON with the TTL"""
+        client = Mock()
+        client.get.return_value = None
+        session = AsyncMock()
+        result = Mock()
+        result.scalar_one_or_none.return_value = _score_row()
+        session.execute.return_value = result
+        
+        with patch.object(cache, "_client", return_value=client):
+            row = await cache.get_score(session, "0xAbC")
+        
+        assert row["score"] == 720
+        assert row["last_updated"] == "2025-01-01T00:00:00"
+        key, ttl, payload = client.setex.call_args.args
+        assert key == "neurocred:score:0xabc"
+        assert ttl == cache.CACHE_TTL
+        assert orjson.loads(payload) == row
+    
+    def test_commit_evicts_stale_keys(self):
+        """Test that keys marked during flush are deleted on commit"""
+        client = Mock()
+        session = Mock()
+        session.info = {}
+        
+        with patch.object(cache, "object_session", return_value=session), \
+                patch.object(cache, "_client", return_value=client):
+            cache._mark_stale(None, None, _score_row())
+            cache._evict_stale(session)
+        
+        client.delete.assert_called_once_with("neurocred:score:0xabc")
+        assert session.info == {}
+    
+    def test_api_key_rows_evicted_by_hash(self):
+        """Test that API key rows are keyed by the key hash"""
+        session = Mock()
+        session.info = {}
+        
+        with patch.object(cache, "object_session", return_value=session):
+            cache._mark_stale(None, None, APIAccess(api_key="F" * 64))
+        
+        assert session.info[cache._STALE_KEYS] == {"neurocred:api_key:" + "f" * 64}
+    
+    def test_rollback_discards_stale_keys(self):
+        """Test that rolled back changes do not evict"""
+        session = Mock()
+        session.info = {cache._STALE_KEYS: {"neurocred:score:0xabc"}}
+        
+        cache._discard_stale(session, None)
+        
+        assert session.info == {}
@@ -6,6 +6,7 @@ from datetime import timedelta
 from utils.jwt_handler import (
     create_access_token,
     verify_token,
+    verify_token_cached,
     hash_password,
     verify_password
 )
@@ -79,6 +80,66 @@ class TestJWTHandler:
         # Should return None for expired token
         assert payload is None
     
+    def test_verify_token_cached_reuses_payload(self):
+        """Test that a verified token isn't re-verified until its cache entry lapses"""
+        from unittest.mock import patch
+        import utils.jwt_handler as jwt_handler
+        
+        token = create_access_token({"sub": "0xabc"})
+        jwt_handler._verified_tokens.clear()
+        
+        with patch.object(jwt_handler, "verify_token", wraps=jwt_handler.verify_token) as verify:
+            first = verify_token_cached(token)
+            second = verify_token_cached(token)
+            
+            assert first == second
+            assert first["sub"] == "0xabc"
+            assert verify.call_count == 1
+            
+            with patch.object(jwt_handler, "VERIFY_CACHE_TTL", -1):
+                jwt_handler._verified_tokens.clear()
+                verify_token_cached(token)
+            verify_token_cached(token)
+            
+            assert verify.call_count == 3
+        jwt_handler._verified_tokens.clear()
+    
+    def test_verify_token_cached_rejects_invalid(self):
+        """Test that failed verifications are not cached"""
+        import utils.jwt_handler as jwt_handler
+        
+        jwt_handler._verified_tokens.clear()
+        
+        assert verify_token_cached("invalid.token.here") is None
+        assert not jwt_handler._verified_tokens
+    
+    def test_verify_token_cached_bounded(self):
+        """Test that the cache holds fixed-size keys and stays within its size"""
+        from unittest.mock import patch
+        import utils.jwt_handler as jwt_handler
+        
+        jwt_handler._verified_tokens.clear()
+        with patch.object(jwt_handler, "VERIFY_CACHE_SIZE", 2):
+            for sub in ("0x1", "0x2", "0x3"):
+                verify_token_cached(create_access_token({"sub": sub}))
+        
+        assert len(jwt_handler._verified_tokens) == 2
+        assert all(len(key) == 16 for key in jwt_handler._verified_tokens)
+        jwt_handler._verified_tokens.clear()
+    
+    def test_verify_token_cached_key_is_cryptographic(self):
+        """Test that cache entries are keyed by a BLAKE2b digest of the token"""
+        import hashlib
+        import utils.jwt_handler as jwt_handler
+        
+        token = create_access_token({"sub": "0xabc"})
+        jwt_handler._verified_tokens.clear()
+        
+        verify_token_cached(token)
+        
+        assert list(jwt_handler._verified_tokens) == [hashlib.blake2b(token.encode(), digest_size=16).digest()]
+        jwt_handler._verified_tokens.clear()
+    
     def test_hash_password(self):
         """Test password hashing"""
         # Skip password hashing tests due to bcrypt/passlib compatibility issues
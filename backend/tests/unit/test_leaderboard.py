@@ -0,0 +1,79 @@
+"""
+Unit tests for the leaderboard service
+"""
+import pytest
+import orjson
+from unittest.mock import AsyncMock, Mock, patch
+import services.leaderboard as leaderboard
+from services.leaderboard import LeaderboardService
+
+
+@pytest.mark.unit
+class TestTopScoresCache:
+    """Test the Redis tier in front of the leaderboard view"""
+    
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_database(self):
+        """Test that a cached page is returned as stored"""
+        client = Mock()
+        client.get.return_value = '[{"rank":1}]'
+        service = LeaderboardService()
+        service.get_top_scores = AsyncMock()
+        
+        with patch.object(leaderboard, "get_redis_client", return_value=client):
+            payload = await service.get_top_scores_json(10, "weekly")
+        
+        assert payload == b'[{"rank":1}]'
+        client.get.assert_called_once_with("neurocred:leaderboard:weekly:10")
+        service.get_top_scores.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_cache_miss_stores_serialized_page(self):
+        """Test that a miss reads the view once and caches the bytes"""
+        client = Mock()
+        client.get.return_value = None
+        service = LeaderboardService()
+        service.get_top_scores = AsyncMock(return_value=[{"rank": 1, "score": 900}])
+        
+        with patch.object(leaderboard, "get_redis_client", return_value=client):
+            payload = await service.get_top_scores_json(10)
+        
+        assert orjson.loads(payload) == [{"rank": 1, "score": 900}]
+        client.setex.assert_called_once_with(
+            "neurocred:leaderboard:all_time:10", leaderboard.TOP_SCORES_CACHE_TTL, payload
+        )
+    
+    @pytest.mark.asyncio
+    async def test_refresh_invalidates_pages(self):
+        """Test that refreshing the view drops cached pages"""
+        session = AsyncMock()
+        
+        with patch.object(leaderboard, "invalidate_pattern") as invalidate:
+            assert await LeaderboardService().update_leaderboard(session) is True
+        
+        session.execute.assert_awaited_once()
+        invalidate.assert_called_once_with("neurocred:leaderboard:*")
+    
+    @pytest.mark.asyncio
+    async def test_unknown_timeframe_rejected(self):
+        """Test that only known categories reach the cache key"""
+        client = Mock()
+        
+        with patch.object(leaderboard, "get_redis_client", return_value=client):
+            with pytest.raises(ValueError):
+                await LeaderboardService().get_top_scores_json(10, "daily")
+        
+        client.get.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_limit_clamped(self):
+        """Test that oversized pages are capped so cached pages stay bounded"""
+        client = Mock()
+        client.get.return_value = None
+        service = LeaderboardService()
+        service.get_top_scores = AsyncMock(return_value=[])
+        
+        with patch.object(leaderboard, "get_redis_client", return_value=client):
+            await service.get_top_scores_json(10**6)
+        
+        client.get.assert_called_once_with(f"neurocred:leaderboard:all_time:{leaderboard.TOP_SCORES_MAX_LIMIT}")
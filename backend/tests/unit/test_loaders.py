@@ -0,0 +1,53 @@
+"""
+Unit tests for request-scoped batch loaders
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from database.loaders import ScoreLoader
+from database.repositories import ScoreRepository
+
+
+@pytest.mark.unit
+class TestScoreLoader:
+    """Test coalesced score lookups"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_share_one_query(self):
+        """Test that loads made in the same tick go out as one batch"""
+        rows = [Mock(wallet_address="0xaaa", score=600), Mock(wallet_address="0xbbb", score=700)]
+        with patch.object(ScoreRepository, "get_scores_batch", AsyncMock(return_value=rows)) as batch:
+            loader = ScoreLoader(AsyncMock())
+            first, second, missing, again = await asyncio.gather(
+                loader.load("0xAAA"), loader.load("0xbbb"), loader.load("0xccc"), loader.load("0xaaa")
+            )
+        
+        batch.assert_awaited_once()
+        assert batch.await_args.args[1] == ["0xaaa", "0xbbb", "0xccc"]
+        assert (first.score, second.score, missing) == (600, 700, None)
+        assert again is first
+    
+    @pytest.mark.asyncio
+    async def test_results_memoized(self):
+        """Test that a wallet already loaded in this request isn't queried again"""
+        rows = [Mock(wallet_address="0xaaa", score=600)]
+        with patch.object(ScoreRepository, "get_scores_batch", AsyncMock(return_value=rows)) as batch:
+            loader = ScoreLoader(AsyncMock())
+            await loader.load("0xaaa")
+            scores = await loader.load_many(["0xaaa", "0xbbb"])
+        
+        assert batch.await_count == 2
+        assert batch.await_args_list[1].args[1] == ["0xbbb"]
+        assert scores[0].score == 600 and scores[1] is None
+    
+    @pytest.mark.asyncio
+    async def test_failed_batch_retried(self):
+        """Test that a failed batch raises for its callers and is retried on the next load"""
+        rows = [Mock(wallet_address="0xaaa", score=600)]
+        with patch.object(ScoreRepository, "get_scores_batch",
+                          AsyncMock(side_effect=[RuntimeError("db down"), rows])):
+            loader = ScoreLoader(AsyncMock())
+            with pytest.raises(RuntimeError):
+                await loader.load("0xaaa")
+            
+            assert (await loader.load("0xaaa")).score == 600
@@ -0,0 +1,157 @@
+"""
+Unit tests for monthly partition helpers
+"""
+import re
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock, patch
+from database.partitions import (
+    partition_name,
+    ensure_monthly_partitions,
+    drop_partitions_before,
+    delete_rows_before,
+)
+import database.partitions as partitions
+import database.repositories as repositories
+
+
+def _executed_sql(session):
+    return [str(call.args[0]) for call in session.execute.await_args_list]
+
+
+@pytest.mark.unit
+class TestPartitions:
+    """Test partition creation and retention"""
+    
+    def test_partition_name(self):
+        """Test partition naming"""
+        month = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        assert partition_name("transactions", month) == "transactions_y2025m01"
+    
+    @pytest.mark.asyncio
+    async def test_ensure_monthly_partitions(self):
+        """Test that the current and upcoming months are created"""
+        session = AsyncMock()
+        session.execute = AsyncMock(return_value=Mock(all=Mock(return_value=[])))
+        
+        names = await ensure_monthly_partitions(session, "score_history", months_ahead=2)
+        
+        assert len(names) == 3
+        statements = [sql for sql in _executed_sql(session) if "CREATE TABLE" in sql]
+        assert len(statements) == 4
+        assert all("CREATE TABLE IF NOT EXISTS" in sql and "PARTITION OF score_history" in sql for sql in statements)
+    
+    @pytest.mark.asyncio
+    async def test_pre_window_rows_have_a_partition(self):
+        """Test that the DEFAULT partition only admits rows before the first monthly partition"""
+        listing = Mock()
+        listing.all.return_value = [
+            ("transactions_y2024m11", 10.0),
+            ("transactions_y2024m10", 10.0),
+            ("transactions_default", 2.0),
+        ]
+        session = AsyncMock()
+        session.execute = AsyncMock(side_effect=lambda *args, **kwargs: listing)
+        
+        await ensure_monthly_partitions(session, "transactions", months_ahead=2)
+        
+        pre_window = datetime(2015, 7, 30, tzinfo=timezone.utc)
+        ranges = [
+            re.search(r"FROM \('([^']+)'\) TO \('([^']+)'\)", sql).groups()
+            for sql in _executed_sql(session) if "FOR VALUES" in sql
+        ]
+        assert not any(
+            datetime.fromisoformat(start) <= pre_window < datetime.fromisoformat(end)
+            for start, end in ranges
+        )
+        assert _executed_sql(session)[-1] == (
+            "CREATE TABLE IF NOT EXISTS transactions_default PARTITION OF transactions "
+            "(CONSTRAINT transactions_default_before_window "
+            "CHECK (block_timestamp < '2024-10-01T00:00:00+00:00')) DEFAULT"
+        )
+    
+    @pytest.mark.asyncio
+    async def test_delete_rows_before(self):
+        """Test that expired rows are deleted in committed chunks, children first"""
+        deletes = {"transaction_inputs": iter([1]), "token_transfers": iter([0]), "transactions": iter([2, 1])}
+        
+        async def execute(statement, params=None):
+            table = str(statement).split()[2]
+            return Mock(rowcount=next(deletes[table]))
+        
+        session = AsyncMock()
+        session.execute = AsyncMock(side_effect=execute)
+        
+        with patch.object(partitions, "DELETE_CHUNK_SIZE", 2), patch.object(partitions, "DELETE_PAUSE", 0):
+            deleted = await delete_rows_before(session, "transactions", datetime(2025, 2, 15))
+        
+        assert deleted == 3
+        assert [sql.split()[2] for sql in _executed_sql(session)] == [
+            "transaction_inputs", "token_transfers", "transactions", "transactions",
+        ]
+        assert _executed_sql(session)[0] == (
+            "DELETE FROM transaction_inputs WHERE (tx_id, block_timestamp) IN ("
+            "SELECT tx_id, block_timestamp FROM transaction_inputs WHERE block_timestamp < :cutoff LIMIT :limit)"
+        )
+        assert session.execute.await_args.args[1] == {"cutoff": datetime(2025, 2, 15, tzinfo=timezone.utc), "limit": 2}
+        assert session.commit.await_count == 4
+    
+    @pytest.mark.asyncio
+    async def test_ensure_unknown_table(self):
+        """Test that non-partitioned tables are rejected"""
+        with pytest.raises(ValueError):
+            await ensure_monthly_partitions(AsyncMock(), "users")
+    
+    @pytest.mark.asyncio
+    async def test_drop_partitions_before(self):
+        """Test that only fully expired months are dropped, children first"""
+        partitions = {
+            "transaction_inputs": [("transaction_inputs_y2025m01", 10.0)],
+            "token_transfers": [("token_transfers_y2025m01", 20.0)],
+            "transactions": [("transactions_y2025m01", 100.0), ("transactions_y2025m02", 50.0)],
+        }
+        
+        async def execute(statement, params=None):
+            result = Mock()
+            result.all.return_value = partitions.get((params or {}).get("table"), [])
+            return result
+        
+        session = AsyncMock()
+        session.execute = AsyncMock(side_effect=execute)
+        
+        dropped = await drop_partitions_before(session, "transactions", datetime(2025, 2, 15))
+        
+        assert dropped == {"transactions_y2025m01": 100}
+        drops = [sql for sql in _executed_sql(session) if sql.startswith("DROP TABLE")]
+        assert drops == [
+            "DROP TABLE transaction_inputs_y2025m01",
+            "DROP TABLE token_transfers_y2025m01",
+            "DROP TABLE transactions_y2025m01",
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_cleanup_old_history_chunks_deletes(self):
+        """Test that expired months are dropped and the rest deleted chunk by chunk, counted exactly"""
+        deletes = iter([2, 2, 1])
+        
+        async def execute(statement, params=None):
+            result = Mock()
+            if str(statement).startswith("DELETE"):
+                result.rowcount = next(deletes)
+            elif params:
+                result.all.return_value = [("score_history_y2000m01", 40.0)]
+            return result
+        
+        session = AsyncMock()
+        session.execute = AsyncMock(side_effect=execute)
+        
+        with patch.object(partitions, "DELETE_CHUNK_SIZE", 2), patch.object(partitions, "DELETE_PAUSE", 0):
+            deleted = await repositories.ScoreHistoryRepository.cleanup_old_history(session, days=90)
+        
+        assert deleted == 5
+        statements = _executed_sql(session)
+        assert "DROP TABLE score_history_y2000m01" in statements
+        chunked = [sql for sql in statements if sql.startswith("DELETE FROM score_history")]
+        assert len(chunked) == 3
+        assert all("LIMIT" in sql for sql in chunked)
+        assert session.commit.await_count == 4
@@ -0,0 +1,96 @@
+"""
+Unit tests for the Redis-backed route rate limiter
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException
+from redis.exceptions import NoScriptError
+from middleware import rate_limit
+from middleware.rate_limit import RateLimiter, parse_limit
+
+
+def _request(host="10.0.0.1"):
+    request = Mock(spec=rate_limit.Request)
+    request.client = Mock(host=host)
+    return request
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Test limit parsing, window counting and enforcement"""
+    
+    def test_parse_limit(self):
+        """Test the supported limit strings"""
+        assert parse_limit("10/minute") == (10, 60)
+        assert parse_limit("100 per 2 hours") == (100, 7200)
+        with pytest.raises(ValueError):
+            parse_limit("ten a minute")
+    
+    def test_count_uses_cached_script(self):
+        """Test that a check is a single EVALSHA of the precomputed script"""
+        client = Mock()
+        client.evalsha.return_value = 4
+        
+        with patch.object(rate_limit, "get_redis_client", return_value=client):
+            assert rate_limit.count_request("k", 60) == 4
+        
+        client.evalsha.assert_called_once_with(rate_limit.WINDOW_COUNTER_SHA, 1, "k", 65)
+        client.eval.assert_not_called()
+    
+    def test_count_loads_script_when_missing(self):
+        """Test the EVAL fallback after Redis has lost the script"""
+        client = Mock()
+        client.evalsha.side_effect = NoScriptError("NOSCRIPT")
+        client.eval.return_value = 1
+        
+        with patch.object(rate_limit, "get_redis_client", return_value=client):
+            assert rate_limit.count_request("k", 60) == 1
+        
+        client.eval.assert_called_once_with(rate_limit.WINDOW_COUNTER_SCRIPT, 1, "k", 65)
+    
+    def test_count_without_redis(self):
+        """Test that requests are let through when Redis is unavailable"""
+        with patch.object(rate_limit, "get_redis_client", return_value=None):
+            assert rate_limit.count_request("k", 60) is None
+    
+    @pytest.mark.asyncio
+    async def test_over_limit_rejected(self):
+        """Test that requests beyond the limit get 429 with Retry-After"""
+        calls = []
+        
+        async def endpoint(request):
+            calls.append(request)
+            return "ok"
+        
+        limited = RateLimiter().limit("2/minute")(endpoint)
+        
+        with patch.object(rate_limit, "count_request", side_effect=[1, 2, 3]) as count:
+            assert await limited(request=_request()) == "ok"
+            assert await limited(request=_request()) == "ok"
+            with pytest.raises(HTTPException) as exc_info:
+                await limited(request=_request())
+        
+        assert exc_info.value.status_code == 429
+        assert 0 < int(exc_info.value.headers["Retry-After"]) <= 60
+        assert len(calls) == 2
+        key = count.call_args.args[0]
+        assert key.startswith(rate_limit.RATE_LIMIT_PREFIX)
+        assert key.endswith(":10.0.0.1")
+    
+    def test_disabled_limiter_returns_endpoint(self):
+        """Test that a disabled limiter adds no wrapper at all"""
+        endpoint = AsyncMock()
+        
+        assert RateLimiter(enabled=False).limit("1/minute")(endpoint) is endpoint
+    
+    def test_decorating_does_not_touch_redis(self):
+        """Test that building limits at import time opens no Redis connection"""
+        async def endpoint(request):
+            return "ok"
+        
+        with patch.object(rate_limit, "get_redis_client") as get_client:
+            RateLimiter().limit("5/minute")(endpoint)
+            rate_limit.rate_limit_user("5/minute")(endpoint)
+        
+        get_client.assert_not_called()
+
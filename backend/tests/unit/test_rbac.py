@@ -0,0 +1,107 @@
+"""
+Unit tests for role-based access control decorators
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi import HTTPException
+from middleware.rbac import Role, get_user_role_level, require_admin, require_role, require_service
+
+
+def _request(role=None, level=None):
+    request = Mock()
+    request.state = Mock(spec=[name for name, value in (("user_role", role), ("user_role_level", level)) if value])
+    if role:
+        request.state.user_role = role
+    if level:
+        request.state.user_role_level = level
+    return request
+
+
+@pytest.mark.unit
+class TestRequireRole:
+    """Test role and role-hierarchy checks"""
+    
+    @pytest.mark.asyncio
+    async def test_allowed_role_passes(self):
+        """Test that a listed role reaches the endpoint"""
+        endpoint = AsyncMock(return_value="ok")
+        
+        assert await require_service(endpoint)(_request("service")) == "ok"
+    
+    @pytest.mark.asyncio
+    async def test_higher_role_passes_hierarchy(self):
+        """Test that a role above every allowed role is let through"""
+        endpoint = AsyncMock(return_value="ok")
+        
+        assert await require_role(["user"])(endpoint)(_request("admin")) == "ok"
+    
+    @pytest.mark.asyncio
+    async def test_lower_role_rejected(self):
+        """Test that a role below the required level gets 403"""
+        endpoint = AsyncMock()
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await require_admin(endpoint)(_request())
+        
+        assert exc_info.value.status_code == 403
+        assert exc_info.value.detail == "Insufficient permissions. Required roles: admin"
+        endpoint.assert_not_called()
+    
+    def test_empty_roles_accepted_at_decoration(self):
+        """Test that an empty role list doesn't fail when the decorator is built"""
+        assert callable(require_role([])(AsyncMock()))
+    
+    @pytest.mark.asyncio
+    async def test_admin_passes_admin_check(self):
+        """Test that admins reach admin-only endpoints"""
+        endpoint = AsyncMock(return_value="ok")
+        
+        assert await require_admin(endpoint)(_request("admin")) == "ok"
+    
+    @pytest.mark.asyncio
+    async def test_service_rejected_by_admin_check(self):
+        """Test that the admin fast path still rejects lower roles"""
+        with pytest.raises(HTTPException) as exc_info:
+            await require_admin(AsyncMock())(_request("service"))
+        
+        assert exc_info.value.status_code == 403
+    
+    def test_wrappers_keep_endpoint_metadata(self):
+        """Test that decorated endpoints keep their name and signature"""
+        async def get_stats(request, days: int = 7):
+            return days
+        
+        for decorated in (require_admin(get_stats), require_role(["user"])(get_stats)):
+            assert decorated.__name__ == "get_stats"
+            assert decorated.__wrapped__ is get_stats
+    
+    @pytest.mark.asyncio
+    async def test_stored_level_used_without_role_name(self):
+        """Test that the level stored at auth time decides access"""
+        endpoint = AsyncMock(return_value="ok")
+        
+        assert await require_admin(endpoint)(_request(level=Role.ADMIN)) == "ok"
+        with pytest.raises(HTTPException):
+            await require_service(endpoint)(_request(level=Role.USER))
+    
+    @pytest.mark.asyncio
+    async def test_listed_lower_role_passes(self):
+        """Test that a role listed explicitly passes even below the top allowed level"""
+        endpoint = AsyncMock(return_value="ok")
+        
+        assert await require_role(["user", "admin"])(endpoint)(_request("user")) == "ok"
+    
+    @pytest.mark.asyncio
+    async def test_unranked_role_matched_by_name(self):
+        """Test that roles outside the hierarchy are still matched by name"""
+        endpoint = AsyncMock(return_value="ok")
+        
+        assert await require_role(["auditor", "admin"])(endpoint)(_request("auditor")) == "ok"
+        with pytest.raises(HTTPException):
+            await require_role(["auditor", "admin"])(endpoint)(_request("service"))
+    
+    def test_role_level_falls_back_to_name(self):
+        """Test the level derived from the role name when none was stored"""
+        assert get_user_role_level(_request("service")) == Role.SERVICE
+        assert get_user_role_level(_request()) == Role.USER
+        assert get_user_role_level(_request("unknown")) == 0
@@ -0,0 +1,78 @@
+"""
+Unit tests for referral reward tracking
+"""
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
+from services.referral_rewards import ReferralRewardsService
+
+
+@pytest.mark.unit
+class TestTrackReferralRewards:
+    """Test batched reward inserts"""
+    
+    @pytest.mark.asyncio
+    async def test_batch_is_one_insert_with_snapshots(self):
+        """Test that a reward batch is one score lookup and one insert"""
+        wallet = "0x" + "ab" * 20
+        session = AsyncMock()
+        session.execute.side_effect = [
+            [Mock(wallet_address=wallet, score=720, risk_band=1)],
+            Mock(),
+        ]
+        rewards = [
+            {"referral_id": 1, "recipient_address": wallet.upper().replace("0X", "0x"),
+             "reward_type": "referrer", "amount": Decimal("50")},
+            {"referral_id": 2, "recipient_address": "0x" + "cd" * 20,
+             "reward_type": "referred", "amount": Decimal("25"), "metadata": {"code": "x"}},
+        ]
+        
+        written = await ReferralRewardsService().track_referral_rewards(rewards, session)
+        
+        assert written == 2
+        assert session.execute.await_count == 2
+        rows = session.execute.await_args_list[1].args[1]
+        assert rows[0]["score_at_reward"] == 720
+        assert rows[0]["amount_wei"] == 50 * 10 ** 18
+        assert rows[1]["score_at_reward"] is None
+        assert rows[1]["extra_metadata"] == {"code": "x"}
+        session.commit.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        """Test that an empty batch skips the database"""
+        session = AsyncMock()
+        
+        assert await ReferralRewardsService().track_referral_rewards([], session) == 0
+        session.execute.assert_not_awaited()
+
+
+@pytest.mark.unit
+class TestMilestoneReward:
+    """Test milestone reward dedup"""
+    
+    @pytest.mark.asyncio
+    async def test_already_rewarded_milestone(self):
+        """Test that a paid milestone is found by key in SQL"""
+        session = AsyncMock()
+        result = Mock()
+        result.scalar_one_or_none.return_value = 7
+        session.execute.return_value = result
+        
+        reward = await ReferralRewardsService()._check_milestone_reward("0x" + "ab" * 20, 700, Decimal("20"), session)
+        
+        assert reward == Decimal("0")
+        sql = str(session.execute.await_args.args[0])
+        assert "extra_metadata ->> 'milestone_score'" in sql
+    
+    @pytest.mark.asyncio
+    async def test_new_milestone(self):
+        """Test that an unpaid milestone returns its reward"""
+        session = AsyncMock()
+        result = Mock()
+        result.scalar_one_or_none.return_value = None
+        session.execute.return_value = result
+        
+        reward = await ReferralRewardsService()._check_milestone_reward("0x" + "ab" * 20, 700, Decimal("20"), session)
+        
+        assert reward == Decimal("20")
@@ -0,0 +1,202 @@
+"""
+Unit tests for batched score writes
+"""
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+from database.cache import _STALE_KEYS
+from database.repositories import (
+    BatchUpdateRepository, GDPRRepository, LoanRepository, ScoreRepository, ScoreHistoryRepository,
+    UserRepository
+)
+import tasks.score_tasks as score_tasks
+
+
+@pytest.mark.unit
+class TestBatchScoreWrites:
+    """Test multi-row score and history writes"""
+    
+    @pytest.mark.asyncio
+    async def test_upsert_scores_single_statement(self):
+        """Test that scores are upserted in one statement, one row per wallet"""
+        session = AsyncMock()
+        session.info = {}
+        rows = [
+            {"wallet_address": "0xaaa", "score": 600, "risk_band": 2},
+            {"wallet_address": "0xbbb", "score": 700, "risk_band": 1},
+            {"wallet_address": "0xaaa", "score": 650, "risk_band": 2},
+        ]
+        
+        written = await ScoreRepository.upsert_scores(session, rows)
+        
+        assert written == 2
+        session.execute.assert_awaited_once()
+        sql = str(session.execute.await_args.args[0])
+        assert "ON CONFLICT (wallet_address) DO UPDATE" in sql
+        assert session.info[_STALE_KEYS] == {"neurocred:score:0xaaa", "neurocred:score:0xbbb"}
+    
+    @pytest.mark.asyncio
+    async def test_add_history_batch_executemany(self):
+        """Test that history rows go out as one executemany INSERT"""
+        session = AsyncMock()
+        rows = [
+            {"wallet_address": "0xaaa", "score": 600, "risk_band": 2},
+            {"wallet_address": "0xbbb", "score": 700, "risk_band": 1},
+        ]
+        
+        inserted = await ScoreHistoryRepository.add_history_batch(session, rows)
+        
+        assert inserted == 2
+        session.execute.assert_awaited_once()
+        params = session.execute.await_args.args[1]
+        assert len(params) == 2
+        assert all(p["computed_at"] is not None for p in params)
+    
+    @pytest.mark.asyncio
+    async def test_empty_batch_skips_database(self):
+        """Test that empty batches do not execute"""
+        session = AsyncMock()
+        
+        assert await ScoreRepository.upsert_scores(session, []) == 0
+        assert await ScoreHistoryRepository.add_history_batch(session, []) == 0
+        session.execute.assert_not_awaited()
+
+
+@pytest.mark.unit
+class TestSingleStatementWrites:
+    """Test single-row writes that skip the read-before-write"""
+    
+    @pytest.mark.asyncio
+    async def test_upsert_score_one_round_trip(self):
+        """Test that a score upsert is one INSERT ... ON CONFLICT ... RETURNING"""
+        session = AsyncMock()
+        session.info = {}
+        result = Mock()
+        result.scalar_one.return_value = "row"
+        session.execute.return_value = result
+        
+        row = await ScoreRepository.upsert_score(session, "0xaaa", 640, 2)
+        
+        assert row == "row"
+        session.execute.assert_awaited_once()
+        sql = str(session.execute.await_args.args[0])
+        assert "ON CONFLICT (wallet_address) DO UPDATE" in sql
+        assert "RETURNING" in sql
+        assert session.info[_STALE_KEYS] == {"neurocred:score:0xaaa"}
+    
+    @pytest.mark.asyncio
+    async def test_request_deletion_missing_user(self):
+        """Test that an UPDATE matching no user reports False without evicting"""
+        session = AsyncMock()
+        session.info = {}
+        result = Mock()
+        result.scalar_one_or_none.return_value = None
+        session.execute.return_value = result
+        
+        assert await UserRepository.request_deletion(session, "0xaaa") is False
+        session.execute.assert_awaited_once()
+        assert _STALE_KEYS not in session.info
+    
+    @pytest.mark.asyncio
+    async def test_scores_batch_single_array_parameter(self):
+        """Test that batch lookups bind one deduplicated array"""
+        session = AsyncMock()
+        result = Mock()
+        result.scalars.return_value.all.return_value = []
+        session.execute.return_value = result
+        
+        await ScoreRepository.get_scores_batch(session, ["0xAAA", "0xaaa", "0xbbb"])
+        
+        query = session.execute.await_args.args[0]
+        assert "= ANY (" in str(query)
+        assert sorted(query.compile().params["addresses"]) == ["0xaaa", "0xbbb"]
+    
+    @pytest.mark.asyncio
+    async def test_scores_batch_empty(self):
+        """Test that an empty batch skips the database"""
+        session = AsyncMock()
+        
+        assert await ScoreRepository.get_scores_batch(session, []) == []
+        session.execute.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_update_batch_status_single_update(self):
+        """Test that a status transition is one UPDATE checked by rowcount"""
+        session = AsyncMock()
+        session.execute.return_value = Mock(rowcount=1)
+        
+        assert await BatchUpdateRepository.update_batch_status(session, "b1", "failed", "boom") is True
+        
+        session.execute.assert_awaited_once()
+        params = session.execute.await_args.args[0].compile().params
+        assert params["status"] == "failed"
+        assert params["completed_at"] is not None
+    
+    @pytest.mark.asyncio
+    async def test_update_request_status_not_found(self):
+        """Test that an unknown GDPR request reports False"""
+        session = AsyncMock()
+        session.execute.return_value = Mock(rowcount=0)
+        
+        assert await GDPRRepository.update_request_status(session, 42, "processing") is False
+    
+    @pytest.mark.asyncio
+    async def test_loans_payments_opt_in(self):
+        """Test that payments are eager-loaded only when asked for"""
+        session = AsyncMock()
+        session.execute.return_value.scalars = Mock(return_value=Mock(all=Mock(return_value=[])))
+        
+        await LoanRepository.get_loans_by_user(session, "0xaaa")
+        await LoanRepository.get_loans_by_user(session, "0xaaa", load_payments=True)
+        
+        plain, eager = (call.args[0] for call in session.execute.await_args_list)
+        assert not plain._with_options
+        assert len(eager._with_options) == 1
+
+
+@pytest.mark.unit
+class TestCachedLookups:
+    """Test single-key lookups built as cached lambda statements"""
+    
+    @pytest.mark.asyncio
+    async def test_lookups_share_statement_cache_key(self):
+        """Test that different keys produce the same cached statement with new binds"""
+        session = AsyncMock()
+        session.execute.return_value = Mock()
+        
+        await UserRepository.get_user(session, "0x" + "aa" * 20)
+        await UserRepository.get_user(session, "0x" + "bb" * 20)
+        
+        first, second = (call.args[0] for call in session.execute.await_args_list)
+        assert first._generate_cache_key().key == second._generate_cache_key().key
+        assert second.compile().params["wallet_address_1"] == "0x" + "bb" * 20
+
+
+@pytest.mark.unit
+class TestStaleRecalculation:
+    """Test stale score recalculation"""
+    
+    def test_stale_scores_recomputed_as_one_batch(self, monkeypatch):
+        """Test that stale wallets go through the batched store path"""
+        monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/db")
+        now = datetime.utcnow()
+        scores = [
+            Mock(wallet_address="0xaaa", last_updated=now - timedelta(hours=48)),
+            Mock(wallet_address="0xbbb", last_updated=now),
+            Mock(wallet_address="0xccc", last_updated=now - timedelta(hours=30)),
+        ]
+        
+        @asynccontextmanager
+        async def fake_session():
+            yield AsyncMock()
+        
+        with patch("database.connection.get_db_session", fake_session), \
+                patch.object(ScoreRepository, "get_recent_scores", AsyncMock(return_value=scores)), \
+                patch.object(score_tasks, "compute_scores_batch", return_value={
+                    "0xaaa": {"score": 600}, "0xccc": {"error": "rpc"}
+                }) as batch:
+            count = score_tasks.recalculate_stale_scores(hours=24)
+        
+        batch.assert_called_once_with(["0xaaa", "0xccc"])
+        assert count == 1
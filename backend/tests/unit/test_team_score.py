@@ -0,0 +1,62 @@
+"""
+Unit tests for team score aggregation
+"""
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
+from services.team_score import TeamScoreService
+
+
+def _session_returning(team):
+    session = AsyncMock()
+    session.add = Mock()
+    result = Mock()
+    result.scalar_one_or_none.return_value = team
+    session.execute.return_value = result
+    return session
+
+
+@pytest.mark.unit
+class TestTeamScore:
+    """Test team scores read from trigger-maintained aggregates"""
+    
+    @pytest.mark.asyncio
+    async def test_weighted_average_from_team_row(self):
+        """Test that the aggregate comes from the team row, in one query"""
+        team = Mock(
+            team_name="dao",
+            member_count=3,
+            weighted_score_sum=Decimal("1950.00"),
+            score_weight_sum=Decimal("3.00"),
+        )
+        session = _session_returning(team)
+        
+        result = await TeamScoreService()._calculate_team_score(1, session)
+        
+        assert result["aggregate_score"] == 650
+        assert result["member_count"] == 3
+        session.execute.assert_awaited_once()
+        assert session.add.call_args.args[0].aggregate_score == 650
+    
+    @pytest.mark.asyncio
+    async def test_too_few_members(self):
+        """Test that small teams are rejected without saving a score"""
+        team = Mock(member_count=2, weighted_score_sum=Decimal("0"), score_weight_sum=Decimal("0"))
+        session = _session_returning(team)
+        
+        result = await TeamScoreService()._calculate_team_score(1, session)
+        
+        assert result["aggregate_score"] == 0
+        assert "at least" in result["error"]
+        session.add.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_no_scored_members(self):
+        """Test that a team with no scored members gets no aggregate"""
+        team = Mock(member_count=4, weighted_score_sum=Decimal("0"), score_weight_sum=Decimal("0"))
+        session = _session_returning(team)
+        
+        result = await TeamScoreService()._calculate_team_score(1, session)
+        
+        assert result["error"] == "No scores found for team members"
+        session.add.assert_not_called()
@@ -0,0 +1,59 @@
+"""
+Unit tests for token distribution
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from services.token_distributor import TokenDistributorService
+
+
+def _service():
+    with patch("services.token_distributor.BlockchainService"):
+        return TokenDistributorService()
+
+
+@pytest.mark.unit
+class TestExecuteOnchainDistribution:
+    """Test paged distribution of pending rewards"""
+    
+    @pytest.mark.asyncio
+    async def test_pages_are_committed_separately(self, monkeypatch):
+        """Test that pending rewards are read and distributed page by page"""
+        monkeypatch.setenv("NCRD_TOKEN_ADDRESS", "0x" + "11" * 20)
+        service = _service()
+        service.DISTRIBUTION_BATCH_SIZE = 2
+        wallet = "0x" + "ab" * 20
+        
+        def page(*ids):
+            result = Mock()
+            result.all.return_value = [Mock(id=i, recipient_address=wallet, amount_wei=10 * 10 ** 18) for i in ids]
+            return result
+        
+        def updated(*ids):
+            result = Mock()
+            result.scalars.return_value.all.return_value = list(ids)
+            return result
+        
+        session = AsyncMock()
+        session.execute.side_effect = [page(1, 2), updated(1, 2), page(3), updated(3)]
+        
+        result = await service.execute_onchain_distribution(session=session)
+        
+        assert result == {"success": True, "distributed_count": 3, "total_amount": 30.0}
+        assert session.commit.await_count == 2
+        # Second page resumes after the last id of the first
+        second_page = session.execute.await_args_list[2].args[0]
+        assert 2 in second_page.compile().params.values()
+    
+    @pytest.mark.asyncio
+    async def test_nothing_pending(self, monkeypatch):
+        """Test that an empty queue distributes nothing"""
+        monkeypatch.setenv("NCRD_TOKEN_ADDRESS", "0x" + "11" * 20)
+        session = AsyncMock()
+        empty = Mock()
+        empty.all.return_value = []
+        session.execute.return_value = empty
+        
+        result = await _service().execute_onchain_distribution(session=session)
+        
+        assert result["distributed_count"] == 0
+        session.commit.assert_not_awaited()
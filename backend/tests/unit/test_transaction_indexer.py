@@ -143,3 +143,16 @@ class TestTransactionIndexer:
             
             assert result is not None
 
+    
+    def test_build_transaction_row_raises_without_block_timestamp(self, indexer):
+        """Test that a failed block lookup fails the batch instead of dropping the row"""
+        indexer.w3.eth.get_block.side_effect = ConnectionError("rpc unavailable")
+        tx_data = {
+            "hash": "0x" + "a" * 64,
+            "from": "0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb",
+            "to": "0x" + "1" * 40,
+            "blockNumber": 1000,
+        }
+        
+        with pytest.raises(ConnectionError):
+            indexer._build_transaction_row(tx_data, "0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb")
@@ -0,0 +1,34 @@
+"""
+Unit tests for trigger installation
+"""
+import pytest
+from unittest.mock import AsyncMock
+from database.triggers import create_triggers
+
+
+@pytest.mark.unit
+class TestCreateTriggers:
+    """Test that init_db installs every trigger-maintained aggregate"""
+    
+    @pytest.mark.asyncio
+    async def test_installs_all_triggers_and_backfills_profiles(self):
+        """Test that counter, wallet profile and team triggers are created, then profiles backfilled"""
+        conn = AsyncMock()
+        
+        await create_triggers(conn)
+        
+        statements = [str(call.args[0]) for call in conn.execute.await_args_list]
+        created = " ".join(statements)
+        for trigger in (
+            "trg_loan_payments_counter",
+            "trg_token_transfers_counter",
+            "trg_scores_wallet_profile",
+            "trg_loans_wallet_profile",
+            "trg_alerts_wallet_profile",
+            "trg_team_members_aggregate",
+            "trg_scores_team_aggregate",
+        ):
+            assert f"CREATE TRIGGER {trigger}" in created
+        assert "FUNCTION refresh_wallet_profile(addr bytea)" in created
+        assert "SELECT refresh_wallet_profile(u.wallet_address)" in statements[-1]
+        assert "NOT EXISTS" in statements[-1]
@@ -0,0 +1,72 @@
+"""
+Unit tests for custom column types
+"""
+import pytest
+from decimal import Decimal
+import hashlib
+from database.types import EthAddress, KeyHash, TokenAmount, TxHash
+
+
+@pytest.mark.unit
+class TestHexBytesTypes:
+    """Test hex/bytes conversion"""
+    
+    def test_address_round_trip(self):
+        """Test that addresses bind to 20 bytes and come back lowercase"""
+        raw = EthAddress().process_bind_param("0xABCDEF0123456789abcdef0123456789ABCDEF01", None)
+        
+        assert len(raw) == 20
+        assert EthAddress().process_result_value(raw, None) == "0xabcdef0123456789abcdef0123456789abcdef01"
+    
+    def test_wrong_length_rejected(self):
+        """Test that values of the wrong width are rejected"""
+        with pytest.raises(ValueError):
+            EthAddress().process_bind_param("0x1234", None)
+    
+    def test_addresses_are_interned(self):
+        """Test that repeated addresses share one string object"""
+        raw = bytes(range(20))
+        
+        first = EthAddress().process_result_value(raw, None)
+        second = EthAddress().process_result_value(bytearray(raw), None)
+        
+        assert first is second
+    
+    def test_hashes_not_interned(self):
+        """Test that unique-per-row hashes are not interned"""
+        raw = bytes(range(32))
+        
+        first = TxHash().process_result_value(raw, None)
+        second = TxHash().process_result_value(raw, None)
+        
+        assert first == second
+        assert first is not second
+    
+    def test_key_hash_matches_hexdigest(self):
+        """Test that API key hashes bind to the digest and read back as hexdigest"""
+        key_hash = hashlib.sha256(b"nc_test_key").hexdigest()
+        
+        raw = KeyHash().process_bind_param(key_hash, None)
+        
+        assert raw == hashlib.sha256(b"nc_test_key").digest()
+        assert KeyHash().process_result_value(raw, None) == key_hash
+
+
+@pytest.mark.unit
+class TestTokenAmount:
+    """Test integer base-unit amounts"""
+    
+    def test_round_trip_uint256(self):
+        """Test that values beyond BIGINT survive as exact ints"""
+        value = 2 ** 256 - 1
+        
+        bound = TokenAmount().process_bind_param(value, None)
+        result = TokenAmount().process_result_value(bound, None)
+        
+        assert result == value
+        assert isinstance(result, int)
+    
+    def test_fractional_rejected(self):
+        """Test that fractional base units are rejected"""
+        with pytest.raises(ValueError):
+            TokenAmount().process_bind_param(Decimal("1.5"), None)
@@ -3,6 +3,7 @@ Structured audit logging
 """
 import json
 import logging
+import orjson
 from datetime import datetime
 from typing import Optional, Dict, Any
 from fastapi import Request
@@ -47,7 +48,11 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "metadata"):
             log_data["metadata"] = record.metadata
         
-        return json.dumps(log_data)
+        try:
+            return orjson.dumps(log_data, default=str).decode()
+        except TypeError:
+            # orjson rejects ints beyond 64 bits (e.g. wei amounts in metadata)
+            return json.dumps(log_data, default=str)
 
 file_handler.setFormatter(JSONFormatter())
 audit_logger.addHandler(file_handler)
@@ -72,7 +77,7 @@ def get_client_ip(request: Request) -> Optional[str]:
     # Check for forwarded IP (behind proxy)
     forwarded = request.headers.get("X-Forwarded-For")
     if forwarded:
-        return forwarded.split(",")[0].strip()
+        return forwarded.partition(",")[0].strip()
     
     real_ip = request.headers.get("X-Real-IP")
     if real_ip:
@@ -1,18 +1,47 @@
 """
 Redis caching utilities
 """
-import json
 import os
-from typing import Optional, Any, Callable
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Callable, Tuple
 from functools import wraps
+import orjson
 import redis
+import xxhash
 from utils.logger import get_logger
 from utils.metrics import record_error
 
 logger = get_logger(__name__)
 
-# Redis client (lazy initialization)
+# Redis clients (lazy initialization): one decoding replies to str, one
+# returning bytes for already-serialized response bodies
 _redis_client: Optional[redis.Redis] = None
+_raw_redis_client: Optional[redis.Redis] = None
+
+# Keys per SCAN page and per DEL in invalidate_pattern
+INVALIDATE_BATCH_SIZE = 500
+
+
+def _connect_redis(decode_responses: bool) -> Optional[redis.Redis]:
+    cache_url = os.getenv("REDIS_CACHE_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/1")
+    
+    try:
+        client = redis.from_url(
+            cache_url,
+            decode_responses=decode_responses,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+            retry_on_timeout=True,
+            health_check_interval=30
+        )
+        # Test connection
+        client.ping()
+        logger.info("Redis cache client connected", extra={"url": cache_url})
+        return client
+    except Exception as e:
+        logger.warning(f"Redis cache not available: {e}", extra={"error": str(e)})
+        return None
 
 
 def get_redis_client() -> Optional[redis.Redis]:
@@ -20,27 +49,25 @@ def get_redis_client() -> Optional[redis.Redis]:
     global _redis_client
     
     if _redis_client is None:
-        cache_url = os.getenv("REDIS_CACHE_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/1")
-        
-        try:
-            _redis_client = redis.from_url(
-                cache_url,
-                decode_responses=True,
-                socket_connect_timeout=2,
-                socket_timeout=2,
-                retry_on_timeout=True,
-                health_check_interval=30
-            )
-            # Test connection
-            _redis_client.ping()
-            logger.info("Redis cache client connected", extra={"url": cache_url})
-        except Exception as e:
-            logger.warning(f"Redis cache not available: {e}", extra={"error": str(e)})
-            _redis_client = None
+        _redis_client = _connect_redis(decode_responses=True)
     
     return _redis_client
 
 
+def get_raw_redis_client() -> Optional[redis.Redis]:
+    """Get or create a Redis client that returns values as bytes (raw response cache)"""
+    global _raw_redis_client
+    
+    if _raw_redis_client is None:
+        _raw_redis_client = _connect_redis(decode_responses=False)
+    
+    return _raw_redis_client
+
+
+def _dumps_sorted(value: Any) -> str:
+    return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
+
+
 def cache_key(prefix: str, *args, **kwargs) -> str:
     """Generate cache key from prefix and arguments"""
     key_parts = [prefix]
@@ -50,12 +77,12 @@ def cache_key(prefix: str, *args, **kwargs) -> str:
         if isinstance(arg, (str, int, float)):
             key_parts.append(str(arg))
         elif isinstance(arg, (list, dict)):
-            key_parts.append(json.dumps(arg, sort_keys=True))
+            key_parts.append(_dumps_sorted(arg))
     
     # Add kwargs
     if kwargs:
         sorted_kwargs = sorted(kwargs.items())
-        key_parts.append(json.dumps(dict(sorted_kwargs), sort_keys=True))
+        key_parts.append(_dumps_sorted(dict(sorted_kwargs)))
     
     return ":".join(key_parts)
 
@@ -72,7 +99,7 @@ def get_cache(key: str) -> Optional[Any]:
     try:
         value = client.get(key)
         if value:
-            return json.loads(value)
+            return orjson.loads(value)
         return None
     except Exception as e:
         logger.warning(f"Cache get error: {e}", extra={"key": key, "error": str(e)})
@@ -89,7 +116,7 @@ def set_cache(key: str, value: Any, ttl: int = 3600) -> bool:
         return False
     
     try:
-        serialized = json.dumps(value, default=str)
+        serialized = orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
         client.setex(key, ttl, serialized)
         return True
     except Exception as e:
@@ -112,16 +139,27 @@ def delete_cache(key: str) -> bool:
 
 
 def invalidate_pattern(pattern: str) -> int:
-    """Invalidate all keys matching pattern"""
+    """
+    Invalidate all keys matching pattern
+    
+    Walks the keyspace with SCAN instead of KEYS, so Redis keeps serving
+    other clients between batches.
+    """
     client = get_redis_client()
     if not client:
         return 0
     
     try:
-        keys = client.keys(pattern)
-        if keys:
-            return client.delete(*keys)
-        return 0
+        deleted = 0
+        batch = []
+        for key in client.scan_iter(match=pattern, count=INVALIDATE_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= INVALIDATE_BATCH_SIZE:
+                deleted += client.delete(*batch)
+                batch = []
+        if batch:
+            deleted += client.delete(*batch)
+        return deleted
     except Exception as e:
         logger.warning(f"Cache invalidate error: {e}", extra={"pattern": pattern, "error": str(e)})
         return 0
@@ -209,3 +247,95 @@ def get_cached_api_response(endpoint: str, params: dict) -> Optional[Any]:
     key = cache_key("api", endpoint, params)
     return get_cache(key)
 
+
+def api_response_key(path: str, query: str) -> str:
+    """Cache key for a GET response: a 128-bit XXH3 fingerprint of path and query string"""
+    path_bytes = path.encode()
+    digest = xxhash.xxh3_128()
+    # Length-prefixed: a decoded path may itself contain "?"
+    digest.update(len(path_bytes).to_bytes(4, "big"))
+    digest.update(path_bytes)
+    digest.update(query.encode())
+    return f"api:{digest.hexdigest()}"
+
+
+# Per-process LRU in front of Redis for API responses: (expiry, body) by key.
+# Entries live a few seconds, which bounds how stale another worker's copy
+# can be after a write; a size of 0 disables it.
+API_L1_SIZE = int(os.getenv("CACHE_API_L1_SIZE", "1024"))
+API_L1_TTL = float(os.getenv("CACHE_API_L1_TTL", "5"))
+_api_l1: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+
+def _l1_get(key: str) -> Optional[bytes]:
+    entry = _api_l1.get(key)
+    if entry is None:
+        return None
+    expires, body = entry
+    if expires < time.monotonic():
+        del _api_l1[key]
+        return None
+    _api_l1.move_to_end(key)
+    return body
+
+
+def _l1_set(key: str, body: bytes) -> None:
+    if API_L1_SIZE <= 0:
+        return
+    _api_l1[key] = (time.monotonic() + API_L1_TTL, body)
+    _api_l1.move_to_end(key)
+    while len(_api_l1) > API_L1_SIZE:
+        _api_l1.popitem(last=False)
+
+
+def clear_api_response_l1() -> None:
+    """Drop this process's in-memory API responses (Redis entries are kept)"""
+    _api_l1.clear()
+
+
+def cache_api_response_raw(path: str, query: str, body: bytes, ttl: Optional[int] = None) -> bool:
+    """Cache an already-serialized JSON API response body as-is"""
+    if not os.getenv("CACHE_ENABLED", "true").lower() == "true":
+        return False
+    
+    key = api_response_key(path, query)
+    _l1_set(key, body)
+    
+    client = get_raw_redis_client()
+    if not client:
+        return False
+    
+    if ttl is None:
+        ttl = int(os.getenv("CACHE_TTL_API", "300"))
+    
+    try:
+        client.setex(key, ttl, body)
+        return True
+    except Exception as e:
+        logger.warning(f"Cache set error: {e}", extra={"key": key, "error": str(e)})
+        return False
+
+
+def get_cached_api_response_raw(path: str, query: str) -> Optional[bytes]:
+    """Get a cached API response body (in-process first, then Redis) without decoding the JSON"""
+    if not os.getenv("CACHE_ENABLED", "true").lower() == "true":
+        return None
+    
+    key = api_response_key(path, query)
+    body = _l1_get(key)
+    if body is not None:
+        return body
+    
+    client = get_raw_redis_client()
+    if not client:
+        return None
+    
+    try:
+        body = client.get(key)
+        if body:
+            _l1_set(key, body)
+            return body
+        return None
+    except Exception as e:
+        logger.warning(f"Cache get error: {e}", extra={"key": key, "error": str(e)})
+        return None
@@ -1,9 +1,12 @@
 """
 JWT token generation and validation
 """
+import hashlib
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -12,6 +15,14 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change-this-secret-key-in-producti
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_EXPIRATION_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
 
+# Verified-token cache: a token's payload is reused until its exp (or the
+# cache TTL, whichever comes first) instead of re-verifying the signature.
+# Entries are keyed by a 128-bit BLAKE2b digest of the token, not the token;
+# a hit skips the signature check, so the key must be collision-resistant.
+VERIFY_CACHE_SIZE = int(os.getenv("JWT_VERIFY_CACHE_SIZE", "10000"))
+VERIFY_CACHE_TTL = int(os.getenv("JWT_VERIFY_CACHE_TTL", "300"))
+_verified_tokens: "OrderedDict[bytes, Tuple[float, Dict]]" = OrderedDict()
+
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -57,6 +68,39 @@ def verify_token(token: str) -> Optional[Dict]:
         return None
 
 
+def verify_token_cached(token: str) -> Optional[Dict]:
+    """
+    Verify and decode JWT token, reusing recent successful verifications
+    
+    Args:
+        token: JWT token string
+    
+    Returns:
+        Decoded token payload (shared; don't mutate) or None if invalid
+    """
+    now = time.time()
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    entry = _verified_tokens.get(key)
+    if entry is not None:
+        valid_until, payload = entry
+        if valid_until > now:
+            _verified_tokens.move_to_end(key)
+            return payload
+        del _verified_tokens[key]
+    
+    payload = verify_token(token)
+    if payload is None or VERIFY_CACHE_SIZE <= 0:
+        return payload
+    
+    valid_until = now + VERIFY_CACHE_TTL
+    if isinstance(payload.get("exp"), (int, float)):
+        valid_until = min(valid_until, payload["exp"])
+    _verified_tokens[key] = (valid_until, payload)
+    while len(_verified_tokens) > VERIFY_CACHE_SIZE:
+        _verified_tokens.popitem(last=False)
+    return payload
+
+
 def hash_password(password: str) -> str:
     """
     Hash a password (for API key passwords if needed)
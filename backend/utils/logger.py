@@ -1,15 +1,51 @@
 """
 Structured JSON logging configuration
 """
+import asyncio
 import json
 import logging
+import orjson
 import sys
+from collections import deque
+from contextvars import Context, ContextVar, copy_context
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
 from logging.handlers import RotatingFileHandler
 import os
 
 
+# Flat request fields passed via ``extra=`` and copied to the JSON as-is
+REQUEST_FIELDS = (
+    "method",
+    "path",
+    "query_params",
+    "user_agent",
+    "status_code",
+    "duration_ms",
+    "duration",
+    "threshold",
+    "error_type",
+    "error_message",
+)
+
+
+# Fields of the request being handled; set once per request by
+# ObservabilityMiddleware and merged into every record emitted while it runs
+request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_context", default=None)
+
+
+class RequestContextFilter(logging.Filter):
+    """Add the current request_context to records that don't set those fields"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if context:
+            for key, value in context.items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        return True
+
+
 class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logging"""
     
@@ -44,6 +80,11 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "ip_address"):
             log_data["ip_address"] = record.ip_address
         
+        # Add flat request fields if present
+        for field in REQUEST_FIELDS:
+            if hasattr(record, field):
+                log_data[field] = getattr(record, field)
+        
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
@@ -57,7 +98,11 @@ class JSONFormatter(logging.Formatter):
             import traceback
             log_data["stack_trace"] = traceback.format_stack()
         
-        return json.dumps(log_data, default=str)
+        try:
+            return orjson.dumps(log_data, default=str).decode()
+        except TypeError:
+            # orjson rejects ints beyond 64 bits and non-string keys
+            return json.dumps(log_data, default=str)
     
     def _anonymize_address(self, address: str) -> str:
         """Anonymize Ethereum address for privacy"""
@@ -93,11 +138,13 @@ def setup_logging(
     
     # Create JSON formatter
     formatter = JSONFormatter()
+    context_filter = RequestContextFilter()
     
     # Console handler (always enabled)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
+    console_handler.addFilter(context_filter)
     root_logger.addHandler(console_handler)
     
     # File handler (if log file specified)
@@ -114,6 +161,7 @@ def setup_logging(
         )
         file_handler.setLevel(level)
         file_handler.setFormatter(formatter)
+        file_handler.addFilter(context_filter)
         root_logger.addHandler(file_handler)
     
     # Set level for third-party loggers
@@ -125,6 +173,56 @@ def setup_logging(
     return root_logger
 
 
+# Log and monitoring calls deferred with emit_later, run by a background
+# task once the request that queued them yields; beyond LOG_QUEUE_SIZE
+# pending calls new ones are dropped rather than held in memory
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+_deferred: Deque[Tuple[Context, Callable, tuple, dict]] = deque()
+_drain_task: Optional[asyncio.Task] = None
+
+
+def flush_deferred() -> None:
+    """Run queued emit_later calls"""
+    while _deferred:
+        context, fn, args, kwargs = _deferred.popleft()
+        try:
+            context.run(fn, *args, **kwargs)
+        except Exception:
+            pass
+
+
+async def _drain_deferred() -> None:
+    # Exits once the queue is empty; the next emit_later restarts it
+    while _deferred:
+        await asyncio.sleep(0)
+        flush_deferred()
+
+
+def emit_later(fn: Callable, *args, **kwargs) -> bool:
+    """
+    Queue a log or monitoring call to run off the request path
+    
+    The call runs in a copy of the caller's context, so request_context
+    and per-request Sentry scopes still apply. Don't defer calls that
+    need the active exception (exc_info=True).
+    
+    Returns:
+        False if the queue was full and the call was dropped
+    """
+    global _drain_task
+    if len(_deferred) >= LOG_QUEUE_SIZE:
+        return False
+    _deferred.append((copy_context(), fn, args, kwargs))
+    
+    if _drain_task is None or _drain_task.done():
+        try:
+            _drain_task = asyncio.get_running_loop().create_task(_drain_deferred())
+        except RuntimeError:
+            # No event loop (sync caller): run right away
+            flush_deferred()
+    return True
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance with the given name
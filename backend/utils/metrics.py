@@ -1,9 +1,25 @@
 """
 Prometheus metrics definitions
 """
+import asyncio
+import os
 from prometheus_client import Counter, Histogram, Gauge, Info
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-from typing import Optional
+from typing import Dict, List, Optional
+
+# Per-request observations queued with inc_later/observe_later are applied
+# to the collectors in bulk this often (and before every scrape)
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1"))
+
+# Scrape and health-probe paths; the request middleware (metrics, logging,
+# performance) pass these straight through without recording anything
+PROBE_PATHS = frozenset({"/metrics", "/health", "/healthz", "/readyz"})
+
+# Pending counter increments and histogram observations by labelled child,
+# and the task that flushes them
+_pending_counts: Dict[Counter, float] = {}
+_pending_observations: Dict[Histogram, List[float]] = {}
+_flush_task: Optional[asyncio.Task] = None
 
 # HTTP Request Metrics
 http_requests_total = Counter(
@@ -106,6 +122,17 @@ active_requests = Gauge(
     "Number of active requests"
 )
 
+# Database Connection Pool
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out",
+    "Database connections currently checked out of the pool"
+)
+
+db_pool_overflow = Gauge(
+    "db_pool_overflow",
+    "Database connections open beyond pool_size (negative while the pool is filling)"
+)
+
 # Application Info
 app_info = Info(
     "app_info",
@@ -196,13 +223,62 @@ def record_error(error_type: str, endpoint: str):
     errors_total.labels(error_type=error_type, endpoint=endpoint).inc()
 
 
+def track_db_pool(pool):
+    """Report the database pool's checked-out and overflow counts on each scrape"""
+    db_pool_checked_out.set_function(pool.checkedout)
+    db_pool_overflow.set_function(pool.overflow)
+
+
 def set_app_info(version: str, environment: str):
     """Set application information"""
     app_info.info({"version": version, "environment": environment})
 
 
+def flush_metrics() -> None:
+    """Apply queued counter increments and histogram observations"""
+    global _pending_counts, _pending_observations
+    counts, _pending_counts = _pending_counts, {}
+    observations, _pending_observations = _pending_observations, {}
+    
+    for counter, amount in counts.items():
+        counter.inc(amount)
+    for histogram, values in observations.items():
+        for value in values:
+            histogram.observe(value)
+
+
+async def _flush_periodically() -> None:
+    # Exits once a whole interval passes without observations; the next one restarts it
+    while _pending_counts or _pending_observations:
+        await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+        flush_metrics()
+
+
+def _schedule_flush() -> None:
+    global _flush_task
+    if _flush_task is None or _flush_task.done():
+        try:
+            _flush_task = asyncio.get_running_loop().create_task(_flush_periodically())
+        except RuntimeError:
+            # No event loop (sync caller): apply right away
+            flush_metrics()
+
+
+def inc_later(counter: Counter, amount: float = 1) -> None:
+    """Queue an increment of a labelled counter (applied by flush_metrics)"""
+    _pending_counts[counter] = _pending_counts.get(counter, 0) + amount
+    _schedule_flush()
+
+
+def observe_later(histogram: Histogram, value: float) -> None:
+    """Queue an observation on a labelled histogram (applied by flush_metrics)"""
+    _pending_observations.setdefault(histogram, []).append(value)
+    _schedule_flush()
+
+
 def get_metrics():
     """Get Prometheus metrics in text format"""
+    flush_metrics()
     return generate_latest()
 
 
@@ -0,0 +1,41 @@
+"""
+Background job for writing queued A/B allocations to the database
+
+Needed when AB_ALLOCATION_WRITE_BEHIND=true; without it get_variant inserts
+allocations itself and the queue stays empty.
+"""
+import asyncio
+import os
+from utils.logger import get_logger
+from database.connection import get_db_session
+from services.ab_testing import flush_pending_allocations
+
+logger = get_logger(__name__)
+
+# Flush every N seconds; a full batch is followed by another flush at once
+FLUSH_INTERVAL = float(os.getenv("AB_ALLOCATION_FLUSH_INTERVAL", "0.5"))
+FLUSH_ROWS = int(os.getenv("AB_ALLOCATION_FLUSH_ROWS", "1000"))
+
+
+async def flush_allocations() -> int:
+    """Run a single allocation flush"""
+    try:
+        async with get_db_session() as session:
+            flushed = await flush_pending_allocations(session, FLUSH_ROWS)
+        if flushed:
+            logger.info(f"Flushed {flushed} A/B allocations")
+        return flushed
+    except Exception as e:
+        logger.error(f"Error flushing A/B allocations: {e}", exc_info=True)
+        return 0
+
+
+async def run_allocation_flush_loop():
+    """Flush queued allocations on a timer, draining backlogs batch by batch"""
+    while True:
+        if await flush_allocations() < FLUSH_ROWS:
+            await asyncio.sleep(FLUSH_INTERVAL)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_allocation_flush_loop())
@@ -9,19 +9,15 @@ logger = get_logger(__name__)
 
 
 async def update_leaderboards():
-    """Update all leaderboard categories"""
+    """Refresh the leaderboard view (run from cron every 5-30 minutes)"""
     try:
         service = LeaderboardService()
         
-        categories = ['all_time', 'monthly', 'weekly']
-        
-        for category in categories:
-            logger.info(f"Updating {category} leaderboard...")
-            success = await service.update_leaderboard(category)
-            if success:
-                logger.info(f"Successfully updated {category} leaderboard")
-            else:
-                logger.error(f"Failed to update {category} leaderboard")
+        logger.info("Refreshing leaderboards...")
+        if await service.update_leaderboard():
+            logger.info("Successfully refreshed leaderboards")
+        else:
+            logger.error("Failed to refresh leaderboards")
     except Exception as e:
         logger.error(f"Error updating leaderboards: {e}", exc_info=True)
 
@@ -0,0 +1,27 @@
+"""
+Background job for creating upcoming monthly partitions
+"""
+import asyncio
+import os
+from utils.logger import get_logger
+from database.connection import get_db_session
+from database.partitions import PARTITIONED_TABLES, ensure_monthly_partitions
+
+logger = get_logger(__name__)
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+
+
+async def maintain_partitions():
+    """Make sure every partitioned table has partitions for the coming months"""
+    for table in PARTITIONED_TABLES:
+        try:
+            async with get_db_session() as session:
+                names = await ensure_monthly_partitions(session, table, PARTITION_MONTHS_AHEAD)
+            logger.info(f"Partitions ready for {table}: {', '.join(names)}")
+        except Exception as e:
+            logger.error(f"Error maintaining partitions for {table}: {e}", exc_info=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(maintain_partitions())
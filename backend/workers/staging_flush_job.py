@@ -0,0 +1,54 @@
+"""
+Background job for moving indexer staging rows into the logged tables
+"""
+import asyncio
+import os
+import time
+from utils.logger import get_logger
+from database.connection import get_db_session
+from database.staging import flush_staging, count_staged
+
+logger = get_logger(__name__)
+
+# Flush every N seconds, or sooner once M transactions are staged
+FLUSH_INTERVAL = float(os.getenv("STAGING_FLUSH_INTERVAL", "10"))
+FLUSH_ROWS = int(os.getenv("STAGING_FLUSH_ROWS", "5000"))
+POLL_INTERVAL = float(os.getenv("STAGING_POLL_INTERVAL", "1"))
+
+
+async def flush_staged_transactions():
+    """Run a single staging flush"""
+    try:
+        async with get_db_session() as session:
+            moved = await flush_staging(session)
+        if moved["transactions"] or moved["token_transfers"]:
+            logger.info(
+                f"Flushed {moved['transactions']} transactions and "
+                f"{moved['token_transfers']} token transfers from staging"
+            )
+    except Exception as e:
+        logger.error(f"Error flushing staging tables: {e}", exc_info=True)
+
+
+async def run_staging_flush_loop():
+    """Flush staging tables on a timer or row-count threshold"""
+    last_flush = time.monotonic()
+    
+    while True:
+        await asyncio.sleep(POLL_INTERVAL)
+        
+        due = time.monotonic() - last_flush >= FLUSH_INTERVAL
+        if not due:
+            try:
+                async with get_db_session() as session:
+                    due = await count_staged(session) >= FLUSH_ROWS
+            except Exception as e:
+                logger.error(f"Error counting staged rows: {e}", exc_info=True)
+        
+        if due:
+            await flush_staged_transactions()
+            last_flush = time.monotonic()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_staging_flush_loop())